@@ -19,7 +19,7 @@ import {
 } from 'lucide-react';
 import { useAuthStore } from '../../store/auth';
 import { ProcessingConfig } from '../../lib/supabase';
-import { processingAPI, useJobPolling } from '../../services/api';
+import { processingAPI, useJobEvents } from '../../services/api';
 
 interface FilterRule {
   id: string;
@@ -53,7 +53,7 @@ export default function UploadContentModal({ isOpen, onClose }: UploadContentMod
   const [currentJobId, setCurrentJobId] = useState<string | null>(null);
   
   // Hook para polling del trabajo actual
-  const { job: currentJob, loading: jobLoading, error: jobError } = useJobPolling(currentJobId);
+  const { job: currentJob, loading: jobLoading, error: jobError } = useJobEvents(currentJobId);
   
   // Estados para configuraciones guardadas
   const [savedConfigs, setSavedConfigs] = useState<ProcessingConfig[]>([]);
@@ -302,7 +302,7 @@ export default function UploadContentModal({ isOpen, onClose }: UploadContentMod
     }
   }, [currentJob, addLog])
 
-  // Monitorear errores del job polling
+  // Monitorear errores del flujo de eventos del trabajo
   useEffect(() => {
     if (jobError) {
       addLog(`❌ Error de conexión: ${jobError}`);
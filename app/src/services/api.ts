@@ -26,19 +26,28 @@ export interface ProcessingConfig {
   author_override?: string;
   confidence_threshold?: number;
   json_filter_config?: any;
+  staging?: 'in_place' | 'link' | 'copy';
+}
+
+export interface ProcessingJobStage {
+  status: 'running' | 'completed';
+  progress: number;
 }
 
 export interface ProcessingJob {
   id: string;
-  status: 'pending' | 'running' | 'completed' | 'error';
+  status: 'pending' | 'queued' | 'running' | 'completed' | 'error' | 'cancelled';
   progress: number;
   message: string;
   config: ProcessingConfig;
+  queue_position?: number;
+  stages?: Record<string, ProcessingJobStage>;
   logs?: string[];
   stats?: {
     files_processed?: number;
     files_success?: number;
     files_error?: number;
+    documents_saved?: number;
     total_time?: string;
   };
   created_at: string;
@@ -282,9 +291,13 @@ export const dedupAPI = {
 };
 
 /**
- * Hook personalizado para polling del estado de un trabajo
+ * Hook que sigue el avance de un trabajo mediante Server-Sent Events.
+ *
+ * El servidor envía solo los cambios: `progress` (estado, progreso, mensaje y etapas),
+ * `log` (líneas nuevas) y `done` (trabajo final). EventSource reconecta por sí solo y
+ * reanuda los logs desde el último cursor recibido.
  */
-export function useJobPolling(jobId: string | null, intervalMs: number = 2000) {
+export function useJobEvents(jobId: string | null) {
   const [job, setJob] = React.useState<ProcessingJob | null>(null);
   const [loading, setLoading] = React.useState(false);
   const [error, setError] = React.useState<string | null>(null);
@@ -292,37 +305,51 @@ export function useJobPolling(jobId: string | null, intervalMs: number = 2000) {
   React.useEffect(() => {
     if (!jobId) return;
 
-    let intervalId: NodeJS.Timeout;
-    
-    const pollJobStatus = async () => {
-      setLoading(true);
-      const response = await processingAPI.getJobStatus(jobId);
-      
-      if (response.success && response.data) {
-        setJob(response.data.job);
-        setError(null);
-        
-        // Detener polling si el trabajo terminó
-        if (['completed', 'error'].includes(response.data.job.status)) {
-          clearInterval(intervalId);
-        }
-      } else {
-        setError(response.error || 'Error al obtener estado del trabajo');
-      }
-      
-      setLoading(false);
+    setLoading(true);
+    setJob(null);
+    setError(null);
+
+    const source = new EventSource(`${API_BASE}/processing/events/${encodeURIComponent(jobId)}`);
+    let finished = false;
+
+    const update = (changes: Partial<ProcessingJob>) => {
+      setJob(prev => ({
+        ...(prev ?? { id: jobId, status: 'pending', progress: 0, message: '', config: { input_path: '' }, created_at: '', logs: [] }),
+        ...changes
+      }));
     };
 
-    // Polling inicial
-    pollJobStatus();
-    
-    // Configurar polling periódico
-    intervalId = setInterval(pollJobStatus, intervalMs);
+    source.addEventListener('progress', (event) => {
+      update(JSON.parse((event as MessageEvent).data));
+      setLoading(false);
+      setError(null);
+    });
+
+    source.addEventListener('log', (event) => {
+      const { lines } = JSON.parse((event as MessageEvent).data) as { lines: string[] };
+      setJob(prev => prev ? { ...prev, logs: [...(prev.logs ?? []), ...lines] } : prev);
+    });
+
+    source.addEventListener('done', (event) => {
+      finished = true;
+      const { logs: _ignored, ...finalJob } = JSON.parse((event as MessageEvent).data) as ProcessingJob;
+      update(finalJob);
+      setLoading(false);
+      source.close();
+    });
+
+    source.onerror = () => {
+      // Mientras readyState sea CONNECTING, EventSource está reintentando
+      if (!finished && source.readyState === EventSource.CLOSED) {
+        setError('Se perdió la conexión con el servidor');
+        setLoading(false);
+      }
+    };
 
     return () => {
-      clearInterval(intervalId);
+      source.close();
     };
-  }, [jobId, intervalMs]);
+  }, [jobId]);
 
   return { job, loading, error };
 }
@@ -0,0 +1,8 @@
+"""
+Suite de benchmarks reproducibles del pipeline de Biblioperson.
+
+Genera un corpus sintético determinista (``corpus``), mide cada caso en un proceso
+aislado (``harness``, casos en ``cases``) y guarda los resultados en un histórico
+JSON Lines para comparar entre commits (``history``). Se ejecuta con
+``python -m benchmarks``.
+"""
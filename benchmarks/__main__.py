@@ -0,0 +1,133 @@
+"""
+Ejecuta la suite de benchmarks.
+
+Uso:
+    python -m benchmarks                              # tamaño small, todos los casos
+    python -m benchmarks --sizes small medium --cases "loader.*" "segment.*"
+    python -m benchmarks --compare                    # contra la ejecución anterior
+    python -m benchmarks --compare a1b2c3d --threshold 5
+    python -m benchmarks --generate-only --sizes large
+"""
+
+import argparse
+import fnmatch
+import logging
+import math
+import sys
+from pathlib import Path
+
+from .cases import CASES
+from .corpus import DEFAULT_SEED, SIZES, generate_corpus
+from .harness import run_case
+from .history import (DEFAULT_HISTORY_FILE, append_run, compare_runs, find_baseline,
+                      load_history, new_run_record)
+
+logger = logging.getLogger('benchmarks')
+
+
+def _select_cases(patterns):
+    if not patterns:
+        return list(CASES)
+    return [name for name in CASES if any(fnmatch.fnmatch(name, pattern) for pattern in patterns)]
+
+
+def _fmt(value, digits=1):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return '-'
+    return f"{value:,.{digits}f}"
+
+
+def _print_results(results):
+    header = f"{'caso':<24} {'tamaño':<7} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'unid/s':>12} {'MB/s':>8} {'RSS MB':>8}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        if result['status'] != 'ok':
+            print(f"{result['case']:<24} {result['size']:<7} {result['status']}: {result.get('reason', '')}")
+            continue
+        print(f"{result['case']:<24} {result['size']:<7} {_fmt(result['p50_ms'], 2):>10} "
+              f"{_fmt(result['p90_ms'], 2):>10} {_fmt(result['p99_ms'], 2):>10} "
+              f"{_fmt(result['units_per_s']):>12} {_fmt(result['mb_per_s'], 2):>8} "
+              f"{_fmt(result['peak_rss_mb']):>8}")
+
+
+def _print_comparison(baseline, comparison, threshold):
+    print(f"\nComparación con {str(baseline.get('commit'))[:10]} ({baseline.get('timestamp')}), umbral {threshold}%:")
+    regressions = 0
+    for entry in comparison:
+        mark = '⚠️ ' if entry['regression'] else '  '
+        regressions += entry['regression']
+        print(f"{mark}{entry['case']:<24} {entry['size']:<7} p50 {_fmt(entry['p50_ms_before'], 2)} → "
+              f"{_fmt(entry['p50_ms_after'], 2)} ms ({_fmt(entry['p50_delta_pct'])}%), "
+              f"RSS {_fmt(entry['rss_delta_pct'])}%")
+    print(f"Regresiones: {regressions}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Benchmarks reproducibles del pipeline de Biblioperson')
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['small'],
+                        help='Tamaños de corpus a medir (por defecto: small)')
+    parser.add_argument('--cases', nargs='+', metavar='PATRÓN',
+                        help='Patrones fnmatch de los casos (p. ej. "loader.*"); por defecto todos')
+    parser.add_argument('--list', action='store_true', help='Listar los casos disponibles y salir')
+    parser.add_argument('--repeat', type=int, help='Ejecuciones medidas por caso (por defecto, las del caso)')
+    parser.add_argument('--warmup', type=int, default=1, help='Ejecuciones de calentamiento descartadas (por defecto: 1)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Semilla del corpus sintético')
+    parser.add_argument('--corpus-dir', type=Path, help='Directorio de los corpus (por defecto benchmarks/.corpus)')
+    parser.add_argument('--history', type=Path, default=DEFAULT_HISTORY_FILE, help='Archivo JSON Lines del histórico')
+    parser.add_argument('--no-record', action='store_true', help='No añadir la ejecución al histórico')
+    parser.add_argument('--compare', nargs='?', const='', metavar='REF',
+                        help='Comparar con la ejecución anterior o con la de un commit')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Porcentaje de empeoramiento que cuenta como regresión (por defecto: 10)')
+    parser.add_argument('--generate-only', action='store_true', help='Solo generar el corpus')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    if args.list:
+        for case in CASES.values():
+            print(f"{case.name:<24} {case.group:<18} {', '.join(case.formats) or '-'}")
+        return 0
+
+    for size in args.sizes:
+        corpus = generate_corpus(size, seed=args.seed, corpus_dir=args.corpus_dir)
+        for fmt, reason in corpus.skipped.items():
+            logger.warning(f"⚠️ {size}: sin {fmt} ({reason})")
+    if args.generate_only:
+        return 0
+
+    case_names = _select_cases(args.cases)
+    if not case_names:
+        logger.error(f"Ningún caso coincide con {args.cases}")
+        return 1
+
+    results = []
+    for size in args.sizes:
+        for name in case_names:
+            logger.info(f"▶ {name} ({size})")
+            results.append(run_case(name, size, args.seed, args.corpus_dir, args.repeat, args.warmup))
+
+    print()
+    _print_results(results)
+
+    record = new_run_record(args.seed, args.sizes, results)
+    previous_runs = load_history(args.history)
+    if not args.no_record:
+        path = append_run(record, args.history)
+        logger.info(f"\n📊 Resultados añadidos a {path}")
+
+    exit_code = 1 if any(r['status'] == 'error' for r in results) else 0
+    if args.compare is not None:
+        baseline = find_baseline(previous_runs, record, args.compare or None)
+        if baseline is None:
+            logger.warning("No hay ejecución de referencia en el histórico para comparar")
+        elif _print_comparison(baseline, compare_runs(baseline, record, args.threshold), args.threshold):
+            exit_code = 2
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
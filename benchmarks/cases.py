@@ -0,0 +1,270 @@
+"""
+Casos de benchmark del pipeline.
+
+Cada caso declara los formatos del corpus que necesita y una función ``setup``
+que, fuera de la medición, carga lo necesario (bloques de entrada, modelos,
+índices) y devuelve un ``PreparedCase`` cuyo ``run()`` es lo que se mide y
+devuelve el número de unidades procesadas (bloques, segmentos, consultas...).
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from .corpus import Corpus
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class PreparedCase:
+    """Caso listo para medir."""
+
+    def __init__(self, run: Callable[[], int], bytes_per_run: int = 0,
+                 cleanup: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            run: Operación medida; devuelve las unidades procesadas
+            bytes_per_run: Bytes de entrada por ejecución (para MB/s; 0 si no aplica)
+            cleanup: Liberación de recursos al terminar
+        """
+        self.run = run
+        self.bytes_per_run = bytes_per_run
+        self._cleanup = cleanup
+
+    def close(self) -> None:
+        if self._cleanup is not None:
+            self._cleanup()
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    group: str
+    formats: Tuple[str, ...]
+    setup: Callable[[Corpus], PreparedCase]
+    unit: str = 'bloques'
+    repeat: int = 5
+
+
+CASES: Dict[str, BenchmarkCase] = {}
+
+
+def benchmark(name: str, group: str, formats: Tuple[str, ...], unit: str = 'bloques', repeat: int = 5):
+    """Registra una función ``setup(corpus) -> PreparedCase`` como caso de benchmark."""
+    def decorator(setup: Callable[[Corpus], PreparedCase]) -> Callable[[Corpus], PreparedCase]:
+        CASES[name] = BenchmarkCase(name, group, formats, setup, unit, repeat)
+        return setup
+    return decorator
+
+
+# ---------------------------------------------------------------------- #
+# Utilidades
+# ---------------------------------------------------------------------- #
+
+_LOADER_CLASSES = {
+    'prose_pdf': 'PDFLoader',
+    'verse_pdf': 'PDFLoader',
+    'docx': 'DocxLoader',
+    'txt': 'txtLoader',
+    'json': 'JSONLoader',
+    'ndjson': 'NDJSONLoader',
+    'excel': 'ExcelLoader',
+}
+
+
+def _load_blocks(corpus: Corpus, fmt: str):
+    from dataset.processing import loaders
+
+    loader_class = getattr(loaders, _LOADER_CLASSES[fmt])
+    loaded = loader_class(corpus.path(fmt)).load()
+    if isinstance(loaded, dict):
+        return loaded.get('blocks', []), loaded.get('document_metadata', {})
+    # NDJSONLoader devuelve un iterador de documentos
+    return list(loaded), {}
+
+
+def _preprocessed_blocks(corpus: Corpus, fmt: str):
+    from dataset.processing.pre_processors import CommonBlockPreprocessor
+
+    blocks, metadata = _load_blocks(corpus, fmt)
+    return CommonBlockPreprocessor().process(blocks, metadata)
+
+
+def _copy_blocks(blocks):
+    # Los pre-procesadores y segmentadores anotan los bloques: cada ejecución parte de copias
+    return [dict(block) for block in blocks]
+
+
+# ---------------------------------------------------------------------- #
+# Loaders
+# ---------------------------------------------------------------------- #
+
+def _loader_case(fmt: str) -> Callable[[Corpus], PreparedCase]:
+    def setup(corpus: Corpus) -> PreparedCase:
+        from dataset.processing import loaders  # importar fuera de la medición
+
+        path = corpus.path(fmt)
+        loader_class = getattr(loaders, _LOADER_CLASSES[fmt])
+
+        def run() -> int:
+            loaded = loader_class(path).load()
+            return len(loaded.get('blocks', [])) if isinstance(loaded, dict) else sum(1 for _ in loaded)
+
+        return PreparedCase(run, path.stat().st_size)
+    return setup
+
+
+for _fmt in _LOADER_CLASSES:
+    benchmark(f"loader.{_fmt}", 'loaders', (_fmt,))(_loader_case(_fmt))
+
+
+# ---------------------------------------------------------------------- #
+# Pre-procesado, segmentación, detección de autor y exportación
+# ---------------------------------------------------------------------- #
+
+def _preprocess_case(fmt: str) -> Callable[[Corpus], PreparedCase]:
+    def setup(corpus: Corpus) -> PreparedCase:
+        from dataset.processing.pre_processors import CommonBlockPreprocessor
+
+        blocks, metadata = _load_blocks(corpus, fmt)
+        preprocessor = CommonBlockPreprocessor()
+
+        def run() -> int:
+            processed, _ = preprocessor.process(_copy_blocks(blocks), dict(metadata))
+            return len(processed)
+
+        return PreparedCase(run, sum(len(block.get('text', '')) for block in blocks))
+    return setup
+
+
+benchmark('preprocess.prose_pdf', 'preprocess', ('prose_pdf',))(_preprocess_case('prose_pdf'))
+benchmark('preprocess.txt', 'preprocess', ('txt',))(_preprocess_case('txt'))
+
+
+@benchmark('segment.heading', 'segmentation', ('prose_pdf',), unit='segmentos')
+def _heading_segmenter(corpus: Corpus) -> PreparedCase:
+    from dataset.processing.segmenters.heading_segmenter import HeadingSegmenter
+
+    blocks, _ = _preprocessed_blocks(corpus, 'prose_pdf')
+
+    def run() -> int:
+        return len(HeadingSegmenter().segment(_copy_blocks(blocks)))
+
+    return PreparedCase(run, sum(len(block.get('text', '')) for block in blocks))
+
+
+@benchmark('segment.verse', 'segmentation', ('verse_pdf',), unit='segmentos')
+def _verse_segmenter(corpus: Corpus) -> PreparedCase:
+    from dataset.processing.segmenters.verse_segmenter import VerseSegmenter
+
+    blocks, _ = _preprocessed_blocks(corpus, 'verse_pdf')
+
+    def run() -> int:
+        return len(VerseSegmenter().segment(_copy_blocks(blocks)))
+
+    return PreparedCase(run, sum(len(block.get('text', '')) for block in blocks))
+
+
+@benchmark('author.detect', 'author_detection', ('prose_pdf',), unit='documentos')
+def _author_detection(corpus: Corpus) -> PreparedCase:
+    from dataset.processing.author_detection import AuthorDetectionEngine
+
+    blocks, metadata = _preprocessed_blocks(corpus, 'prose_pdf')
+    engine = AuthorDetectionEngine()
+    path = str(corpus.path('prose_pdf'))
+    # La primera llamada construye los detectores (carga de autores conocidos): fuera de la medición
+    engine.detect(segments=blocks[:10], profile_type='prose', source_file_path=path)
+
+    def run() -> int:
+        engine.detect(segments=blocks, profile_type='prose',
+                      document_title=metadata.get('titulo_documento', ''), source_file_path=path)
+        return 1
+
+    return PreparedCase(run, sum(len(block.get('text', '')) for block in blocks), engine.close)
+
+
+@benchmark('export.ndjson', 'export', ('prose_pdf',), unit='segmentos')
+def _export_ndjson(corpus: Corpus) -> PreparedCase:
+    from dataset.processing.output_modes import create_serializer
+    from dataset.processing.segmenters.heading_segmenter import HeadingSegmenter
+
+    blocks, metadata = _preprocessed_blocks(corpus, 'prose_pdf')
+    segments = HeadingSegmenter().segment(_copy_blocks(blocks))
+    serializer = create_serializer('biblioperson')
+    output_dir = tempfile.mkdtemp(prefix='bench_export_')
+    output_file = os.path.join(output_dir, 'salida.ndjson')
+
+    def run() -> int:
+        serializer.export_segments(segments, output_file, metadata, 'ndjson')
+        return len(segments)
+
+    return PreparedCase(run, 0, lambda: shutil.rmtree(output_dir, ignore_errors=True))
+
+
+@benchmark('pipeline.txt', 'pipeline', ('txt',), unit='segmentos', repeat=3)
+def _pipeline_txt(corpus: Corpus) -> PreparedCase:
+    from dataset.processing.profile_manager import ProfileManager
+
+    manager = ProfileManager()
+    path = corpus.path('txt')
+    output_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    output_file = os.path.join(output_dir, 'salida.ndjson')
+
+    def run() -> int:
+        segments, _, _ = manager.process_file(str(path), 'prosa', output_file=output_file,
+                                              output_mode='generic')
+        return len(segments)
+
+    return PreparedCase(run, path.stat().st_size, lambda: shutil.rmtree(output_dir, ignore_errors=True))
+
+
+# ---------------------------------------------------------------------- #
+# Búsqueda semántica
+# ---------------------------------------------------------------------- #
+
+SEARCH_VECTORS = 20000
+SEARCH_DIMENSION = 384
+SEARCH_MODEL = 'benchmark:random-384'
+
+
+@benchmark('search.embedding_index', 'semantic_search', (), unit='consultas', repeat=200)
+def _semantic_search(corpus: Corpus) -> PreparedCase:
+    import numpy as np
+
+    # scripts/backend no es un paquete instalable: mismo sys.path que api_conexion.py
+    scripts_dir = str(PROJECT_ROOT / 'scripts')
+    if scripts_dir not in sys.path:
+        sys.path.append(scripts_dir)
+    from backend.embedding_codec import encode_embedding
+    from backend.embedding_index import EmbeddingIndex
+
+    from .corpus import SIZES
+
+    count = SEARCH_VECTORS * SIZES[corpus.size]
+    rng = np.random.default_rng(len(corpus.size) * 7919 + count)
+    work_dir = tempfile.mkdtemp(prefix='bench_search_')
+    db_path = os.path.join(work_dir, 'embeddings.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE embeddings (segment_id TEXT PRIMARY KEY, embedding BLOB, model TEXT)")
+        for start in range(0, count, 5000):
+            vectors = rng.standard_normal((min(5000, count - start), SEARCH_DIMENSION), dtype=np.float32)
+            conn.executemany("INSERT INTO embeddings (segment_id, embedding, model) VALUES (?, ?, ?)",
+                             ((f"seg-{start + i}", encode_embedding(vector), SEARCH_MODEL)
+                              for i, vector in enumerate(vectors)))
+    index = EmbeddingIndex(db_path, SEARCH_MODEL, cache_dir=os.path.join(work_dir, 'index'))
+    index.build()
+    queries = rng.standard_normal((64, SEARCH_DIMENSION), dtype=np.float32)
+    position = [0]
+
+    def run() -> int:
+        query = queries[position[0] % len(queries)]
+        position[0] += 1
+        index.search(query, k=10)
+        return 1
+
+    return PreparedCase(run, 0, lambda: shutil.rmtree(work_dir, ignore_errors=True))
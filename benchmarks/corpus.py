@@ -0,0 +1,302 @@
+"""
+Generador determinista de corpus sintéticos para los benchmarks.
+
+Cada formato se genera a partir de una semilla fija y del tamaño pedido, así que
+dos ejecuciones (en la misma o en otra máquina) producen el mismo contenido y los
+resultados son comparables entre commits. Los archivos se guardan en
+``benchmarks/.corpus/<tamaño>/`` junto a un ``manifest.json``; si el manifest
+coincide con la versión del generador y la semilla, no se regeneran.
+
+Los formatos cuyo escritor no está instalado (PyMuPDF para PDF, python-docx para
+DOCX, pandas + openpyxl para Excel) se omiten y quedan anotados en el manifest.
+"""
+
+import json
+import logging
+import random
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+GENERATOR_VERSION = 1
+DEFAULT_SEED = 20250601
+DEFAULT_CORPUS_DIR = Path(__file__).resolve().parent / '.corpus'
+
+# Factor de escala de cada tamaño sobre los volúmenes base de FORMAT_VOLUMES
+SIZES = {
+    'small': 1,
+    'medium': 10,
+    'large': 50,
+}
+
+# Volumen base (tamaño 'small') de cada formato
+FORMAT_VOLUMES = {
+    'prose_pdf': 12,      # capítulos de ~8 párrafos
+    'verse_pdf': 30,      # poemas
+    'docx': 12,           # capítulos
+    'txt': 12,            # capítulos
+    'json': 2000,         # registros
+    'ndjson': 2000,       # registros
+    'excel': 1000,        # filas
+}
+
+_WORDS = (
+    "casa tiempo vida mundo noche día hombre mujer ciudad camino palabra agua tierra fuego "
+    "viento luz sombra memoria silencio historia libro carta puerta ventana río mar montaña "
+    "cielo sol luna estrella corazón alma voz mirada mano sueño deseo verdad razón guerra paz "
+    "pueblo patria amigo hermano padre madre hijo niño viejo joven año siglo hora momento "
+    "recuerdo olvido esperanza miedo dolor alegría tristeza amor muerte destino fortuna "
+    "pensamiento idea lengua nombre figura forma orden origen final principio mitad parte "
+    "camina mira piensa escribe recuerda olvida busca encuentra pierde gana lleva trae vuelve "
+    "sabe conoce siente quiere puede dice hace tiene vive muere nace crece cae sube baja "
+    "antiguo nuevo largo breve oscuro claro blanco negro rojo verde lejano cercano profundo "
+    "hondo alto bajo lento rápido triste alegre solo último primero mismo otro cierto"
+).split()
+_CONNECTORS = "el la los las un una de del en con por para sin sobre entre hacia y que como cuando donde".split()
+_FIRST_NAMES = ("Ana", "Luis", "Carmen", "José", "Elena", "Miguel", "Rosa", "Pedro", "Lucía", "Andrés",
+                "Teresa", "Julio", "Isabel", "Ramón", "Marta", "Tomás")
+_SURNAMES = ("García", "Martínez", "López", "Sánchez", "Pérez", "Gómez", "Fernández", "Ruiz",
+             "Díaz", "Moreno", "Álvarez", "Romero", "Navarro", "Torres", "Domínguez", "Castro")
+
+
+class TextFactory:
+    """Frases, párrafos, títulos y poemas pseudoaleatorios con un ``random.Random`` propio."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def sentence(self, min_words: int = 8, max_words: int = 22) -> str:
+        words = []
+        for _ in range(self.rng.randint(min_words, max_words)):
+            pool = _CONNECTORS if self.rng.random() < 0.35 else _WORDS
+            words.append(self.rng.choice(pool))
+        sentence = ' '.join(words)
+        if self.rng.random() < 0.2:
+            sentence = sentence.replace(' ', ', ', 1)
+        return sentence[0].upper() + sentence[1:] + '.'
+
+    def paragraph(self, min_sentences: int = 3, max_sentences: int = 8) -> str:
+        return ' '.join(self.sentence() for _ in range(self.rng.randint(min_sentences, max_sentences)))
+
+    def title(self, max_words: int = 5) -> str:
+        words = [self.rng.choice(_WORDS) for _ in range(self.rng.randint(2, max_words))]
+        return ' '.join(word.capitalize() for word in words)
+
+    def verse(self) -> str:
+        return self.sentence(4, 9).rstrip('.')
+
+    def poem(self) -> List[List[str]]:
+        """Estrofas de versos."""
+        return [[self.verse() for _ in range(self.rng.randint(3, 6))]
+                for _ in range(self.rng.randint(2, 5))]
+
+    def author(self) -> str:
+        return f"{self.rng.choice(_FIRST_NAMES)} {self.rng.choice(_SURNAMES)}"
+
+
+def _rng(seed: int, fmt: str, size: str) -> random.Random:
+    # Semilla de texto: random la convierte con SHA-512, estable entre versiones de Python
+    return random.Random(f"{seed}:{fmt}:{size}")
+
+
+def _prose_chapters(factory: TextFactory, chapters: int) -> List[Dict]:
+    return [{'title': f"Capítulo {i + 1}. {factory.title()}",
+             'paragraphs': [factory.paragraph() for _ in range(8)]}
+            for i in range(chapters)]
+
+
+# ---------------------------------------------------------------------- #
+# Escritores por formato
+# ---------------------------------------------------------------------- #
+
+def _write_txt(path: Path, factory: TextFactory, volume: int, author: str) -> None:
+    lines = [f"{factory.title()}", f"{author}", ""]
+    for chapter in _prose_chapters(factory, volume):
+        lines += [chapter['title'], ""]
+        for paragraph in chapter['paragraphs']:
+            lines += [paragraph, ""]
+    path.write_text('\n'.join(lines), encoding='utf-8')
+
+
+def _write_json(path: Path, factory: TextFactory, volume: int, author: str) -> None:
+    records = [{'id': i, 'date': f"2024-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}",
+                'author': author, 'text': factory.paragraph(1, 4)}
+               for i in range(volume)]
+    path.write_text(json.dumps(records, ensure_ascii=False), encoding='utf-8')
+
+
+def _write_ndjson(path: Path, factory: TextFactory, volume: int, author: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(volume):
+            record = {'id': i, 'author': author, 'text': factory.paragraph(1, 4)}
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def _write_docx(path: Path, factory: TextFactory, volume: int, author: str) -> None:
+    import docx
+    from datetime import datetime
+
+    document = docx.Document()
+    document.add_heading(factory.title(), level=0)
+    document.add_paragraph(author)
+    for chapter in _prose_chapters(factory, volume):
+        document.add_heading(chapter['title'], level=1)
+        for paragraph in chapter['paragraphs']:
+            document.add_paragraph(paragraph)
+    # Fechas fijas: el archivo (y su hash) no depende del momento de generación
+    document.core_properties.author = author
+    document.core_properties.created = datetime(2025, 1, 1)
+    document.core_properties.modified = datetime(2025, 1, 1)
+    document.save(str(path))
+
+
+def _write_excel(path: Path, factory: TextFactory, volume: int, author: str) -> None:
+    import pandas as pd
+
+    rows = [{'Título': factory.title(), 'Autor': author, 'Fecha': f"2024-{(i % 12) + 1:02d}-01",
+             'Texto': factory.paragraph(1, 3)}
+            for i in range(volume)]
+    pd.DataFrame(rows).to_excel(path, index=False, engine='openpyxl')
+
+
+def _pdf_document():
+    import fitz
+    document = fitz.open()
+    return fitz, document
+
+
+def _save_pdf(document, path: Path, author: str, title: str) -> None:
+    document.set_metadata({'author': author, 'title': title, 'creationDate': "D:20250101000000",
+                           'modDate': "D:20250101000000", 'producer': 'biblioperson-benchmarks'})
+    document.save(str(path), garbage=3, deflate=True, no_new_id=True)
+    document.close()
+
+
+def _write_prose_pdf(path: Path, factory: TextFactory, volume: int, author: str) -> None:
+    fitz, document = _pdf_document()
+    title = factory.title()
+    page_rect = fitz.paper_rect('a4')
+    margin = 60
+    for chapter in _prose_chapters(factory, volume):
+        page = document.new_page(width=page_rect.width, height=page_rect.height)
+        y = margin
+        page.insert_text((margin, y), chapter['title'], fontsize=16, fontname='hebo')
+        y += 30
+        for paragraph in chapter['paragraphs']:
+            box = fitz.Rect(margin, y, page_rect.width - margin, page_rect.height - margin)
+            remaining = page.insert_textbox(box, paragraph, fontsize=11, fontname='helv')
+            if remaining < 0:
+                # No cabe: nueva página para el párrafo
+                page = document.new_page(width=page_rect.width, height=page_rect.height)
+                y = margin
+                box = fitz.Rect(margin, y, page_rect.width - margin, page_rect.height - margin)
+                remaining = page.insert_textbox(box, paragraph, fontsize=11, fontname='helv')
+            used = box.height - max(remaining, 0)
+            y += used + 12
+        # Pie de página repetido, como en los libros reales (lo limpia el pre-procesador)
+        page.insert_text((margin, page_rect.height - 30), f"{title} - {author}", fontsize=8, fontname='helv')
+    _save_pdf(document, path, author, title)
+
+
+def _write_verse_pdf(path: Path, factory: TextFactory, volume: int, author: str) -> None:
+    fitz, document = _pdf_document()
+    title = factory.title()
+    page_rect = fitz.paper_rect('a4')
+    margin = 70
+    for _ in range(volume):
+        page = document.new_page(width=page_rect.width, height=page_rect.height)
+        y = margin
+        page.insert_text((margin, y), factory.title(4), fontsize=14, fontname='hebo')
+        y += 28
+        for stanza in factory.poem():
+            for verse in stanza:
+                if y > page_rect.height - margin:
+                    page = document.new_page(width=page_rect.width, height=page_rect.height)
+                    y = margin
+                page.insert_text((margin, y), verse, fontsize=11, fontname='helv')
+                y += 15
+            y += 12
+    _save_pdf(document, path, author, title)
+
+
+# formato → (nombre de archivo, escritor)
+WRITERS: Dict[str, tuple] = {
+    'prose_pdf': ('prosa.pdf', _write_prose_pdf),
+    'verse_pdf': ('verso.pdf', _write_verse_pdf),
+    'docx': ('prosa.docx', _write_docx),
+    'txt': ('prosa.txt', _write_txt),
+    'json': ('registros.json', _write_json),
+    'ndjson': ('registros.ndjson', _write_ndjson),
+    'excel': ('tabla.xlsx', _write_excel),
+}
+
+
+class Corpus:
+    """Archivos generados para un tamaño, indexados por formato."""
+
+    def __init__(self, size: str, directory: Path, files: Dict[str, Path],
+                 skipped: Dict[str, str], author: str):
+        self.size = size
+        self.directory = directory
+        self.files = files
+        self.skipped = skipped
+        self.author = author
+
+    def path(self, fmt: str) -> Optional[Path]:
+        return self.files.get(fmt)
+
+
+def generate_corpus(size: str = 'small', seed: int = DEFAULT_SEED,
+                    corpus_dir: Optional[Path] = None, force: bool = False,
+                    formats: Optional[List[str]] = None) -> Corpus:
+    """
+    Genera (o reutiliza) el corpus de un tamaño.
+
+    Args:
+        size: Clave de SIZES
+        seed: Semilla base; con la misma semilla el contenido es idéntico
+        corpus_dir: Directorio raíz de los corpus (por defecto benchmarks/.corpus)
+        force: Regenerar aunque el manifest coincida
+        formats: Subconjunto de formatos (por defecto todos)
+    """
+    if size not in SIZES:
+        raise ValueError(f"Tamaño desconocido: {size} (disponibles: {', '.join(SIZES)})")
+    directory = Path(corpus_dir or DEFAULT_CORPUS_DIR) / size
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest_path = directory / 'manifest.json'
+    formats = formats or list(WRITERS)
+
+    manifest = {}
+    if manifest_path.exists() and not force:
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            manifest = {}
+    if manifest.get('generator_version') != GENERATOR_VERSION or manifest.get('seed') != seed:
+        manifest = {'generator_version': GENERATOR_VERSION, 'seed': seed, 'size': size,
+                    'files': {}, 'skipped': {}}
+
+    author = TextFactory(_rng(seed, 'author', size)).author()
+    manifest['author'] = author
+    scale = SIZES[size]
+    for fmt in formats:
+        file_name, writer = WRITERS[fmt]
+        path = directory / file_name
+        if fmt in manifest['files'] and path.exists():
+            continue
+        factory = TextFactory(_rng(seed, fmt, size))
+        try:
+            writer(path, factory, FORMAT_VOLUMES[fmt] * scale, author)
+        except ImportError as e:
+            manifest['skipped'][fmt] = f"dependencia no instalada: {e.name}"
+            logger.warning(f"Corpus {size}: se omite {fmt} ({manifest['skipped'][fmt]})")
+            continue
+        manifest['files'][fmt] = {'name': file_name, 'bytes': path.stat().st_size}
+        manifest['skipped'].pop(fmt, None)
+        logger.info(f"Corpus {size}: generado {file_name} ({path.stat().st_size:,} bytes)")
+
+    manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+    files = {fmt: directory / info['name'] for fmt, info in manifest['files'].items()
+             if fmt in formats and (directory / info['name']).exists()}
+    return Corpus(size, directory, files, dict(manifest['skipped']), author)
@@ -0,0 +1,117 @@
+"""
+Medición de los casos de benchmark.
+
+Cada caso se ejecuta en un proceso hijo nuevo (``spawn``): el pico de memoria
+residente que informa el sistema es un máximo histórico del proceso, así que solo
+aislado refleja lo que consume ese caso. Dentro del hijo se prepara el caso
+(``setup``, sin medir), se hacen ``warmup`` ejecuciones descartadas y ``repeat``
+ejecuciones medidas con ``time.perf_counter``.
+"""
+
+import logging
+import math
+import multiprocessing
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentil ``q`` (0-100) con interpolación lineal sobre valores ya ordenados."""
+    if not sorted_values:
+        return math.nan
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], units_per_run: float, bytes_per_run: int) -> Dict[str, Any]:
+    """Latencias en milisegundos y throughput en unidades y MB por segundo."""
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        'runs': len(ordered),
+        'mean_ms': statistics.fmean(ordered) * 1000 if ordered else math.nan,
+        'stdev_ms': statistics.stdev(ordered) * 1000 if len(ordered) > 1 else 0.0,
+        'min_ms': ordered[0] * 1000 if ordered else math.nan,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p90_ms': percentile(ordered, 90) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'max_ms': ordered[-1] * 1000 if ordered else math.nan,
+        'units_per_run': units_per_run,
+        'units_per_s': units_per_run * len(ordered) / total if total else math.nan,
+        'mb_per_s': bytes_per_run * len(ordered) / total / (1024 * 1024) if total and bytes_per_run else None,
+    }
+
+
+def _run_case_in_child(case_name: str, size: str, seed: int, corpus_dir: Optional[str],
+                       repeat: Optional[int], warmup: int) -> Dict[str, Any]:
+    """Cuerpo del proceso hijo: prepara el caso, lo mide y devuelve el resumen."""
+    # Los módulos del pipeline registran mucho en INFO; en benchmarks solo interesan errores
+    logging.basicConfig(level=logging.ERROR)
+
+    from dataset.processing.pipeline_metrics import process_peak_rss_mb
+    from .cases import CASES
+    from .corpus import generate_corpus
+
+    case = CASES[case_name]
+    corpus = generate_corpus(size, seed=seed, corpus_dir=Path(corpus_dir) if corpus_dir else None)
+    missing = [fmt for fmt in case.formats if corpus.path(fmt) is None]
+    if missing:
+        reasons = [corpus.skipped.get(fmt, 'no generado') for fmt in missing]
+        return {'case': case_name, 'size': size, 'status': 'skipped',
+                'reason': f"corpus sin {', '.join(missing)} ({'; '.join(reasons)})"}
+
+    try:
+        prepared = case.setup(corpus)
+    except ImportError as e:
+        return {'case': case_name, 'size': size, 'status': 'skipped',
+                'reason': f"dependencia no instalada: {e.name}"}
+
+    rss_after_setup = process_peak_rss_mb()
+    runs = repeat or case.repeat
+    units = 0
+    try:
+        for _ in range(warmup):
+            prepared.run()
+        latencies = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            units = prepared.run()
+            latencies.append(time.perf_counter() - start)
+    finally:
+        prepared.close()
+
+    result = {'case': case_name, 'group': case.group, 'size': size, 'status': 'ok', 'unit': case.unit}
+    result.update(summarize(latencies, units or 0, prepared.bytes_per_run))
+    peak = process_peak_rss_mb()
+    result['peak_rss_mb'] = peak
+    result['setup_rss_mb'] = rss_after_setup
+    return result
+
+
+def run_case(case_name: str, size: str, seed: int, corpus_dir: Optional[Path] = None,
+             repeat: Optional[int] = None, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Ejecuta un caso en un proceso hijo aislado.
+
+    Returns:
+        Resumen del caso: latencias (ms), percentiles, throughput y pico de RSS; o
+        ``status='skipped'/'error'`` con el motivo
+    """
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        future = executor.submit(_run_case_in_child, case_name, size, seed,
+                                 str(corpus_dir) if corpus_dir else None, repeat, warmup)
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"El caso {case_name} ({size}) falló: {e}")
+            return {'case': case_name, 'size': size, 'status': 'error', 'reason': str(e)}
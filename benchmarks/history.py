@@ -0,0 +1,137 @@
+"""
+Histórico de resultados de benchmarks.
+
+Cada ejecución se añade como una línea JSON a ``benchmarks/results/history.jsonl``
+con el commit, si el árbol tenía cambios sin confirmar, la plataforma y los
+resultados por caso. ``compare_runs`` contrasta dos ejecuciones y marca las
+regresiones de latencia (p50) y de memoria que superen un umbral porcentual.
+"""
+
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_HISTORY_FILE = Path(__file__).resolve().parent / 'results' / 'history.jsonl'
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        completed = subprocess.run(['git', *args], cwd=PROJECT_ROOT, capture_output=True,
+                                   text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() if completed.returncode == 0 else None
+
+
+def git_revision() -> Dict[str, Any]:
+    """Commit actual, rama y si hay cambios sin confirmar (None si no es un repo git)."""
+    commit = _git('rev-parse', 'HEAD')
+    status = _git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': commit,
+        'branch': _git('rev-parse', '--abbrev-ref', 'HEAD'),
+        'dirty': bool(status) if status is not None else None,
+    }
+
+
+def new_run_record(seed: int, sizes: List[str], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'seed': seed,
+        'sizes': sizes,
+        'results': results,
+    }
+    record.update(git_revision())
+    return record
+
+
+def append_run(record: Dict[str, Any], history_file: Optional[Path] = None) -> Path:
+    path = Path(history_file or DEFAULT_HISTORY_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return path
+
+
+def load_history(history_file: Optional[Path] = None) -> List[Dict[str, Any]]:
+    path = Path(history_file or DEFAULT_HISTORY_FILE)
+    if not path.exists():
+        return []
+    runs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                runs.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return runs
+
+
+def find_baseline(runs: List[Dict[str, Any]], current: Dict[str, Any],
+                  ref: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Ejecución de referencia para comparar con ``current``.
+
+    Args:
+        runs: Histórico (sin incluir ``current``)
+        current: Ejecución actual
+        ref: Prefijo de commit o referencia git; si es None, la última ejecución
+             de un commit distinto (o la anterior si todas son del mismo)
+    """
+    if ref:
+        commit = _git('rev-parse', ref) or ref
+        for run in reversed(runs):
+            if run.get('commit') and run['commit'].startswith(commit):
+                return run
+        return None
+    for run in reversed(runs):
+        if run.get('commit') != current.get('commit'):
+            return run
+    return runs[-1] if runs else None
+
+
+def compare_runs(baseline: Dict[str, Any], current: Dict[str, Any],
+                 threshold_pct: float = 10.0) -> List[Dict[str, Any]]:
+    """
+    Compara caso a caso (mismo nombre y tamaño) la mediana de latencia y el pico de RSS.
+
+    Returns:
+        Una entrada por caso presente en ambas ejecuciones, con los deltas en % y
+        ``regression=True`` si alguno supera ``threshold_pct``
+    """
+    previous = {(r['case'], r['size']): r for r in baseline.get('results', []) if r.get('status') == 'ok'}
+    comparison = []
+    for result in current.get('results', []):
+        key = (result['case'], result['size'])
+        if result.get('status') != 'ok' or key not in previous:
+            continue
+        before = previous[key]
+        p50_delta = _delta_pct(before.get('p50_ms'), result.get('p50_ms'))
+        rss_delta = _delta_pct(before.get('peak_rss_mb'), result.get('peak_rss_mb'))
+        comparison.append({
+            'case': result['case'],
+            'size': result['size'],
+            'p50_ms_before': before.get('p50_ms'),
+            'p50_ms_after': result.get('p50_ms'),
+            'p50_delta_pct': p50_delta,
+            'rss_delta_pct': rss_delta,
+            'regression': any(delta is not None and delta > threshold_pct for delta in (p50_delta, rss_delta)),
+        })
+    return comparison
+
+
+def _delta_pct(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
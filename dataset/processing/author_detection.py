@@ -22,10 +22,14 @@ Autor: Sistema de IA
 Fecha: 2024
 """
 
+import os
 import re
+import json
 import logging
+import threading
 import unicodedata
-from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict, Counter
 from pathlib import Path
@@ -88,8 +92,9 @@ class AutorDetector:
             
         self.logger.info("🔍 INICIALIZANDO AUTOR DETECTOR V2.0 - ALGORITMO AVANZADO CON UTILIDADES")
         
-        # Inicializar utilidades si están disponibles
-        self.header_footer_filter = None
+        # Inicializar utilidades si están disponibles. El filtro de headers/footers
+        # acumula estado por documento, así que se crea uno nuevo en cada detect_author
+        self.header_footer_threshold = None
         self.pdf_metadata_extractor = None
         self.spacy_validator = None
         self.known_authors_validator = None
@@ -98,7 +103,7 @@ class AutorDetector:
             # Header/Footer filter
             if self.config.get('use_header_footer_filter', True):
                 threshold = self.config.get('structural_header_threshold', 0.9)
-                self.header_footer_filter = HeaderFooterFilter(threshold)
+                self.header_footer_threshold = threshold
                 self.logger.info(f"✅ Filtro de headers/footers activado (umbral: {threshold})")
             
             # PDF metadata extractor
@@ -189,6 +194,14 @@ class AutorDetector:
         # === COMPILAR PATRONES REGEX ===
         self._compile_patterns()
         
+        # Detector contextual mejorado: sin estado entre documentos, se construye una vez
+        enhanced_config = {
+            'confidence_threshold': self.config.get('confidence_threshold', 0.6),
+            'debug': self.config.get('debug', False),
+            'strict_mode': self.config.get('strict_mode', True)
+        }
+        self.enhanced_detector = EnhancedContextualAuthorDetector(enhanced_config)
+        
         self.logger.info(f"✅ Detector configurado - umbral: {self.confidence_threshold}")
     
     def _compile_patterns(self) -> None:
@@ -238,8 +251,11 @@ class AutorDetector:
                 self.logger.info(f"📄 Autor extraído de metadatos PDF ({filename}): {pdf_metadata['name']}")
 
         # === PASO 2: ANALIZAR HEADERS/FOOTERS SI HAY BLOQUES ===
-        if self.header_footer_filter and blocks:
-            self.header_footer_filter.analyze_blocks(blocks)
+        header_footer_filter = None
+        if self.header_footer_threshold is not None:
+            header_footer_filter = HeaderFooterFilter(self.header_footer_threshold)
+        if header_footer_filter and blocks:
+            header_footer_filter.analyze_blocks(blocks)
             self.logger.info(f"📋 Analizados {len(blocks)} bloques para headers/footers")
 
         self.logger.debug(f"Valor de document_title recibido: {document_title}")
@@ -262,14 +278,7 @@ class AutorDetector:
         self.logger.debug(f"DocumentContext creado: title='{doc_context.title}', filename='{doc_context.filename}'")
 
         # === PASO 3: DETECCIÓN PRINCIPAL CON ENHANCED DETECTOR ===
-        current_config = self.config if isinstance(self.config, dict) else {}
-        enhanced_config = {
-            'confidence_threshold': current_config.get('confidence_threshold', 0.6),
-            'debug': current_config.get('debug', False),
-            'strict_mode': current_config.get('strict_mode', True)
-        }
-        
-        enhanced_detector = EnhancedContextualAuthorDetector(enhanced_config)
+        enhanced_detector = self.enhanced_detector
         content_type_for_enhanced = 'poetry' if profile_type == 'verso' else 'prose'
 
         try:
@@ -277,7 +286,7 @@ class AutorDetector:
             
             if result and isinstance(result, dict) and result.get('name'):
                 # === PASO 4: VALIDAR Y MEJORAR CON UTILIDADES ===
-                result = self._enhance_with_utilities(result, segments, pdf_author)
+                result = self._enhance_with_utilities(result, segments, pdf_author, header_footer_filter)
                 
                 confidence_pct = result.get('confidence', 0) * 100
                 self.logger.info(f"✅ Autor detectado por AutorDetector: {result.get('name')} (Confianza: {confidence_pct:.1f}%)")
@@ -288,7 +297,7 @@ class AutorDetector:
                 # Si no hay resultado del detector principal, intentar con metadatos PDF
                 if pdf_author:
                     self.logger.info("Usando autor de metadatos PDF como fallback")
-                    return self._enhance_with_utilities(pdf_author, segments, pdf_author)
+                    return self._enhance_with_utilities(pdf_author, segments, pdf_author, header_footer_filter)
                 
                 self.logger.warning("No se pudo detectar autor con el detector principal")
                 return None
@@ -301,16 +310,17 @@ class AutorDetector:
             return None
     
     def _enhance_with_utilities(self, result: Dict[str, Any], segments: List[Dict[str, Any]], 
-                               pdf_author: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                               pdf_author: Optional[Dict[str, Any]] = None,
+                               header_footer_filter: Optional['HeaderFooterFilter'] = None) -> Dict[str, Any]:
         """
         Mejorar resultado de detección con utilidades adicionales.
         """
         enhanced_result = result.copy()
         
         # === FILTRAR SI ES TEXTO ESTRUCTURAL ===
-        if self.header_footer_filter:
+        if header_footer_filter:
             author_name = enhanced_result.get('name', '')
-            if self.header_footer_filter.is_structural_text(author_name):
+            if header_footer_filter.is_structural_text(author_name):
                 self.logger.warning(f"⚠️ Autor '{author_name}' detectado como header/footer estructural")
                 enhanced_result['confidence'] *= 0.5
                 enhanced_result['is_structural'] = True
@@ -700,6 +710,147 @@ class AutorDetector:
         
         return context.replace('\n', ' ').strip()
 
+# === MOTOR REUTILIZABLE ===
+
+class AuthorDetectionEngine:
+    """
+    Motor de detección de autores de larga vida y thread-safe.
+    
+    Construye los detectores (y con ellos la carga de autores conocidos, base de
+    datos literaria, stopwords y patrones compilados) una sola vez por
+    configuración y los reutiliza entre documentos. Los detectores no guardan
+    estado entre llamadas, así que se comparten entre hilos.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: Hilos para ejecutar en paralelo los detectores del modo
+                         híbrido y los documentos de detect_many (por defecto
+                         BIBLIOPERSON_AUTHOR_WORKERS o 4)
+        """
+        self.max_workers = max(1, int(max_workers or os.environ.get('BIBLIOPERSON_AUTHOR_WORKERS') or 4))
+        self.logger = logging.getLogger(f"{__name__}.AuthorDetectionEngine")
+        self._detectors: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._detector_executor: Optional[ThreadPoolExecutor] = None
+        self._document_executor: Optional[ThreadPoolExecutor] = None
+    
+    def _get_detectors(self, config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Devuelve (creándolos la primera vez) los detectores para una configuración."""
+        key = json.dumps(config or {}, sort_keys=True, default=str)
+        with self._lock:
+            detectors = self._detectors.get(key)
+            if detectors is None:
+                detectors = {'hybrid': None, 'standard': AutorDetector(config)}
+                if (config or {}).get('use_hybrid_detection', True):
+                    try:
+                        from .hybrid_author_detection import HybridAuthorDetector
+                        detectors['hybrid'] = HybridAuthorDetector(config)
+                    except ImportError:
+                        # Si no está disponible el detector híbrido, usar el mejorado
+                        pass
+                    except Exception as e:
+                        self.logger.warning(f"No se pudo crear el detector híbrido: {e}")
+                self._detectors[key] = detectors
+            return detectors
+    
+    def _executor_for_detectors(self) -> Optional[ThreadPoolExecutor]:
+        if self.max_workers <= 1:
+            return None
+        with self._lock:
+            if self._detector_executor is None:
+                self._detector_executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                             thread_name_prefix='author-detector')
+            return self._detector_executor
+    
+    def detect(self, segments: List[Dict[str, Any]], profile_type: str,
+               config: Optional[Dict[str, Any]] = None,
+               document_title: Optional[str] = None,
+               source_file_path: Optional[str] = None,
+               blocks: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Detecta el autor de un documento (mismos argumentos que detect_author_in_segments).
+        
+        Returns:
+            Información del autor detectado o None
+        """
+        detectors = self._get_detectors(config)
+        
+        # Usar detector híbrido si está disponible y habilitado
+        if detectors['hybrid'] is not None:
+            try:
+                result = detectors['hybrid'].detect_author(segments, profile_type,
+                                                           executor=self._executor_for_detectors())
+                if result:
+                    return result
+            except Exception as e:
+                self.logger.warning(f"Error en detector híbrido, usando detector estándar: {e}")
+        
+        # Usar el detector principal con todas las utilidades
+        return detectors['standard'].detect_author(segments, profile_type, document_title, source_file_path, blocks)
+    
+    def detect_many(self, documents: Iterable[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Detecta el autor de varios documentos en paralelo.
+        
+        Args:
+            documents: Diccionarios con los argumentos de detect() ('segments',
+                       'profile_type' y opcionalmente 'config', 'document_title',
+                       'source_file_path', 'blocks')
+        
+        Returns:
+            Resultados en el mismo orden que los documentos
+        """
+        documents = list(documents)
+        if len(documents) <= 1 or self.max_workers <= 1:
+            return [self.detect(**document) for document in documents]
+        
+        with self._lock:
+            if self._document_executor is None:
+                # Pool separado del de los detectores: un documento espera a sus detectores
+                self._document_executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                             thread_name_prefix='author-document')
+            executor = self._document_executor
+        futures = [executor.submit(self.detect, **document) for document in documents]
+        results = []
+        for document, future in zip(documents, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                self.logger.error(f"Error detectando autor de {document.get('source_file_path') or 'documento'}: {e}")
+                results.append(None)
+        return results
+    
+    def close(self) -> None:
+        """Libera los pools de hilos (los detectores se conservan)."""
+        with self._lock:
+            executors = [self._detector_executor, self._document_executor]
+            self._detector_executor = None
+            self._document_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+
+# Instancia global para uso conveniente
+_global_author_engine = None
+_global_author_engine_lock = threading.Lock()
+
+def get_author_detection_engine() -> AuthorDetectionEngine:
+    """
+    Obtiene la instancia global del motor de detección de autores.
+    
+    Returns:
+        Instancia de AuthorDetectionEngine
+    """
+    global _global_author_engine
+    
+    with _global_author_engine_lock:
+        if _global_author_engine is None:
+            _global_author_engine = AuthorDetectionEngine()
+        return _global_author_engine
+
 # === FUNCIONES DE UTILIDAD PARA INTEGRACIÓN ===
 
 def detect_author_in_segments(segments: List[Dict[str, Any]], 
@@ -711,6 +862,9 @@ def detect_author_in_segments(segments: List[Dict[str, Any]],
     """
     Función de conveniencia para detectar autor en segmentos.
     
+    Usa el motor global, de modo que los detectores se construyen una sola vez
+    por proceso y configuración.
+    
     Args:
         segments: Lista de segmentos procesados
         profile_type: Tipo de perfil ('verso' o 'prosa')
@@ -722,27 +876,8 @@ def detect_author_in_segments(segments: List[Dict[str, Any]],
     Returns:
         Información del autor detectado o None
     """
-    # Usar detector híbrido si está disponible y habilitado
-    use_hybrid = config.get('use_hybrid_detection', True) if config else True
-    
-    if use_hybrid:
-        try:
-            from .hybrid_author_detection import HybridAuthorDetector
-            hybrid_detector = HybridAuthorDetector(config)
-            result = hybrid_detector.detect_author(segments, profile_type)
-            if result:
-                return result
-        except ImportError:
-            # Si no está disponible el detector híbrido, usar el mejorado
-            pass
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Error en detector híbrido, usando detector estándar: {e}")
-    
-    # Usar el detector principal con todas las utilidades
-    detector = AutorDetector(config)
-    return detector.detect_author(segments, profile_type, document_title, source_file_path, blocks)
+    return get_author_detection_engine().detect(segments, profile_type, config,
+                                                document_title, source_file_path, blocks)
 
 def get_author_detection_config(profile_type: str) -> Dict[str, Any]:
     """
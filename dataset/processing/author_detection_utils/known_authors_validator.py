@@ -9,6 +9,8 @@ from typing import List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
 from difflib import SequenceMatcher
 
+from ..known_authors_index import KnownAuthorsIndex
+
 try:
     from fuzzywuzzy import fuzz, process
     FUZZYWUZZY_AVAILABLE = True
@@ -28,6 +30,7 @@ class KnownAuthorsValidator:
         self.logger = logging.getLogger(__name__)
         self.authors_file = authors_file or self._get_default_authors_file()
         self.known_authors = self._load_known_authors()
+        self._build_indexes()
         self.fuzzy_available = FUZZYWUZZY_AVAILABLE
         
         if not self.fuzzy_available:
@@ -122,6 +125,32 @@ class KnownAuthorsValidator:
         
         return authors
     
+    def _build_indexes(self) -> None:
+        """
+        Precalcula los índices de búsqueda: aliases normalizados → autor, e índice de
+        trigramas sobre nombres canónicos y aliases para la búsqueda difusa.
+        """
+        self._alias_index: Dict[str, Dict[str, Any]] = {}
+        # Clave normalizada → [(nombre original, info del autor)]
+        self._fuzzy_names: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        self._names_index = KnownAuthorsIndex(normalizer=self._normalize_name)
+        
+        for norm_name, author_info in self.known_authors.items():
+            names = [author_info['canonical_name']] + list(author_info.get('aliases', []))
+            for position, name in enumerate(names):
+                key = self._names_index.add(name)
+                if not key:
+                    continue
+                if position > 0:
+                    self._alias_index.setdefault(key, author_info)
+                self._fuzzy_names.setdefault(key, []).append((name, author_info))
+    
+    def _fuzzy_candidates(self, author_name: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """(clave normalizada, nombre original, info) de los nombres que comparten trigramas con la consulta."""
+        return [(key, name, author_info)
+                for key in self._names_index.fuzzy_candidates(author_name)
+                for name, author_info in self._fuzzy_names.get(key, ())]
+    
     def validate_author(self, author_name: str, threshold: float = 0.85) -> Optional[Dict[str, Any]]:
         """
         Valida si un nombre corresponde a un autor conocido.
@@ -147,14 +176,13 @@ class KnownAuthorsValidator:
             }
         
         # Búsqueda en aliases
-        for norm_name, author_info in self.known_authors.items():
-            for alias in author_info.get('aliases', []):
-                if self._normalize_name(alias) == normalized_query:
-                    return {
-                        'match_type': 'alias',
-                        'confidence': 0.95,
-                        'author_info': author_info
-                    }
+        author_info = self._alias_index.get(normalized_query)
+        if author_info is not None:
+            return {
+                'match_type': 'alias',
+                'confidence': 0.95,
+                'author_info': author_info
+            }
         
         # Búsqueda difusa
         if self.fuzzy_available:
@@ -164,19 +192,17 @@ class KnownAuthorsValidator:
     
     def _fuzzy_match(self, author_name: str, threshold: float) -> Optional[Dict[str, Any]]:
         """Búsqueda difusa usando fuzzywuzzy."""
-        # Preparar lista de nombres para búsqueda
+        # Preparar lista de nombres para búsqueda: solo los que comparten trigramas con la consulta
         all_names = []
         name_to_info = {}
         
-        for norm_name, author_info in self.known_authors.items():
-            canonical = author_info['canonical_name']
-            all_names.append(canonical)
-            name_to_info[canonical] = author_info
-            
-            # Incluir aliases
-            for alias in author_info.get('aliases', []):
-                all_names.append(alias)
-                name_to_info[alias] = author_info
+        for _, name, author_info in self._fuzzy_candidates(author_name):
+            if name not in name_to_info:
+                all_names.append(name)
+                name_to_info[name] = author_info
+        
+        if not all_names:
+            return None
         
         # Buscar mejores coincidencias
         matches = process.extract(author_name, all_names, scorer=fuzz.token_sort_ratio, limit=3)
@@ -200,19 +226,12 @@ class KnownAuthorsValidator:
         
         normalized_query = self._normalize_name(author_name)
         
-        for norm_name, author_info in self.known_authors.items():
-            # Comparar con nombre canónico
-            score = self._similarity_score(normalized_query, norm_name)
+        # Comparar solo con nombres canónicos y aliases que comparten trigramas con la consulta
+        for key, _, author_info in self._fuzzy_candidates(author_name):
+            score = self._similarity_score(normalized_query, key)
             if score > best_score:
                 best_score = score
                 best_match = author_info
-            
-            # Comparar con aliases
-            for alias in author_info.get('aliases', []):
-                score = self._similarity_score(normalized_query, self._normalize_name(alias))
-                if score > best_score:
-                    best_score = score
-                    best_match = author_info
         
         if best_score >= threshold:
             return {
@@ -2,15 +2,13 @@
 Extractor de metadatos de autor desde archivos PDF.
 """
 
+import importlib.util
 import logging
 from typing import Optional, Dict, Any, List
 from pathlib import Path
 
-try:
-    import pymupdf
-    PYMUPDF_AVAILABLE = True
-except ImportError:
-    PYMUPDF_AVAILABLE = False
+# PyMuPDF se usa a través del handle compartido (pdf_document_cache, que importa fitz)
+PYMUPDF_AVAILABLE = importlib.util.find_spec('fitz') is not None
 
 try:
     from pdfminer.pdfparser import PDFParser
@@ -71,9 +69,10 @@ class PDFMetadataExtractor:
     def _extract_with_pymupdf(self, file_path: str) -> Optional[Dict[str, Any]]:
         """Extrae metadatos usando PyMuPDF."""
         try:
-            doc = pymupdf.open(file_path)
-            metadata = doc.metadata
-            doc.close()
+            # Reutiliza el documento si otra etapa del pipeline ya lo tiene abierto
+            from ..loaders.pdf_document_cache import shared_pdf_document
+            with shared_pdf_document(file_path) as pdf_handle:
+                metadata = pdf_handle.metadata
             
             # Buscar campos de autor
             author_fields = ['author', 'creator', 'producer']
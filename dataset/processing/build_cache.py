@@ -0,0 +1,186 @@
+"""
+Caché de construcción incremental para el procesamiento de documentos.
+
+Cada salida generada se registra junto al hash SHA-256 del archivo de entrada y
+una huella (fingerprint) de la configuración efectiva del pipeline: perfil YAML
+(incluye segmentador y configuración del pre-procesador), opciones de la CLI que
+alteran el resultado y la versión del pipeline (``PIPELINE_VERSION`` de
+output_modes, la misma que se escribe en cada segmento). Al volver a procesar una biblioteca solo
+se rehacen los archivos cuya entrada o configuración cambió; para el resto se
+conserva la salida existente.
+"""
+
+import copy
+import hashlib
+import json
+import sqlite3
+import pathlib
+import threading
+from datetime import datetime
+from typing import Optional, Dict, Any
+import logging
+
+from .hash_cache import cached_sha256
+from .output_modes import PIPELINE_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Ruta por defecto para la base de datos de la caché de construcción
+DEFAULT_BUILD_CACHE_DB_PATH = pathlib.Path("dataset/.cache/build_cache.sqlite")
+
+def compute_file_sha256(file_path: str | pathlib.Path) -> str:
+    """Calcula el hash SHA-256 del contenido de un archivo (vía la caché de hashes)."""
+    return cached_sha256(file_path)
+
+
+def compute_pipeline_fingerprint(profile: Optional[Dict[str, Any]], options: Dict[str, Any]) -> str:
+    """
+    Calcula la huella de la configuración efectiva del pipeline.
+
+    Args:
+        profile: Perfil cargado (o dict de todos los perfiles si el perfil se detecta
+                 automáticamente, porque la detección depende de todos ellos)
+        options: Opciones que alteran la salida (encoding, umbral, overrides, formato...)
+
+    Returns:
+        Hash SHA-256 hexadecimal de la configuración serializada de forma canónica
+    """
+    payload = {
+        'pipeline_version': PIPELINE_VERSION,
+        # El ProfileManager anota el perfil en ejecución con claves '_...' (p. ej.
+        # '_actual_segmenter' al caer de verso a prosa): no forman parte de la configuración
+        'profile': _without_runtime_keys(profile),
+        'options': options,
+    }
+    serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def _without_runtime_keys(value: Any) -> Any:
+    """Copia profunda de ``value`` sin las claves de diccionario que empiezan por '_'."""
+    if isinstance(value, dict):
+        return {key: _without_runtime_keys(item) for key, item in value.items()
+                if not (isinstance(key, str) and key.startswith('_'))}
+    if isinstance(value, (list, tuple)):
+        return [_without_runtime_keys(item) for item in value]
+    return copy.deepcopy(value)
+
+
+class BuildCache:
+    """Registro de salidas generadas, indexado por archivo de salida."""
+
+    def __init__(self, db_path: Optional[str | pathlib.Path] = None):
+        """
+        Inicializa la caché de construcción.
+
+        Args:
+            db_path: Ruta a la base de datos SQLite. Si es None, usa la ruta por defecto.
+        """
+        if db_path is None:
+            self.db_path = DEFAULT_BUILD_CACHE_DB_PATH
+        else:
+            self.db_path = pathlib.Path(db_path)
+        self._ensure_db_exists()
+
+    def _ensure_db_exists(self) -> None:
+        """Crea la base de datos y tabla si no existen."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS builds (
+                    output_path  TEXT PRIMARY KEY,
+                    input_path   TEXT NOT NULL,
+                    file_hash    TEXT NOT NULL,
+                    fingerprint  TEXT NOT NULL,
+                    output_size  INTEGER NOT NULL,
+                    built_at     TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_builds_input_path
+                ON builds(input_path)
+            """)
+            conn.commit()
+
+    def is_up_to_date(self, input_path: str | pathlib.Path, output_path: str | pathlib.Path,
+                      file_hash: str, fingerprint: str) -> bool:
+        """
+        Verifica si la salida registrada sigue siendo válida.
+
+        Es válida si se generó desde la misma entrada con el mismo hash y la misma
+        huella de configuración, y el archivo de salida existe con el tamaño registrado.
+        """
+        output_path = pathlib.Path(output_path).resolve()
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT input_path, file_hash, fingerprint, output_size FROM builds WHERE output_path = ?",
+                (str(output_path),)
+            ).fetchone()
+        if row is None:
+            return False
+        recorded_input, recorded_hash, recorded_fingerprint, recorded_size = row
+        if (recorded_input != str(pathlib.Path(input_path).resolve())
+                or recorded_hash != file_hash or recorded_fingerprint != fingerprint):
+            return False
+        try:
+            return output_path.stat().st_size == recorded_size
+        except OSError:
+            return False
+
+    def record(self, input_path: str | pathlib.Path, output_path: str | pathlib.Path,
+               file_hash: str, fingerprint: str) -> None:
+        """Registra (o actualiza) la salida generada para una entrada."""
+        output_path = pathlib.Path(output_path).resolve()
+        try:
+            output_size = output_path.stat().st_size
+        except OSError:
+            logger.debug(f"Salida no encontrada, no se registra en la caché: {output_path}")
+            return
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO builds (output_path, input_path, file_hash, fingerprint, output_size, built_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (str(output_path), str(pathlib.Path(input_path).resolve()), file_hash, fingerprint,
+                 output_size, datetime.utcnow().isoformat())
+            )
+            conn.commit()
+
+    def invalidate(self, output_path: str | pathlib.Path) -> bool:
+        """Elimina la entrada de una salida. Devuelve True si existía."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                "DELETE FROM builds WHERE output_path = ?",
+                (str(pathlib.Path(output_path).resolve()),)
+            )
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def clear_all(self) -> int:
+        """Vacía la caché. Devuelve el número de entradas eliminadas."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute("DELETE FROM builds")
+            conn.commit()
+            return cursor.rowcount
+
+
+# Instancia global para uso conveniente
+_global_build_cache = None
+_global_build_cache_lock = threading.Lock()
+
+def get_build_cache(db_path: Optional[str | pathlib.Path] = None) -> BuildCache:
+    """
+    Obtiene la instancia global de la caché de construcción.
+
+    Args:
+        db_path: Ruta personalizada para la base de datos (solo en primera llamada)
+
+    Returns:
+        Instancia de BuildCache
+    """
+    global _global_build_cache
+
+    with _global_build_cache_lock:
+        if _global_build_cache is None:
+            _global_build_cache = BuildCache(db_path)
+        return _global_build_cache
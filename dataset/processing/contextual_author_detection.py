@@ -15,13 +15,89 @@ Sin dependencias externas complejas - funciona con bibliotecas estándar.
 
 import re
 import logging
-import unicodedata
 import json
 import os
-from typing import List, Dict, Any, Optional, Tuple, Set
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Set, FrozenSet
 from dataclasses import dataclass, field
 from collections import Counter, defaultdict
 
+try:
+    from .known_authors_index import KnownAuthorsIndex, fold_accents
+except ImportError:
+    # Importado como módulo de primer nivel (ver enhanced_contextual_author_detection)
+    from known_authors_index import KnownAuthorsIndex, fold_accents
+
+
+def _default_known_authors_file() -> str:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    config_dir = os.path.join(os.path.dirname(current_dir), 'config')
+    return os.path.join(config_dir, 'known_authors.json')
+
+
+@lru_cache(maxsize=8)
+def _load_known_authors_file(authors_file: str, mtime_ns: int) -> Tuple[FrozenSet[str], KnownAuthorsIndex, int]:
+    """Lee known_authors.json una vez por versión del archivo (mtime_ns forma parte de la clave)."""
+    with open(authors_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    # Extraer todos los autores de todas las categorías
+    known_authors = set()
+    authors_data = data.get('authors', {})
+    
+    for category_name, category_authors in authors_data.items():
+        if isinstance(category_authors, list):
+            for author in category_authors:
+                # Añadir en minúsculas para comparación
+                known_authors.add(author.lower())
+                # También agregar variaciones comunes
+                known_authors.add(author.lower().replace(',', ''))
+                # Añadir sin acentos
+                known_authors.add(fold_accents(author))
+    
+    # Claves sin acentos precalculadas: la comparación acento-insensible es O(1)
+    return frozenset(known_authors), KnownAuthorsIndex.from_names(known_authors), len(authors_data)
+
+
+def load_known_authors(authors_file: str) -> Tuple[FrozenSet[str], KnownAuthorsIndex, int]:
+    """
+    Devuelve (autores conocidos, índice, número de categorías) para el archivo dado.
+    
+    Si el archivo no existe o no se puede leer devuelve un conjunto e índice vacíos.
+    """
+    try:
+        mtime_ns = os.stat(authors_file).st_mtime_ns
+        return _load_known_authors_file(authors_file, mtime_ns)
+    except Exception as e:
+        logging.getLogger(__name__).debug(f"No se pudieron cargar autores conocidos de {authors_file}: {e}")
+        return frozenset(), KnownAuthorsIndex(), 0
+
+
+def is_known_author(index: Optional[KnownAuthorsIndex], name: str) -> bool:
+    """Verifica si un nombre (o una variante habitual de él) está en el índice de autores conocidos."""
+    if not index or not name:
+        return False
+    
+    name_lower = name.lower().strip()
+    
+    # Búsqueda exacta, insensible a acentos
+    if name_lower in index:
+        return True
+    
+    # Búsqueda por partes (nombre y apellido por separado)
+    name_parts = name_lower.split()
+    if len(name_parts) >= 2:
+        # Buscar combinaciones comunes
+        full_name_variants = [
+            ' '.join(name_parts),
+            ' '.join(name_parts[:2]),  # Solo primeros dos nombres
+            f"{name_parts[-1]}, {' '.join(name_parts[:-1])}",  # Apellido, Nombre
+        ]
+        return any(variant in index for variant in full_name_variants)
+    
+    return False
+
+
 @dataclass
 class ContextualAuthorCandidate:
     """Candidato a autor con información contextual"""
@@ -119,122 +195,30 @@ class HispanicMorphologyAnalyzer:
                 return True
     
     def _load_known_authors(self) -> Set[str]:
-        """Carga la lista blanca de autores conocidos"""
-        try:
-            # Buscar el archivo de autores conocidos
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            config_dir = os.path.join(os.path.dirname(current_dir), 'config')
-            authors_file = os.path.join(config_dir, 'known_authors.json')
-            
-            if self.debug:
-                self.logger.info(f"Buscando archivo de autores en: {authors_file}")
-            
-            if os.path.exists(authors_file):
-                with open(authors_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Extraer todos los autores de todas las categorías
-                known_authors = set()
-                authors_data = data.get('authors', {})
-                
-                for category_name, category_authors in authors_data.items():
-                    if isinstance(category_authors, list):
-                        for author in category_authors:
-                            # Añadir en minúsculas para comparación
-                            known_authors.add(author.lower())
-                            # También agregar variaciones comunes
-                            known_authors.add(author.lower().replace(',', ''))
-                            # Añadir sin acentos
-                            normalized = unicodedata.normalize('NFD', author.lower()).encode('ascii', 'ignore').decode('ascii')
-                            known_authors.add(normalized)
-                
-                if self.debug:
-                    self.logger.info(f"✅ Cargados {len(known_authors)} autores conocidos de {len(authors_data)} categorías")
-                    # Mostrar algunos ejemplos
-                    examples = list(known_authors)[:5]
-                    self.logger.info(f"Ejemplos: {examples}")
-                
-                return known_authors
+        """Carga la lista blanca de autores conocidos (compartida entre instancias) y su índice"""
+        authors_file = _default_known_authors_file()
+        debug = getattr(self, 'debug', False)
+        logger = getattr(self, 'logger', None) or logging.getLogger(__name__)
+        
+        if debug:
+            logger.info(f"Buscando archivo de autores en: {authors_file}")
+        
+        known_authors, self.known_authors_index, categories = load_known_authors(authors_file)
+        
+        if debug:
+            if known_authors:
+                logger.info(f"✅ Cargados {len(known_authors)} autores conocidos de {categories} categorías")
+                # Mostrar algunos ejemplos
+                examples = list(known_authors)[:5]
+                logger.info(f"Ejemplos: {examples}")
             else:
-                if self.debug:
-                    self.logger.warning(f"❌ No se encontró archivo de autores conocidos: {authors_file}")
-                return set()
-                
-        except Exception as e:
-            if self.debug:
-                self.logger.error(f"❌ Error cargando autores conocidos: {e}")
-            return set()
+                logger.warning(f"❌ No se encontraron autores conocidos en: {authors_file}")
+        
+        return known_authors
     
     def _is_known_author(self, name: str) -> bool:
         """Verifica si un nombre está en la lista de autores conocidos"""
-        if not self.known_authors:
-            return False
-        
-        name_lower = name.lower().strip()
-        
-        # Normalizar acentos para comparación
-        def normalize_accents(text):
-            """Normaliza acentos para comparación"""
-            return unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('ascii')
-        
-        name_normalized = normalize_accents(name_lower)
-        
-        # Búsqueda exacta (con y sin acentos)
-        if name_lower in self.known_authors or name_normalized in self.known_authors:
-            return True
-        
-        # También buscar en la lista normalizada
-        for known_author in self.known_authors:
-            if normalize_accents(known_author) == name_normalized:
-                return True
-        
-        # Búsqueda por partes (nombre y apellido por separado)
-        name_parts = name_lower.split()
-        if len(name_parts) >= 2:
-            # Buscar combinaciones comunes
-            full_name_variants = [
-                ' '.join(name_parts),
-                ' '.join(name_parts[:2]),  # Solo primeros dos nombres
-                f"{name_parts[-1]}, {' '.join(name_parts[:-1])}",  # Apellido, Nombre
-            ]
-            
-            for variant in full_name_variants:
-                if variant in self.known_authors:
-                    return True
-                
-                # También buscar variante normalizada
-                variant_normalized = normalize_accents(variant)
-                if variant_normalized in self.known_authors:
-                    return True
-                
-                # Buscar en la lista normalizada
-                for known_author in self.known_authors:
-                    if normalize_accents(known_author) == variant_normalized:
-                        return True
-        
-        return False
-        
-        name_lower = name.lower().strip()
-        
-        # Búsqueda exacta
-        if name_lower in self.known_authors:
-            return True
-        
-        # Búsqueda por partes (nombre y apellido por separado)
-        name_parts = name_lower.split()
-        if len(name_parts) >= 2:
-            # Buscar combinaciones comunes
-            full_name_variants = [
-                ' '.join(name_parts),
-                ' '.join(name_parts[:2]),  # Solo primeros dos nombres
-                f"{name_parts[-1]}, {' '.join(name_parts[:-1])}",  # Apellido, Nombre
-            ]
-            
-            for variant in full_name_variants:
-                if variant in self.known_authors:
-                    return True
-        
-        return False
+        return is_known_author(getattr(self, 'known_authors_index', None), name)
 
 class AttributionContextAnalyzer:
     """Analizador de contextos de atribución de autoría"""
@@ -822,100 +806,30 @@ class ContextualAuthorDetector:
         return True
     
     def _load_known_authors(self) -> Set[str]:
-        """Carga la lista blanca de autores conocidos"""
-        try:
-            # Buscar el archivo de autores conocidos
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            config_dir = os.path.join(os.path.dirname(current_dir), 'config')
-            authors_file = os.path.join(config_dir, 'known_authors.json')
-            
-            if self.debug:
-                self.logger.info(f"Buscando archivo de autores en: {authors_file}")
-            
-            if os.path.exists(authors_file):
-                with open(authors_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Extraer todos los autores de todas las categorías
-                known_authors = set()
-                authors_data = data.get('authors', {})
-                
-                for category_name, category_authors in authors_data.items():
-                    if isinstance(category_authors, list):
-                        for author in category_authors:
-                            # Añadir en minúsculas para comparación
-                            known_authors.add(author.lower())
-                            # También agregar variaciones comunes
-                            known_authors.add(author.lower().replace(',', ''))
-                            # Añadir sin acentos
-                            normalized = unicodedata.normalize('NFD', author.lower()).encode('ascii', 'ignore').decode('ascii')
-                            known_authors.add(normalized)
-                
-                if self.debug:
-                    self.logger.info(f"✅ Cargados {len(known_authors)} autores conocidos de {len(authors_data)} categorías")
-                    # Mostrar algunos ejemplos
-                    examples = list(known_authors)[:5]
-                    self.logger.info(f"Ejemplos: {examples}")
-                
-                return known_authors
+        """Carga la lista blanca de autores conocidos (compartida entre instancias) y su índice"""
+        authors_file = _default_known_authors_file()
+        debug = getattr(self, 'debug', False)
+        logger = getattr(self, 'logger', None) or logging.getLogger(__name__)
+        
+        if debug:
+            logger.info(f"Buscando archivo de autores en: {authors_file}")
+        
+        known_authors, self.known_authors_index, categories = load_known_authors(authors_file)
+        
+        if debug:
+            if known_authors:
+                logger.info(f"✅ Cargados {len(known_authors)} autores conocidos de {categories} categorías")
+                # Mostrar algunos ejemplos
+                examples = list(known_authors)[:5]
+                logger.info(f"Ejemplos: {examples}")
             else:
-                if self.debug:
-                    self.logger.warning(f"❌ No se encontró archivo de autores conocidos: {authors_file}")
-                return set()
-                
-        except Exception as e:
-            if self.debug:
-                self.logger.error(f"❌ Error cargando autores conocidos: {e}")
-            return set()
+                logger.warning(f"❌ No se encontraron autores conocidos en: {authors_file}")
+        
+        return known_authors
     
     def _is_known_author(self, name: str) -> bool:
         """Verifica si un nombre está en la lista de autores conocidos"""
-        if not self.known_authors:
-            return False
-        
-        name_lower = name.lower().strip()
-        
-        # Normalizar acentos para comparación
-        def normalize_accents(text):
-            """Normaliza acentos para comparación"""
-            return unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('ascii')
-        
-        name_normalized = normalize_accents(name_lower)
-        
-        # Búsqueda exacta (con y sin acentos)
-        if name_lower in self.known_authors or name_normalized in self.known_authors:
-            return True
-        
-        # También buscar en la lista normalizada
-        for known_author in self.known_authors:
-            if normalize_accents(known_author) == name_normalized:
-                return True
-        
-        # Búsqueda por partes (nombre y apellido por separado)
-        name_parts = name_lower.split()
-        if len(name_parts) >= 2:
-            # Buscar combinaciones comunes
-            full_name_variants = [
-                ' '.join(name_parts),
-                ' '.join(name_parts[:2]),  # Solo primeros dos nombres
-                f"{name_parts[-1]}, {' '.join(name_parts[:-1])}",  # Apellido, Nombre
-            ]
-            
-            for variant in full_name_variants:
-                if variant in self.known_authors:
-                    return True
-                
-                # También buscar variante normalizada
-                variant_normalized = normalize_accents(variant)
-                if variant_normalized in self.known_authors:
-                    return True
-                
-                # Buscar en la lista normalizada
-                for known_author in self.known_authors:
-                    if normalize_accents(known_author) == variant_normalized:
-                        return True
-        
-        return False
+        return is_known_author(getattr(self, 'known_authors_index', None), name)
 
     def extract_author_from_document_metadata(self, file_path: str, pdf_metadata: dict = None) -> List[Tuple[str, float, str]]:
         """Extrae autor de metadatos del documento (nombre archivo + metadatos PDF) con alta confianza"""
@@ -3,13 +3,15 @@ Módulo de deduplicación para el sistema de procesamiento de documentos.
 Implementa hash SHA-256 y gestión de duplicados usando SQLite.
 """
 
-import hashlib
 import sqlite3
 import pathlib
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 import logging
 
+from .hash_cache import cached_sha256
+from .fulltext import build_match_query, ensure_fts_index
+
 logger = logging.getLogger(__name__)
 
 # Ruta por defecto para la base de datos de deduplicación
@@ -53,6 +55,7 @@ class DeduplicationManager:
                 CREATE INDEX IF NOT EXISTS idx_docs_title 
                 ON docs(title)
             """)
+            self.fts_enabled = ensure_fts_index(conn, 'docs', ['title', 'file_path'])
             conn.commit()
     
     def compute_sha256(self, file_path: str | pathlib.Path) -> str:
@@ -74,18 +77,12 @@ class DeduplicationManager:
         if not file_path.exists():
             raise FileNotFoundError(f"El archivo {file_path} no existe")
         
-        hash_sha256 = hashlib.sha256()
-        
         try:
-            with open(file_path, "rb") as f:
-                # Leer en chunks de 8192 bytes para eficiencia de memoria
-                for chunk in iter(lambda: f.read(8192), b""):
-                    hash_sha256.update(chunk)
+            # Caché por (ruta, tamaño, mtime_ns, inodo): solo se relee el archivo si cambió
+            return cached_sha256(file_path)
         except IOError as e:
             logger.error(f"Error leyendo archivo {file_path}: {e}")
             raise
-        
-        return hash_sha256.hexdigest()
     
     def is_duplicate(self, file_hash: str) -> bool:
         """
@@ -188,7 +185,7 @@ class DeduplicationManager:
         Lista documentos en la base de datos con filtros opcionales.
         
         Args:
-            search: Texto a buscar en título o ruta
+            search: Texto a buscar en título o ruta (por términos, con el índice FTS5)
             before: Fecha límite superior (ISO format)
             after: Fecha límite inferior (ISO format)
             limit: Número máximo de resultados
@@ -200,9 +197,15 @@ class DeduplicationManager:
         params = []
         
         if search:
-            query += " AND (title LIKE ? OR file_path LIKE ?)"
-            search_pattern = f"%{search}%"
-            params.extend([search_pattern, search_pattern])
+            match = build_match_query(search) if self.fts_enabled else None
+            if match:
+                # Índice de texto completo: sin tildes ni mayúsculas, prefijo en el último término
+                query += " AND rowid IN (SELECT rowid FROM docs_fts WHERE docs_fts MATCH ?)"
+                params.append(match)
+            else:
+                query += " AND (title LIKE ? OR file_path LIKE ?)"
+                search_pattern = f"%{search}%"
+                params.extend([search_pattern, search_pattern])
         
         if before:
             query += " AND first_seen < ?"
@@ -0,0 +1,204 @@
+"""
+Índices de texto completo SQLite FTS5 para las bases de datos de Biblioperson.
+
+Las búsquedas de la biblioteca, del registro de duplicados y de segmentos usaban
+``LIKE '%término%'``, que recorre la tabla entera y no ordena por relevancia.
+Este módulo crea tablas FTS5 de contenido externo (``<tabla>_fts``) sincronizadas
+con la tabla original mediante triggers, y consultas con ranking BM25 y
+fragmentos resaltados. Los fragmentos se devuelven como HTML seguro: el texto
+del documento va escapado y solo las etiquetas <mark> son marcado.
+
+El tokenizador ``unicode61 remove_diacritics 2`` ignora mayúsculas y tildes, de
+modo que "canción" y "cancion" coinciden (también "año" y "ano").
+
+El índice se enlaza por rowid: en tablas sin INTEGER PRIMARY KEY un VACUUM puede
+renumerar las filas, y entonces hay que llamar a ``rebuild_fts_index``.
+"""
+
+import html
+import logging
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+FTS_TOKENIZE = "unicode61 remove_diacritics 2"
+SNIPPET_OPEN = '<mark>'
+SNIPPET_CLOSE = '</mark>'
+# Marcadores de uso privado que pide snippet() en lugar de las etiquetas: el texto
+# se escapa antes de sustituirlos, de modo que el contenido del documento nunca es HTML
+_SNIPPET_OPEN_SENTINEL = '\ue000'
+_SNIPPET_CLOSE_SENTINEL = '\ue001'
+SNIPPET_TOKENS = 16
+
+_fts5_available: Optional[bool] = None
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    """Indica si el SQLite enlazado incluye FTS5 (se comprueba una vez por proceso)."""
+    global _fts5_available
+    if _fts5_available is None:
+        try:
+            conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+            conn.execute("DROP TABLE temp._fts5_probe")
+            _fts5_available = True
+        except sqlite3.OperationalError:
+            _fts5_available = False
+            logger.warning("⚠️ SQLite sin FTS5: las búsquedas usarán LIKE")
+    return _fts5_available
+
+
+def fts_table_name(table: str) -> str:
+    return f"{table}_fts"
+
+
+def ensure_fts_index(conn: sqlite3.Connection, table: str, columns: Sequence[str],
+                     content_rowid: str = 'rowid') -> bool:
+    """
+    Crea, si no existen, el índice FTS5 de ``table`` y los triggers que lo mantienen.
+
+    Un índice recién creado sobre una tabla con filas se llena con 'rebuild'.
+
+    Args:
+        conn: Conexión abierta (el llamador hace commit)
+        table: Tabla de contenido
+        columns: Columnas de texto a indexar
+        content_rowid: Columna entera que identifica la fila (``rowid`` o un
+                       INTEGER PRIMARY KEY)
+
+    Returns:
+        True si el índice está disponible, False si SQLite no tiene FTS5
+    """
+    if not fts5_available(conn):
+        return False
+
+    fts = fts_table_name(table)
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (fts,)
+    ).fetchone()
+
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f"new.{column}" for column in columns)
+    old_values = ', '.join(f"old.{column}" for column in columns)
+
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {column_list},
+            content='{table}', content_rowid='{content_rowid}',
+            tokenize='{FTS_TOKENIZE}', prefix='2 3'
+        )
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {column_list}) VALUES (new.{content_rowid}, {new_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.{content_rowid}, {old_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.{content_rowid}, {old_values});
+            INSERT INTO {fts}(rowid, {column_list}) VALUES (new.{content_rowid}, {new_values});
+        END
+    """)
+
+    if not exists:
+        rebuild_fts_index(conn, table)
+    return True
+
+
+def has_fts_index(conn: sqlite3.Connection, table: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (fts_table_name(table),)
+    ).fetchone() is not None
+
+
+def rebuild_fts_index(conn: sqlite3.Connection, table: str) -> None:
+    """Reconstruye el índice de ``table`` a partir de su contenido."""
+    fts = fts_table_name(table)
+    conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    logger.info(f"🔎 Índice de texto completo {fts} reconstruido")
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """
+    Convierte texto libre en una expresión MATCH segura.
+
+    Cada término va entre comillas (la sintaxis FTS5 del usuario no se interpreta)
+    y el último admite prefijo, para buscar mientras se escribe. Los términos se
+    combinan con AND. Devuelve None si el texto no tiene términos.
+    """
+    terms = _TERM_RE.findall(text or '')
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def fts_search(conn: sqlite3.Connection, table: str, query: str, select_columns: Sequence[str],
+               snippet_column: int, weights: Optional[Sequence[float]] = None,
+               content_rowid: str = 'rowid', limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Busca en el índice de ``table`` ordenando por BM25.
+
+    Args:
+        conn: Conexión abierta
+        table: Tabla de contenido con índice creado por ``ensure_fts_index``
+        query: Texto libre del usuario
+        select_columns: Columnas de la tabla de contenido a devolver
+        snippet_column: Posición, en las columnas indexadas, de la que se extrae el fragmento
+        weights: Peso BM25 de cada columna indexada (por defecto, todas 1)
+        content_rowid: Columna que enlaza con el índice
+        limit, offset: Paginación
+
+    Returns:
+        Filas con las columnas pedidas más ``score`` (mayor = más relevante) y
+        ``snippet`` (HTML escapado, con los términos entre <mark>...</mark>)
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+
+    fts = fts_table_name(table)
+    bm25_args = fts + ''.join(f", {float(weight)}" for weight in (weights or ()))
+    selected = ', '.join(f"t.{column}" for column in select_columns)
+    cursor = conn.execute(f"""
+        SELECT {selected},
+               bm25({bm25_args}) AS rank,
+               snippet({fts}, {snippet_column}, ?, ?, '…', {SNIPPET_TOKENS}) AS snippet
+        FROM {fts}
+        JOIN {table} t ON t.{content_rowid} = {fts}.rowid
+        WHERE {fts} MATCH ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+    """, (_SNIPPET_OPEN_SENTINEL, _SNIPPET_CLOSE_SENTINEL, match, limit, offset))
+
+    results = []
+    for row in cursor.fetchall():
+        result = dict(zip(list(select_columns) + ['rank', 'snippet'], row))
+        result['score'] = -result.pop('rank')
+        result['snippet'] = highlight_snippet(result['snippet'])
+        results.append(result)
+    return results
+
+
+def highlight_snippet(snippet: Optional[str]) -> str:
+    """Escapa el fragmento como HTML y convierte los marcadores en <mark>...</mark>."""
+    escaped = html.escape(snippet or '')
+    return escaped.replace(_SNIPPET_OPEN_SENTINEL, SNIPPET_OPEN).replace(_SNIPPET_CLOSE_SENTINEL, SNIPPET_CLOSE)
+
+
+def fts_count(conn: sqlite3.Connection, table: str, query: str) -> int:
+    """Número de filas que coinciden con ``query``."""
+    match = build_match_query(query)
+    if match is None:
+        return 0
+    fts = fts_table_name(table)
+    return conn.execute(f"SELECT COUNT(*) FROM {fts} WHERE {fts} MATCH ?", (match,)).fetchone()[0]
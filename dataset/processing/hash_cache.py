@@ -0,0 +1,200 @@
+"""
+Caché persistente de hashes SHA-256 de archivos.
+
+Evita releer archivos sin cambios: el hash se guarda indexado por ruta y se
+reutiliza mientras coincidan tamaño, mtime_ns e inodo del archivo. Se respeta la
+sección ``performance`` de la configuración de deduplicación:
+
+- enable_hash_cache: activa/desactiva la caché (sin ella se calcula siempre)
+- max_cache_size: número máximo de entradas en memoria; se expulsan las menos
+  usadas (LRU). La tabla de SQLite guarda una fila por ruta (se reemplaza al
+  cambiar el archivo) y no se poda: una biblioteca con más archivos que ese
+  máximo debe seguir acertando al volver a escanearse; ``clear()`` la vacía
+- hash_chunk_size: tamaño de lectura al calcular el hash
+- operation_timeout: timeout de SQLite ante escrituras concurrentes
+"""
+
+import hashlib
+import os
+import sqlite3
+import pathlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ruta por defecto para la base de datos de la caché de hashes
+DEFAULT_HASH_CACHE_DB_PATH = pathlib.Path("dataset/.cache/hash_cache.sqlite")
+
+_StatKey = Tuple[int, int, int]  # (size, mtime_ns, inode)
+
+
+class FileHashCache:
+    """Caché de hashes de archivos: LRU acotada en memoria y tabla SQLite sin límite."""
+
+    def __init__(self, db_path: Optional[str | pathlib.Path] = None, enabled: bool = True,
+                 max_cache_size: int = 1000, chunk_size: int = 8192, timeout: float = 30):
+        """
+        Inicializa la caché de hashes.
+
+        Args:
+            db_path: Ruta a la base de datos SQLite. Si es None, usa la ruta por defecto.
+            enabled: Si es False, compute_sha256 siempre lee el archivo completo
+            max_cache_size: Máximo de entradas en memoria; 0 = sin límite
+            chunk_size: Bytes por lectura al calcular el hash
+            timeout: Segundos de espera ante bloqueos de SQLite
+        """
+        self.db_path = pathlib.Path(db_path) if db_path else DEFAULT_HASH_CACHE_DB_PATH
+        self.enabled = enabled
+        self.max_cache_size = max_cache_size
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self._memory: "OrderedDict[str, Tuple[_StatKey, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.enabled:
+            self._ensure_db_exists()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=self.timeout)
+
+    def _ensure_db_exists(self) -> None:
+        """Crea la base de datos y tabla si no existen."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connect() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(file_hashes)")}
+            if 'last_used' in columns:
+                # Esquema anterior con una columna LRU que nunca se leía: es una caché,
+                # se descarta y se vuelve a llenar al escanear
+                conn.execute("DROP TABLE file_hashes")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    path        TEXT PRIMARY KEY,
+                    size        INTEGER NOT NULL,
+                    mtime_ns    INTEGER NOT NULL,
+                    inode       INTEGER NOT NULL,
+                    sha256      TEXT NOT NULL
+                )
+            """)
+            conn.commit()
+
+    def _hash_file(self, file_path: pathlib.Path) -> str:
+        hash_sha256 = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                hash_sha256.update(chunk)
+        return hash_sha256.hexdigest()
+
+    def compute_sha256(self, file_path: str | pathlib.Path) -> str:
+        """
+        Devuelve el hash SHA-256 del archivo, leyéndolo solo si cambió.
+
+        Raises:
+            FileNotFoundError / OSError: Si el archivo no existe o no se puede leer
+        """
+        file_path = pathlib.Path(file_path)
+        if not self.enabled:
+            return self._hash_file(file_path)
+
+        key = str(file_path.resolve())
+        st = os.stat(key)
+        stat_key: _StatKey = (st.st_size, st.st_mtime_ns, st.st_ino)
+
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached and cached[0] == stat_key:
+                self._memory.move_to_end(key)
+                return cached[1]
+
+        file_hash = self._lookup_persistent(key, stat_key)
+        if file_hash is None:
+            file_hash = self._hash_file(file_path)
+            self._store_persistent(key, stat_key, file_hash)
+
+        with self._lock:
+            self._memory[key] = (stat_key, file_hash)
+            self._memory.move_to_end(key)
+            while self.max_cache_size and len(self._memory) > self.max_cache_size:
+                self._memory.popitem(last=False)
+        return file_hash
+
+    def _lookup_persistent(self, key: str, stat_key: _StatKey) -> Optional[str]:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT size, mtime_ns, inode, sha256 FROM file_hashes WHERE path = ?",
+                    (key,)
+                ).fetchone()
+                # Sin escrituras en los aciertos: un commit por archivo serializaría a los workers
+                if row is None or tuple(row[:3]) != stat_key:
+                    return None
+                return row[3]
+        except sqlite3.Error as e:
+            logger.warning(f"Error leyendo la caché de hashes: {e}")
+            return None
+
+    def _store_persistent(self, key: str, stat_key: _StatKey, file_hash: str) -> None:
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, inode, sha256) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, *stat_key, file_hash)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Error escribiendo en la caché de hashes: {e}")
+
+    def clear(self) -> int:
+        """Vacía la caché. Devuelve el número de entradas persistidas eliminadas."""
+        with self._lock:
+            self._memory.clear()
+        if not self.enabled:
+            return 0
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM file_hashes")
+            conn.commit()
+            return cursor.rowcount
+
+
+# Instancia global para uso conveniente
+_global_hash_cache = None
+_global_hash_cache_lock = threading.Lock()
+
+def get_hash_cache() -> FileHashCache:
+    """
+    Obtiene la instancia global de la caché de hashes, configurada desde la
+    sección ``performance`` de la configuración de deduplicación.
+
+    Returns:
+        Instancia de FileHashCache
+    """
+    global _global_hash_cache
+
+    with _global_hash_cache_lock:
+        if _global_hash_cache is None:
+            db_path = None
+            try:
+                from .dedup_config import get_config_manager
+                config_manager = get_config_manager()
+                perf = config_manager.get_performance_config()
+                db_path = config_manager.get_cache_directory() / "hash_cache.sqlite"
+                _global_hash_cache = FileHashCache(
+                    db_path,
+                    enabled=perf.enable_hash_cache,
+                    max_cache_size=perf.max_cache_size,
+                    chunk_size=perf.hash_chunk_size,
+                    timeout=perf.operation_timeout
+                )
+            except Exception as e:
+                # Sin configuración disponible: valores por defecto
+                logger.debug(f"Configuración de rendimiento no disponible, usando valores por defecto: {e}")
+                _global_hash_cache = FileHashCache(db_path)
+        return _global_hash_cache
+
+
+def cached_sha256(file_path: str | pathlib.Path) -> str:
+    """Hash SHA-256 de un archivo a través de la caché global."""
+    return get_hash_cache().compute_sha256(file_path)
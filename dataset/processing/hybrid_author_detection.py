@@ -8,6 +8,7 @@ Detector híbrido de autores que combina múltiples enfoques:
 """
 
 import logging
+from concurrent.futures import Executor
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
@@ -52,45 +53,55 @@ class HybridAuthorDetector:
         # Logger
         self.logger = logging.getLogger(__name__)
         
-    def detect_author(self, segments: List[Dict[str, Any]], profile_type: str) -> Optional[Dict[str, Any]]:
-        """Detecta el autor usando enfoque híbrido"""
+    def detect_author(self, segments: List[Dict[str, Any]], profile_type: str,
+                      executor: Optional[Executor] = None) -> Optional[Dict[str, Any]]:
+        """
+        Detecta el autor usando enfoque híbrido.
+        
+        Args:
+            segments: Segmentos del documento
+            profile_type: Tipo de perfil
+            executor: Pool opcional para ejecutar los tres detectores en paralelo
+        """
         if not segments:
             return None
         
+        detectors = [
+            # 1. Análisis estilométrico (prioridad alta para autores literarios)
+            ('stylometric', self.stylometric_detector, "Error en análisis estilométrico"),
+            # 2. Detector contextual mejorado
+            ('enhanced_contextual', self.enhanced_detector, "Error en detector mejorado"),
+            # 3. Detector contextual básico
+            ('contextual', self.contextual_detector, "Error en detector contextual"),
+        ]
+        if executor is not None:
+            futures = [executor.submit(detector.detect_author, segments, profile_type)
+                       for _, detector, _ in detectors]
+            run = lambda index: futures[index].result()
+        else:
+            futures = []
+            run = lambda index: detectors[index][1].detect_author(segments, profile_type)
+        
         candidates = []
         
-        # 1. Análisis estilométrico (prioridad alta para autores literarios)
-        try:
-            stylometric_result = self.stylometric_detector.detect_author(segments, profile_type)
-            if stylometric_result:
-                candidates.append(self._normalize_result(stylometric_result, 'stylometric'))
-                
-                # Si es una coincidencia de base de datos literaria con alta confianza, usar directamente
-                if (stylometric_result.get('method') == 'literary_database_match' and 
-                    stylometric_result.get('confidence', 0) > 0.8):
-                    return stylometric_result
+        # Los resultados se consumen en orden de prioridad, igual que en modo secuencial
+        for index, (detector_type, _, error_message) in enumerate(detectors):
+            try:
+                result = run(index)
+                if result:
+                    candidates.append(self._normalize_result(result, detector_type))
                     
-        except Exception as e:
-            if self.debug:
-                self.logger.warning(f"Error en análisis estilométrico: {e}")
-        
-        # 2. Detector contextual mejorado
-        try:
-            enhanced_result = self.enhanced_detector.detect_author(segments, profile_type)
-            if enhanced_result:
-                candidates.append(self._normalize_result(enhanced_result, 'enhanced_contextual'))
-        except Exception as e:
-            if self.debug:
-                self.logger.warning(f"Error en detector mejorado: {e}")
-        
-        # 3. Detector contextual básico
-        try:
-            contextual_result = self.contextual_detector.detect_author(segments, profile_type)
-            if contextual_result:
-                candidates.append(self._normalize_result(contextual_result, 'contextual'))
-        except Exception as e:
-            if self.debug:
-                self.logger.warning(f"Error en detector contextual: {e}")
+                    # Si es una coincidencia de base de datos literaria con alta confianza, usar directamente
+                    if (detector_type == 'stylometric' and
+                        result.get('method') == 'literary_database_match' and 
+                        result.get('confidence', 0) > 0.8):
+                        for future in futures:
+                            future.cancel()
+                        return result
+                        
+            except Exception as e:
+                if self.debug:
+                    self.logger.warning(f"{error_message}: {e}")
         
         # Seleccionar el mejor candidato
         if candidates:
@@ -0,0 +1,108 @@
+"""
+Índice de autores conocidos para validar candidatos sin recorrer toda la lista.
+
+Cada nombre se normaliza una sola vez al construir el índice (por defecto: minúsculas
+y sin acentos) y se guarda en:
+
+- un dict de claves normalizadas → búsqueda exacta O(1)
+- un índice invertido de trigramas para la búsqueda difusa: solo se comparan los
+  nombres que comparten trigramas con la consulta, ordenados por coeficiente de
+  Dice (trigramas compartidos normalizados por la longitud de ambos nombres)
+"""
+
+import heapq
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+
+def fold_accents(text: str) -> str:
+    """Minúsculas y sin acentos (NFD + ASCII), igual que la comparación histórica."""
+    return unicodedata.normalize('NFD', text.lower().strip()).encode('ascii', 'ignore').decode('ascii')
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class KnownAuthorsIndex:
+    """Índice de nombres normalizados con búsqueda exacta y difusa."""
+
+    def __init__(self, normalizer: Callable[[str], str] = fold_accents):
+        """
+        Args:
+            normalizer: Función que convierte un nombre en su clave de búsqueda
+        """
+        self.normalizer = normalizer
+        self._entries: Dict[str, Any] = {}
+        self._trigram_index: Dict[str, Set[str]] = defaultdict(set)
+        self._trigram_counts: Dict[str, int] = {}
+
+    @classmethod
+    def from_names(cls, names: Iterable[str], normalizer: Callable[[str], str] = fold_accents) -> 'KnownAuthorsIndex':
+        index = cls(normalizer)
+        for name in names:
+            index.add(name)
+        return index
+
+    def add(self, name: str, value: Any = None) -> Optional[str]:
+        """
+        Añade un nombre al índice. Si la clave ya existe se conserva el primer valor.
+
+        Returns:
+            Clave normalizada, o None si el nombre queda vacío al normalizarlo
+        """
+        key = self.normalizer(name) if name else ''
+        if not key:
+            return None
+        if key in self._entries:
+            return key
+        self._entries[key] = value
+        trigrams = _trigrams(key)
+        self._trigram_counts[key] = len(trigrams)
+        for trigram in trigrams:
+            self._trigram_index[trigram].add(key)
+        return key
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return bool(name) and self.normalizer(name) in self._entries
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Valor asociado al nombre (búsqueda exacta tras normalizar)."""
+        if not name:
+            return default
+        return self._entries.get(self.normalizer(name), default)
+
+    def get_key(self, key: str, default: Any = None) -> Any:
+        """Valor asociado a una clave ya normalizada."""
+        return self._entries.get(key, default)
+
+    def fuzzy_candidates(self, name: str, limit: int = 50) -> List[str]:
+        """
+        Claves candidatas para una comparación difusa con ``name``.
+
+        Devuelve como mucho ``limit`` claves, ordenadas por coeficiente de Dice sobre
+        trigramas (las que no comparten ninguno se descartan). Normalizar por la
+        longitud evita que nombres largos, con muchos trigramas comunes, desplacen
+        de la lista a la coincidencia corta correcta.
+        """
+        key = self.normalizer(name) if name else ''
+        if not key:
+            return []
+        query_trigrams = _trigrams(key)
+        shared: Counter = Counter()
+        for trigram in query_trigrams:
+            for candidate in self._trigram_index.get(trigram, ()):
+                shared[candidate] += 1
+        query_count = len(query_trigrams)
+        ranked = heapq.nlargest(
+            limit, shared.items(),
+            key=lambda item: 2 * item[1] / (query_count + self._trigram_counts[item[0]]))
+        return [candidate for candidate, _ in ranked]
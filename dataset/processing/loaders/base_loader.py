@@ -31,6 +31,32 @@ class BaseLoader(ABC):
         """
         pass
     
+    def load_streaming(self, batch_pages: int = 20) -> Dict[str, Any]:
+        """
+        Variante incremental de load() para el pipeline en streaming.
+        
+        La implementación por defecto delega en load() y entrega todos los bloques
+        en un único lote; los loaders que puedan leer por páginas (p.ej. PDFLoader)
+        la sobrescriben para producir lotes acotados.
+        
+        Args:
+            batch_pages: Número aproximado de páginas por lote (si el formato las tiene).
+        
+        Returns:
+            Dict[str, Any]: Igual que load(), pero en lugar de 'blocks' contiene
+                'block_batches': Iterator[List[Dict[str, Any]]], un generador de lotes de bloques.
+        """
+        loaded_data = self.load()
+        blocks = loaded_data.get('blocks', [])
+        
+        def _single_batch() -> Iterator[List[Dict[str, Any]]]:
+            if blocks:
+                yield blocks
+        
+        streamed = {k: v for k, v in loaded_data.items() if k != 'blocks'}
+        streamed['block_batches'] = _single_batch()
+        return streamed
+    
     def get_source_info(self) -> tuple[str, str]:
         """
         Extrae la información de fuente y contexto del archivo.
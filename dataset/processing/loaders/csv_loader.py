@@ -2,16 +2,19 @@ from datetime import datetime
 import re
 import csv
 from pathlib import Path
-from typing import Iterator, Dict, Any, Optional
+from typing import Iterator, Dict, Any, List, Optional
 
 from .base_loader import BaseLoader
 from dataset.scripts.converters import _calculate_sha256
 
+# Filas por lote en load_streaming()
+DEFAULT_STREAM_BATCH_ROWS = 5000
+
 class CSVLoader(BaseLoader):
     """Loader para archivos CSV (.csv)."""
     
     def __init__(self, file_path: str | Path, tipo: str = 'escritos', encoding: str = 'utf-8', 
-                 delimiter: str = ',', quotechar: str = '"'):
+                 delimiter: str = ',', quotechar: str = '"', stream_batch_rows: int = DEFAULT_STREAM_BATCH_ROWS):
         """
         Inicializa el loader para archivos CSV.
         
@@ -21,12 +24,14 @@ class CSVLoader(BaseLoader):
             encoding: Codificación del archivo
             delimiter: Separador de campos (por defecto ',')
             quotechar: Carácter para encerrar campos con espacios (por defecto '"')
+            stream_batch_rows: Bloques por lote en load_streaming()
         """
         super().__init__(file_path)
         self.tipo = tipo.lower()
         self.encoding = encoding
         self.delimiter = delimiter
         self.quotechar = quotechar
+        self.stream_batch_rows = max(1, stream_batch_rows)
         
     def _extract_date_from_filename(self) -> Optional[str]:
         """Intenta extraer una fecha del nombre del archivo."""
@@ -90,23 +95,10 @@ class CSVLoader(BaseLoader):
             
         return self.delimiter  # Usar valor por defecto si falla la detección
         
-    def load(self) -> Dict[str, Any]:
-        """
-        Carga y procesa el archivo CSV.
-        
-        Returns:
-            Dict[str, Any]: Un diccionario con bloques de contenido y metadatos del documento.
-        """
-        fuente, contexto = self.get_source_info()
-        fecha = self._extract_date_from_filename()
-        delimiter = self._detect_delimiter()
-        
-        blocks = []
-        order_in_document = 0
-        
+    def _document_metadata(self) -> Dict[str, Any]:
         file_hash = _calculate_sha256(self.file_path)
         # Placeholder for actual metadata extraction if possible from CSV
-        document_metadata: DocumentMetadata = {
+        return {
             "nombre_archivo": self.file_path.name,
             "ruta_archivo": str(self.file_path.resolve()),
             "extension_archivo": self.file_path.suffix,
@@ -115,53 +107,98 @@ class CSVLoader(BaseLoader):
             # Add other relevant metadata if extractable
         }
 
-        try:
-            with open(self.file_path, 'r', encoding=self.encoding, newline='') as f:
-                reader = csv.reader(f, delimiter=delimiter, quotechar=self.quotechar)
-                headers = []
-                try:
-                    headers = next(reader)
-                    blocks.append({
-                        'text': ', '.join(headers),
+    def iter_blocks(self, document_metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Genera los bloques del CSV fila a fila, sin mantener el archivo en memoria.
+        
+        La cabecera y los datos de ``csv_has_header``/``csv_headers`` se anotan en
+        ``document_metadata`` al leer la primera fila.
+        """
+        delimiter = self._detect_delimiter()
+        order_in_document = 0
+        
+        with open(self.file_path, 'r', encoding=self.encoding, newline='') as f:
+            reader = csv.reader(f, delimiter=delimiter, quotechar=self.quotechar)
+            try:
+                headers = next(reader)
+            except StopIteration:
+                document_metadata['csv_has_header'] = False
+                return
+            
+            document_metadata['csv_has_header'] = True
+            document_metadata['csv_headers'] = headers
+            yield {
+                'text': ', '.join(headers),
+                'order_in_document': order_in_document,
+                'block_type': 'csv_header'
+            }
+            order_in_document += 1
+            
+            # Nombres de campo limpios una sola vez, no por celda
+            field_names = [header.strip() for header in headers]
+            num_fields = len(field_names)
+            
+            for row_num, row in enumerate(reader, 1):
+                row_texts = []
+                for i, value in enumerate(row):
+                    cell_text = value.strip()
+                    if not cell_text:
+                        continue
+                    if i < num_fields and field_names[i]:
+                        row_texts.append(f"{field_names[i]}: {cell_text}")
+                    else:
+                        row_texts.append(cell_text)
+                
+                if row_texts:
+                    yield {
+                        'text': '; '.join(row_texts),
                         'order_in_document': order_in_document,
-                        'block_type': 'csv_header'
-                    })
+                        'block_type': 'csv_row',
+                        'csv_row_number': row_num
+                    }
                     order_in_document += 1
-                except StopIteration:
-                    document_metadata['csv_has_header'] = False
-                    return {'blocks': [], 'document_metadata': document_metadata}
-                
-                document_metadata['csv_has_header'] = True
-                document_metadata['csv_headers'] = headers
 
-                for row_num, row in enumerate(reader, 1):
-                    if not any(field.strip() for field in row):
-                        continue
-                        
-                    row_texts = []
-                    for i, value in enumerate(row):
-                        cell_text = value.strip()
-                        if i < len(headers):
-                            field_name = headers[i].strip()
-                            if field_name and cell_text:
-                                row_texts.append(f"{field_name}: {cell_text}")
-                            elif cell_text:
-                                row_texts.append(cell_text)
-                        elif cell_text:
-                            row_texts.append(cell_text)
-                    
-                    if row_texts:
-                        blocks.append({
-                            'text': '; '.join(row_texts),
-                            'order_in_document': order_in_document,
-                            'block_type': 'csv_row',
-                            'csv_row_number': row_num
-                        })
-                        order_in_document += 1
-                            
+    def load(self) -> Dict[str, Any]:
+        """
+        Carga y procesa el archivo CSV.
+        
+        Returns:
+            Dict[str, Any]: Un diccionario con bloques de contenido y metadatos del documento.
+        """
+        document_metadata = self._document_metadata()
+        blocks = []
+        
+        try:
+            for block in self.iter_blocks(document_metadata):
+                blocks.append(block)
         except Exception as e:
             error_message = f"Error al procesar CSV {self.file_path}: {str(e)}"
             document_metadata['loader_error'] = error_message
             return {'blocks': blocks, 'document_metadata': document_metadata}
+        
+        if not document_metadata.get('csv_has_header'):
+            return {'blocks': [], 'document_metadata': document_metadata}
+        return {'blocks': blocks, 'document_metadata': document_metadata}
 
-        return {'blocks': blocks, 'document_metadata': document_metadata}
\ No newline at end of file
+    def load_streaming(self, batch_pages: int = 20) -> Dict[str, Any]:
+        """
+        Variante incremental para el pipeline en streaming: lotes de
+        ``stream_batch_rows`` filas leídas de forma perezosa (``batch_pages`` no aplica
+        a CSV).
+        """
+        document_metadata = self._document_metadata()
+        
+        def _batches() -> Iterator[List[Dict[str, Any]]]:
+            batch = []
+            for block in self.iter_blocks(document_metadata):
+                batch.append(block)
+                if len(batch) >= self.stream_batch_rows:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        
+        return {
+            'block_batches': _batches(),
+            'document_metadata': document_metadata
+        }
@@ -1,7 +1,8 @@
 from datetime import datetime
 import re
 from pathlib import Path
-from typing import Dict, Any, Optional, Iterator, List
+from typing import Dict, Any, Optional, Iterator, List, Tuple
+import numpy as np
 import pandas as pd
 
 from .base_loader import BaseLoader
@@ -152,6 +153,53 @@ class ExcelLoader(BaseLoader):
                         row_values.append(clean_value)
             return ' | '.join(row_values)
     
+    def _header_from_first_row(self, df_raw: pd.DataFrame) -> Tuple[List[str], pd.DataFrame]:
+        """
+        Usa la primera fila de una hoja leída con ``header=None`` como cabecera.
+        
+        Reproduce los nombres que daba ``read_excel(header=0)`` seguido de
+        _clean_column_names (celdas vacías → ``Columna_N``, duplicados con sufijo
+        ``.N``) sin volver a leer la hoja.
+        
+        Returns:
+            Tuple con (nombres de columna, DataFrame de datos sin la fila de cabecera)
+        """
+        names = []
+        seen: Dict[str, int] = {}
+        for i, value in enumerate(df_raw.iloc[0].tolist()):
+            name = f"Columna_{i+1}" if pd.isna(value) else str(value)
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            seen.setdefault(name, 0)
+            names.append(name)
+        
+        df = df_raw.iloc[1:].reset_index(drop=True)
+        df.columns = names
+        return names, df
+    
+    def _row_texts(self, df: pd.DataFrame, use_column_names: bool = True) -> pd.Series:
+        """
+        Versión columnar de _format_row_data para todas las filas a la vez.
+        
+        Se recorre por columnas (no por filas): cada columna se convierte a texto y se
+        enmascaran nulos y vacíos con operaciones vectorizadas, y los fragmentos se
+        concatenan con `` | ``.
+        
+        Returns:
+            Serie con el texto de cada fila ('' si la fila no tiene contenido)
+        """
+        texts = pd.Series('', index=df.index, dtype=object)
+        for col_name, column in df.items():
+            cells = column.astype(str).str.strip()
+            present = column.notna().to_numpy() & (cells != '').to_numpy()
+            if not present.any():
+                continue
+            pieces = f"{col_name}: " + cells if use_column_names else cells
+            separators = pd.Series(np.where(texts.to_numpy() != '', ' | ', ''), index=df.index)
+            texts = texts.where(~present, texts + separators + pieces)
+        return texts
+    
     def _read_excel_file(self, file_path: Path, sheet_name: str = None) -> pd.ExcelFile:
         """
         Lee un archivo Excel usando el engine apropiado según la extensión.
@@ -224,28 +272,8 @@ class ExcelLoader(BaseLoader):
             # Procesar cada hoja
             for sheet_name in excel_file.sheet_names:
                 try:
-                    # Leer la hoja sin asumir cabeceras
-                    if self.file_path.suffix.lower() == '.xlsx':
-                        df_raw = pd.read_excel(excel_file, sheet_name=sheet_name, header=None, engine='openpyxl')
-                    else:
-                        df_raw = pd.read_excel(excel_file, sheet_name=sheet_name, header=None, engine='xlrd')
-                    
-                    # Detectar si hay cabeceras válidas
-                    has_headers, header_row = self._detect_header_row(df_raw)
-                    
-                    # Si detectamos cabeceras, releer con ellas
-                    if has_headers and header_row == 0:
-                        if self.file_path.suffix.lower() == '.xlsx':
-                            df = pd.read_excel(excel_file, sheet_name=sheet_name, header=0, engine='openpyxl')
-                        else:
-                            df = pd.read_excel(excel_file, sheet_name=sheet_name, header=0, engine='xlrd')
-                        df = self._clean_column_names(df)
-                    elif has_headers and header_row > 0:
-                        df = self._clean_column_names(df_raw, header_row)
-                    else:
-                        # No hay cabeceras válidas, usar números de columna
-                        df = df_raw.copy()
-                        df.columns = [f"Columna_{i+1}" for i in range(len(df.columns))]
+                    # Una sola lectura por hoja, sin asumir cabeceras
+                    df_raw = excel_file.parse(sheet_name=sheet_name, header=None)
                     
                     # Agregar nombre de la hoja como título
                     blocks.append({
@@ -257,6 +285,20 @@ class ExcelLoader(BaseLoader):
                         'sheet_name': sheet_name
                     })
                     order_in_document += 1
+                    if df_raw.empty:
+                        continue
+                    
+                    # Detectar cabeceras mirando solo las primeras filas
+                    has_headers, header_row = self._detect_header_row(df_raw.head(5))
+                    
+                    if has_headers and header_row == 0:
+                        _, df = self._header_from_first_row(df_raw)
+                    elif has_headers and header_row > 0:
+                        df = self._clean_column_names(df_raw, header_row)
+                    else:
+                        # No hay cabeceras válidas, usar números de columna
+                        df = df_raw
+                        df.columns = [f"Columna_{i+1}" for i in range(len(df.columns))]
                     
                     # Solo agregar cabeceras si son significativas
                     if has_headers:
@@ -272,27 +314,20 @@ class ExcelLoader(BaseLoader):
                         })
                         order_in_document += 1
                     
-                    # Procesar cada fila con datos
-                    for row_idx, row in df.iterrows():
-                        # Verificar si la fila tiene contenido significativo
-                        non_null_count = row.notna().sum()
-                        if non_null_count == 0:
-                            continue  # Saltar filas completamente vacías
-                        
-                        # Formatear la fila
-                        row_text = self._format_row_data(row, use_column_names=has_headers)
-                        
-                        if row_text:  # Solo agregar si hay contenido
-                            blocks.append({
-                                'text': row_text,
-                                'order_in_document': order_in_document,
-                                'block_type': 'excel_row',
-                                'is_heading': False,
-                                'sheet_name': sheet_name,
-                                'excel_row_number': row_idx + 1,
-                                'has_headers': has_headers
-                            })
-                            order_in_document += 1
+                    # Texto de todas las filas de una vez; las vacías quedan como ''
+                    row_texts = self._row_texts(df, use_column_names=has_headers)
+                    non_empty = row_texts[row_texts != '']
+                    for row_idx, row_text in zip(non_empty.index.tolist(), non_empty.tolist()):
+                        blocks.append({
+                            'text': row_text,
+                            'order_in_document': order_in_document,
+                            'block_type': 'excel_row',
+                            'is_heading': False,
+                            'sheet_name': sheet_name,
+                            'excel_row_number': row_idx + 1,
+                            'has_headers': has_headers
+                        })
+                        order_in_document += 1
                             
                 except Exception as sheet_error:
                     # Error procesando una hoja específica
@@ -330,19 +365,24 @@ class ExcelLoader(BaseLoader):
         blocks = []
         order = start_order
         
-        # Crear una representación más elaborada de la tabla
-        for i, row in df.iterrows():
-            row_text = self._format_row_data(row, use_column_names=True)
-                    
+        # Textos y celdas por columnas; por fila solo se ensamblan los bloques
+        row_texts = self._row_texts(df, use_column_names=True).tolist()
+        present = df.notna().to_numpy()
+        cell_strings = df.astype(str).to_numpy()
+        column_names = [str(col) for col in df.columns]
+        
+        for position, (i, row_text) in enumerate(zip(df.index.tolist(), row_texts)):
             # Si hay algún contenido, agregar bloque
             if row_text:
+                row_present = present[position]
+                row_cells = cell_strings[position]
                 blocks.append({
                     'text': row_text,
                     'order_in_document': order,
                     'block_type': 'excel_table_row',
                     'is_heading': False,
                     'row_number': i + 1,
-                    'excel_columns': {str(col): str(row[col]) for col in df.columns if pd.notna(row[col])}
+                    'excel_columns': {column_names[j]: row_cells[j] for j in np.flatnonzero(row_present)}
                 })
                 order += 1
                 
@@ -4,13 +4,57 @@ import json
 import logging
 import re
 from pathlib import Path
-from typing import Iterator, Dict, Any, List, Optional
+from typing import Iterable, Iterator, Dict, Any, List, Optional
 
 from .base_loader import BaseLoader
 from ...scripts.utils import filter_and_extract_from_json_object
 
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    ijson = None
+    IJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# A partir de este tamaño el archivo se lee en streaming con ijson en lugar de json.loads
+STREAMING_THRESHOLD_MB = 256
+# Bloques por lote en load_streaming()
+DEFAULT_STREAM_BATCH_SIZE = 1000
+
+# Bytes de control que JSON no admite (todos salvo \t, \n, \r) más DEL, sustituidos por espacio
+# igual que en _clean_json_content. En UTF-8 los bytes < 0x80 nunca forman parte de una
+# secuencia multibyte, así que se pueden sustituir sin decodificar.
+_CONTROL_BYTES = bytes(list(range(0, 9)) + [11, 12] + list(range(14, 32)) + [127])
+_CONTROL_BYTES_TABLE = bytes.maketrans(_CONTROL_BYTES, b' ' * len(_CONTROL_BYTES))
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+
+class _ControlCharFilter:
+    """Envoltorio de lectura binaria que limpia los caracteres de control trozo a trozo."""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._first_read = True
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._raw.read(size)
+        if self._first_read:
+            self._first_read = False
+            if chunk.startswith(_UTF8_BOM):
+                chunk = chunk[len(_UTF8_BOM):]
+        return chunk.translate(_CONTROL_BYTES_TABLE)
+
+    def close(self) -> None:
+        self._raw.close()
+
+    def __enter__(self) -> '_ControlCharFilter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
 
 class JSONLoader(BaseLoader):
     """
@@ -20,6 +64,9 @@ class JSONLoader(BaseLoader):
     - Manejo de arrays y objetos anidados
     - Concatenación automática de contenido de arrays
     - Limpieza automática de caracteres de control problemáticos
+    - Lectura en streaming con ijson para exportaciones grandes (chats de Telegram,
+      volcados de varios GB): los objetos del array se parsean y filtran de uno en
+      uno y el archivo nunca se carga entero en memoria
     """
     
     def __init__(self, file_path: Path, encoding: str = 'utf-8', **kwargs):
@@ -40,6 +87,12 @@ class JSONLoader(BaseLoader):
         self.min_text_length = kwargs.get('min_text_length', None)
         self.max_text_length = kwargs.get('max_text_length', None)
         
+        # Streaming: None = automático según el tamaño del archivo
+        self.streaming = kwargs.get('streaming', None)
+        self.streaming_threshold_mb = kwargs.get('streaming_threshold_mb', STREAMING_THRESHOLD_MB)
+        self.stream_batch_size = max(1, int(kwargs.get('stream_batch_size', DEFAULT_STREAM_BATCH_SIZE)))
+        self._stream_prefix_cache: Optional[str] = None  # '' = sin array de objetos
+        
         logger.info(f"JSONLoader inicializado para {file_path}")
         logger.debug(f"Configuración: text_paths={self.text_property_paths}, "
                     f"filter_rules={len(self.filter_rules)} reglas, "
@@ -94,6 +147,9 @@ class JSONLoader(BaseLoader):
         Returns:
             Dict con 'blocks' y 'document_metadata'
         """
+        if self._use_streaming():
+            return self._load_streamed()
+        
         blocks = []
         document_metadata = {}
         
@@ -114,14 +170,7 @@ class JSONLoader(BaseLoader):
             logger.info(f"JSON cargado exitosamente después de limpieza: {self.file_path}")
             
             # Metadatos del documento
-            fuente, contexto = self.get_source_info()
-            document_metadata = {
-                'source_file_path': str(self.file_path.absolute()),
-                'file_format': 'json',
-                'original_fuente': fuente,
-                'original_contexto': contexto,
-                'preprocessing_applied': 'control_character_cleaning'
-            }
+            document_metadata = self._document_metadata()
             
             # ✅ LOG: Debugging para fecha
             logger.debug(f"🔍 JSONLoader inicializado para {self.file_path} con date_path='{self.date_path}'")
@@ -138,16 +187,10 @@ class JSONLoader(BaseLoader):
             first_date_found = None  # Para agregar a document_metadata
             
             for i, item in enumerate(processed_items):
-                block = {
-                    'text': item['texto'],
-                    'order_in_document': i,
-                    'metadata': item['metadata']
-                }
-                if item.get('fecha'):
-                    block['detected_date'] = item['fecha']
-                    # ✅ CORRECCIÓN: Guardar la primera fecha para document_metadata
-                    if first_date_found is None:
-                        first_date_found = item['fecha']
+                block = self._item_to_block(item, i)
+                # ✅ CORRECCIÓN: Guardar la primera fecha para document_metadata
+                if first_date_found is None and item.get('fecha'):
+                    first_date_found = item['fecha']
                 blocks.append(block)
             
             # ✅ CORRECCIÓN: Agregar fecha a document_metadata si se encontró
@@ -169,6 +212,206 @@ class JSONLoader(BaseLoader):
             'document_metadata': document_metadata
         }
 
+    def _document_metadata(self) -> Dict[str, Any]:
+        fuente, contexto = self.get_source_info()
+        return {
+            'source_file_path': str(self.file_path.absolute()),
+            'file_format': 'json',
+            'original_fuente': fuente,
+            'original_contexto': contexto,
+            'preprocessing_applied': 'control_character_cleaning'
+        }
+
+    def _item_to_block(self, item: Dict[str, Any], order: int) -> Dict[str, Any]:
+        block = {
+            'text': item['texto'],
+            'order_in_document': order,
+            'metadata': item['metadata']
+        }
+        if item.get('fecha'):
+            block['detected_date'] = item['fecha']
+        return block
+
+    # ------------------------------------------------------------------ #
+    # Streaming con ijson
+    # ------------------------------------------------------------------ #
+
+    def _use_streaming(self) -> bool:
+        """
+        Decide si leer en streaming: forzado con ``streaming=True/False`` o, por
+        defecto, para archivos de más de ``streaming_threshold_mb``. Requiere ijson,
+        UTF-8 y un array de objetos (``treat_as_single_object`` necesita el JSON entero).
+        """
+        if self.streaming is False:
+            return False
+        if self.streaming is None:
+            try:
+                size_mb = self.file_path.stat().st_size / (1024 * 1024)
+            except OSError:
+                return False
+            if size_mb < self.streaming_threshold_mb:
+                return False
+        return self._can_stream()
+
+    def _can_stream(self) -> bool:
+        if self.treat_as_single_object:
+            return False
+        if not IJSON_AVAILABLE:
+            logger.warning(f"ijson no está instalado; {self.file_path} se cargará completo en memoria")
+            return False
+        if self.encoding.lower().replace('-', '').replace('_', '') not in ('utf8', 'utf8sig'):
+            logger.warning(f"Streaming JSON solo admite UTF-8 (encoding={self.encoding}); usando carga completa")
+            return False
+        return True
+
+    def _open_stream(self) -> _ControlCharFilter:
+        return _ControlCharFilter(self.file_path.open('rb'))
+
+    def _stream_prefix(self) -> Optional[str]:
+        """
+        Prefijo ijson del array de objetos a recorrer, con el mismo criterio que
+        _process_json_structure: el array raíz (aunque haya ``root_array_path``), el
+        de ``root_array_path`` o el array de objetos más grande accesible a través
+        de objetos.
+        
+        Returns:
+            Prefijo tipo ``'messages.item'``, o None si no hay array de objetos
+        """
+        if self._stream_prefix_cache is not None:
+            return self._stream_prefix_cache or None
+        self._stream_prefix_cache = self._find_stream_prefix() or ''
+        return self._stream_prefix_cache or None
+
+    def _find_stream_prefix(self) -> Optional[str]:
+        with self._open_stream() as f:
+            first_event = next(ijson.parse(f), (None, None, None))[1]
+        if first_event == 'start_array':
+            return 'item'
+        if first_event != 'start_map':
+            return None
+        if self.root_array_path:
+            return f"{self.root_array_path}.item"
+        
+        # Sin root_array_path hay que recorrer el archivo una vez para medir los arrays
+        logger.info(f"🔍 Buscando el array principal de {self.file_path} (configura root_array_path para evitar esta pasada)")
+        item_counts: Dict[str, int] = {}
+        # Tipos de los contenedores abiertos: el prefijo no distingue un elemento de
+        # array de una clave llamada 'item'
+        containers: List[str] = []
+        with self._open_stream() as f:
+            for prefix, event, _ in ijson.parse(f):
+                if event == 'start_map':
+                    # Solo arrays alcanzables a través de objetos, no anidados en otros arrays
+                    if (containers and containers[-1] == 'array'
+                            and all(container == 'map' for container in containers[:-1])):
+                        array_prefix = prefix[:-len('.item')]
+                        item_counts[array_prefix] = item_counts.get(array_prefix, 0) + 1
+                    containers.append('map')
+                elif event == 'start_array':
+                    containers.append('array')
+                elif event in ('end_map', 'end_array'):
+                    containers.pop()
+        if not item_counts:
+            return None
+        largest = max(item_counts, key=item_counts.get)
+        logger.debug(f"Array más grande encontrado en streaming: '{largest}' con {item_counts[largest]} objetos")
+        return f"{largest}.item"
+
+    def iter_blocks(self, document_metadata: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Genera los bloques del archivo de uno en uno, parseando con ijson.
+        
+        Las reglas de filtrado y extracción son las mismas que en load(); la memoria
+        usada no depende del tamaño del archivo. Si se pasa ``document_metadata``, la
+        primera fecha encontrada se anota en él como en load().
+        
+        Raises:
+            ValueError: Si no se encuentra un array de objetos que recorrer
+            ijson.JSONError: Si el JSON está mal formado
+        """
+        prefix = self._stream_prefix()
+        if prefix is None:
+            raise ValueError(f"No se encontró un array de objetos para leer en streaming en {self.file_path}")
+        logger.info(f"📡 Leyendo {self.file_path} en streaming (prefijo ijson '{prefix}')")
+        
+        first_date_found = False
+        order = -1
+        with self._open_stream() as f:
+            objects = ijson.items(f, prefix, use_float=True)
+            for order, item in enumerate(self._process_object_list(objects)):
+                if not first_date_found and item.get('fecha'):
+                    first_date_found = True
+                    if document_metadata is not None:
+                        document_metadata['fecha_publicacion_documento'] = item['fecha']
+                yield self._item_to_block(item, order)
+        
+        if order < 0 and prefix != 'item' and self.root_array_path and not self._stream_path_exists(prefix):
+            # Mismo aviso que la carga completa cuando la ruta configurada no existe
+            logger.warning(f"No se encontró array en la ruta '{self.root_array_path}'")
+
+    def _stream_path_exists(self, prefix: str) -> bool:
+        """True si el JSON tiene un array en ``prefix`` (sin el '.item' final)."""
+        array_prefix = prefix[:-len('.item')]
+        with self._open_stream() as f:
+            return any(path == array_prefix and event == 'start_array' for path, event, _ in ijson.parse(f))
+
+    def _load_streamed(self) -> Dict[str, Any]:
+        """load() sobre iter_blocks(): sin leer el archivo entero ni construir el árbol JSON."""
+        document_metadata = self._document_metadata()
+        document_metadata['extraction_method'] = 'ijson_streaming'
+        blocks = []
+        try:
+            for block in self.iter_blocks(document_metadata):
+                blocks.append(block)
+        except ijson.JSONError as e:
+            logger.error(f"Error al decodificar JSON en streaming {self.file_path}: {e}")
+            document_metadata['error'] = f"Error de decodificación JSON: {str(e)}"
+        except ValueError as e:
+            if blocks:
+                # A mitad de lectura la carga completa del archivo es justo lo que se evita
+                raise
+            # Sin array de objetos: el JSON no es una exportación grande, vale la carga completa
+            logger.info(f"{e}; usando carga completa")
+            self.streaming = False
+            return self.load()
+        return {
+            'blocks': blocks,
+            'document_metadata': document_metadata
+        }
+
+    def load_streaming(self, batch_pages: int = 20) -> Dict[str, Any]:
+        """
+        Variante incremental para el pipeline en streaming de ProfileManager.
+        
+        Los bloques se entregan en lotes de ``stream_batch_size`` objetos (JSON no tiene
+        páginas, así que ``batch_pages`` no se usa). Si ijson no está disponible o el
+        JSON no tiene un array de objetos, se delega en la implementación base (un
+        único lote con load()).
+        """
+        if self.streaming is False or not self._can_stream():
+            return super().load_streaming(batch_pages)
+        if self._stream_prefix() is None:
+            self.streaming = False
+            return super().load_streaming(batch_pages)
+        
+        document_metadata = self._document_metadata()
+        document_metadata['extraction_method'] = 'ijson_streaming'
+        
+        def _batches() -> Iterator[List[Dict[str, Any]]]:
+            batch = []
+            for block in self.iter_blocks(document_metadata):
+                batch.append(block)
+                if len(batch) >= self.stream_batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        
+        return {
+            'block_batches': _batches(),
+            'document_metadata': document_metadata
+        }
+
     def _process_json_structure(self, data: Any) -> Iterator[Dict[str, Any]]:
         """Procesa la estructura JSON para encontrar objetos a filtrar."""
         
@@ -219,27 +462,29 @@ class JSONLoader(BaseLoader):
         _search_recursive(obj)
         return arrays
 
-    def _process_object_list(self, objects: List[Any]) -> Iterator[Dict[str, Any]]:
+    def _converted_filter_rules(self) -> List[Dict[str, Any]]:
+        """Reglas de filtro en el formato esperado por utils.py (se convierten una vez por archivo)."""
+        return [
+            {
+                'path': rule.get('field', ''),
+                'op': rule.get('operator', 'eq'),
+                'value': rule.get('value', ''),
+                'exclude': rule.get('negate', False)
+            }
+            for rule in self.filter_rules
+        ]
+
+    def _process_object_list(self, objects: Iterable[Any]) -> Iterator[Dict[str, Any]]:
         """Procesa una lista de objetos JSON aplicando filtros."""
         processed_count = 0
         filtered_count = 0
+        converted_rules = self._converted_filter_rules()
         
         for i, obj in enumerate(objects):
             if not isinstance(obj, dict):
                 logger.debug(f"Saltando elemento {i}: no es un objeto")
                 continue
                 
-            # Convertir reglas de filtro al formato esperado por utils.py
-            converted_rules = []
-            for rule in self.filter_rules:
-                converted_rule = {
-                    'path': rule.get('field', ''),
-                    'op': rule.get('operator', 'eq'),
-                    'value': rule.get('value', ''),
-                    'exclude': rule.get('negate', False)
-                }
-                converted_rules.append(converted_rule)
-            
             # Aplicar filtros y extraer contenido
             result = filter_and_extract_from_json_object(
                 json_object=obj,
@@ -263,16 +508,7 @@ class JSONLoader(BaseLoader):
 
     def _process_single_object(self, obj: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
         """Procesa un solo objeto JSON."""
-        # Convertir reglas de filtro al formato esperado por utils.py
-        converted_rules = []
-        for rule in self.filter_rules:
-            converted_rule = {
-                'path': rule.get('field', ''),
-                'op': rule.get('operator', 'eq'),
-                'value': rule.get('value', ''),
-                'exclude': rule.get('negate', False)
-            }
-            converted_rules.append(converted_rule)
+        converted_rules = self._converted_filter_rules()
         
         result = filter_and_extract_from_json_object(
             json_object=obj,
@@ -9,9 +9,11 @@ manteniendo títulos, párrafos y formato original.
 import logging
 import os
 import re
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-import fitz
+from typing import Dict, List, Any, Optional, Iterator
+
+from .pdf_document_cache import shared_pdf_document
 
 logger = logging.getLogger(__name__)
 
@@ -52,30 +54,32 @@ class MarkdownPDFLoader:
             self.logger.info(f"Iniciando conversión PDF -> Markdown: {self.file_path}")
             
             # 1. CONVERSIÓN A MARKDOWN
-            # Usar opciones para preservar mejor la estructura
-            try:
-                # Intentar con opciones que preserven mejor los saltos de línea
-                markdown_text = pymupdf4llm.to_markdown(
-                    self.file_path,
-                    page_chunks=True,  # Procesar por páginas para mejor control
-                    write_images=False,  # No incluir imágenes
-                    image_path="",
-                    image_format="png",
-                    dpi=150
-                )
-                
-                # Si page_chunks devuelve una lista, unirla
-                if isinstance(markdown_text, list):
-                    # Unir con doble salto de línea entre páginas
-                    markdown_text = "\n\n".join(
-                        chunk.get('text', chunk) if isinstance(chunk, dict) else str(chunk) 
-                        for chunk in markdown_text
+            # Reutilizar el documento ya abierto por otras etapas (detección, metadatos)
+            with shared_pdf_document(self.file_path) as pdf_handle:
+                # Usar opciones para preservar mejor la estructura
+                try:
+                    # Intentar con opciones que preserven mejor los saltos de línea
+                    markdown_text = pymupdf4llm.to_markdown(
+                        pdf_handle.doc,
+                        page_chunks=True,  # Procesar por páginas para mejor control
+                        write_images=False,  # No incluir imágenes
+                        image_path="",
+                        image_format="png",
+                        dpi=150
                     )
                     
-            except Exception as e:
-                self.logger.warning(f"Error con opciones avanzadas, usando conversión básica: {e}")
-                # Fallback a conversión básica
-                markdown_text = pymupdf4llm.to_markdown(self.file_path)
+                    # Si page_chunks devuelve una lista, unirla
+                    if isinstance(markdown_text, list):
+                        # Unir con doble salto de línea entre páginas
+                        markdown_text = "\n\n".join(
+                            chunk.get('text', chunk) if isinstance(chunk, dict) else str(chunk) 
+                            for chunk in markdown_text
+                        )
+                        
+                except Exception as e:
+                    self.logger.warning(f"Error con opciones avanzadas, usando conversión básica: {e}")
+                    # Fallback a conversión básica
+                    markdown_text = pymupdf4llm.to_markdown(pdf_handle.doc)
             
             if not markdown_text or not markdown_text.strip():
                 self.logger.warning("Markdown vacío - usando fallback")
@@ -112,6 +116,65 @@ class MarkdownPDFLoader:
             self.logger.error(f"Error en conversión markdown: {e}")
             return self._fallback_extraction()
     
+    def load_streaming(self, batch_pages: int = 20) -> Dict[str, Any]:
+        """
+        Convierte el PDF a markdown por lotes de páginas (pipeline en streaming).
+        
+        Args:
+            batch_pages: Páginas convertidas por lote
+            
+        Returns:
+            Dict con block_batches (generador de listas de bloques), metadata y source_info
+        """
+        try:
+            import pymupdf4llm
+        except ImportError:
+            self.logger.error("pymupdf4llm no disponible - usando PDFLoader tradicional en streaming")
+            from .pdf_loader import PDFLoader
+            return PDFLoader(self.file_path).load_streaming(batch_pages)
+        
+        batch_pages = max(1, batch_pages)
+        # El documento se abre una sola vez y se comparte con las demás etapas; el
+        # generador lo libera al agotarse o al cerrarse (block_batches.close())
+        document_scope = ExitStack()
+        pdf_handle = document_scope.enter_context(shared_pdf_document(self.file_path))
+        page_count = pdf_handle.page_count
+        
+        def _batches() -> Iterator[List[Dict[str, Any]]]:
+            block_offset = 0
+            try:
+                for start in range(0, page_count, batch_pages):
+                    pages = list(range(start, min(start + batch_pages, page_count)))
+                    chunks = pymupdf4llm.to_markdown(
+                        pdf_handle.doc,
+                        pages=pages,
+                        page_chunks=True,
+                        write_images=False,
+                        image_path="",
+                        image_format="png",
+                        dpi=150
+                    )
+                    markdown_text = "\n\n".join(
+                        chunk.get('text', chunk) if isinstance(chunk, dict) else str(chunk)
+                        for chunk in chunks
+                    )
+                    blocks = self._markdown_to_blocks(self._clean_duplicated_text(markdown_text))
+                    for block in blocks:
+                        block['id'] += block_offset
+                    block_offset += len(blocks)
+                    yield blocks
+            finally:
+                document_scope.close()
+        
+        return {
+            'block_batches': _batches(),
+            'metadata': {'loader_type': 'markdown_pdf', 'page_count': page_count, 'language': 'es'},
+            'source_info': {
+                'extraction_method': 'pymupdf4llm_markdown_streaming',
+                'converter_version': getattr(pymupdf4llm, '__version__', 'unknown')
+            }
+        }
+    
     def _clean_duplicated_text(self, markdown_text: str) -> str:
         """
         Limpiar texto duplicado como 'VVeeiinnttee ppooeem'
@@ -13,12 +13,64 @@ Soporta múltiples proveedores para máxima flexibilidad en entornos web:
 import os
 import io
 import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any
+from contextlib import contextmanager
+from typing import Iterator, Optional, List, Dict, Any
 from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+_RAW_MODES = {1: 'L', 3: 'RGB', 4: 'RGBA'}
+
+# Documentos en OCR a la vez en todo el proceso (None = sin límite). Cada documento ya
+# reparte sus páginas entre varios workers, así que en el servidor API varios trabajos
+# con OCR simultáneo saturan la CPU; el planificador de trabajos fija este límite.
+_ocr_slots: Optional[threading.BoundedSemaphore] = None
+
+def set_ocr_concurrency(limit: Optional[int]) -> None:
+    """Limita los documentos que pueden hacer OCR a la vez (None o 0 = sin límite)."""
+    global _ocr_slots
+    _ocr_slots = threading.BoundedSemaphore(limit) if limit else None
+
+@contextmanager
+def ocr_slot() -> Iterator[None]:
+    """Reserva un hueco de OCR durante el bloque; espera si el límite está ocupado."""
+    slots = _ocr_slots
+    if slots is None:
+        yield
+        return
+    with slots:
+        yield
+
+def limit_tesseract_threads() -> None:
+    """
+    Un hilo OpenMP por proceso Tesseract (OMP_THREAD_LIMIT=1), salvo que ya esté fijado.
+    
+    El OCR paralelo lanza un Tesseract por worker; si cada uno abre además varios
+    hilos OpenMP saturan la CPU. Se llama una vez al arrancar el proceso, antes de
+    lanzar ningún Tesseract (los subprocesos heredan el entorno).
+    """
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+def image_from_raw(samples, width: int, height: int, channels: int, stride: Optional[int] = None) -> Image.Image:
+    """
+    Construye una imagen PIL sobre un buffer de píxeles crudo sin codificarlo.
+    
+    Con un memoryview (p.ej. ``Pixmap.samples_mv`` de PyMuPDF) la imagen comparte la
+    memoria del buffer: el objeto dueño del buffer debe seguir vivo mientras se use.
+    
+    Args:
+        samples: Bytes / memoryview con las filas de píxeles (8 bits por canal)
+        width, height: Dimensiones en píxeles
+        channels: 1 (gris), 3 (RGB) o 4 (RGBA)
+        stride: Bytes por fila (por defecto width * channels)
+    """
+    mode = _RAW_MODES.get(channels)
+    if mode is None:
+        raise ValueError(f"Número de canales no soportado: {channels}")
+    return Image.frombuffer(mode, (width, height), samples, 'raw', mode, stride or width * channels, 1)
+
 class OCRProvider(ABC):
     """Interfaz base para proveedores OCR"""
     
@@ -349,6 +401,16 @@ class OCRManager:
         self.logger.error("❌ Todos los proveedores OCR fallaron")
         return "", "failed"
     
+    def extract_text_from_raw(self, samples, width: int, height: int, channels: int,
+                              stride: Optional[int] = None, language: str = 'spa') -> tuple[str, str]:
+        """
+        Extrae texto de un buffer de píxeles crudo, sin pasar por PNG.
+        
+        Returns:
+            tuple: (texto_extraído, proveedor_usado)
+        """
+        return self.extract_text_from_image(image_from_raw(samples, width, height, channels, stride), language)
+    
     def has_available_providers(self) -> bool:
         """Verifica si hay al menos un proveedor disponible"""
         return len(self.providers) > 0 
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+Caché de extracción por archivo PDF.
+
+Un mismo PDF se consulta en varias etapas del pipeline: detección de perfil
+(process_file.py), muestra markdown para detección automática (ProfileManager),
+carga de bloques (PDFLoader) y metadatos de autor (PDFMetadataExtractor).
+PDFDocumentHandle abre el documento una sola vez y memoiza sus metadatos;
+shared_pdf_document() entrega el mismo handle a todos los consumidores mientras
+alguno lo mantenga abierto.
+
+La vista de diccionario de cada página se parsea una vez y se guarda en una caché
+LRU acotada (``DEFAULT_CACHED_PAGES`` páginas); la vista de texto se deriva de ella.
+La detección de perfil muestrea solo las primeras ``DETECTION_SAMPLE_PAGES``
+páginas, que caben en la caché, así que PDFLoader reutiliza esas páginas en lugar
+de volver a extraerlas, y la memoria no crece con el tamaño del documento.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, Union
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+# Páginas cuya vista de diccionario se conserva por handle
+DEFAULT_CACHED_PAGES = 32
+# Páginas leídas para la detección automática de perfil (debe caber en la caché)
+DETECTION_SAMPLE_PAGES = 20
+
+
+class PDFDocumentHandle:
+    """
+    Documento PDF abierto de forma perezosa, compartido entre etapas.
+
+    Soporta len() e indexación por página como fitz.Document, de modo que puede
+    pasarse a código que esperaba el documento directamente.
+    """
+
+    def __init__(self, file_path: Union[str, Path], cached_pages: int = DEFAULT_CACHED_PAGES):
+        """
+        Args:
+            file_path: Ruta al archivo PDF
+            cached_pages: Páginas cuya vista de diccionario se conserva (LRU);
+                          0 desactiva la caché (lectura en streaming)
+        """
+        self.file_path = str(file_path)
+        self.cached_pages = max(0, cached_pages)
+        self._doc = None
+        self._metadata = None
+        self._dicts: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        # fitz.Document no es thread-safe; serializar el acceso al documento
+        self._lock = threading.RLock()
+
+    @property
+    def doc(self) -> fitz.Document:
+        """Documento fitz subyacente (se abre en el primer acceso)."""
+        with self._lock:
+            if self._doc is None:
+                logger.debug(f"Abriendo PDF una sola vez para todas las etapas: {self.file_path}")
+                self._doc = fitz.open(self.file_path)
+            return self._doc
+
+    @property
+    def page_count(self) -> int:
+        return len(self.doc)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Metadatos del PDF (author, title, creator...)."""
+        with self._lock:
+            if self._metadata is None:
+                self._metadata = self.doc.metadata or {}
+            return self._metadata
+
+    def __len__(self) -> int:
+        return self.page_count
+
+    def __getitem__(self, page_num: int):
+        return self.doc[page_num]
+
+    def _view(self, page_num: int, option: str) -> Any:
+        with self._lock:
+            return self.doc.load_page(page_num).get_text(option)
+
+    def page_text(self, page_num: int) -> str:
+        """Texto plano de la página (base 0), derivado de la vista de diccionario."""
+        lines = []
+        for block in self.page_dict(page_num).get("blocks", ()):
+            for line in block.get("lines", ()):
+                lines.append("".join(span["text"] for span in line["spans"]))
+        return "\n".join(lines)
+
+    def page_dict(self, page_num: int) -> Dict[str, Any]:
+        """Estructura de bloques/líneas/spans de la página (base 0), con caché LRU acotada."""
+        with self._lock:
+            cached = self._dicts.get(page_num)
+            if cached is not None:
+                self._dicts.move_to_end(page_num)
+                return cached
+            value = self._view(page_num, "dict")
+            if self.cached_pages:
+                self._dicts[page_num] = value
+                if len(self._dicts) > self.cached_pages:
+                    self._dicts.popitem(last=False)
+            return value
+
+    def page_markdown(self, page_num: int) -> str:
+        """Vista markdown de la página (base 0)."""
+        return self._view(page_num, "markdown")
+
+    def close(self) -> None:
+        """Cierra el documento y libera las páginas en caché."""
+        with self._lock:
+            if self._doc is not None:
+                self._doc.close()
+                self._doc = None
+            self._dicts.clear()
+
+
+_shared_handles: Dict[str, PDFDocumentHandle] = {}
+_shared_refcounts: Dict[str, int] = {}
+_registry_lock = threading.Lock()
+
+
+@contextmanager
+def shared_pdf_document(file_path: Union[str, Path]) -> Iterator[PDFDocumentHandle]:
+    """
+    Entrega el handle compartido del PDF mientras dure el bloque ``with``.
+
+    Los bloques anidados sobre el mismo archivo reciben el mismo handle; el
+    documento se cierra cuando sale el último.
+    """
+    key = str(Path(file_path).resolve())
+    with _registry_lock:
+        handle = _shared_handles.get(key)
+        if handle is None:
+            handle = PDFDocumentHandle(key)
+            _shared_handles[key] = handle
+        _shared_refcounts[key] = _shared_refcounts.get(key, 0) + 1
+    try:
+        yield handle
+    finally:
+        with _registry_lock:
+            _shared_refcounts[key] -= 1
+            if _shared_refcounts[key] == 0:
+                del _shared_refcounts[key]
+                del _shared_handles[key]
+                handle.close()
@@ -1,22 +1,21 @@
 from datetime import datetime, timezone, timedelta
+import os
 import re
-import hashlib
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Iterator
 from datetime import datetime, timezone, timedelta
 # import PyPDF2 # Eliminado PyPDF2
 import fitz  # Importación de PyMuPDF
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from .base_loader import BaseLoader
+from ..hash_cache import cached_sha256
+from .pdf_document_cache import PDFDocumentHandle, shared_pdf_document
 
 def _calculate_sha256(file_path: Path) -> str:
-    """Calcula el hash SHA256 de un archivo."""
-    hash_sha256 = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_sha256.update(chunk)
-    return hash_sha256.hexdigest()
+    """Calcula el hash SHA256 de un archivo (reutilizando la caché de hashes)."""
+    return cached_sha256(file_path)
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +37,9 @@ class PDFLoader(BaseLoader):
             file_path (str): Ruta al archivo PDF
             tipo (str): Tipo de contenido (opcional, por compatibilidad)
             encoding (str): Codificación (opcional, por compatibilidad)
-            **kwargs: Argumentos adicionales para compatibilidad
+            **kwargs: Argumentos adicionales para compatibilidad. Admite ``ocr_workers``
+                      y ``ocr_max_memory_mb`` (o las variables de entorno
+                      BIBLIOPERSON_OCR_WORKERS / BIBLIOPERSON_OCR_MAX_MEMORY_MB)
         """
         super().__init__(file_path)
         self.logger = logging.getLogger(__name__)
@@ -57,6 +58,11 @@ class PDFLoader(BaseLoader):
         self.corruption_percentage = 0.0
         self.uses_ocr = False
         
+        # OCR paralelo: workers y memoria máxima de páginas renderizadas en vuelo. En los
+        # workers de --executor process, BIBLIOPERSON_OCR_WORKERS reparte las CPUs entre el pool
+        self.ocr_workers = int(kwargs.get('ocr_workers') or os.environ.get('BIBLIOPERSON_OCR_WORKERS') or os.cpu_count() or 1)
+        self.ocr_max_memory_mb = int(kwargs.get('ocr_max_memory_mb') or os.environ.get('BIBLIOPERSON_OCR_MAX_MEMORY_MB') or 512)
+        
     def load(self) -> Dict[str, Any]:
         """
         Carga el archivo PDF con detección inteligente de OCR.
@@ -70,69 +76,116 @@ class PDFLoader(BaseLoader):
         self.logger.warning("🚀 PDLOADER V7.5 LOAD - OCR ULTRA RESTRICTIVO 🚀")
         
         try:
-            self.logger.warning("📋 PASO 1: EXTRACCIÓN TRADICIONAL...")
-            
-            # Paso 1: Intentar extracción tradicional
-            pdf_document = fitz.open(self.file_path)
-            
-            # Extraer texto usando el método de markdown con páginas
-            text_blocks_with_pages = self._extract_as_markdown(pdf_document)
-            # Calcular total de caracteres
-            self.total_chars_extracted = sum(len(text) for text, _ in text_blocks_with_pages)
-            
-            self.logger.warning(f"📝 EXTRACCIÓN TRADICIONAL: {self.total_chars_extracted} caracteres")
-            
-            # Crear bloques estructurados con información de página
-            self.logger.warning("🔄 EXTRAYENDO BLOQUES DE MARKDOWN CON PÁGINAS")
-            blocks = self._create_blocks_from_markdown(text_blocks_with_pages)
-            self.logger.warning(f"📦 BLOQUES EXTRAÍDOS: {len(blocks)}")
-            
-            # Crear metadatos
-            # Reconstruir texto completo para metadatos
-            full_text = "\n\n".join(text for text, _ in text_blocks_with_pages)
-            metadata = self._create_metadata(pdf_document, full_text)
-            
-            # Paso 2: Evaluación PRE-segmentación (corrupción, etc.)
-            self.logger.warning("🧠 EVALUANDO NECESIDAD DE OCR PRE-SEGMENTACIÓN...")
-            needs_ocr_pre, reasons_pre = self._should_use_ocr(pdf_document, blocks, metadata)
-            
-            if needs_ocr_pre:
-                self.logger.warning(f"🎯 DECISIÓN PRE-SEGMENTACIÓN: ACTIVAR OCR - {', '.join(reasons_pre)}")
-                return self._extract_with_ocr(pdf_document, blocks, metadata)
-            else:
-                self.logger.warning("🎯 DECISIÓN PRE-SEGMENTACIÓN: CONTINUAR SIN OCR")
-            
-            # Paso 3: Evaluación POST-segmentación (granularidad de segmentos)
-            self.logger.warning("🧠 EVALUANDO NECESIDAD DE OCR POST-SEGMENTACIÓN...")
-            needs_ocr_post, reasons_post = self._should_use_ocr_post_segmentation(blocks, metadata)
-            
-            if needs_ocr_post:
-                self.logger.warning(f"🎯 DECISIÓN POST-SEGMENTACIÓN: ACTIVAR OCR - {', '.join(reasons_post)}")
-                return self._extract_with_ocr(pdf_document, blocks, metadata)
-            else:
-                self.logger.warning("🎯 DECISIÓN POST-SEGMENTACIÓN: NO REQUIERE OCR")
-            
-            # Si no necesita OCR, proceder normalmente
-            pdf_document.close()
-            
-            self.logger.warning(f"✅ LOAD COMPLETADO: {len(blocks)} bloques extraídos")
-            
-            return {
-                'blocks': blocks,
-                'metadata': metadata,
-                'source_info': {
-                    'file_path': self.file_path,
-                    'total_chars': self.total_chars_extracted,
-                    'corruption_percentage': self.corruption_percentage,
-                    'uses_ocr': self.uses_ocr,
-                    'extraction_method': 'traditional'
+            # Handle compartido: reutiliza el documento y las vistas ya extraídas
+            # por la detección de perfil o de autor sobre el mismo archivo
+            with shared_pdf_document(self.file_path) as pdf_document:
+                self.logger.warning("📋 PASO 1: EXTRACCIÓN TRADICIONAL...")
+                
+                # Paso 1: Intentar extracción tradicional
+                
+                # Extraer texto usando el método de markdown con páginas
+                text_blocks_with_pages = self._extract_as_markdown(pdf_document)
+                # Calcular total de caracteres
+                self.total_chars_extracted = sum(len(text) for text, _ in text_blocks_with_pages)
+                
+                self.logger.warning(f"📝 EXTRACCIÓN TRADICIONAL: {self.total_chars_extracted} caracteres")
+                
+                # Crear bloques estructurados con información de página
+                self.logger.warning("🔄 EXTRAYENDO BLOQUES DE MARKDOWN CON PÁGINAS")
+                blocks = self._create_blocks_from_markdown(text_blocks_with_pages)
+                self.logger.warning(f"📦 BLOQUES EXTRAÍDOS: {len(blocks)}")
+                
+                # Crear metadatos
+                # Reconstruir texto completo para metadatos
+                full_text = "\n\n".join(text for text, _ in text_blocks_with_pages)
+                metadata = self._create_metadata(pdf_document, full_text)
+                
+                # Paso 2: Evaluación PRE-segmentación (corrupción, etc.)
+                self.logger.warning("🧠 EVALUANDO NECESIDAD DE OCR PRE-SEGMENTACIÓN...")
+                needs_ocr_pre, reasons_pre = self._should_use_ocr(pdf_document, blocks, metadata)
+                
+                if needs_ocr_pre:
+                    self.logger.warning(f"🎯 DECISIÓN PRE-SEGMENTACIÓN: ACTIVAR OCR - {', '.join(reasons_pre)}")
+                    return self._extract_with_ocr(pdf_document, blocks, metadata)
+                else:
+                    self.logger.warning("🎯 DECISIÓN PRE-SEGMENTACIÓN: CONTINUAR SIN OCR")
+                
+                # Paso 3: Evaluación POST-segmentación (granularidad de segmentos)
+                self.logger.warning("🧠 EVALUANDO NECESIDAD DE OCR POST-SEGMENTACIÓN...")
+                needs_ocr_post, reasons_post = self._should_use_ocr_post_segmentation(blocks, metadata)
+                
+                if needs_ocr_post:
+                    self.logger.warning(f"🎯 DECISIÓN POST-SEGMENTACIÓN: ACTIVAR OCR - {', '.join(reasons_post)}")
+                    return self._extract_with_ocr(pdf_document, blocks, metadata)
+                else:
+                    self.logger.warning("🎯 DECISIÓN POST-SEGMENTACIÓN: NO REQUIERE OCR")
+                
+                # Si no necesita OCR, proceder normalmente
+                self.logger.warning(f"✅ LOAD COMPLETADO: {len(blocks)} bloques extraídos")
+                
+                return {
+                    'blocks': blocks,
+                    'metadata': metadata,
+                    'source_info': {
+                        'file_path': self.file_path,
+                        'total_chars': self.total_chars_extracted,
+                        'corruption_percentage': self.corruption_percentage,
+                        'uses_ocr': self.uses_ocr,
+                        'extraction_method': 'traditional'
+                    }
                 }
-            }
             
         except Exception as e:
             self.logger.error(f"Error procesando PDF: {e}")
             raise
     
+    def load_streaming(self, batch_pages: int = 20) -> Dict[str, Any]:
+        """
+        Carga el PDF de forma incremental, en lotes de ``batch_pages`` páginas.
+        
+        Los metadatos del documento se calculan al abrir el archivo; los bloques
+        se extraen página a página solo cuando se consume ``block_batches``, de modo
+        que nunca se mantiene en memoria el texto completo del documento.
+        
+        La decisión de OCR (pre y post segmentación) necesita ver el documento
+        completo, por lo que en este modo no se aplica: ProfileManager vuelve a la
+        carga completa cuando el primer lote sugiere un PDF escaneado.
+        
+        Args:
+            batch_pages: Páginas por lote.
+            
+        Returns:
+            Dict[str, Any]: {'block_batches', 'metadata', 'source_info'}, como load()
+        """
+        batch_pages = max(1, batch_pages)
+        # Handle propio y sin caché: cada lote se extrae y se descarta
+        pdf_document = PDFDocumentHandle(self.file_path, cached_pages=0)
+        metadata = self._create_metadata(pdf_document, "")
+        metadata['extraction_method'] = 'traditional_streaming'
+        
+        def _batches() -> Iterator[List[Dict[str, Any]]]:
+            block_order = 0
+            try:
+                for start in range(0, len(pdf_document), batch_pages):
+                    pages = range(start, min(start + batch_pages, len(pdf_document)))
+                    text_blocks_with_pages = self._extract_as_markdown(pdf_document, pages)
+                    self.total_chars_extracted += sum(len(text) for text, _ in text_blocks_with_pages)
+                    blocks = self._create_blocks_from_markdown(text_blocks_with_pages, start_order=block_order)
+                    block_order += len(blocks)
+                    yield blocks
+            finally:
+                pdf_document.close()
+        
+        return {
+            'block_batches': _batches(),
+            'metadata': metadata,
+            'source_info': {
+                'file_path': self.file_path,
+                'uses_ocr': False,
+                'extraction_method': 'traditional_streaming'
+            }
+        }
+    
     def _should_use_ocr_post_segmentation(self, blocks: List[Dict], metadata: Dict) -> Tuple[bool, List[str]]:
         """
         Evalúa si se necesita OCR después de la segmentación inicial.
@@ -250,7 +303,7 @@ class PDFLoader(BaseLoader):
         Extrae texto usando el sistema OCR flexible con múltiples proveedores.
         
         Args:
-            pdf_document: Documento PDF abierto
+            pdf_document: PDFDocumentHandle del archivo
             fallback_blocks: Bloques de fallback si OCR falla
             metadata: Metadatos del documento
             
@@ -261,7 +314,7 @@ class PDFLoader(BaseLoader):
         
         try:
             # Importar el nuevo sistema OCR
-            from .ocr_providers import OCRManager
+            from .ocr_providers import OCRManager, ocr_slot
             
             # Inicializar gestor OCR
             ocr_manager = OCRManager()
@@ -274,42 +327,24 @@ class PDFLoader(BaseLoader):
             available_providers = ocr_manager.get_available_providers()
             self.logger.warning(f"✅ Proveedores OCR disponibles: {', '.join(available_providers)}")
             
-            # Procesar páginas con OCR
+            # Procesar páginas con OCR (en paralelo; los resultados llegan en orden de página)
             ocr_blocks = []
             total_ocr_text = ""
             successful_pages = 0
             
-            for page_num in range(len(pdf_document)):
-                self.logger.warning(f"🔍 OCR en página {page_num + 1}/{len(pdf_document)}")
-                
-                page = pdf_document[page_num]
-                
-                # Renderizar página a imagen con alta resolución
-                mat = fitz.Matrix(3, 3)  # 3x zoom para mejor calidad OCR
-                pix = page.get_pixmap(matrix=mat)
-                
-                # Convertir a PIL Image
-                from PIL import Image
-                import io
-                img_data = pix.tobytes("png")
-                image = Image.open(io.BytesIO(img_data))
-                
-                # Usar OCR Manager para extraer texto
-                page_text, provider_used = ocr_manager.extract_text_from_image(image, language='spa')
-                
-                if page_text.strip():
-                    total_ocr_text += page_text + "\n\n"
-                    successful_pages += 1
-                    
-                    # Crear bloques granulares a partir del texto OCR
-                    page_blocks = self._create_granular_blocks_from_ocr(page_text, page_num + 1)
-                    ocr_blocks.extend(page_blocks)
-                    
-                    self.logger.warning(f"✅ Página {page_num + 1} procesada con {provider_used}: {len(page_text)} chars")
-                else:
-                    self.logger.warning(f"⚠️ Página {page_num + 1}: No se extrajo texto")
-            
-            pdf_document.close()
+            with ocr_slot():
+                for page_num, page_text, provider_used in self._ocr_pages(pdf_document, ocr_manager):
+                    if page_text.strip():
+                        total_ocr_text += page_text + "\n\n"
+                        successful_pages += 1
+                        
+                        # Crear bloques granulares a partir del texto OCR
+                        page_blocks = self._create_granular_blocks_from_ocr(page_text, page_num + 1)
+                        ocr_blocks.extend(page_blocks)
+                        
+                        self.logger.warning(f"✅ Página {page_num + 1} procesada con {provider_used}: {len(page_text)} chars")
+                    else:
+                        self.logger.warning(f"⚠️ Página {page_num + 1}: No se extrajo texto")
             
             # Verificar si OCR fue exitoso
             if successful_pages == 0:
@@ -355,6 +390,63 @@ class PDFLoader(BaseLoader):
             self.logger.error(f"❌ Error en extracción OCR: {e}")
             return self._create_fallback_response(fallback_blocks, metadata, f"OCR error: {e}")
     
+    def _ocr_pages(self, pdf_document, ocr_manager) -> Iterator[Tuple[int, str, str]]:
+        """
+        OCR de todas las páginas con un pool acotado de workers.
+        
+        El renderizado se hace en este hilo (el documento fitz no es thread-safe) y
+        el reconocimiento en paralelo: Tesseract corre como subproceso y los
+        proveedores cloud esperan red, así que los hilos no compiten por el GIL.
+        Se mantienen en vuelo como máximo 2×workers páginas y, además, no más de
+        ``ocr_max_memory_mb`` de imágenes renderizadas (siempre al menos una).
+        
+        Yields:
+            Tuple[int, str, str]: (índice de página base 0, texto, proveedor usado)
+        """
+        page_count = len(pdf_document)
+        workers = max(1, min(self.ocr_workers, page_count or 1))
+        memory_budget = self.ocr_max_memory_mb * 1024 * 1024
+        self.logger.warning(f"⚙️ OCR paralelo: {workers} workers, hasta {self.ocr_max_memory_mb} MB de páginas en vuelo")
+        
+        pending: Dict[int, Tuple[Any, int]] = {}
+        inflight_bytes = 0
+        next_to_render = 0
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ocr') as executor:
+            for next_to_yield in range(page_count):
+                while (next_to_render < page_count and len(pending) < workers * 2
+                       and (not pending or inflight_bytes < memory_budget)):
+                    self.logger.warning(f"🔍 OCR en página {next_to_render + 1}/{page_count}")
+                    page = pdf_document[next_to_render]
+                    
+                    # Renderizar página a imagen con alta resolución
+                    mat = fitz.Matrix(3, 3)  # 3x zoom para mejor calidad OCR
+                    pix = page.get_pixmap(matrix=mat)
+                    page_bytes = pix.stride * pix.height
+                    
+                    # El pixmap viaja tal cual al worker: el OCR lee sus píxeles sin
+                    # pasar por PNG (la referencia en el futuro lo mantiene vivo)
+                    future = executor.submit(self._ocr_page_image, ocr_manager, pix)
+                    pending[next_to_render] = (future, page_bytes)
+                    inflight_bytes += page_bytes
+                    next_to_render += 1
+                
+                future, page_bytes = pending.pop(next_to_yield)
+                page_text, provider_used = future.result()
+                inflight_bytes -= page_bytes
+                yield next_to_yield, page_text, provider_used
+    
+    def _ocr_page_image(self, ocr_manager, pix) -> Tuple[str, str]:
+        """Pasa los píxeles de una página renderizada al OCR (se ejecuta en un worker)."""
+        try:
+            # samples_mv (PyMuPDF >= 1.19) expone el buffer sin copiarlo
+            samples = pix.samples_mv if hasattr(pix, 'samples_mv') else pix.samples
+            return ocr_manager.extract_text_from_raw(samples, pix.width, pix.height, pix.n,
+                                                     stride=pix.stride, language='spa')
+        except Exception as e:
+            self.logger.warning(f"⚠️ Error de OCR en página: {e}")
+            return "", "error"
+    
     def _create_fallback_response(self, fallback_blocks: List[Dict], metadata: Dict, error_reason: str) -> Dict[str, Any]:
         """Crea respuesta de fallback cuando OCR falla"""
         return {
@@ -525,24 +617,26 @@ class PDFLoader(BaseLoader):
         
         return False
 
-    def _extract_as_markdown(self, doc):
+    def _extract_as_markdown(self, doc, page_numbers: Optional[range] = None):
         """
         Extrae el texto del PDF utilizando un enfoque de markdown estructurado.
         Ahora incluye información de página para cada bloque.
         
         Args:
-            doc: Documento PDF abierto con fitz
+            doc: PDFDocumentHandle del archivo
+            page_numbers: Páginas (base 0) a extraer; por defecto todas
             
         Returns:
             List[Tuple[str, int]]: Lista de tuplas (texto, página)
         """
         text_blocks = []
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            
+        if page_numbers is None:
+            page_numbers = range(len(doc))
+        
+        for page_num in page_numbers:
             # Obtener bloques de texto con información de formato
-            blocks = page.get_text("dict")
+            blocks = doc.page_dict(page_num)
             
             page_text_blocks = []
             
@@ -566,18 +660,19 @@ class PDFLoader(BaseLoader):
         
         return text_blocks
     
-    def _create_blocks_from_markdown(self, text_blocks_with_pages: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    def _create_blocks_from_markdown(self, text_blocks_with_pages: List[Tuple[str, int]], start_order: int = 0) -> List[Dict[str, Any]]:
         """
         Crea bloques estructurados a partir de los bloques de texto con páginas.
         
         Args:
             text_blocks_with_pages: Lista de tuplas (texto, página)
+            start_order: Orden inicial de los bloques (para lotes en streaming)
             
         Returns:
             List[Dict]: Lista de bloques estructurados con página original
         """
         blocks = []
-        block_order = 0
+        block_order = start_order
         
         for text, page_num in text_blocks_with_pages:
             if not text.strip():
@@ -624,7 +719,7 @@ class PDFLoader(BaseLoader):
         Crea metadatos del documento PDF.
         
         Args:
-            doc: Documento PDF abierto
+            doc: PDFDocumentHandle del archivo
             text: Texto extraído
             
         Returns:
@@ -6,12 +6,18 @@ Define los modos 'generic' y 'biblioperson' con diferentes niveles de metadatos.
 from enum import Enum
 from typing import Dict, Any, List, Optional
 import json
+import os
 from datetime import datetime, timezone
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Versión del pipeline escrita en cada segmento. Cambiarla cuando un cambio en
+# loaders/pre-procesadores/segmentadores altere las salidas: también invalida la
+# caché de construcción incremental
+PIPELINE_VERSION = "profile_manager_v4.0_english_clean"
+
 class OutputMode(Enum):
     """Modos de salida disponibles para el procesamiento de documentos."""
     GENERIC = "generic"
@@ -193,7 +199,7 @@ class OutputModeSerializer:
                 "publisher": document_metadata.get('publisher', None) if document_metadata else None,
                 "isbn": document_metadata.get('isbn', None) if document_metadata else None,
                 "additional_metadata": segment.get('metadata', {}),
-                "pipeline_version": "profile_manager_v4.0_english_clean",
+                "pipeline_version": PIPELINE_VERSION,
                 "segmenter_used": document_metadata.get('segmenter_name', 'unknown') if document_metadata else 'unknown',
                 "_legacy_processing_notes": segment.get('notes', None)
             }
@@ -246,6 +252,21 @@ class OutputModeSerializer:
         
         self.logger.info(f"Segmentos exportados en modo {self.mode.value} formato {output_format.upper()}: {output_path}")
     
+    def open_stream(self, output_file: str,
+                    document_metadata: Optional[Dict[str, Any]] = None) -> 'SegmentStreamWriter':
+        """
+        Abre un escritor incremental NDJSON para exportar segmentos a medida que se producen.
+        
+        Args:
+            output_file: Ruta del archivo de salida
+            document_metadata: Metadatos del documento (se leen en cada escritura,
+                               por lo que pueden completarse durante el procesamiento)
+            
+        Returns:
+            SegmentStreamWriter listo para usar como context manager
+        """
+        return SegmentStreamWriter(self, output_file, document_metadata)
+    
     def _clean_document_metadata(self, document_metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Limpia y prepara los metadatos del documento para exportación.
@@ -270,6 +291,58 @@ class OutputModeSerializer:
             return {k: v for k, v in document_metadata.items() if v is not None}
 
 
+class SegmentStreamWriter:
+    """
+    Escritor NDJSON incremental: serializa y escribe cada segmento en cuanto llega.
+    
+    A diferencia de OutputModeSerializer.export_segments, no acumula la lista de
+    resultados serializados, de modo que la memoria no crece con el documento.
+    
+    Escribe en ``<salida>.partial`` y solo lo renombra a la ruta final al cerrar sin
+    error; si el bloque ``with`` lanza una excepción o se llama a ``discard()``, el
+    archivo parcial se borra y la salida anterior (si existía) queda intacta.
+    """
+    
+    def __init__(self, serializer: OutputModeSerializer, output_file: str,
+                 document_metadata: Optional[Dict[str, Any]] = None):
+        self.serializer = serializer
+        self.output_path = Path(output_file)
+        self.partial_path = self.output_path.with_name(self.output_path.name + '.partial')
+        self.document_metadata = document_metadata
+        self.segments_written = 0
+        self._file = None
+        self._discarded = False
+    
+    def __enter__(self) -> 'SegmentStreamWriter':
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.partial_path, 'w', encoding='utf-8')
+        return self
+    
+    def write(self, segment: Any) -> None:
+        """Serializa un segmento y lo escribe como una línea NDJSON."""
+        serialized = self.serializer.serialize_segment(segment, self.document_metadata, self.segments_written)
+        self._file.write(json.dumps(serialized, ensure_ascii=False) + '\n')
+        self.segments_written += 1
+    
+    def discard(self) -> None:
+        """Marca la salida como fallida: al cerrar se borra en lugar de publicarse."""
+        self._discarded = True
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+        if exc_type is not None or self._discarded:
+            self.partial_path.unlink(missing_ok=True)
+            return
+        os.replace(self.partial_path, self.output_path)
+        logger.info(f"Segmentos exportados en streaming ({self.segments_written}) en modo "
+                    f"{self.serializer.mode.value}: {self.output_path}")
+
+
 def get_output_mode_from_string(mode_str: str) -> OutputMode:
     """
     Convierte una cadena a OutputMode.
@@ -0,0 +1,145 @@
+"""
+Logging de las rutas calientes del pipeline.
+
+Con documentos de cientos de miles de bloques, formatear f-strings por bloque y
+escribir en consola llega a pesar en el tiempo total. Este módulo reúne:
+
+- ``should_log_block``: muestreo de los logs por bloque (primeros N y uno cada K)
+- ``pipeline_print``: sustituto de ``print`` para diagnósticos; en modo silencioso
+  se envía al logger con formato diferido en lugar de a stdout
+- ``configure_quiet_pipeline``: modo ``--quiet-pipeline``; los loggers de
+  ``dataset.processing`` escriben en un sumidero JSON Lines con buffer
+  (``MemoryHandler``) y en consola solo quedan los errores
+"""
+
+import json
+import logging
+import logging.handlers
+import multiprocessing.util
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+PIPELINE_LOGGER_NAME = 'dataset.processing'
+QUIET_ENV_VAR = 'BIBLIOPERSON_QUIET_PIPELINE'
+DEFAULT_DIAGNOSTICS_FILE = 'pipeline_diagnostics.jsonl'
+
+# Muestreo de logs por bloque: siempre los primeros, después uno de cada N
+BLOCK_LOG_FIRST = int(os.environ.get('BIBLIOPERSON_BLOCK_LOG_FIRST', '5'))
+BLOCK_LOG_EVERY = max(1, int(os.environ.get('BIBLIOPERSON_BLOCK_LOG_EVERY', '1000')))
+
+_diagnostics_logger = logging.getLogger(f'{PIPELINE_LOGGER_NAME}.diagnostics')
+_configure_lock = threading.Lock()
+_quiet_handler: Optional[logging.Handler] = None
+_flush_at_exit_registered = False
+
+
+def is_quiet_pipeline() -> bool:
+    """True si los diagnósticos del pipeline no deben ir a stdout."""
+    return os.environ.get(QUIET_ENV_VAR, '').lower() in ('1', 'true', 'yes')
+
+
+def should_log_block(index: int) -> bool:
+    """True para los bloques que entran en el muestreo de logs por bloque."""
+    return index < BLOCK_LOG_FIRST or index % BLOCK_LOG_EVERY == 0
+
+
+def pipeline_print(message: str, *args) -> None:
+    """
+    ``print`` de diagnóstico con formato ``%`` diferido.
+
+    En modo normal imprime en stdout como antes; con ``--quiet-pipeline`` el mensaje
+    va al logger de diagnósticos en nivel DEBUG y solo se formatea si ese nivel está
+    habilitado.
+    """
+    if is_quiet_pipeline():
+        _diagnostics_logger.debug(message, *args)
+    else:
+        print(message % args if args else message)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Un registro por línea en JSON, para analizar los diagnósticos con herramientas."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_quiet_pipeline(log_path: Optional[Union[str, Path]] = None,
+                             level: int = logging.INFO,
+                             capacity: int = 1000) -> Path:
+    """
+    Activa el modo silencioso para los loggers de ``dataset.processing``.
+
+    Los registros se acumulan en memoria y se vuelcan al archivo JSON Lines cada
+    ``capacity`` registros, ante cualquier ERROR, con ``flush_pipeline_logs`` y al
+    cerrar el proceso (también en los workers de multiprocessing, que terminan sin
+    ``logging.shutdown``). Los errores
+    se muestran además en stderr. La variable de entorno ``BIBLIOPERSON_QUIET_PIPELINE``
+    queda activada para que los procesos hijos hereden el modo.
+
+    Args:
+        log_path: Archivo de destino (por defecto ``pipeline_diagnostics.jsonl`` en el cwd)
+        level: Nivel mínimo que llega al sumidero
+        capacity: Registros acumulados antes de escribir en disco
+
+    Returns:
+        Ruta del archivo de diagnósticos
+    """
+    global _quiet_handler, _flush_at_exit_registered
+    path = Path(log_path) if log_path else Path.cwd() / DEFAULT_DIAGNOSTICS_FILE
+
+    with _configure_lock:
+        os.environ[QUIET_ENV_VAR] = '1'
+        pipeline_logger = logging.getLogger(PIPELINE_LOGGER_NAME)
+
+        if _quiet_handler is not None:
+            pipeline_logger.removeHandler(_quiet_handler)
+            _quiet_handler.close()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(path, mode='a', encoding='utf-8')
+        file_handler.setFormatter(JsonLinesFormatter())
+        buffered = logging.handlers.MemoryHandler(capacity, flushLevel=logging.ERROR,
+                                                  target=file_handler)
+        buffered.setLevel(level)
+        _quiet_handler = buffered
+
+        # Solo los errores siguen llegando a la consola
+        for handler in list(pipeline_logger.handlers):
+            if getattr(handler, '_pipeline_console', False):
+                pipeline_logger.removeHandler(handler)
+        console = logging.StreamHandler(sys.stderr)
+        console.setLevel(logging.ERROR)
+        console.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        console._pipeline_console = True
+
+        pipeline_logger.addHandler(buffered)
+        pipeline_logger.addHandler(console)
+        pipeline_logger.setLevel(level)
+        pipeline_logger.propagate = False
+
+        if not _flush_at_exit_registered:
+            # Los procesos hijos de multiprocessing ejecutan estos finalizadores al salir
+            multiprocessing.util.Finalize(None, flush_pipeline_logs, exitpriority=10)
+            _flush_at_exit_registered = True
+
+    return path
+
+
+def flush_pipeline_logs() -> None:
+    """Vuelca a disco los registros pendientes del modo silencioso."""
+    if _quiet_handler is not None:
+        _quiet_handler.flush()
@@ -0,0 +1,271 @@
+"""
+Instrumentación por etapas del pipeline de procesamiento.
+
+ProfileManager.process_file recibe un ``FileMetrics`` y envuelve cada etapa (carga,
+pre-procesado, detección de autor, segmentación, detección de idioma, construcción
+de unidades y exportación) en ``metrics.stage(nombre)``. Por archivo se registran
+duraciones por etapa, contadores de bloques/segmentos, bytes leídos y el pico de
+memoria del proceso; ``PipelineMetricsReport`` los agrega para ``--show-timing`` y
+los exporta a JSON o CSV. Con ``profile_dir`` cada etapa se perfila con cProfile y
+se vuelca a un ``.prof`` por archivo y etapa (analizable con ``pstats`` o snakeviz).
+"""
+
+import cProfile
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Orden de presentación de las etapas conocidas; las demás se listan después
+STAGE_ORDER = (
+    'deduplication',
+    'profile_detection',
+    'load',
+    'preprocess',
+    'author_detection',
+    'segmentation',
+    'language_detection',
+    'build_items',
+    'export',
+)
+
+
+def process_peak_rss_mb() -> Optional[float]:
+    """Pico de memoria residente del proceso en MB (None si no se puede medir)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa en KB, macOS en bytes
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except (ImportError, OSError):
+        pass
+    try:
+        import psutil
+        memory_info = psutil.Process().memory_info()
+        # En Windows peak_wset es el pico real; en otros sistemas, la memoria actual
+        return getattr(memory_info, 'peak_wset', memory_info.rss) / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class FileMetrics:
+    """Duraciones por etapa, contadores y memoria de un archivo procesado."""
+
+    def __init__(self, file_path: Union[str, Path], profile_dir: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            file_path: Archivo que se procesa
+            profile_dir: Directorio donde volcar un cProfile por etapa (None = sin perfilado)
+        """
+        self.file_path = str(file_path)
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.result: Optional[str] = None
+        self.total_seconds: Optional[float] = None
+        self.peak_rss_mb: Optional[float] = None
+        self.profile_files: List[str] = []
+        try:
+            self.bytes_read = os.path.getsize(self.file_path)
+        except OSError:
+            self.bytes_read = 0
+        self._profile_dir = Path(profile_dir) if profile_dir else None
+        self._profilers: Dict[str, cProfile.Profile] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Mide una etapa. Si se repite (p. ej. una vez por ventana en streaming), las
+        duraciones y el perfil de cProfile se acumulan.
+        """
+        profiler = self._enable_profiler(name) if self._profile_dir else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start)
+            if profiler is not None:
+                profiler.disable()
+
+    def timed_iter(self, name: str, iterable) -> Iterator[Any]:
+        """Itera ``iterable`` acumulando en la etapa ``name`` el tiempo de cada ``next()``."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def _enable_profiler(self, name: str) -> Optional[cProfile.Profile]:
+        profiler = self._profilers.get(name)
+        if profiler is None:
+            profiler = self._profilers[name] = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Solo puede haber un perfilador activo (otra etapa anidada u otro hilo)
+            logger.debug("cProfile ocupado; etapa '%s' de %s sin perfilar", name, self.file_path)
+            return None
+        return profiler
+
+    def count(self, name: str, value: int) -> None:
+        """Suma ``value`` al contador ``name`` (bloques, segmentos, ventanas...)."""
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def finish(self, result: Optional[str] = None) -> 'FileMetrics':
+        """Cierra la medición: tiempo total, pico de memoria y volcado de perfiles."""
+        if self.total_seconds is None:
+            self.total_seconds = time.perf_counter() - self._started
+            self.peak_rss_mb = process_peak_rss_mb()
+            self._dump_profiles()
+        if result is not None:
+            self.result = result
+        return self
+
+    def _dump_profiles(self) -> None:
+        if not self._profilers:
+            return
+        self._profile_dir.mkdir(parents=True, exist_ok=True)
+        # Sufijo con hash de la ruta: archivos homónimos de distintas carpetas no se pisan
+        path_hash = hashlib.sha1(self.file_path.encode('utf-8')).hexdigest()[:8]
+        prefix = f"{Path(self.file_path).stem}-{path_hash}"
+        for name, profiler in self._profilers.items():
+            target = self._profile_dir / f"{prefix}.{name}.prof"
+            try:
+                profiler.dump_stats(str(target))
+                self.profile_files.append(str(target))
+            except Exception as e:
+                logger.warning(f"No se pudo guardar el perfil {target}: {e}")
+        self._profilers.clear()
+
+    @property
+    def unaccounted_seconds(self) -> float:
+        """Tiempo total no cubierto por ninguna etapa instrumentada."""
+        if self.total_seconds is None:
+            return 0.0
+        return max(0.0, self.total_seconds - sum(self.stages.values()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'file_path': self.file_path,
+            'result': self.result,
+            'total_seconds': self.total_seconds,
+            'unaccounted_seconds': self.unaccounted_seconds,
+            'bytes_read': self.bytes_read,
+            'peak_rss_mb': self.peak_rss_mb,
+            'stages': dict(self.stages),
+            'counts': dict(self.counts),
+            'profile_files': list(self.profile_files),
+        }
+
+
+def ordered_stage_names(names) -> List[str]:
+    """Etapas en el orden del pipeline, seguidas de las no conocidas en orden alfabético."""
+    names = set(names)
+    known = [name for name in STAGE_ORDER if name in names]
+    return known + sorted(names - set(STAGE_ORDER))
+
+
+class PipelineMetricsReport:
+    """Agregado thread-safe de las métricas de todos los archivos de una ejecución."""
+
+    def __init__(self):
+        self.files: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, metrics: Union[FileMetrics, Dict[str, Any]]) -> None:
+        entry = metrics.to_dict() if isinstance(metrics, FileMetrics) else metrics
+        with self._lock:
+            self.files.append(entry)
+
+    def extend(self, entries: List[Dict[str, Any]]) -> None:
+        """Incorpora métricas medidas en otro proceso (modo --executor process)."""
+        with self._lock:
+            self.files.extend(entries)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def stage_totals(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            Dict etapa → {'total', 'mean', 'max', 'files', 'share'} con ``share`` como
+            fracción del tiempo de todas las etapas
+        """
+        with self._lock:
+            files = list(self.files)
+        totals: Dict[str, Dict[str, float]] = {}
+        for entry in files:
+            for name, seconds in entry['stages'].items():
+                stage = totals.setdefault(name, {'total': 0.0, 'max': 0.0, 'files': 0})
+                stage['total'] += seconds
+                stage['max'] = max(stage['max'], seconds)
+                stage['files'] += 1
+        grand_total = sum(stage['total'] for stage in totals.values())
+        for stage in totals.values():
+            stage['mean'] = stage['total'] / stage['files']
+            stage['share'] = stage['total'] / grand_total if grand_total else 0.0
+        return {name: totals[name] for name in ordered_stage_names(totals)}
+
+    def count_totals(self) -> Dict[str, int]:
+        with self._lock:
+            files = list(self.files)
+        totals: Dict[str, int] = {}
+        for entry in files:
+            for name, value in entry['counts'].items():
+                totals[name] = totals.get(name, 0) + value
+        totals['bytes_read'] = sum(entry['bytes_read'] for entry in files)
+        return totals
+
+    def peak_rss_mb(self) -> Optional[float]:
+        peaks = [entry['peak_rss_mb'] for entry in self.files if entry.get('peak_rss_mb') is not None]
+        return max(peaks) if peaks else None
+
+    def write(self, path: Union[str, Path]) -> Path:
+        """Escribe el informe en JSON o CSV según la extensión (``.csv`` → CSV)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix.lower() == '.csv':
+            self._write_csv(path)
+        else:
+            self._write_json(path)
+        return path
+
+    def _write_json(self, path: Path) -> None:
+        report = {
+            'files': self.files,
+            'stage_totals': self.stage_totals(),
+            'count_totals': self.count_totals(),
+            'peak_rss_mb': self.peak_rss_mb(),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    def _write_csv(self, path: Path) -> None:
+        # Una fila por archivo con una columna por etapa y por contador
+        with self._lock:
+            files = list(self.files)
+        stage_names = ordered_stage_names({name for entry in files for name in entry['stages']})
+        count_names = sorted({name for entry in files for name in entry['counts']})
+        fieldnames = (['file_path', 'result', 'total_seconds', 'unaccounted_seconds', 'bytes_read', 'peak_rss_mb']
+                      + [f'stage_{name}_seconds' for name in stage_names]
+                      + [f'count_{name}' for name in count_names])
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for entry in files:
+                row = {key: entry.get(key) for key in fieldnames[:6]}
+                row.update({f'stage_{name}_seconds': entry['stages'].get(name) for name in stage_names})
+                row.update({f'count_{name}': entry['counts'].get(name) for name in count_names})
+                writer.writerow(row)
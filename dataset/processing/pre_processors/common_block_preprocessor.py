@@ -4,8 +4,19 @@ import re
 import logging
 from datetime import datetime
 
+from .multi_pattern import AhoCorasickMatcher
+from ..text_sanitizer import sanitize_unicode_corruption
+from ..pipeline_logging import should_log_block
+
 logger = logging.getLogger(__name__)
 
+# Patrones de corrupción conocidos de "Antología Rubén Darío" (compilados una vez)
+_RUBEN_DARIO_HEADER_PATTERNS = [
+    re.compile(r'\*Antolo\*.*\*[gí]\*.*\*[íi]a\*.*Rub[eé]n.*Dar[íi]o', re.IGNORECASE),  # *Antolo* *g* *ía* *Rubén Darío*
+    re.compile(r'Antolo.*Rub[eé]n.*Dar[íi]o', re.IGNORECASE),  # Variaciones simples de "Antología Rubén Darío"
+    re.compile(r'\*.*Antolo.*\*.*Rub[eé]n.*Dar[íi]o', re.IGNORECASE),  # Cualquier cosa con asteriscos, Antolo, Rubén, Darío
+]
+
 class CommonBlockPreprocessor:
     """Pre-procesador común para bloques de texto y metadatos.
 
@@ -51,6 +62,8 @@ class CommonBlockPreprocessor:
         'max_consecutive_empty_blocks': 5,  # Máximo de bloques vacíos consecutivos antes de parar
     }
 
+    _version_banner_logged = False
+
     def __init__(self, config: Optional[Dict] = None):
         """
         Inicializa el CommonBlockPreprocessor.
@@ -59,21 +72,15 @@ class CommonBlockPreprocessor:
             config: Configuración opcional para el pre-procesador.
                     Sobrescribe los valores de DEFAULT_CONFIG.
         """
-        # PRINT VISIBLE PARA CONFIRMAR QUE SE EJECUTA NUESTRO CÓDIGO
-        print("🚨🚨🚨 COMMONBLOCKPREPROCESSOR MODIFICADO SE ESTÁ EJECUTANDO 🚨🚨🚨")
-        print(f"🚨🚨🚨 CONFIG RECIBIDA: {config} 🚨🚨🚨")
-        
         self.config = {**CommonBlockPreprocessor.DEFAULT_CONFIG, **(config if config else {})}
         
-        # LOGGING DETALLADO PARA DEBUG - ver qué configuración recibe realmente
-        logger.warning(f"🔧 CommonBlockPreprocessor inicializado")
-        logger.warning(f"   📥 Config recibida: {config}")
-        logger.warning(f"   ⚙️  Config final: {self.config}")
-        logger.warning(f"   🔗 Fusión agresiva: {self.config.get('aggressive_merge_for_pdfs', 'NO DEFINIDA')}")
-        logger.warning(f"   🛡️  Filtrado activo: {self.config.get('filter_insignificant_blocks', 'NO DEFINIDA')}")
-        logger.warning(f"   📏 Gap máximo: {self.config.get('max_vertical_gap_aggressive_pt', 'NO DEFINIDA')}")
-        
-        logger.debug(f"CommonBlockPreprocessor inicializado con config: {self.config}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔧 CommonBlockPreprocessor inicializado - config recibida: %s", config)
+            logger.debug("   ⚙️  Config final: %s", self.config)
+            logger.debug("   🔗 Fusión agresiva: %s | 🛡️  Filtrado activo: %s | 📏 Gap máximo: %s",
+                         self.config.get('aggressive_merge_for_pdfs', 'NO DEFINIDA'),
+                         self.config.get('filter_insignificant_blocks', 'NO DEFINIDA'),
+                         self.config.get('max_vertical_gap_aggressive_pt', 'NO DEFINIDA'))
 
     def _is_insignificant_block(self, text: str) -> bool:
         """
@@ -145,7 +152,7 @@ class CommonBlockPreprocessor:
                         date_str = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
                     return date_str
                 except ValueError:
-                    logger.warning(f"Formato de fecha inválido '{date_str}' encontrado en el nombre de archivo '{filename}'.")
+                    logger.warning("Formato de fecha inválido '%s' encontrado en el nombre de archivo '%s'.", date_str, filename)
         return None
 
     def _clean_block_text(self, text: str) -> str:
@@ -173,68 +180,7 @@ class CommonBlockPreprocessor:
         - Caracteres de control Unicode extendidos (0x7F-0x9F)
         - Detecta y remueve texto predominantemente corrupto
         """
-        if not text:
-            return text
-        
-        # 1. Remover secuencias \u seguidas de 4 caracteres hex
-        text = re.sub(r'\\u[0-9a-fA-F]{4}', ' ', text)
-        
-        # 2. LIMPIEZA AGRESIVA: Remover TODOS los caracteres de control problemáticos
-        # Caracteres de control ASCII (0x00-0x1F) excepto \n=0x0A, \r=0x0D, \t=0x09
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F]', ' ', text)
-        
-        # Caracteres de control extendidos (0x7F-0x9F) - TODOS
-        text = re.sub(r'[\x7F-\x9F]', ' ', text)
-        
-        # 3. NUEVA: Limpieza específica de caracteres problemáticos para JSON
-        # Remover caracteres que pueden causar "Invalid control character" en JSON
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F\uFEFF\u200B-\u200F\u2028\u2029]', ' ', text)
-        
-        # 4. Remover secuencias de escape Unicode mal formadas
-        text = re.sub(r'\\[uU][0-9a-fA-F]{0,3}(?![0-9a-fA-F])', ' ', text)
-        
-        # 5. NUEVA FUNCIONALIDAD: Detectar texto predominantemente corrupto
-        total_chars = len(text.replace(' ', '').replace('\n', ''))
-        if total_chars > 0:
-            # Contar caracteres reconocibles vs corruptos
-            letras_validas = len(re.findall(r'[a-zA-ZáéíóúüñÁÉÍÓÚÜÑ]', text))
-            palabras_validas = len(re.findall(r'\b[a-zA-ZáéíóúüñÁÉÍÓÚÜÑ]{3,}\b', text))
-            
-            # Si menos del 30% son letras válidas y hay menos de 2 palabras, es corrupto
-            ratio_letras = letras_validas / total_chars
-            if ratio_letras < 0.3 and palabras_validas < 2 and total_chars > 50:
-                # Marcar como corrupto para filtrado posterior
-                return "texto corrupto en archivo de origen"  # Placeholder descriptivo
-        
-        # 6. Limpiar patrones específicos de corrupción en texto parcialmente corrupto
-        # Remover secuencias de símbolos matemáticos sueltos
-        text = re.sub(r'\s[+\-*/&%#$@!]{1,2}\s', ' ', text)
-        
-        # Remover letras sueltas entre espacios (probable corrupción)
-        text = re.sub(r'\s[a-zA-Z]\s', ' ', text)
-        
-        # Remover números sueltos de 1-2 dígitos entre espacios
-        text = re.sub(r'\s\d{1,2}\s', ' ', text)
-        
-        # 7. Normalizar espacios múltiples
-        text = re.sub(r'\s+', ' ', text)
-        
-        # 8. Limpiar líneas vacías excesivas (mantener máximo 2 saltos consecutivos)
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-        
-        # 9. VALIDACIÓN FINAL: Asegurar que no queden caracteres problemáticos
-        # Filtrar cualquier carácter que no sea imprimible o válido para JSON
-        cleaned_chars = []
-        for char in text:
-            # Permitir solo caracteres seguros para JSON
-            if (ord(char) >= 32 and ord(char) != 127) or char in '\n\r\t':
-                cleaned_chars.append(char)
-            else:
-                cleaned_chars.append(' ')  # Reemplazar con espacio
-        
-        text = ''.join(cleaned_chars)
-        
-        return text.strip()
+        return sanitize_unicode_corruption(text)
 
     def _split_text_into_paragraphs(self, text: str, base_order: float, original_coordinates: Optional[Dict] = None) -> List[Tuple[str, float, Optional[Dict]]]:
         """
@@ -253,20 +199,11 @@ class CommonBlockPreprocessor:
         Returns:
             Lista de tuplas (texto_párrafo, orden, coordenadas)
         """
-        print("🚨🚨🚨 COMMONBLOCK V7.1 - FUSIÓN INTELIGENTE OCR 🚨🚨🚨")
-        logger.warning("🚨🚨🚨 COMMONBLOCK V7.1 - FUSIÓN INTELIGENTE OCR 🚨🚨🚨")
-        
-        # DEBUG: Ver qué texto estamos recibiendo
-        print(f"📊 DEBUG _split_text_into_paragraphs:")
-        print(f"   - Longitud del texto: {len(text)}")
-        has_newlines = '\\n' in text
-        print(f"   - Contiene saltos de línea: {has_newlines}")
-        newline_count = text.count('\\n')
-        print(f"   - Número de saltos de línea: {newline_count}")
-        print(f"   - Primeros 200 chars: {repr(text[:200])}")
-        logger.warning(f"📊 DEBUG _split_text_into_paragraphs:")
-        logger.warning(f"   - Longitud: {len(text)}, Saltos: {newline_count}")
-        logger.warning(f"   - Inicio: {repr(text[:200])}")
+        # base_order es el índice del bloque: se muestrea igual que los logs por bloque
+        log_block = logger.isEnabledFor(logging.DEBUG) and should_log_block(int(base_order))
+        if log_block:
+            logger.debug("📊 _split_text_into_paragraphs bloque %d: longitud %d, saltos %d, inicio %r",
+                         int(base_order), len(text), text.count('\n'), text[:200])
         
         if not text or len(text.strip()) < 10:
             return []
@@ -289,8 +226,8 @@ class CommonBlockPreprocessor:
                 enhanced_paragraphs.extend(sentence_splits)
         
         if len(enhanced_paragraphs) > len(raw_paragraphs):
-            print(f"📄 DIVISIÓN MEJORADA: {len(raw_paragraphs)} → {len(enhanced_paragraphs)} párrafos")
-            logger.warning(f"📄 DIVISIÓN MEJORADA: {len(raw_paragraphs)} → {len(enhanced_paragraphs)} párrafos")
+            if log_block:
+                logger.debug("📄 DIVISIÓN MEJORADA: %d → %d párrafos", len(raw_paragraphs), len(enhanced_paragraphs))
             raw_paragraphs = enhanced_paragraphs
         
         # ✨ ADICIONAL: dividir cuando hay salto de línea seguido de mayúscula (si está configurado)
@@ -303,7 +240,8 @@ class CommonBlockPreprocessor:
                 refined_paragraphs.extend(sub_parts)
             
             if len(refined_paragraphs) > len(raw_paragraphs):
-                print(f"📄 DIVISIÓN ADICIONAL: {len(raw_paragraphs)} → {len(refined_paragraphs)} párrafos")
+                if log_block:
+                    logger.debug("📄 DIVISIÓN ADICIONAL: %d → %d párrafos", len(raw_paragraphs), len(refined_paragraphs))
                 raw_paragraphs = refined_paragraphs
         
         for i, paragraph in enumerate(raw_paragraphs):
@@ -322,15 +260,15 @@ class CommonBlockPreprocessor:
                 order = base_order + (i * 0.001)
                 paragraphs.append((paragraph_merged, order, original_coordinates))
         
-        print(f"🎯 ALGORITMO SIMPLE: {len(paragraphs)} párrafos extraídos")
-        logger.warning(f"🎯 ALGORITMO SIMPLE: {len(paragraphs)} párrafos extraídos")
+        if log_block:
+            logger.debug("🎯 ALGORITMO SIMPLE: %d párrafos extraídos", len(paragraphs))
         
         # ======= FALLBACK: SOLO SI HAY MUY POCOS SEGMENTOS =======
         # Solo aplicar si obtenemos ≤ 3 segmentos (como sugirió el usuario)
         
         if len(paragraphs) <= 3:
-            print("⚠️ MUY POCOS SEGMENTOS: Aplicando algoritmo fallback")
-            logger.warning("⚠️ MUY POCOS SEGMENTOS: Aplicando algoritmo fallback")
+            if log_block:
+                logger.debug("⚠️ MUY POCOS SEGMENTOS: Aplicando algoritmo fallback")
             
             # Fallback 1: Intentar con espacios múltiples (como sugerencia del usuario)
             fallback_paragraphs = []
@@ -346,14 +284,14 @@ class CommonBlockPreprocessor:
                     fallback_paragraphs.append((segment, order, original_coordinates))
             
             if len(fallback_paragraphs) > len(paragraphs):
-                print(f"✅ FALLBACK ESPACIOS: {len(fallback_paragraphs)} párrafos (mejor que {len(paragraphs)})")
-                logger.warning(f"✅ FALLBACK ESPACIOS: {len(fallback_paragraphs)} párrafos")
+                if log_block:
+                    logger.debug("✅ FALLBACK ESPACIOS: %d párrafos (mejor que %d)", len(fallback_paragraphs), len(paragraphs))
                 return fallback_paragraphs
             
             # Fallback 2: Detectar patrones sin saltos de línea (punto + espacio + mayúscula)
             if len(paragraphs) <= 1 and '\n' not in text:
-                print("🔧 APLICANDO DIVISIÓN SIN SALTOS DE LÍNEA")
-                logger.warning("🔧 APLICANDO DIVISIÓN SIN SALTOS DE LÍNEA")
+                if log_block:
+                    logger.debug("🔧 APLICANDO DIVISIÓN SIN SALTOS DE LÍNEA")
                 
                 # Primero, separar números romanos o títulos muy cortos al inicio
                 title_pattern = r'^(\*\*)?([IVXLCDM]+|\d+|Capítulo\s+[IVXLCDM]+|Capítulo\s+\d+|Cap\.\s*\d+)(\*\*)?\s+'
@@ -367,8 +305,8 @@ class CommonBlockPreprocessor:
                     title_text = title_match.group(0).strip()
                     smart_paragraphs.append((title_text, base_order, original_coordinates))
                     remaining_text = text[len(title_match.group(0)):]
-                    print(f"📖 TÍTULO DETECTADO: '{title_text}'")
-                    logger.warning(f"📖 TÍTULO DETECTADO: '{title_text}'")
+                    if log_block:
+                        logger.debug("📖 TÍTULO DETECTADO: '%s'", title_text)
                 
                 # Dividir el resto por punto + espacio + mayúscula
                 sentence_pattern = r'(?<=[.!?])\s+(?=[A-ZÁÉÍÓÚÜÑ])'
@@ -402,27 +340,27 @@ class CommonBlockPreprocessor:
                     smart_paragraphs.append((current_paragraph.strip(), order, original_coordinates))
                 
                 if len(smart_paragraphs) > len(paragraphs):
-                    print(f"✅ DIVISIÓN SIN SALTOS: {len(smart_paragraphs)} párrafos")
-                    logger.warning(f"✅ DIVISIÓN SIN SALTOS: {len(smart_paragraphs)} párrafos")
+                    if log_block:
+                        logger.debug("✅ DIVISIÓN SIN SALTOS: %d párrafos", len(smart_paragraphs))
                     return smart_paragraphs
             
             # Fallback 3: Fusión inteligente de líneas (para OCR)
             elif len(paragraphs) <= 1:
-                print("🔧 APLICANDO FUSIÓN INTELIGENTE DE LÍNEAS (OCR)")
-                logger.warning("🔧 APLICANDO FUSIÓN INTELIGENTE DE LÍNEAS (OCR)")
+                if log_block:
+                    logger.debug("🔧 APLICANDO FUSIÓN INTELIGENTE DE LÍNEAS (OCR)")
                 
                 lines = text.split('\n')
                 smart_paragraphs = self._smart_merge_lines(lines, base_order, original_coordinates)
                 
                 if len(smart_paragraphs) > len(paragraphs):
-                    print(f"✅ FUSIÓN INTELIGENTE: {len(smart_paragraphs)} párrafos")
-                    logger.warning(f"✅ FUSIÓN INTELIGENTE: {len(smart_paragraphs)} párrafos")
+                    if log_block:
+                        logger.debug("✅ FUSIÓN INTELIGENTE: %d párrafos", len(smart_paragraphs))
                     return smart_paragraphs
         
         # Heurística adicional eliminada — se reemplaza por detección de fragmentación OCR integrada a nivel de bloque.
 
-        print(f"🎯 RESULTADO FINAL: {len(paragraphs)} párrafos tras heurísticas")
-        logger.warning(f"🎯 RESULTADO FINAL: {len(paragraphs)} párrafos tras heurísticas")
+        if log_block:
+            logger.debug("🎯 RESULTADO FINAL: %d párrafos tras heurísticas", len(paragraphs))
         
         return paragraphs
 
@@ -580,7 +518,9 @@ class CommonBlockPreprocessor:
 
             # Fusión especial para oraciones divididas por saltos de página
             if self._should_merge_split_sentences(current_block, block):
-                logger.info(f"🔗 FUSIONANDO ORACIÓN DIVIDIDA: '{current_block.get('text', '')[-30:]}' + '{block.get('text', '')[:30]}'")
+                if logger.isEnabledFor(logging.DEBUG) and should_log_block(i):
+                    logger.debug("🔗 FUSIONANDO ORACIÓN DIVIDIDA: '%s' + '%s'",
+                                 current_block.get('text', '')[-30:], block.get('text', '')[:30])
                 sep = self._get_merge_separator(current_block['text'], block['text'])
                 current_block['text'] = current_block['text'].rstrip() + sep + block['text'].lstrip()
                 current_block['order'] = min(current_block.get('order', 0), block.get('order', 0))
@@ -631,7 +571,7 @@ class CommonBlockPreprocessor:
         
         # NUEVA VALIDACIÓN: No fusionar si el segundo bloque es un título corto
         if self._looks_like_short_title(text2):
-            logger.info(f"🚫 NO FUSIONAR ORACIONES: segundo bloque es título: '{text2[:50]}'")
+            logger.debug("🚫 NO FUSIONAR ORACIONES: segundo bloque es título: '%s'", text2[:50])
             return False
         
         page1 = block1.get('page', 0)
@@ -670,10 +610,8 @@ class CommonBlockPreprocessor:
         )
         
         if should_merge:
-            logger.info(f"🔍 DETECTADA DIVISIÓN ARTIFICIAL:")
-            logger.info(f"   Bloque 1: '{text1[-50:]}'")
-            logger.info(f"   Bloque 2: '{text2[:50]}'")
-            logger.info(f"   Sin puntuación: {ends_without_punctuation}, Minúscula: {starts_lowercase}")
+            logger.debug("🔍 DETECTADA DIVISIÓN ARTIFICIAL: '%s' | '%s' (sin puntuación: %s, minúscula: %s)",
+                         text1[-50:], text2[:50], ends_without_punctuation, starts_lowercase)
         
         return should_merge
 
@@ -689,13 +627,13 @@ class CommonBlockPreprocessor:
         
         # NO fusionar si el siguiente bloque parece ser un título corto
         if self._looks_like_short_title(next_stripped):
-            logger.info(f"🚫 NO FUSIONAR: siguiente bloque parece título: '{next_stripped[:50]}'")
+            logger.debug("🚫 NO FUSIONAR: siguiente bloque parece título: '%s'", next_stripped[:50])
             return False
         
         # NO fusionar si son de páginas diferentes Y el siguiente es un título potencial
         if curr_page != next_page and len(next_stripped) < 100:
             if next_stripped[0].isupper() or re.match(r'^[IVXLCDM]+\s*$', next_stripped):
-                logger.info(f"🚫 NO FUSIONAR: cambio de página con posible título: '{next_stripped[:50]}'")
+                logger.debug("🚫 NO FUSIONAR: cambio de página con posible título: '%s'", next_stripped[:50])
                 return False
         
         # Lógica existente de fusión
@@ -844,35 +782,35 @@ class CommonBlockPreprocessor:
         Returns:
             Lista de bloques procesados.
         """
-        print("🚨🚨🚨 COMMONBLOCK V7.1 - FUSIÓN INTELIGENTE OCR 🚨🚨🚨")
-        logger.warning("🚨🚨🚨 COMMONBLOCK V7.1 - FUSIÓN INTELIGENTE OCR 🚨🚨🚨")
+        # ===== IDENTIFICADOR DE VERSIÓN (una vez por proceso) =====
+        if not CommonBlockPreprocessor._version_banner_logged:
+            CommonBlockPreprocessor._version_banner_logged = True
+            logger.debug("COMMONBLOCK V7.1 - FUSIÓN INTELIGENTE OCR")
         
-        # DEBUG: Ver qué bloques estamos recibiendo
-        print(f"📊 DEBUG process - Bloques recibidos: {len(blocks)}")
-        logger.warning(f"📊 DEBUG process - Bloques recibidos: {len(blocks)}")
-        for i, block in enumerate(blocks[:3]):  # Primeros 3 bloques
-            text = block.get('text', '')
-            print(f"   Bloque {i}: {len(text)} chars, inicio: {repr(text[:100])}")
-            logger.warning(f"   Bloque {i}: {len(text)} chars")
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            for i, block in enumerate(blocks[:3]):  # Primeros 3 bloques
+                text = block.get('text', '')
+                logger.debug("   Bloque %d: %d chars, inicio: %r", i, len(text), text[:100])
         
         if not blocks:
             logger.info("No hay bloques para procesar.")
             return []
         
-        logger.info(f"Iniciando procesamiento de {len(blocks)} bloques.")
+        logger.info("Iniciando procesamiento de %d bloques.", len(blocks))
         
         # 🆕 PASO 1: Detectar y filtrar elementos estructurales
         structural_elements = self._detect_structural_elements(blocks)
         if structural_elements:
             blocks = self._filter_structural_elements(blocks, structural_elements)
-            logger.info(f"✅ Filtrado estructural aplicado: {len(structural_elements)} elementos eliminados")
+            logger.info("✅ Filtrado estructural aplicado: %d elementos eliminados", len(structural_elements))
         
         # 🆕 PASO 2: Detectar si es texto OCR y aplicar fusión inteligente
         ocr_detected = self._detect_ocr_fragmentation(blocks, document_metadata.get('doc_profile_used', ''))
         if ocr_detected:
-            logger.warning("🔍 TEXTO OCR DETECTADO - APLICANDO FUSIÓN INTELIGENTE")
+            logger.info("🔍 TEXTO OCR DETECTADO - APLICANDO FUSIÓN INTELIGENTE")
             blocks = self._merge_contiguous_fitz_blocks(blocks)
-            logger.warning(f"✅ FUSIÓN OCR APLICADA: {len(blocks)} bloques después de fusión")
+            logger.info("✅ FUSIÓN OCR APLICADA: %d bloques después de fusión", len(blocks))
         
         processed_blocks = []
         
@@ -895,7 +833,8 @@ class CommonBlockPreprocessor:
             if self.config.get('split_blocks_into_paragraphs', True):
                 # Para texto OCR FUSIONADO, dividir en párrafos basándose en puntuación
                 if ocr_detected and len(text) > 1000:  # Texto fusionado grande
-                    logger.info(f"📄 Dividiendo texto fusionado OCR en párrafos: {len(text)} caracteres")
+                    if debug_enabled and should_log_block(i):
+                        logger.debug("📄 Dividiendo texto fusionado OCR en párrafos: %d caracteres", len(text))
                     paragraph_blocks = self._split_fused_text_into_paragraphs(
                         text, 
                         i, 
@@ -953,8 +892,8 @@ class CommonBlockPreprocessor:
                         processed_blocks.append(new_block)
             else:
                 # 🎵 MODO VERSO: Mantener bloque original sin dividir
-                print(f"🎵 MODO VERSO: Manteniendo bloque sin dividir: {repr(text[:50])}")
-                logger.warning(f"🎵 MODO VERSO: Manteniendo bloque sin dividir: {repr(text[:50])}")
+                if debug_enabled and should_log_block(i):
+                    logger.debug("🎵 MODO VERSO: Manteniendo bloque sin dividir: %r", text[:50])
                 
                 new_block = {
                     'text': text,
@@ -967,8 +906,7 @@ class CommonBlockPreprocessor:
                 }
                 processed_blocks.append(new_block)
         
-        print(f"✅ PROCESO COMPLETADO: {len(blocks)} → {len(processed_blocks)} bloques")
-        logger.warning(f"✅ PROCESO COMPLETADO: {len(blocks)} → {len(processed_blocks)} bloques")
+        logger.info("✅ PROCESO COMPLETADO: %d → %d bloques", len(blocks), len(processed_blocks))
         
         return processed_blocks, document_metadata
 
@@ -1036,12 +974,11 @@ class CommonBlockPreprocessor:
         )
 
         if ocr_detected:
-            logger.warning("🔍 OCR FRAGMENTADO DETECTADO:")
-            logger.warning(f"   📊 Bloques totales: {total_text_blocks}")
-            logger.warning(f"   📏 Bloques cortos (<100 chars): {short_blocks} ({short_ratio:.1%})")
-            logger.warning(f"   📝 Bloques una línea: {single_line_blocks} ({single_line_ratio:.1%})")
-            logger.warning(f"   ❌ Bloques sin puntuación final: {no_punct_blocks} ({no_punct_ratio:.1%})")
-            logger.warning(f"   ➡️  Longitud media por bloque: {avg_len:.1f} chars")
+            logger.info("🔍 OCR FRAGMENTADO DETECTADO: %d bloques; cortos (<100 chars) %d (%.1f%%); "
+                        "una línea %d (%.1f%%); sin puntuación final %d (%.1f%%); longitud media %.1f chars",
+                        total_text_blocks, short_blocks, short_ratio * 100,
+                        single_line_blocks, single_line_ratio * 100,
+                        no_punct_blocks, no_punct_ratio * 100, avg_len)
         
         return ocr_detected
 
@@ -1170,14 +1107,14 @@ class CommonBlockPreprocessor:
         
         # Solo analizar si hay suficientes páginas
         if total_pages < min_pages:
-            logger.debug(f"📄 Solo {total_pages} páginas, omitiendo detección estructural (mínimo: {min_pages})")
+            logger.debug("📄 Solo %d páginas, omitiendo detección estructural (mínimo: %d)", total_pages, min_pages)
             return []
         
         # Detectar elementos estructurales
         structural_elements = []
         threshold = self.config.get('structural_frequency_threshold', 0.9)
         
-        logger.info(f"🔍 Analizando elementos estructurales en {total_pages} páginas (umbral: {threshold*100}%)")
+        logger.info("🔍 Analizando elementos estructurales en %d páginas (umbral: %s%%)", total_pages, threshold * 100)
         
         # MÉTODO 1: Detección por normalización (como antes)
         for normalized_text, data in text_to_pages.items():
@@ -1191,19 +1128,25 @@ class CommonBlockPreprocessor:
                 for original_text in original_texts:
                     structural_elements.append(original_text)
                 
-                # Log con ejemplo de variaciones detectadas
-                examples = list(original_texts)[:3]  # Mostrar máximo 3 ejemplos
-                logger.warning(f"🚫 Elemento estructural detectado ({frequency*100:.1f}%): '{normalized_text}'")
-                logger.warning(f"   📝 Variaciones encontradas: {examples}")
+                # Log con ejemplo de variaciones detectadas (máximo 3)
+                logger.info("🚫 Elemento estructural detectado (%.1f%%): '%s' - variaciones: %s",
+                            frequency * 100, normalized_text, list(original_texts)[:3])
         
         # MÉTODO 2: Detección por patrones específicos conocidos (NUEVO)
-        # Buscar patrones como "*Antolo*" que claramente son corrupción de "Antología"
-        pattern_pages = {}  # {pattern: set(pages)}
+        # Buscar patrones como "*Antolo*" que claramente son corrupción de "Antología".
+        # Cada bloque se evalúa una sola vez; los que coinciden se reutilizan abajo
+        pattern_pages = set()
+        pattern_texts = []
         
         for block in blocks:
             original_text = block.get('text', '').strip()
             if not original_text or len(original_text) < 5:
                 continue
+            
+            # Buscar patrones específicos de corrupción de "Antología Rubén Darío"
+            if not any(pattern.search(original_text) for pattern in _RUBEN_DARIO_HEADER_PATTERNS):
+                continue
+            pattern_texts.append(original_text)
                 
             page_num = None
             metadata = block.get('metadata', {})
@@ -1215,46 +1158,21 @@ class CommonBlockPreprocessor:
                 page_num = metadata['page']
                 
             if page_num is not None:
-                # Buscar patrones específicos de corrupción de "Antología Rubén Darío"
-                patterns_to_check = [
-                    r'\*Antolo\*.*\*[gí]\*.*\*[íi]a\*.*Rub[eé]n.*Dar[íi]o',  # *Antolo* *g* *ía* *Rubén Darío*
-                    r'Antolo.*Rub[eé]n.*Dar[íi]o',  # Variaciones simples de "Antología Rubén Darío"
-                    r'\*.*Antolo.*\*.*Rub[eé]n.*Dar[íi]o',  # Cualquier cosa con asteriscos, Antolo, Rubén, Darío
-                ]
-                
-                for pattern in patterns_to_check:
-                    if re.search(pattern, original_text, re.IGNORECASE):
-                        pattern_key = "antologia_ruben_dario_pattern"
-                        if pattern_key not in pattern_pages:
-                            pattern_pages[pattern_key] = set()
-                        pattern_pages[pattern_key].add(page_num)
-                        logger.debug(f"🎯 Patrón detectado en página {page_num}: '{original_text[:50]}...'")
-                        break
+                pattern_pages.add(page_num)
+                logger.debug("🎯 Patrón detectado en página %s: '%s...'", page_num, original_text[:50])
         
         # Verificar si los patrones aparecen en suficientes páginas
-        for pattern_key, pages in pattern_pages.items():
-            frequency = len(pages) / total_pages
+        if pattern_pages:
+            frequency = len(pattern_pages) / total_pages
             if frequency >= threshold:
-                logger.warning(f"🚫 Patrón estructural detectado ({frequency*100:.1f}%): {pattern_key}")
+                logger.info("🚫 Patrón estructural detectado (%.1f%%): antologia_ruben_dario_pattern", frequency * 100)
                 
                 # Agregar todos los bloques que coincidan con este patrón
-                for block in blocks:
-                    original_text = block.get('text', '').strip()
-                    if original_text and len(original_text) >= 5:
-                        # Aplicar los mismos patrones de búsqueda
-                        patterns_to_check = [
-                            r'\*Antolo\*.*\*[gí]\*.*\*[íi]a\*.*Rub[eé]n.*Dar[íi]o',
-                            r'Antolo.*Rub[eé]n.*Dar[íi]o',
-                            r'\*.*Antolo.*\*.*Rub[eé]n.*Dar[íi]o',
-                        ]
-                        
-                        for pattern in patterns_to_check:
-                            if re.search(pattern, original_text, re.IGNORECASE):
-                                structural_elements.append(original_text)
-                                logger.debug(f"🎯 Agregado por patrón: '{original_text[:30]}...'")
-                                break
-        
-        logger.info(f"🔍 Detección completada: {len(structural_elements)} elementos estructurales encontrados")
+                for original_text in pattern_texts:
+                    structural_elements.append(original_text)
+                    logger.debug("🎯 Agregado por patrón: '%s...'", original_text[:30])
+        
+        logger.info("🔍 Detección completada: %d elementos estructurales encontrados", len(structural_elements))
         return structural_elements
 
     def _filter_structural_elements(self, blocks: List[Dict], structural_elements: List[str]) -> List[Dict]:
@@ -1275,27 +1193,27 @@ class CommonBlockPreprocessor:
         filtered_count = 0
         cleaned_count = 0
         
+        # Conjunto para las coincidencias exactas y autómata para eliminar todas las
+        # apariciones internas en una sola pasada por bloque
+        structural_set = set(structural_elements)
+        matcher = AhoCorasickMatcher(structural_set)
+        
         for block in blocks:
             text = block.get('text', '').strip()
             
             # Verificar si el texto ES EXACTAMENTE un elemento estructural
-            is_structural = text in structural_elements
+            is_structural = text in structural_set
             
             if is_structural:
                 filtered_count += 1
-                logger.debug(f"🚫 Filtrando bloque estructural completo: '{text[:30]}{'...' if len(text) > 30 else ''}'")
+                logger.debug("🚫 Filtrando bloque estructural completo: '%s'", text[:30])
                 continue
             
             # NUEVA FUNCIONALIDAD: Limpiar elementos estructurales DENTRO del texto
-            cleaned_text = text
-            text_was_cleaned = False
-            
-            for structural_element in structural_elements:
-                if structural_element in cleaned_text:
-                    # Remover el elemento estructural del texto
-                    cleaned_text = cleaned_text.replace(structural_element, '').strip()
-                    text_was_cleaned = True
-                    logger.debug(f"🧹 Limpiando elemento estructural '{structural_element[:20]}...' del bloque")
+            cleaned_text, removed = matcher.remove_all(text)
+            text_was_cleaned = removed > 0
+            if text_was_cleaned:
+                logger.debug("🧹 Limpiando %d apariciones de elementos estructurales del bloque", removed)
             
             # Limpiar saltos de línea y espacios excesivos después de la limpieza
             if text_was_cleaned:
@@ -1313,10 +1231,10 @@ class CommonBlockPreprocessor:
             else:
                 # El bloque quedó vacío después de limpiar elementos estructurales
                 filtered_count += 1
-                logger.debug(f"🗑️ Bloque vacío después de limpieza: eliminado")
+                logger.debug("🗑️ Bloque vacío después de limpieza: eliminado")
         
-        logger.info(f"🔄 Filtrado estructural: {len(blocks)} → {len(filtered_blocks)} bloques")
-        logger.info(f"   📊 {filtered_count} bloques eliminados, {cleaned_count} bloques limpiados")
+        logger.info("🔄 Filtrado estructural: %d → %d bloques (%d eliminados, %d limpiados)",
+                    len(blocks), len(filtered_blocks), filtered_count, cleaned_count)
         return filtered_blocks
 
     def _split_fused_text_into_paragraphs(self, text: str, base_order: float, original_metadata: Dict) -> List[Dict]:
@@ -1327,13 +1245,15 @@ class CommonBlockPreprocessor:
         if not text.strip():
             return []
         
-        logger = logging.getLogger(__name__)
-        logger.info(f"🔄 DIVIDIENDO TEXTO FUSIONADO: {len(text)} caracteres usando estructura semántica")
+        log_block = logger.isEnabledFor(logging.DEBUG) and should_log_block(int(base_order))
+        if log_block:
+            logger.debug("🔄 DIVIDIENDO TEXTO FUSIONADO: %d caracteres usando estructura semántica", len(text))
         
         # Método 1: División por dobles saltos de línea (estructura natural del documento)
         natural_paragraphs = re.split(r'\n\s*\n\s*', text)
         if len(natural_paragraphs) > 1:
-            logger.info(f"📄 Encontrados {len(natural_paragraphs)} párrafos naturales (dobles saltos)")
+            if log_block:
+                logger.debug("📄 Encontrados %d párrafos naturales (dobles saltos)", len(natural_paragraphs))
             paragraphs = []
             for i, para_text in enumerate(natural_paragraphs):
                 para_text = para_text.strip()
@@ -1350,7 +1270,8 @@ class CommonBlockPreprocessor:
                         }
                     })
             if paragraphs:
-                logger.info(f"✅ División semántica por párrafos naturales: {len(paragraphs)} párrafos")
+                if log_block:
+                    logger.debug("✅ División semántica por párrafos naturales: %d párrafos", len(paragraphs))
                 return paragraphs
         
         # Método 2: División por headers markdown y patrones semánticos específicos
@@ -1368,7 +1289,8 @@ class CommonBlockPreprocessor:
         for pattern in semantic_patterns:
             splits = re.split(pattern, text)
             if len(splits) > 1:  # Al menos 2 segmentos
-                logger.info(f"📄 Patrón semántico encontró {len(splits)} segmentos")
+                if log_block:
+                    logger.debug("📄 Patrón semántico encontró %d segmentos", len(splits))
                 paragraphs = []
                 
                 for i, segment in enumerate(splits):
@@ -1387,14 +1309,16 @@ class CommonBlockPreprocessor:
                         })
                 
                 if len(paragraphs) > 1:
-                    logger.info(f"✅ División semántica por patrón: {len(paragraphs)} párrafos")
+                    if log_block:
+                        logger.debug("✅ División semántica por patrón: %d párrafos", len(paragraphs))
                     return paragraphs
         
         # Método 3: División por estructura de párrafos (puntuación + salto + mayúscula)
         paragraph_pattern = r'(?<=[.!?])\s*\n\s*(?=[A-ZÁÉÍÓÚÜÑ])'
         sentences = re.split(paragraph_pattern, text)
         if len(sentences) > 1:
-            logger.info(f"📄 División por estructura de párrafos: {len(sentences)} segmentos")
+            if log_block:
+                logger.debug("📄 División por estructura de párrafos: %d segmentos", len(sentences))
             paragraphs = []
             
             for i, sentence in enumerate(sentences):
@@ -1413,11 +1337,13 @@ class CommonBlockPreprocessor:
                     })
             
             if len(paragraphs) > 1:
-                logger.info(f"✅ División semántica por estructura: {len(paragraphs)} párrafos")
+                if log_block:
+                    logger.debug("✅ División semántica por estructura: %d párrafos", len(paragraphs))
                 return paragraphs
         
         # Si no se puede dividir semánticamente, mantener como párrafo único
-        logger.info("📄 Manteniendo texto como párrafo único (no se encontró estructura semántica)")
+        if log_block:
+            logger.debug("📄 Manteniendo texto como párrafo único (no se encontró estructura semántica)")
         return [{
             'text': text.strip(),
             'metadata': {
@@ -0,0 +1,102 @@
+"""
+Búsqueda simultánea de muchos patrones literales (autómata Aho–Corasick).
+
+Lo usa CommonBlockPreprocessor para eliminar headers/footers repetidos: con cientos
+de variantes de un encabezado, recorrer cada bloque una sola vez es lineal en su
+longitud, en lugar de un ``str.replace`` por variante y bloque.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+
+class AhoCorasickMatcher:
+    """Autómata de Aho–Corasick sobre un conjunto de cadenas literales."""
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Args:
+            patterns: Cadenas a buscar (las vacías se ignoran, los duplicados se unifican)
+        """
+        self.patterns = sorted({p for p in patterns if p})
+        # Nodo 0 = raíz. Por nodo: transiciones, enlace de fallo y longitudes de los
+        # patrones que terminan en él (incluidos los heredados por enlaces de fallo)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[int, ...]] = [()]
+        self._build()
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def _build(self) -> None:
+        for pattern in self.patterns:
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(())
+                node = next_node
+            self._outputs[node] = (len(pattern),)
+
+        # Enlaces de fallo en anchura: cada nodo hereda las salidas de su fallo
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                child_fail = self._goto[fail].get(char, 0)
+                self._fail[child] = child_fail if child_fail != child else 0
+                if self._outputs[self._fail[child]]:
+                    self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Devuelve todas las apariciones (posiblemente solapadas) como (inicio, fin).
+        """
+        matches = []
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length in outputs[node]:
+                matches.append((index + 1 - length, index + 1))
+        return matches
+
+    def remove_all(self, text: str) -> Tuple[str, int]:
+        """
+        Elimina del texto las apariciones de los patrones en una sola pasada.
+
+        Entre apariciones solapadas gana la que empieza antes y, a igual inicio,
+        la más larga.
+
+        Returns:
+            Tuple con (texto resultante, número de apariciones eliminadas)
+        """
+        if not self.patterns or not text:
+            return text, 0
+        matches = self.find_all(text)
+        if not matches:
+            return text, 0
+        matches.sort(key=lambda match: (match[0], -match[1]))
+
+        pieces = []
+        removed = 0
+        position = 0
+        for start, end in matches:
+            if start < position:
+                continue
+            pieces.append(text[position:start])
+            position = end
+            removed += 1
+        pieces.append(text[position:])
+        return ''.join(pieces), removed
@@ -7,11 +7,20 @@ import dataclasses
 from datetime import datetime, timezone
 import uuid
 import importlib
+import itertools
+import json
 import re
+import threading
 
 from langdetect import detect, LangDetectException
 from dataset.scripts.data_models import ProcessedContentItem, BatchContext
-from .author_detection import detect_author_in_segments
+from .author_detection import get_author_detection_engine
+from .pipeline_logging import pipeline_print
+from .pipeline_metrics import FileMetrics
+from .output_modes import PIPELINE_VERSION
+from .text_sanitizer import (
+    count_control_characters, duplicated_char_ratio, remove_control_characters, to_json_safe
+)
 
 # Importar detector de perfiles automático
 try:
@@ -23,21 +32,27 @@ except ImportError:
     get_profile_detection_config = None
     PROFILE_DETECTION_AVAILABLE = False
 
-# RECARGA FORZADA DE MÓDULOS MODIFICADOS - V7.0
-import dataset.processing.segmenters.heading_segmenter
-importlib.reload(dataset.processing.segmenters.heading_segmenter)
+# Modo desarrollo: recarga en caliente de los módulos del pipeline editados sin
+# reiniciar el proceso. Desactivado por defecto (re-ejecutar los módulos recompila
+# sus regex y rompe la identidad de clases entre hilos)
+DEV_HOT_RELOAD = os.environ.get('BIBLIOPERSON_DEV_RELOAD', '').lower() in ('1', 'true', 'yes')
 
-import dataset.processing.loaders.pdf_loader
-importlib.reload(dataset.processing.loaders.pdf_loader)
+if DEV_HOT_RELOAD:
+    import dataset.processing.segmenters.heading_segmenter
+    importlib.reload(dataset.processing.segmenters.heading_segmenter)
 
-import dataset.processing.pre_processors.common_block_preprocessor
-importlib.reload(dataset.processing.pre_processors.common_block_preprocessor)
+    import dataset.processing.loaders.pdf_loader
+    importlib.reload(dataset.processing.loaders.pdf_loader)
+
+    import dataset.processing.pre_processors.common_block_preprocessor
+    importlib.reload(dataset.processing.pre_processors.common_block_preprocessor)
 
 from .segmenters.base import BaseSegmenter
 from .segmenters.verse_segmenter import VerseSegmenter
 from .segmenters.heading_segmenter import HeadingSegmenter
 from .loaders import BaseLoader, MarkdownLoader, NDJSONLoader, JSONLoader, DocxLoader, txtLoader, PDFLoader, ExcelLoader, CSVLoader
 from .pre_processors import CommonBlockPreprocessor
+from .loaders.pdf_document_cache import shared_pdf_document
 
 # Importar módulos de deduplicación y modos de salida (opcional)
 try:
@@ -58,6 +73,14 @@ except ImportError as e:
 # from .exporters.base import BaseExporter
 # etc.
 
+# Patrones de _detect_extreme_corruption (compilados una vez)
+_WEIRD_SEQUENCE_RE = re.compile(r'[^\w\s\.,;:!?¡¿\-\(\)\[\]"\'áéíóúñüÁÉÍÓÚÑÜ]+')
+_EXTREME_CORRUPTION_PATTERNS = [
+    re.compile(r'�{10,}'),  # 10 o más caracteres de reemplazo consecutivos
+    re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F]{5,}'),  # 5 o más caracteres de control consecutivos
+    re.compile(r'^[\s�\x00-\x1F]*$'),  # Solo espacios, caracteres de reemplazo y control
+]
+
 class ProfileManager:
     """
     Gestor del sistema de perfiles de procesamiento.
@@ -70,15 +93,26 @@ class ProfileManager:
     - Exportación de resultados
     """
     
-    def __init__(self, profiles_dir: str = None):
+    def __init__(self, profiles_dir: str = None, dev_reload: Optional[bool] = None):
         """
         Inicializa el gestor de perfiles.
         
         Args:
             profiles_dir: Directorio donde se encuentran los perfiles YAML
+            dev_reload: Recargar CommonBlockPreprocessor cuando su código fuente cambie
+                        (por defecto, variable de entorno BIBLIOPERSON_DEV_RELOAD)
         """
         self.logger = logging.getLogger(__name__)
         
+        # Pool de pre-procesadores reutilizables, uno por configuración
+        self.dev_reload = DEV_HOT_RELOAD if dev_reload is None else dev_reload
+        self._preprocessor_pool: Dict[str, CommonBlockPreprocessor] = {}
+        self._preprocessor_pool_lock = threading.Lock()
+        self._preprocessor_source_mtime: Optional[float] = None
+        
+        # Motor de detección de autores compartido: detectores y recursos se cargan una vez
+        self.author_detection_engine = get_author_detection_engine()
+        
         # Directorio de perfiles por defecto
         if profiles_dir is None:
             module_dir = os.path.dirname(os.path.abspath(__file__))
@@ -95,6 +129,47 @@ class ProfileManager:
         # Cargar perfiles desde directorio
         self.load_profiles()
     
+    def get_common_preprocessor(self, preprocessor_config: Optional[Dict] = None) -> CommonBlockPreprocessor:
+        """
+        Devuelve un CommonBlockPreprocessor del pool para la configuración dada.
+        
+        El pre-procesador no guarda estado entre llamadas a process(), así que una
+        misma instancia se comparte entre archivos e hilos. En modo desarrollo el
+        pool se vacía y el módulo se recarga cuando cambia su código fuente.
+        """
+        key = json.dumps(preprocessor_config or {}, sort_keys=True, default=str)
+        with self._preprocessor_pool_lock:
+            if self.dev_reload:
+                self._reload_preprocessor_module_if_changed()
+            preprocessor = self._preprocessor_pool.get(key)
+            if preprocessor is None:
+                preprocessor_class = (self._preprocessor_class() if self.dev_reload
+                                      else CommonBlockPreprocessor)
+                preprocessor = preprocessor_class(config=preprocessor_config)
+                self._preprocessor_pool[key] = preprocessor
+                self.logger.debug(f"Nuevo CommonBlockPreprocessor en el pool ({len(self._preprocessor_pool)} configuraciones)")
+            return preprocessor
+    
+    def _preprocessor_class(self):
+        """Clase CommonBlockPreprocessor vigente (la última recargada en modo desarrollo)."""
+        import dataset.processing.pre_processors.common_block_preprocessor as cbp_module
+        return cbp_module.CommonBlockPreprocessor
+    
+    def _reload_preprocessor_module_if_changed(self):
+        """Recarga common_block_preprocessor si su archivo cambió desde la última carga."""
+        import dataset.processing.pre_processors.common_block_preprocessor as cbp_module
+        try:
+            mtime = os.path.getmtime(cbp_module.__file__)
+        except OSError:
+            return
+        if self._preprocessor_source_mtime is None:
+            self._preprocessor_source_mtime = mtime
+        elif mtime != self._preprocessor_source_mtime:
+            self.logger.warning("🔄 common_block_preprocessor modificado: recargando módulo (modo desarrollo)")
+            importlib.reload(cbp_module)
+            self._preprocessor_pool.clear()
+            self._preprocessor_source_mtime = mtime
+    
     def reload_custom_segmenters(self):
         """Recarga los segmentadores personalizados. Útil después de generar nuevos segmentadores."""
         self.logger.info("Recargando segmentadores personalizados...")
@@ -416,14 +491,14 @@ class ProfileManager:
             lang_clean = language_override.strip().lower()
             if 2 <= len(lang_clean) <= 5 and lang_clean.replace('-', '').isalpha():
                 final_language = lang_clean
-                self.logger.info(f"Usando idioma forzado: {final_language}")
+                self.logger.debug("Usando idioma forzado: %s", final_language)
             else:
-                self.logger.warning(f"Código de idioma inválido: '{language_override}'. Usando detección automática.")
+                self.logger.warning("Código de idioma inválido: '%s'. Usando detección automática.", language_override)
         
         if not final_language:
             final_language = detected_lang or processed_document_metadata.get('language', 'unknown')
             if final_language and final_language != 'unknown':
-                self.logger.debug(f"Usando idioma detectado: {final_language}")
+                self.logger.debug("Usando idioma detectado: %s", final_language)
         
         if not final_language or final_language == 'unknown':
             final_language = 'unknown'
@@ -437,21 +512,21 @@ class ProfileManager:
                 import re
                 final_author = re.sub(r'[<>|:*?"\\\/\n\r\t]', '', author_clean).strip()
                 if final_author:
-                    self.logger.info(f"Usando autor forzado: {final_author}")
+                    self.logger.debug("Usando autor forzado: %s", final_author)
                 else:
                     self.logger.warning("Autor forzado quedó vacío después de limpieza")
             else:
                 final_author = author_clean[:200].strip()
-                self.logger.warning(f"Autor forzado truncado a 200 caracteres: {final_author}")
+                self.logger.warning("Autor forzado truncado a 200 caracteres: %s", final_author)
         
         if not final_author and main_document_author_name:
             final_author = main_document_author_name
-            self.logger.debug(f"Usando autor principal del documento: {final_author}")
+            self.logger.debug("Usando autor principal del documento: %s", final_author)
         
         if not final_author:
             final_author = processed_document_metadata.get('autor_documento') or processed_document_metadata.get('author')
             if final_author:
-                self.logger.debug(f"Usando autor de fallback: {final_author}")
+                self.logger.debug("Usando autor de fallback: %s", final_author)
         
         # 3. CONSOLIDAR METADATOS ADICIONALES (sin duplicaciones)
         # Campos que YA están como campos principales - NO incluir en additional_metadata
@@ -538,60 +613,17 @@ class ProfileManager:
             publisher=processed_document_metadata.get('editorial_documento') or processed_document_metadata.get('publisher'),
             isbn=processed_document_metadata.get('isbn_documento') or processed_document_metadata.get('isbn'),
             additional_metadata=additional_metadata_clean,
-            pipeline_version="profile_manager_v4.0_english_clean",
+            pipeline_version=PIPELINE_VERSION,
             segmenter_used=segmenter_name
         )
 
-    def process_file(self, 
-                    file_path: str, 
-                    profile_name: str, 
-                    output_file: Optional[str] = None,
-                    encoding: str = 'utf-8',
-                    force_content_type: Optional[str] = None,
-                    confidence_threshold: float = 0.5,
-                    job_config_dict: Optional[Dict[str, Any]] = None,
-                    language_override: Optional[str] = None,
-                    author_override: Optional[str] = None,
-                    output_format: str = "ndjson",
-                    folder_structure_info: Optional[Dict[str, Any]] = None,
-                    output_mode: str = "biblioperson") -> tuple:
+    def _check_deduplication(self, file_path: str, profile_name: str, output_mode: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
         """
-        Procesa un archivo completo usando un perfil.
+        Registra el archivo en el sistema de deduplicación (si aplica).
         
-        Args:
-            file_path: Ruta al archivo a procesar
-            profile_name: Nombre del perfil a usar
-            output_file: Archivo para guardar resultados (opcional)
-            encoding: Codificación para abrir el archivo (por defecto utf-8)
-            force_content_type: Forzar un tipo específico de contenido (ignora detección automática)
-            confidence_threshold: Umbral de confianza para detección de poemas (0.0-1.0)
-            job_config_dict: Diccionario con la configuración del job actual (opcional)
-            language_override: Código de idioma para override (opcional)
-            author_override: Nombre del autor para override (opcional)
-            output_format: Formato de salida ("ndjson" o "json")
-            folder_structure_info: Información sobre la estructura de carpetas del archivo (opcional)
-            output_mode: Modo de salida ("generic" o "biblioperson")
-            
         Returns:
-            Tuple con: (Lista de unidades procesadas, Estadísticas del segmentador, Metadatos del documento)
+            Tuple con (hash del documento nuevo o None, metadatos del duplicado o None)
         """
-        
-        # [DEBUG] LOGGING DETALLADO PARA DEBUG DE EXPORTACIÓN
-        self.logger.warning(f"[DEBUG] INICIO process_file - output_file recibido: '{output_file}'")
-        self.logger.warning(f"[DEBUG] INICIO process_file - output_format: '{output_format}'")
-        print(f"[DEBUG] INICIO process_file - output_file recibido: '{output_file}'")
-        print(f"[DEBUG] INICIO process_file - output_format: '{output_format}'")
-        
-        if not os.path.exists(file_path):
-            self.logger.error(f"Archivo no encontrado: {file_path}")
-            # Devolver la estructura de tupla esperada por process_file.py
-            return [], {}, {'error': f"Archivo no encontrado: {file_path}"}
-        
-        # [CONFIG] GENERAR DOCUMENT_ID ÚNICO PARA TODO EL ARCHIVO
-        # Este ID será compartido por todos los segmentos del mismo archivo
-        file_document_id = None
-        
-        # [CONFIG] SISTEMA DE DEDUPLICACIÓN (opcional y configurable)
         document_hash = None
         if DEDUPLICATION_AVAILABLE and is_deduplication_enabled_for_mode(output_mode.lower()):
             try:
@@ -613,7 +645,7 @@ class ProfileManager:
                         self.logger.warning(f"   Ruta original: {duplicate_info['file_path']}")
                         
                         # Devolver información del duplicado en lugar de procesar
-                        return [], {}, {
+                        return document_hash, {
                             'duplicate_detected': True,
                             'document_hash': document_hash,
                             'original_file_path': duplicate_info['file_path'],
@@ -623,8 +655,6 @@ class ProfileManager:
                         }
                     else:
                         self.logger.info(f"[OK] Documento nuevo registrado: {document_hash[:8]}...")
-                        # Usar el hash de deduplicación como document_id
-                        file_document_id = document_hash
                 else:
                     if dedup_config.warn_when_disabled:
                         self.logger.info(f"[INFO] Deduplicación no aplicable para perfil '{profile_name}' o formato '{Path(file_path).suffix}'")
@@ -654,73 +684,171 @@ class ProfileManager:
                 if dedup_config.warn_when_disabled:
                     self.logger.info(f"[INFO] Deduplicación deshabilitada para modo '{output_mode}'")
         
+        return document_hash, None
+    
+    def process_file(self, 
+                    file_path: str, 
+                    profile_name: str, 
+                    output_file: Optional[str] = None,
+                    encoding: str = 'utf-8',
+                    force_content_type: Optional[str] = None,
+                    confidence_threshold: float = 0.5,
+                    job_config_dict: Optional[Dict[str, Any]] = None,
+                    language_override: Optional[str] = None,
+                    author_override: Optional[str] = None,
+                    output_format: str = "ndjson",
+                    folder_structure_info: Optional[Dict[str, Any]] = None,
+                    output_mode: str = "biblioperson",
+                    streaming: bool = False,
+                    stream_window_pages: int = 20,
+                    metrics: Optional[FileMetrics] = None) -> tuple:
+        """
+        Procesa un archivo completo usando un perfil.
+        
+        Args:
+            file_path: Ruta al archivo a procesar
+            profile_name: Nombre del perfil a usar
+            output_file: Archivo para guardar resultados (opcional)
+            encoding: Codificación para abrir el archivo (por defecto utf-8)
+            force_content_type: Forzar un tipo específico de contenido (ignora detección automática)
+            confidence_threshold: Umbral de confianza para detección de poemas (0.0-1.0)
+            job_config_dict: Diccionario con la configuración del job actual (opcional)
+            language_override: Código de idioma para override (opcional)
+            author_override: Nombre del autor para override (opcional)
+            output_format: Formato de salida ("ndjson" o "json")
+            folder_structure_info: Información sobre la estructura de carpetas del archivo (opcional)
+            output_mode: Modo de salida ("generic" o "biblioperson")
+            streaming: Procesar por ventanas de páginas y escribir los segmentos en NDJSON
+                       a medida que se producen (ver _process_file_streaming)
+            stream_window_pages: Páginas por ventana en modo streaming
+            metrics: Instrumentación por etapas (duraciones, contadores); el llamador
+                     la cierra con ``metrics.finish()``
+            
+        Returns:
+            Tuple con: (Lista de unidades procesadas, Estadísticas del segmentador, Metadatos del documento).
+            En modo streaming la lista va vacía y las estadísticas incluyen 'streamed_segments'.
+        """
+        
+        # [DEBUG] LOGGING DETALLADO PARA DEBUG DE EXPORTACIÓN
+        self.logger.debug("[DEBUG] INICIO process_file - output_file recibido: '%s', output_format: '%s'",
+                          output_file, output_format)
+        
+        if not os.path.exists(file_path):
+            self.logger.error(f"Archivo no encontrado: {file_path}")
+            # Devolver la estructura de tupla esperada por process_file.py
+            return [], {}, {'error': f"Archivo no encontrado: {file_path}"}
+        
+        if metrics is None:
+            metrics = FileMetrics(file_path)
+        
+        if streaming:
+            if output_file and output_format.lower() == "ndjson" and profile_name != "automático":
+                return self._process_file_streaming(
+                    file_path, profile_name, output_file, encoding, force_content_type,
+                    confidence_threshold, job_config_dict, language_override, author_override,
+                    folder_structure_info, output_mode, stream_window_pages, metrics)
+            self.logger.info("Modo streaming no aplicable (requiere salida NDJSON y perfil explícito); usando pipeline completo")
+        
+        if file_path.lower().endswith('.pdf'):
+            # Un único PDFDocumentHandle para detección de perfil, carga y metadatos de autor
+            with shared_pdf_document(file_path):
+                return self._process_file_full(
+                    file_path, profile_name, output_file, encoding, force_content_type,
+                    confidence_threshold, job_config_dict, language_override, author_override,
+                    output_format, folder_structure_info, output_mode, metrics)
+        return self._process_file_full(
+            file_path, profile_name, output_file, encoding, force_content_type,
+            confidence_threshold, job_config_dict, language_override, author_override,
+            output_format, folder_structure_info, output_mode, metrics)
+    
+    def _process_file_full(self,
+                           file_path: str,
+                           profile_name: str,
+                           output_file: Optional[str],
+                           encoding: str,
+                           force_content_type: Optional[str],
+                           confidence_threshold: float,
+                           job_config_dict: Optional[Dict[str, Any]],
+                           language_override: Optional[str],
+                           author_override: Optional[str],
+                           output_format: str,
+                           folder_structure_info: Optional[Dict[str, Any]],
+                           output_mode: str,
+                           metrics: FileMetrics) -> tuple:
+        """Pipeline completo en memoria de process_file (ver su docstring para los argumentos)."""
+        # [CONFIG] GENERAR DOCUMENT_ID ÚNICO PARA TODO EL ARCHIVO
+        # Este ID será compartido por todos los segmentos del mismo archivo
+        file_document_id = None
+        
+        # [CONFIG] SISTEMA DE DEDUPLICACIÓN (opcional y configurable)
+        with metrics.stage('deduplication'):
+            document_hash, duplicate_metadata = self._check_deduplication(file_path, profile_name, output_mode)
+        if duplicate_metadata:
+            return [], {}, duplicate_metadata
+        if document_hash:
+            # Usar el hash de deduplicación como document_id
+            file_document_id = document_hash
+        
         # [DEBUG] DETECCIÓN AUTOMÁTICA DE PERFIL
         if profile_name == "automático":
-            self.logger.info(f"[DEBUG] INICIANDO DETECCIÓN AUTOMÁTICA DE PERFIL: {Path(file_path).name}")
+            with metrics.stage('profile_detection'):
+                self.logger.info(f"[DEBUG] INICIANDO DETECCIÓN AUTOMÁTICA DE PERFIL: {Path(file_path).name}")
             
-            # Para PDFs, extraer contenido preservando estructura original con pymupdf
-            content_sample = None
-            if file_path.lower().endswith('.pdf'):
-                try:
-                    # Usar pymupdf para extraer markdown preservando estructura visual
-                    import fitz  # pymupdf
-                    
-                    self.logger.debug(f"[DEBUG] Extrayendo contenido con pymupdf para preservar estructura original...")
+                # Para PDFs, extraer contenido preservando estructura original con pymupdf
+                content_sample = None
+                if file_path.lower().endswith('.pdf'):
+                    try:
+                        self.logger.debug(f"[DEBUG] Extrayendo contenido con pymupdf para preservar estructura original...")
                     
-                    doc = fitz.open(file_path)
-                    markdown_content = ""
+                        markdown_content = ""
                     
-                    # Extraer las primeras páginas para análisis (suficiente para detección)
-                    max_pages = min(5, len(doc))
+                        with shared_pdf_document(file_path) as pdf_handle:
+                            # Extraer las primeras páginas para análisis (suficiente para detección)
+                            max_pages = min(5, pdf_handle.page_count)
+                            # Extraer como markdown preservando estructura visual
+                            page_markdowns = [pdf_handle.page_markdown(page_num) for page_num in range(max_pages)]
                     
-                    for page_num in range(max_pages):
-                        page = doc.load_page(page_num)
-                        
-                        # Extraer como markdown preservando estructura visual
-                        page_markdown = page.get_text("markdown")
-                        
-                        if page_markdown.strip():
-                            # Verificar corrupción en el contenido de la página
-                            corruption_ratio = self._detect_text_corruption(page_markdown)
+                        for page_num, page_markdown in enumerate(page_markdowns):
+                            if page_markdown.strip():
+                                # Verificar corrupción en el contenido de la página
+                                corruption_ratio = self._detect_text_corruption(page_markdown)
                             
-                            if corruption_ratio > 0.3:
-                                self.logger.debug(f"[SKIP] Saltando página {page_num + 1} (corrupción: {corruption_ratio:.1%})")
-                                continue
+                                if corruption_ratio > 0.3:
+                                    self.logger.debug("[SKIP] Saltando página %d (corrupción: %.1f%%)", page_num + 1, corruption_ratio * 100)
+                                    continue
                             
-                            markdown_content += page_markdown + "\n\n"
-                    
-                    doc.close()
+                                markdown_content += page_markdown + "\n\n"
                     
-                    # Usar el contenido markdown como muestra para detección
-                    content_sample = markdown_content.strip()
+                        # Usar el contenido markdown como muestra para detección
+                        content_sample = markdown_content.strip()
                     
-                    self.logger.debug(f"[DEBUG] Contenido markdown extraído: {len(content_sample)} caracteres")
+                        self.logger.debug(f"[DEBUG] Contenido markdown extraído: {len(content_sample)} caracteres")
                     
-                    # DEBUG: Mostrar muestra del contenido markdown
-                    if content_sample:
-                        lines = content_sample.split('\n')
-                        self.logger.debug(f"[DEBUG] DEBUG MARKDOWN: {len(lines)} líneas totales")
-                        self.logger.debug(f"[DEBUG] DEBUG PRIMERAS 3 LÍNEAS:")
-                        for i, line in enumerate(lines[:3]):
-                            self.logger.debug(f"[DEBUG]   [{i+1}]: '{line}'")
+                        # DEBUG: Mostrar muestra del contenido markdown
+                        if content_sample:
+                            lines = content_sample.split('\n')
+                            self.logger.debug(f"[DEBUG] DEBUG MARKDOWN: {len(lines)} líneas totales")
+                            self.logger.debug(f"[DEBUG] DEBUG PRIMERAS 3 LÍNEAS:")
+                            for i, line in enumerate(lines[:3]):
+                                self.logger.debug(f"[DEBUG]   [{i+1}]: '{line}'")
                     
-                except Exception as e:
-                    self.logger.warning(f"[WARN] Error extrayendo contenido markdown para detección: {str(e)}")
+                    except Exception as e:
+                        self.logger.warning(f"[WARN] Error extrayendo contenido markdown para detección: {str(e)}")
             
-            # Detectar perfil automáticamente
-            try:
-                detected_profile = self.get_profile_for_file(file_path, content_sample)
-                if detected_profile:
-                    profile_name = detected_profile
-                    self.logger.info(f"[OK] PERFIL AUTO-DETECTADO: '{profile_name}' para {Path(file_path).name}")
-                else:
-                    # Fallback a prosa si no se puede detectar
+                # Detectar perfil automáticamente
+                try:
+                    detected_profile = self.get_profile_for_file(file_path, content_sample)
+                    if detected_profile:
+                        profile_name = detected_profile
+                        self.logger.info(f"[OK] PERFIL AUTO-DETECTADO: '{profile_name}' para {Path(file_path).name}")
+                    else:
+                        # Fallback a prosa si no se puede detectar
+                        profile_name = "prosa"
+                        self.logger.warning(f"[WARN] No se pudo detectar perfil, usando fallback: '{profile_name}'")
+                except Exception as e:
+                    self.logger.error(f"[ERROR] Error durante detección automática de perfil: {str(e)}")
                     profile_name = "prosa"
-                    self.logger.warning(f"[WARN] No se pudo detectar perfil, usando fallback: '{profile_name}'")
-            except Exception as e:
-                self.logger.error(f"[ERROR] Error durante detección automática de perfil: {str(e)}")
-                profile_name = "prosa"
-                self.logger.warning(f"[FALLBACK] Usando perfil por defecto: '{profile_name}'")
+                    self.logger.warning(f"[FALLBACK] Usando perfil por defecto: '{profile_name}'")
         
         # 1. Obtener loader apropiado y tipo de contenido
         loader_result = self.get_loader_for_file(file_path, profile_name)
@@ -740,37 +868,15 @@ class ProfileManager:
         try:
             self.logger.info(f"Usando loader: {loader_class.__name__}")
             
-            # Si es JSONLoader y el perfil tiene configuración JSON, usarla
-            loader_kwargs = {'encoding': encoding}
-            if loader_class.__name__ == 'JSONLoader':
-                profile = self.get_profile(profile_name)
-                
-                # [CONFIG] PRIORIDAD: job_config_dict > perfil
-                json_config = None
-                
-                # Primero, intentar obtener configuración del job_config_dict (desde GUI)
-                if job_config_dict and 'json_config' in job_config_dict:
-                    json_config = job_config_dict['json_config']
-                    self.logger.info(f"📱 Aplicando configuración JSON desde GUI: {len(json_config.get('filter_rules', []))} reglas")
-                
-                # Si no hay configuración desde GUI, usar la del perfil
-                elif profile and 'json_config' in profile:
-                    json_config = profile['json_config']
-                    self.logger.info(f"⚙️ Aplicando configuración JSON del perfil: {profile_name}")
-                
-                # Aplicar la configuración JSON encontrada
-                if json_config:
-                    loader_kwargs.update(json_config)
-                    self.logger.debug(f"[CONFIG] Configuración JSON aplicada: {json_config}")
-                else:
-                    self.logger.info(f"📄 JSONLoader sin configuración específica - usando valores por defecto")
-            
-            loader = loader_class(file_path, **loader_kwargs)
-            loaded_data = loader.load()
+            loader_kwargs = self._loader_kwargs(loader_class, encoding, profile_name, job_config_dict)
+            with metrics.stage('load'):
+                loader = loader_class(file_path, **loader_kwargs)
+                loaded_data = loader.load()
             
             # Asegurar que las claves existan, incluso si están vacías
             raw_blocks = loaded_data.get('blocks', [])
             raw_document_metadata = loaded_data.get('document_metadata', {})
+            metrics.count('raw_blocks', len(raw_blocks))
             raw_document_metadata.setdefault('source_file_path', str(Path(file_path).absolute()))
             raw_document_metadata.setdefault('file_format', Path(file_path).suffix.lower())
             raw_document_metadata.setdefault('profile_used', profile_name)
@@ -810,13 +916,13 @@ class ProfileManager:
             profile = self.get_profile(profile_name)
             preprocessor_config = profile.get('pre_processor_config') if profile else None
             
-            # Crear pre-procesador con configuración por defecto que incluye limpieza Unicode
-            from dataset.processing.pre_processors.common_block_preprocessor import CommonBlockPreprocessor
-            common_preprocessor = CommonBlockPreprocessor(config=preprocessor_config)
+            # Pre-procesador (del pool) con configuración por defecto que incluye limpieza Unicode
+            common_preprocessor = self.get_common_preprocessor(preprocessor_config)
             
             try:
                 self.logger.info(f"🧹 Aplicando limpieza de caracteres de control a archivo JSON: {file_path}")
-                processed_blocks, processed_document_metadata = common_preprocessor.process(raw_blocks, raw_document_metadata)
+                with metrics.stage('preprocess'):
+                    processed_blocks, processed_document_metadata = common_preprocessor.process(raw_blocks, raw_document_metadata)
                 self.logger.info(f"[OK] Limpieza completada para JSON: {len(processed_blocks)} bloques procesados")
             except Exception as e:
                 self.logger.error(f"Error durante limpieza de JSON {file_path}: {str(e)}")
@@ -826,82 +932,86 @@ class ProfileManager:
                 processed_document_metadata['preprocessing_error'] = str(e)
             
             # [CONFIG] NUEVO: Detectar idioma también para JSON
-            detected_lang = None
-            if language_override:
-                # Validar código de idioma antes de usarlo
-                if len(language_override.strip()) < 2 or len(language_override.strip()) > 5:
-                    self.logger.warning(f"Código de idioma inválido: '{language_override}' (debe tener 2-5 caracteres). Usando detección automática.")
-                elif any(char.isdigit() or not char.isalnum() for char in language_override.strip() if char != '-'):
-                    self.logger.warning(f"Código de idioma contiene caracteres inválidos: '{language_override}'. Usando detección automática.")
-                else:
-                    detected_lang = language_override.strip().lower()
-                    self.logger.info(f"Usando idioma forzado para JSON {file_path}: {detected_lang}")
+            with metrics.stage('language_detection'):
+                detected_lang = None
+                if language_override:
+                    # Validar código de idioma antes de usarlo
+                    if len(language_override.strip()) < 2 or len(language_override.strip()) > 5:
+                        self.logger.warning(f"Código de idioma inválido: '{language_override}' (debe tener 2-5 caracteres). Usando detección automática.")
+                    elif any(char.isdigit() or not char.isalnum() for char in language_override.strip() if char != '-'):
+                        self.logger.warning(f"Código de idioma contiene caracteres inválidos: '{language_override}'. Usando detección automática.")
+                    else:
+                        detected_lang = language_override.strip().lower()
+                        self.logger.info(f"Usando idioma forzado para JSON {file_path}: {detected_lang}")
             
-            if not detected_lang and processed_blocks:
-                try:
-                    # Concatenar texto de los primeros bloques para obtener una muestra representativa
-                    sample_texts = []
-                    total_chars = 0
-                    max_chars = 1000
-                    max_blocks = 5
+                if not detected_lang and processed_blocks:
+                    try:
+                        # Concatenar texto de los primeros bloques para obtener una muestra representativa
+                        sample_texts = []
+                        total_chars = 0
+                        max_chars = 1000
+                        max_blocks = 5
                     
-                    for i, block in enumerate(processed_blocks[:max_blocks]):
-                        if total_chars >= max_chars:
-                            break
+                        for i, block in enumerate(processed_blocks[:max_blocks]):
+                            if total_chars >= max_chars:
+                                break
                         
-                        block_text = block.get('text', '') if isinstance(block, dict) else str(block)
-                        if block_text.strip():
-                            remaining_chars = max_chars - total_chars
-                            if len(block_text) > remaining_chars:
-                                block_text = block_text[:remaining_chars]
-                            sample_texts.append(block_text.strip())
-                            total_chars += len(block_text)
+                            block_text = block.get('text', '') if isinstance(block, dict) else str(block)
+                            if block_text.strip():
+                                remaining_chars = max_chars - total_chars
+                                if len(block_text) > remaining_chars:
+                                    block_text = block_text[:remaining_chars]
+                                sample_texts.append(block_text.strip())
+                                total_chars += len(block_text)
                     
-                    sample_text = " ".join(sample_texts).strip()
+                        sample_text = " ".join(sample_texts).strip()
                     
-                    # Intentar detectar idioma si hay suficiente texto
-                    if len(sample_text) >= 20:
-                        detected_lang = detect(sample_text)
-                        self.logger.info(f"Idioma detectado automáticamente para JSON {file_path}: {detected_lang}")
-                    else:
-                        detected_lang = "und"
+                        # Intentar detectar idioma si hay suficiente texto
+                        if len(sample_text) >= 20:
+                            detected_lang = detect(sample_text)
+                            self.logger.info(f"Idioma detectado automáticamente para JSON {file_path}: {detected_lang}")
+                        else:
+                            detected_lang = "und"
                         
-                except LangDetectException as e:
-                    self.logger.debug(f"No se pudo detectar idioma para JSON {file_path}: {str(e)}")
-                    detected_lang = "und"
-                except Exception as e:
-                    self.logger.warning(f"Error inesperado durante detección de idioma para JSON {file_path}: {str(e)}")
-                    detected_lang = "und"
-            else:
-                detected_lang = detected_lang or "und"
+                    except LangDetectException as e:
+                        self.logger.debug(f"No se pudo detectar idioma para JSON {file_path}: {str(e)}")
+                        detected_lang = "und"
+                    except Exception as e:
+                        self.logger.warning(f"Error inesperado durante detección de idioma para JSON {file_path}: {str(e)}")
+                        detected_lang = "und"
+                else:
+                    detected_lang = detected_lang or "und"
             
             segments = []
             
-            self.logger.warning(f"[DEBUG] DEBUG: Tenemos {len(processed_blocks)} bloques procesados")
-            if processed_blocks:
-                self.logger.warning(f"[DEBUG] DEBUG: Estructura del primer bloque: {processed_blocks[0]}")
+            self.logger.debug("[DEBUG] Tenemos %d bloques procesados", len(processed_blocks))
+            if processed_blocks and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("[DEBUG] Estructura del primer bloque: %s", processed_blocks[0])
             
-            for i, block in enumerate(processed_blocks):
-                # [CONFIG] USAR FUNCIÓN UNIFICADA: Ahora con detección de idioma
-                block_with_type = block.copy() if isinstance(block, dict) else {'text': str(block)}
-                block_with_type['type'] = 'json_element'
+            with metrics.stage('build_items'):
+                for i, block in enumerate(processed_blocks):
+                    # [CONFIG] USAR FUNCIÓN UNIFICADA: Ahora con detección de idioma
+                    block_with_type = block.copy() if isinstance(block, dict) else {'text': str(block)}
+                    block_with_type['type'] = 'json_element'
                 
-                segment = self._create_processed_content_item(
-                    processed_document_metadata,
-                    block_with_type,
-                    file_path,
-                    language_override,
-                    author_override,
-                    detected_lang,
-                    i,
-                    job_config_dict,
-                    "json_direct_conversion",
-                    None,  # main_document_author_name - no aplicable para JSON directo
-                    None,  # main_author_detection_info - no aplicable para JSON directo
-                    file_document_id  # [CONFIG] CORREGIDO: Pasar file_document_id consistente
-                )
-                segments.append(segment)
+                    segment = self._create_processed_content_item(
+                        processed_document_metadata,
+                        block_with_type,
+                        file_path,
+                        language_override,
+                        author_override,
+                        detected_lang,
+                        i,
+                        job_config_dict,
+                        "json_direct_conversion",
+                        None,  # main_document_author_name - no aplicable para JSON directo
+                        None,  # main_author_detection_info - no aplicable para JSON directo
+                        file_document_id  # [CONFIG] CORREGIDO: Pasar file_document_id consistente
+                    )
+                    segments.append(segment)
             
+            metrics.count('processed_blocks', len(processed_blocks))
+            metrics.count('segments', len(segments))
             segmenter_stats = {
                 'json_elements_processed': len(segments),
                 'processing_method': 'direct_conversion',
@@ -909,26 +1019,24 @@ class ProfileManager:
             }
             
             # Para JSON: retornar directamente sin procesamiento adicional
-            self.logger.info(f"[OK] JSON procesado directamente: {len(segments)} segmentos creados")
+            self.logger.info("[OK] JSON procesado directamente: %d segmentos creados", len(segments))
             
             # [OK] CORREGIDO: Exportar si se especificó ruta de salida
-            self.logger.warning(f"[DEBUG] VERIFICANDO EXPORTACIÓN - output_file: '{output_file}' (tipo: {type(output_file)})")
-            print(f"[DEBUG] VERIFICANDO EXPORTACIÓN - output_file: '{output_file}' (tipo: {type(output_file)})")
+            self.logger.debug("[DEBUG] VERIFICANDO EXPORTACIÓN - output_file: '%s' (tipo: %s)",
+                              output_file, type(output_file))
             
             if output_file:
-                self.logger.warning(f"📤 INICIANDO EXPORTACIÓN - {len(segments)} segmentos JSON a: {output_file}")
-                print(f"📤 INICIANDO EXPORTACIÓN - {len(segments)} segmentos JSON a: {output_file}")
+                self.logger.info("📤 INICIANDO EXPORTACIÓN - %d segmentos JSON a: %s", len(segments), output_file)
+                pipeline_print("📤 INICIANDO EXPORTACIÓN - %d segmentos JSON a: %s", len(segments), output_file)
                 try:
-                    self._export_results(segments, output_file, processed_document_metadata, output_format, output_mode)
-                    self.logger.warning(f"[OK] EXPORTACIÓN JSON COMPLETADA EXITOSAMENTE")
-                    print(f"[OK] EXPORTACIÓN JSON COMPLETADA EXITOSAMENTE")
+                    with metrics.stage('export'):
+                        self._export_results(segments, output_file, processed_document_metadata, output_format, output_mode)
+                    self.logger.info("[OK] EXPORTACIÓN JSON COMPLETADA EXITOSAMENTE")
                 except Exception as e:
-                    self.logger.error(f"❌ ERROR EN EXPORTACIÓN JSON: {str(e)}")
-                    print(f"❌ ERROR EN EXPORTACIÓN JSON: {str(e)}")
+                    self.logger.error("❌ ERROR EN EXPORTACIÓN JSON: %s", e)
                     self.logger.exception("Detalles del error de exportación:")
             else:
-                self.logger.warning(f"[WARN] NO SE EXPORTARÁ - output_file es None o vacío")
-                print(f"[WARN] NO SE EXPORTARÁ - output_file es None o vacío")
+                self.logger.warning("[WARN] NO SE EXPORTARÁ - output_file es None o vacío")
             
             return segments, segmenter_stats, processed_document_metadata
             
@@ -936,23 +1044,18 @@ class ProfileManager:
             # Para otros archivos: usar CommonBlockPreprocessor normalmente
             profile = self.get_profile(profile_name)  # Obtener perfil para configuración del preprocessor
             preprocessor_config = profile.get('pre_processor_config') if profile else None
-            self.logger.warning(f"💥 CONFIG PARA CREAR PREPROCESSOR: {preprocessor_config}")
-            print(f"💥 CONFIG PARA CREAR PREPROCESSOR: {preprocessor_config}")
+            self.logger.debug("💥 CONFIG PARA CREAR PREPROCESSOR: %s", preprocessor_config)
             
-            # FORZAR RECARGA DE COMMONBLOCKPREPROCESSOR PARA EVITAR CACHE
-            import importlib
-            import dataset.processing.pre_processors.common_block_preprocessor
-            importlib.reload(dataset.processing.pre_processors.common_block_preprocessor)
-            from dataset.processing.pre_processors.common_block_preprocessor import CommonBlockPreprocessor
-            
-            common_preprocessor = CommonBlockPreprocessor(config=preprocessor_config)
+            common_preprocessor = self.get_common_preprocessor(preprocessor_config)
             
             try:
                 # Debug: verificar que el hash esté presente antes del preprocessor
                 hash_before_preprocessor = raw_document_metadata.get("hash_documento_original")
                 self.logger.debug(f"hash_documento_original antes del preprocessor: '{hash_before_preprocessor}' (tipo: {type(hash_before_preprocessor)})")
                 self.logger.info(f"Aplicando CommonBlockPreprocessor a {len(raw_blocks)} bloques.")
-                processed_blocks, processed_document_metadata = common_preprocessor.process(raw_blocks, raw_document_metadata)
+                with metrics.stage('preprocess'):
+                    processed_blocks, processed_document_metadata = common_preprocessor.process(raw_blocks, raw_document_metadata)
+                metrics.count('processed_blocks', len(processed_blocks))
                 self.logger.debug(f"CommonBlockPreprocessor finalizado. Bloques resultantes: {len(processed_blocks)}.")
                 # Debug: verificar que el hash se preserve después del preprocessor
                 hash_after_preprocessor = processed_document_metadata.get("hash_documento_original")
@@ -973,55 +1076,9 @@ class ProfileManager:
                 return [], {}, processed_document_metadata
                 
             # 2.5. Detectar autor principal del documento usando EnhancedContextualAuthorDetector
-            main_document_author_name = None
-            main_author_detection_info = {}
-            
-            try:
-                self.logger.info(f"Detectando autor principal del documento: {file_path}")
-                
-                # Determinar profile_type basado en profile_name
-                profile_type = 'poetry' if 'verso' in profile_name.lower() else 'prose'
-                
-                # Llamar a la función de detección de autor
-                author_detection_result = detect_author_in_segments(
-                    segments=processed_blocks,
-                    profile_type=profile_type,
-                    document_title=processed_document_metadata.get('titulo_documento', ''),
-                    source_file_path=str(file_path)
-                )
-                
-                if author_detection_result and author_detection_result.get('name'):
-                    main_document_author_name = author_detection_result['name']
-                    main_author_detection_info = {
-                        'confidence': author_detection_result.get('confidence', 0.0),
-                        'method': author_detection_result.get('method', 'unknown'),
-                        'source': author_detection_result.get('source', 'enhanced_contextual')
-                    }
-                    # Log prominente para mostrar autor detectado por documento
-                    filename = Path(file_path).name
-                    confidence_pct = main_author_detection_info['confidence'] * 100
-                    self.logger.info(f"[TARGET] ===== AUTOR DETECTADO AUTOMÁTICAMENTE =====")
-                    self.logger.info(f"📄 Documento: {filename}")
-                    self.logger.info(f"✍️  Autor: {main_document_author_name}")
-                    self.logger.info(f"📊 Confianza: {confidence_pct:.1f}% ({main_author_detection_info['confidence']:.3f})")
-                    self.logger.info(f"[DEBUG] Método: {main_author_detection_info['method']}")
-                    self.logger.info(f"[TARGET] ============================================")
-                    self.logger.info(f"")
-                    # --- COPIAR INMEDIATAMENTE A processed_document_metadata ---
-                    processed_document_metadata['author'] = main_document_author_name
-                    processed_document_metadata['author_confidence'] = main_author_detection_info.get('confidence', 0.0)
-                    processed_document_metadata['author_detection_method'] = main_author_detection_info.get('method', 'unknown')
-                    processed_document_metadata['author_detection_source'] = main_author_detection_info.get('source', 'enhanced_contextual')
-                else:
-                    filename = Path(file_path).name
-                    self.logger.warning(f"❌ No se pudo detectar autor automáticamente para: {filename}")
-                    main_document_author_name = None
-                    
-            except Exception as e:
-                filename = Path(file_path).name
-                self.logger.error(f"❌ Error durante detección de autor automático para {filename}: {str(e)}")
-                main_document_author_name = None
-                main_author_detection_info = {'error': str(e)}
+            with metrics.stage('author_detection'):
+                main_document_author_name, main_author_detection_info = self._detect_main_author(
+                    processed_blocks, processed_document_metadata, profile_name, file_path)
                 
             # 3. Crear segmentador según perfil
             profile = self.get_profile(profile_name) # Recargar perfil por si se modificó
@@ -1042,7 +1099,8 @@ class ProfileManager:
             self.logger.info(f"Segmentando archivo: {file_path} con {len(processed_blocks)} bloques pre-procesados.")
             
             # Para otros archivos: usar segmentador normalmente
-            segments = segmenter.segment(blocks=processed_blocks)
+            with metrics.stage('segmentation'):
+                segments = segmenter.segment(blocks=processed_blocks)
             segmenter_stats = segmenter.get_stats() if hasattr(segmenter, 'get_stats') else {}
             
             # NUEVO: Implementar fallback verso → prosa si no hay segmentos
@@ -1053,7 +1111,8 @@ class ProfileManager:
                 # Crear segmentador de prosa
                 prosa_segmenter = self.create_segmenter('prosa', file_path)
                 if prosa_segmenter:
-                    segments = prosa_segmenter.segment(blocks=processed_blocks)
+                    with metrics.stage('segmentation'):
+                        segments = prosa_segmenter.segment(blocks=processed_blocks)
                     segmenter_stats = prosa_segmenter.get_stats() if hasattr(prosa_segmenter, 'get_stats') else {}
                     
                     # Actualizar el nombre del segmentador usado
@@ -1065,6 +1124,363 @@ class ProfileManager:
                     self.logger.error(f"❌ No se pudo crear segmentador de prosa para fallback")
         
         # 4.1. Detectar idioma del documento (o usar override)
+        with metrics.stage('language_detection'):
+            detected_lang = self._detect_document_language(processed_blocks, language_override, file_path)
+        
+        # 4.5. Transformar segmentos (diccionarios) en instancias de ProcessedContentItem
+        processed_content_items: List[ProcessedContentItem] = []
+        if segments:
+            # Log de debug para verificar el idioma detectado antes del bucle
+            if detected_lang:
+                self.logger.debug(f"Idioma detectado disponible para asignación: '{detected_lang}'")
+            else:
+                self.logger.debug(f"No se detectó idioma válido, detected_lang = {detected_lang}")
+            
+            # Log de debug para verificar las claves disponibles en processed_document_metadata
+            self.logger.debug(f"Claves disponibles en processed_document_metadata: {list(processed_document_metadata.keys())}")
+
+            with metrics.stage('build_items'):
+                for i, segment_dict in enumerate(segments):
+                    # [CONFIG] USAR FUNCIÓN UNIFICADA para archivos no-JSON también
+                    item = self._create_processed_content_item(
+                        processed_document_metadata,
+                        segment_dict,
+                        file_path,
+                        language_override,
+                        author_override,
+                        detected_lang,
+                        i,
+                        job_config_dict,
+                        profile.get('_actual_segmenter', profile.get('segmenter', 'desconocido')) if profile else 'desconocido',
+                        main_document_author_name,
+                        main_author_detection_info,
+                        file_document_id  # [CONFIG] CORREGIDO: Pasar file_document_id consistente
+                    )
+                
+                    processed_content_items.append(item)
+        else: 
+            # Si no hay segmentos del segmentador, processed_content_items quedará vacía
+            pass
+        metrics.count('segments', len(processed_content_items))
+        
+        # 5. TODO: Aplicar post-procesador si está configurado
+        
+        # 6. Agregar información del autor detectado al processed_document_metadata para la UI
+        if main_document_author_name:
+            processed_document_metadata['author'] = main_document_author_name
+            processed_document_metadata['author_confidence'] = main_author_detection_info.get('confidence', 0.0) if main_author_detection_info else 0.0
+            processed_document_metadata['author_detection_method'] = main_author_detection_info.get('method', 'unknown') if main_author_detection_info else 'unknown'
+            processed_document_metadata['author_detection_source'] = main_author_detection_info.get('source', 'enhanced_contextual') if main_author_detection_info else 'unknown'
+        
+        # 7. Exportar si se especificó ruta de salida
+        # Usar processed_document_metadata para la parte de metadatos del documento
+        # y processed_content_items para los segmentos.
+        if output_file: # [OK] CORREGIDO: output_file es la ruta del archivo de salida
+            # El primer if es para si manager.process_file devolvió segmentos (ahora processed_content_items)
+            if processed_content_items:
+                with metrics.stage('export'):
+                    self._export_results(processed_content_items, output_file, processed_document_metadata, output_format, output_mode)
+            # El segundo elif es para cuando no hubo segmentos (lista vacía) pero SÍ hay un output_path
+            # y queremos exportar los metadatos del documento (que pueden contener un error o advertencia).
+            elif not processed_content_items: 
+                self.logger.info(f"No se generaron ProcessedContentItems para {file_path}, pero se exportarán metadatos a {output_file}")
+                with metrics.stage('export'):
+                    self._export_results([], output_file, processed_document_metadata, output_format, output_mode)
+
+        # Devolver la tupla completa como espera process_file.py, usando la nueva lista de dataclasses
+        return processed_content_items, segmenter_stats, processed_document_metadata
+    
+    def _loader_kwargs(self, loader_class, encoding: str, profile_name: str,
+                       job_config_dict: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Argumentos del loader; para JSONLoader incluye la configuración JSON del job o del perfil."""
+        # Si es JSONLoader y el perfil tiene configuración JSON, usarla
+        loader_kwargs = {'encoding': encoding}
+        if loader_class.__name__ == 'JSONLoader':
+            profile = self.get_profile(profile_name)
+            
+            # [CONFIG] PRIORIDAD: job_config_dict > perfil
+            json_config = None
+            
+            # Primero, intentar obtener configuración del job_config_dict (desde GUI)
+            if job_config_dict and 'json_config' in job_config_dict:
+                json_config = job_config_dict['json_config']
+                self.logger.info(f"📱 Aplicando configuración JSON desde GUI: {len(json_config.get('filter_rules', []))} reglas")
+            
+            # Si no hay configuración desde GUI, usar la del perfil
+            elif profile and 'json_config' in profile:
+                json_config = profile['json_config']
+                self.logger.info(f"⚙️ Aplicando configuración JSON del perfil: {profile_name}")
+            
+            # Aplicar la configuración JSON encontrada
+            if json_config:
+                loader_kwargs.update(json_config)
+                self.logger.debug(f"[CONFIG] Configuración JSON aplicada: {json_config}")
+            else:
+                self.logger.info(f"📄 JSONLoader sin configuración específica - usando valores por defecto")
+        return loader_kwargs
+
+    def _process_file_streaming(self,
+                                file_path: str,
+                                profile_name: str,
+                                output_file: str,
+                                encoding: str,
+                                force_content_type: Optional[str],
+                                confidence_threshold: float,
+                                job_config_dict: Optional[Dict[str, Any]],
+                                language_override: Optional[str],
+                                author_override: Optional[str],
+                                folder_structure_info: Optional[Dict[str, Any]],
+                                output_mode: str,
+                                window_pages: int,
+                                metrics: FileMetrics) -> tuple:
+        """
+        Pipeline en streaming: loader → pre-procesador → segmentador → NDJSON por ventanas.
+        
+        El loader entrega lotes de bloques (ventanas de ``window_pages`` páginas en PDFs);
+        cada ventana se pre-procesa, se segmenta y sus segmentos se escriben al archivo
+        en cuanto se producen, así que la memoria queda acotada por la ventana y no por
+        el documento. Autor e idioma se detectan sobre la primera ventana con contenido.
+        Los segmentos no cruzan fronteras de ventana.
+        
+        Los JSON se leen con ijson en lotes de objetos (JSONLoader.load_streaming) y,
+        como en el pipeline completo, cada bloque se convierte directamente en una
+        unidad sin segmentador ni detección de autor.
+        
+        Returns:
+            Tuple con ([], estadísticas del segmentador + 'streamed_segments', metadatos del documento)
+        """
+        loader_result = self.get_loader_for_file(file_path, profile_name)
+        if not loader_result:
+            return [], {}, {'error': f"No se pudo obtener el loader para: {file_path}"}
+        loader_class, _ = loader_result
+        
+        is_json = file_path.lower().endswith('.json')
+        try:
+            loader = loader_class(file_path, **self._loader_kwargs(loader_class, encoding, profile_name, job_config_dict))
+            if not hasattr(loader, 'load_streaming'):
+                self.logger.info(f"{loader_class.__name__} no soporta streaming; usando pipeline completo")
+                return self.process_file(file_path, profile_name, output_file, encoding, force_content_type,
+                                         confidence_threshold, job_config_dict, language_override, author_override,
+                                         "ndjson", folder_structure_info, output_mode, metrics=metrics)
+            with metrics.stage('load'):
+                loaded_data = loader.load_streaming(batch_pages=window_pages)
+                block_batches = loaded_data['block_batches']
+                first_batch = next(block_batches, [])
+        except Exception as e:
+            self.logger.error(f"Excepción al cargar en streaming con {loader_class.__name__} el archivo {file_path}: {str(e)}", exc_info=True)
+            return [], {}, {
+                'source_file_path': str(Path(file_path).absolute()),
+                'file_format': Path(file_path).suffix.lower(),
+                'error': f"Excepción en ProfileManager durante la carga con loader: {str(e)}"
+            }
+        
+        # Un PDF escaneado apenas produce bloques en su primera ventana: la decisión de OCR
+        # necesita el documento completo, así que se delega en el pipeline tradicional.
+        if file_path.lower().endswith('.pdf') and len(first_batch) <= 3:
+            self.logger.info(f"Primera ventana casi vacía ({len(first_batch)} bloques); usando pipeline completo con evaluación de OCR")
+            block_batches.close()
+            return self.process_file(file_path, profile_name, output_file, encoding, force_content_type,
+                                     confidence_threshold, job_config_dict, language_override, author_override,
+                                     "ndjson", folder_structure_info, output_mode, metrics=metrics)
+        
+        with metrics.stage('deduplication'):
+            document_hash, duplicate_metadata = self._check_deduplication(file_path, profile_name, output_mode)
+        if duplicate_metadata:
+            block_batches.close()
+            return [], {}, duplicate_metadata
+        file_document_id = document_hash
+        
+        document_metadata = loaded_data.get('document_metadata', {})
+        document_metadata.setdefault('source_file_path', str(Path(file_path).absolute()))
+        document_metadata.setdefault('file_format', Path(file_path).suffix.lower())
+        document_metadata.setdefault('profile_used', profile_name)
+        if document_hash:
+            document_metadata['document_hash'] = document_hash
+        if folder_structure_info:
+            document_metadata['folder_structure'] = folder_structure_info
+        if document_metadata.get('error'):
+            block_batches.close()
+            return [], {}, document_metadata
+        
+        profile = self.get_profile(profile_name)
+        preprocessor_config = profile.get('pre_processor_config') if profile else None
+        common_preprocessor = self.get_common_preprocessor(preprocessor_config)
+        segmenter = None if is_json else self.create_segmenter(profile_name, file_path)
+        if not segmenter and not is_json:
+            block_batches.close()
+            document_metadata['error'] = f"No se pudo crear el segmentador '{profile.get('segmenter') if profile else 'desconocido'}' para el perfil '{profile_name}'"
+            return [], {}, document_metadata
+        if hasattr(segmenter, 'set_confidence_threshold'):
+            segmenter.set_confidence_threshold(confidence_threshold)
+        prosa_segmenter = None
+        segmenter_name = profile.get('segmenter', 'desconocido') if profile else 'desconocido'
+        if is_json:
+            segmenter_name = "json_direct_conversion"
+        
+        main_document_author_name = None
+        main_author_detection_info = {}
+        detected_lang = None
+        analysis_done = False
+        windows_processed = 0
+        corrupted_segments_count = 0
+        
+        if create_serializer:
+            writer = create_serializer(output_mode).open_stream(output_file, document_metadata)
+        else:
+            writer = _FallbackSegmentWriter(self, output_file)
+        
+        with writer:
+            # Las ventanas se cargan de forma perezosa: cada next() del loader cuenta como 'load'
+            for raw_blocks in itertools.chain([first_batch], metrics.timed_iter('load', block_batches)):
+                if not raw_blocks:
+                    continue
+                windows_processed += 1
+                metrics.count('raw_blocks', len(raw_blocks))
+                try:
+                    with metrics.stage('preprocess'):
+                        processed_blocks, document_metadata = common_preprocessor.process(raw_blocks, document_metadata)
+                except Exception as e:
+                    self.logger.error(f"Excepción durante CommonBlockPreprocessor (ventana {windows_processed}) para {file_path}: {str(e)}", exc_info=True)
+                    document_metadata['error'] = f"Excepción en CommonBlockPreprocessor: {str(e)}"
+                    # La salida quedaría truncada: no se publica
+                    writer.discard()
+                    break
+                if not processed_blocks:
+                    continue
+                metrics.count('processed_blocks', len(processed_blocks))
+                
+                if not analysis_done:
+                    if not is_json:
+                        with metrics.stage('author_detection'):
+                            main_document_author_name, main_author_detection_info = self._detect_main_author(
+                                processed_blocks, document_metadata, profile_name, file_path)
+                    with metrics.stage('language_detection'):
+                        detected_lang = self._detect_document_language(processed_blocks, language_override, file_path)
+                    analysis_done = True
+                
+                with metrics.stage('segmentation'):
+                    if is_json:
+                        segments = [dict(block, type='json_element') for block in processed_blocks]
+                    else:
+                        segments = segmenter.segment(blocks=processed_blocks)
+                    if profile_name == 'verso' and not segments and not is_json:
+                        # Mismo fallback verso → prosa que el pipeline completo, aplicado por ventana
+                        if prosa_segmenter is None:
+                            prosa_segmenter = self.create_segmenter('prosa', file_path)
+                        if prosa_segmenter:
+                            segments = prosa_segmenter.segment(blocks=processed_blocks)
+                            segmenter_name = 'prosa_fallback'
+                
+                # En streaming la construcción de unidades incluye su escritura en el NDJSON
+                with metrics.stage('build_items'):
+                    for segment_dict in segments:
+                        item = self._create_processed_content_item(
+                            document_metadata,
+                            segment_dict,
+                            file_path,
+                            language_override,
+                            author_override,
+                            detected_lang,
+                            writer.segments_written,
+                            job_config_dict,
+                            segmenter_name,
+                            main_document_author_name,
+                            main_author_detection_info,
+                            file_document_id
+                        )
+                        item, was_corrupted = self._replace_corrupted_segment(item, writer.segments_written)
+                        if was_corrupted:
+                            corrupted_segments_count += 1
+                        writer.write(item)
+        
+        if document_metadata.get('error'):
+            return [], {}, document_metadata
+        
+        if corrupted_segments_count > 0:
+            self.logger.warning(f"🚨 RESUMEN DE CORRUPCIÓN: {corrupted_segments_count}/{writer.segments_written} segmentos tenían corrupción extrema y fueron reemplazados")
+        self.logger.info(f"Streaming completado para {file_path}: {windows_processed} ventanas, {writer.segments_written} segmentos escritos en {output_file}")
+        
+        if is_json:
+            segmenter_stats = {
+                'json_elements_processed': writer.segments_written,
+                'processing_method': 'direct_conversion',
+                'bypassed_segmenter': True
+            }
+        else:
+            segmenter_stats = dict(segmenter.get_stats() if hasattr(segmenter, 'get_stats') else {})
+        segmenter_stats['streamed_segments'] = writer.segments_written
+        segmenter_stats['stream_windows'] = windows_processed
+        metrics.count('segments', writer.segments_written)
+        metrics.count('stream_windows', windows_processed)
+        return [], segmenter_stats, document_metadata
+    
+    def _detect_main_author(self, processed_blocks: List[Dict[str, Any]], processed_document_metadata: Dict[str, Any],
+                            profile_name: str, file_path: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Detecta el autor principal del documento y lo copia a ``processed_document_metadata``.
+        
+        Returns:
+            Tuple con (nombre del autor o None, información de la detección)
+        """
+        main_document_author_name = None
+        main_author_detection_info = {}
+        
+        try:
+            self.logger.info(f"Detectando autor principal del documento: {file_path}")
+            
+            # Determinar profile_type basado en profile_name
+            profile_type = 'poetry' if 'verso' in profile_name.lower() else 'prose'
+            
+            # Detección de autor con el motor reutilizable
+            author_detection_result = self.author_detection_engine.detect(
+                segments=processed_blocks,
+                profile_type=profile_type,
+                document_title=processed_document_metadata.get('titulo_documento', ''),
+                source_file_path=str(file_path)
+            )
+            
+            if author_detection_result and author_detection_result.get('name'):
+                main_document_author_name = author_detection_result['name']
+                main_author_detection_info = {
+                    'confidence': author_detection_result.get('confidence', 0.0),
+                    'method': author_detection_result.get('method', 'unknown'),
+                    'source': author_detection_result.get('source', 'enhanced_contextual')
+                }
+                # Log prominente para mostrar autor detectado por documento
+                filename = Path(file_path).name
+                confidence_pct = main_author_detection_info['confidence'] * 100
+                self.logger.info(f"[TARGET] ===== AUTOR DETECTADO AUTOMÁTICAMENTE =====")
+                self.logger.info(f"📄 Documento: {filename}")
+                self.logger.info(f"✍️  Autor: {main_document_author_name}")
+                self.logger.info(f"📊 Confianza: {confidence_pct:.1f}% ({main_author_detection_info['confidence']:.3f})")
+                self.logger.info(f"[DEBUG] Método: {main_author_detection_info['method']}")
+                self.logger.info(f"[TARGET] ============================================")
+                self.logger.info(f"")
+                # --- COPIAR INMEDIATAMENTE A processed_document_metadata ---
+                processed_document_metadata['author'] = main_document_author_name
+                processed_document_metadata['author_confidence'] = main_author_detection_info.get('confidence', 0.0)
+                processed_document_metadata['author_detection_method'] = main_author_detection_info.get('method', 'unknown')
+                processed_document_metadata['author_detection_source'] = main_author_detection_info.get('source', 'enhanced_contextual')
+            else:
+                filename = Path(file_path).name
+                self.logger.warning(f"❌ No se pudo detectar autor automáticamente para: {filename}")
+                main_document_author_name = None
+                
+        except Exception as e:
+            filename = Path(file_path).name
+            self.logger.error(f"❌ Error durante detección de autor automático para {filename}: {str(e)}")
+            main_document_author_name = None
+            main_author_detection_info = {'error': str(e)}
+        
+        return main_document_author_name, main_author_detection_info
+    
+    def _detect_document_language(self, processed_blocks: List[Dict[str, Any]], language_override: Optional[str], file_path: str) -> Optional[str]:
+        """
+        Detecta el idioma del documento a partir de una muestra de los primeros bloques (o usa el override).
+        
+        Returns:
+            Código de idioma detectado, "und" si no se pudo determinar, o None si el override es inválido
+        """
         detected_lang = None
         if language_override:
             # Validar código de idioma antes de usarlo
@@ -1123,64 +1539,8 @@ class ProfileManager:
             self.logger.debug(f"No hay bloques procesados para detectar idioma en {file_path}")
             detected_lang = "und"
         
-        # 4.5. Transformar segmentos (diccionarios) en instancias de ProcessedContentItem
-        processed_content_items: List[ProcessedContentItem] = []
-        if segments:
-            # Log de debug para verificar el idioma detectado antes del bucle
-            if detected_lang:
-                self.logger.debug(f"Idioma detectado disponible para asignación: '{detected_lang}'")
-            else:
-                self.logger.debug(f"No se detectó idioma válido, detected_lang = {detected_lang}")
-            
-            # Log de debug para verificar las claves disponibles en processed_document_metadata
-            self.logger.debug(f"Claves disponibles en processed_document_metadata: {list(processed_document_metadata.keys())}")
-
-            for i, segment_dict in enumerate(segments):
-                # [CONFIG] USAR FUNCIÓN UNIFICADA para archivos no-JSON también
-                item = self._create_processed_content_item(
-                    processed_document_metadata,
-                    segment_dict,
-                    file_path,
-                    language_override,
-                    author_override,
-                    detected_lang,
-                    i,
-                    job_config_dict,
-                    profile.get('_actual_segmenter', profile.get('segmenter', 'desconocido')) if profile else 'desconocido',
-                    main_document_author_name,
-                    main_author_detection_info,
-                    file_document_id  # [CONFIG] CORREGIDO: Pasar file_document_id consistente
-                )
-                
-                processed_content_items.append(item)
-        else: 
-            # Si no hay segmentos del segmentador, processed_content_items quedará vacía
-            pass
         
-        # 5. TODO: Aplicar post-procesador si está configurado
-        
-        # 6. Agregar información del autor detectado al processed_document_metadata para la UI
-        if main_document_author_name:
-            processed_document_metadata['author'] = main_document_author_name
-            processed_document_metadata['author_confidence'] = main_author_detection_info.get('confidence', 0.0) if main_author_detection_info else 0.0
-            processed_document_metadata['author_detection_method'] = main_author_detection_info.get('method', 'unknown') if main_author_detection_info else 'unknown'
-            processed_document_metadata['author_detection_source'] = main_author_detection_info.get('source', 'enhanced_contextual') if main_author_detection_info else 'unknown'
-        
-        # 7. Exportar si se especificó ruta de salida
-        # Usar processed_document_metadata para la parte de metadatos del documento
-        # y processed_content_items para los segmentos.
-        if output_file: # [OK] CORREGIDO: output_file es la ruta del archivo de salida
-            # El primer if es para si manager.process_file devolvió segmentos (ahora processed_content_items)
-            if processed_content_items:
-                self._export_results(processed_content_items, output_file, processed_document_metadata, output_format, output_mode)
-            # El segundo elif es para cuando no hubo segmentos (lista vacía) pero SÍ hay un output_path
-            # y queremos exportar los metadatos del documento (que pueden contener un error o advertencia).
-            elif not processed_content_items: 
-                self.logger.info(f"No se generaron ProcessedContentItems para {file_path}, pero se exportarán metadatos a {output_file}")
-                self._export_results([], output_file, processed_document_metadata, output_format, output_mode)
-
-        # Devolver la tupla completa como espera process_file.py, usando la nueva lista de dataclasses
-        return processed_content_items, segmenter_stats, processed_document_metadata
+        return detected_lang
     
     def _detect_text_corruption(self, text: str) -> float:
         """
@@ -1195,30 +1555,8 @@ class ProfileManager:
         if not text or len(text) < 10:
             return 0.0
         
-        # Contar caracteres duplicados consecutivos
-        duplicated_chars = 0
-        total_chars = len(text)
-        
-        i = 0
-        while i < len(text) - 1:
-            if text[i] == text[i + 1] and text[i].isalpha():
-                # Encontrar cuántos caracteres consecutivos son iguales
-                consecutive_count = 1
-                j = i + 1
-                while j < len(text) and text[j] == text[i]:
-                    consecutive_count += 1
-                    j += 1
-                
-                # Si hay más de 1 carácter consecutivo igual, es probable corrupción
-                if consecutive_count > 1:
-                    duplicated_chars += consecutive_count - 1  # Solo contar los extras
-                
-                i = j
-            else:
-                i += 1
-        
-        corruption_ratio = duplicated_chars / total_chars if total_chars > 0 else 0.0
-        return corruption_ratio
+        # Letras repetidas consecutivas (solo se cuentan las repeticiones extra)
+        return duplicated_char_ratio(text)
 
     def _detect_extreme_corruption(self, text: str, corruption_threshold: float = 0.7) -> Tuple[bool, str]:
         """
@@ -1238,12 +1576,12 @@ class ProfileManager:
         total_chars = len(text)
         
         # Contar caracteres problemáticos
-        control_chars = sum(1 for c in text if ord(c) < 32 and c not in ['\n', '\r', '\t'])
+        control_chars = count_control_characters(text)
         replacement_chars = text.count('�')  # Caracteres de reemplazo Unicode
         null_chars = text.count('\x00')
         
         # Contar secuencias repetitivas de caracteres extraños (solo contar si son significativas)
-        weird_pattern_matches = re.findall(r'[^\w\s\.,;:!?¡¿\-\(\)\[\]"\'áéíóúñüÁÉÍÓÚÑÜ]+', text)
+        weird_pattern_matches = _WEIRD_SEQUENCE_RE.findall(text)
         weird_patterns = sum(len(match) for match in weird_pattern_matches if len(match) >= 3)
         
         # Calcular porcentaje de corrupción
@@ -1251,13 +1589,7 @@ class ProfileManager:
         corruption_ratio = corrupted_chars / total_chars if total_chars > 0 else 0
         
         # Detectar patrones específicos de corrupción extrema
-        extreme_patterns = [
-            r'�{10,}',  # 10 o más caracteres de reemplazo consecutivos
-            r'[\x00-\x08\x0B\x0C\x0E-\x1F]{5,}',  # 5 o más caracteres de control consecutivos
-            r'^[\s�\x00-\x1F]*$',  # Solo espacios, caracteres de reemplazo y control
-        ]
-        
-        has_extreme_pattern = any(re.search(pattern, text) for pattern in extreme_patterns)
+        has_extreme_pattern = any(pattern.search(text) for pattern in _EXTREME_CORRUPTION_PATTERNS)
         
         # Determinar si está extremadamente corrupto (MUCHO MÁS RESTRICTIVO)
         is_extremely_corrupted = (
@@ -1280,22 +1612,8 @@ class ProfileManager:
         Remueve o reemplaza caracteres de control que pueden causar errores de JSON.
         """
         if isinstance(obj, str):
-            # Limpiar caracteres de control problemáticos para JSON
-            import re
-            # Remover caracteres de control ASCII (0x00-0x1F) excepto \n, \r, \t
-            cleaned = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F]', ' ', obj)
-            # Remover caracteres de control extendidos (0x7F-0x9F)
-            cleaned = re.sub(r'[\x7F-\x9F]', ' ', cleaned)
-            # Remover caracteres Unicode problemáticos para JSON
-            cleaned = re.sub(r'[\uFEFF\u200B-\u200F\u2028\u2029]', ' ', cleaned)
-            # Filtrar cualquier carácter que no sea seguro para JSON
-            safe_chars = []
-            for char in cleaned:
-                if (ord(char) >= 32 and ord(char) != 127) or char in '\n\r\t':
-                    safe_chars.append(char)
-                else:
-                    safe_chars.append(' ')
-            return ''.join(safe_chars).strip()
+            # Caracteres de control e invisibles problemáticos para JSON → espacio
+            return to_json_safe(obj).strip()
         elif isinstance(obj, dict):
             return {key: self._clean_for_json_serialization(value) for key, value in obj.items()}
         elif isinstance(obj, list):
@@ -1303,6 +1621,73 @@ class ProfileManager:
         else:
             return obj
 
+    def _replace_corrupted_segment(self, segment: Any, i: int) -> Tuple[Any, bool]:
+        """
+        Sustituye el texto de un segmento con corrupción extrema por un aviso explicativo.
+        
+        Args:
+            segment: Segmento (ProcessedContentItem nuevo/viejo o diccionario)
+            i: Índice del segmento en el documento
+            
+        Returns:
+            Tuple con (segmento resultante, True si estaba corrupto)
+        """
+        # Extraer texto para verificación de corrupción
+        if hasattr(segment, 'text'):
+            segment_text = segment.text
+        elif hasattr(segment, 'texto_segmento'):
+            segment_text = segment.texto_segmento
+        else:
+            segment_text = segment.get('text', '') if isinstance(segment, dict) else str(segment)
+        
+        # [CONFIG] DETECTAR Y MANEJAR CORRUPCIÓN EXTREMA
+        is_corrupted, corruption_reason = self._detect_extreme_corruption(segment_text)
+        
+        if is_corrupted:
+            # Crear copia del segmento con texto corregido
+            if hasattr(segment, 'text'):
+                # ProcessedContentItem nuevo
+                corrected_segment = segment
+                corrected_segment.text = f"[CORRUPTED TEXT IN SOURCE FILE]\n\nSegment #{i+1} contains extremely corrupted text that cannot be processed correctly.\n\nReason: {corruption_reason}\n\nRecommendation: Review original PDF or try advanced OCR."
+                corrected_segment.text_length = len(corrected_segment.text)
+            
+                # Añadir información de corrupción a metadatos
+                if not corrected_segment.additional_metadata:
+                    corrected_segment.additional_metadata = {}
+                corrected_segment.additional_metadata["corruption_detected"] = True
+                corrected_segment.additional_metadata["corruption_reason"] = corruption_reason
+                corrected_segment.additional_metadata["original_text_length"] = len(segment_text)
+                
+            elif hasattr(segment, 'texto_segmento'):
+                # ProcessedContentItem viejo
+                corrected_segment = segment
+                corrected_segment.texto_segmento = f"[CORRUPTED TEXT IN SOURCE FILE]\n\nSegment #{i+1} contains extremely corrupted text that cannot be processed correctly.\n\nReason: {corruption_reason}\n\nRecommendation: Review original PDF or try advanced OCR."
+                corrected_segment.longitud_caracteres_segmento = len(corrected_segment.texto_segmento)
+            
+                # Añadir información de corrupción a metadatos
+                if not corrected_segment.metadatos_adicionales_fuente:
+                    corrected_segment.metadatos_adicionales_fuente = {}
+                corrected_segment.metadatos_adicionales_fuente["corruption_detected"] = True
+                corrected_segment.metadatos_adicionales_fuente["corruption_reason"] = corruption_reason
+                corrected_segment.metadatos_adicionales_fuente["original_text_length"] = len(segment_text)
+        
+            else:
+                # Diccionario
+                corrected_segment = segment.copy() if isinstance(segment, dict) else {"text": str(segment)}
+                corrected_segment["text"] = f"[CORRUPTED TEXT IN SOURCE FILE]\n\nSegment #{i+1} contains extremely corrupted text that cannot be processed correctly.\n\nReason: {corruption_reason}\n\nRecommendation: Review original PDF or try advanced OCR."
+                
+                if "metadata" not in corrected_segment:
+                    corrected_segment["metadata"] = {}
+                corrected_segment["metadata"]["corruption_detected"] = True
+                corrected_segment["metadata"]["corruption_reason"] = corruption_reason
+                corrected_segment["metadata"]["original_text_length"] = len(segment_text)
+            
+            # Log del problema
+            self.logger.warning(f"🚨 Corrupción extrema en segmento #{i+1}: {corruption_reason}")
+            return corrected_segment, True
+        
+        return segment, False
+    
     def _export_results(self, segments: List[Any], output_file: str, document_metadata: Optional[Dict[str, Any]] = None, output_format: str = "ndjson", output_mode: str = "biblioperson"):
         """
         Exporta los segmentos procesados usando el sistema de modos de salida.
@@ -1315,14 +1700,8 @@ class ProfileManager:
             output_mode: Modo de salida ("generic" o "biblioperson")
         """
         # [DEBUG] LOGGING DETALLADO PARA DEBUG DE EXPORTACIÓN
-        self.logger.warning(f"[DEBUG] _export_results INICIADO")
-        self.logger.warning(f"[DEBUG] Parámetros recibidos:")
-        self.logger.warning(f"[DEBUG]   - segments: {len(segments)} elementos")
-        self.logger.warning(f"[DEBUG]   - output_file: '{output_file}'")
-        self.logger.warning(f"[DEBUG]   - output_format: '{output_format}'")
-        self.logger.warning(f"[DEBUG]   - output_mode: '{output_mode}'")
-        print(f"[DEBUG] _export_results INICIADO con {len(segments)} segmentos")
-        print(f"[DEBUG] Exportando a: {output_file} en modo {output_mode}")
+        self.logger.debug("[DEBUG] _export_results INICIADO: %d segmentos -> '%s' (formato: %s, modo: %s)",
+                          len(segments), output_file, output_format, output_mode)
         
         try:
             # Verificar disponibilidad del sistema de modos de salida
@@ -1342,63 +1721,10 @@ class ProfileManager:
             self.logger.info("🧹 INICIANDO EXPORTACIÓN CON LIMPIEZA MEJORADA DE CARACTERES DE CONTROL")
             
             for i, segment in enumerate(segments):
-                # Extraer texto para verificación de corrupción
-                if hasattr(segment, 'text'):
-                    segment_text = segment.text
-                elif hasattr(segment, 'texto_segmento'):
-                    segment_text = segment.texto_segmento
-                else:
-                    segment_text = segment.get('text', '') if isinstance(segment, dict) else str(segment)
-                
-                # [CONFIG] DETECTAR Y MANEJAR CORRUPCIÓN EXTREMA
-                is_corrupted, corruption_reason = self._detect_extreme_corruption(segment_text)
-                
-                if is_corrupted:
+                segment, was_corrupted = self._replace_corrupted_segment(segment, i)
+                if was_corrupted:
                     corrupted_segments_count += 1
-                    
-                    # Crear copia del segmento con texto corregido
-                    if hasattr(segment, 'text'):
-                        # ProcessedContentItem nuevo
-                        corrected_segment = segment
-                        corrected_segment.text = f"[CORRUPTED TEXT IN SOURCE FILE]\n\nSegment #{i+1} contains extremely corrupted text that cannot be processed correctly.\n\nReason: {corruption_reason}\n\nRecommendation: Review original PDF or try advanced OCR."
-                        corrected_segment.text_length = len(corrected_segment.text)
-                    
-                        # Añadir información de corrupción a metadatos
-                        if not corrected_segment.additional_metadata:
-                            corrected_segment.additional_metadata = {}
-                        corrected_segment.additional_metadata["corruption_detected"] = True
-                        corrected_segment.additional_metadata["corruption_reason"] = corruption_reason
-                        corrected_segment.additional_metadata["original_text_length"] = len(segment_text)
-                        
-                    elif hasattr(segment, 'texto_segmento'):
-                        # ProcessedContentItem viejo
-                        corrected_segment = segment
-                        corrected_segment.texto_segmento = f"[CORRUPTED TEXT IN SOURCE FILE]\n\nSegment #{i+1} contains extremely corrupted text that cannot be processed correctly.\n\nReason: {corruption_reason}\n\nRecommendation: Review original PDF or try advanced OCR."
-                        corrected_segment.longitud_caracteres_segmento = len(corrected_segment.texto_segmento)
-                    
-                        # Añadir información de corrupción a metadatos
-                        if not corrected_segment.metadatos_adicionales_fuente:
-                            corrected_segment.metadatos_adicionales_fuente = {}
-                        corrected_segment.metadatos_adicionales_fuente["corruption_detected"] = True
-                        corrected_segment.metadatos_adicionales_fuente["corruption_reason"] = corruption_reason
-                        corrected_segment.metadatos_adicionales_fuente["original_text_length"] = len(segment_text)
-                
-                    else:
-                        # Diccionario
-                        corrected_segment = segment.copy() if isinstance(segment, dict) else {"text": str(segment)}
-                        corrected_segment["text"] = f"[CORRUPTED TEXT IN SOURCE FILE]\n\nSegment #{i+1} contains extremely corrupted text that cannot be processed correctly.\n\nReason: {corruption_reason}\n\nRecommendation: Review original PDF or try advanced OCR."
-                        
-                        if "metadata" not in corrected_segment:
-                            corrected_segment["metadata"] = {}
-                        corrected_segment["metadata"]["corruption_detected"] = True
-                        corrected_segment["metadata"]["corruption_reason"] = corruption_reason
-                        corrected_segment["metadata"]["original_text_length"] = len(segment_text)
-                    
-                    # Log del problema
-                    self.logger.warning(f"🚨 Corrupción extrema en segmento #{i+1}: {corruption_reason}")
-                    processed_segments.append(corrected_segment)
-                else:
-                    processed_segments.append(segment)
+                processed_segments.append(segment)
             
             # Log resumen de corrupción
             if corrupted_segments_count > 0:
@@ -1420,8 +1746,8 @@ class ProfileManager:
             self.logger.error(f"Error al exportar resultados: {str(e)}")
             raise
         
-        self.logger.warning(f"[OK] EXPORTACIÓN COMPLETADA EXITOSAMENTE")
-        print("[OK] EXPORTACIÓN COMPLETADA EXITOSAMENTE")
+        self.logger.info("[OK] EXPORTACIÓN COMPLETADA EXITOSAMENTE")
+        pipeline_print("[OK] EXPORTACIÓN COMPLETADA EXITOSAMENTE")
     
     def _export_results_fallback(self, segments: List[Any], output_file: str, document_metadata: Optional[Dict[str, Any]] = None, output_format: str = "ndjson"):
         """
@@ -1495,11 +1821,8 @@ class ProfileManager:
         if not isinstance(text, str):
             return str(text)
         
-        # Remover caracteres de control comunes
-        import re
         # Mantener saltos de línea y tabulaciones, remover otros caracteres de control
-        cleaned = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-        return cleaned
+        return remove_control_characters(text)
 
     def get_profile_for_file(self, file_path: str, content_sample: Optional[str] = None) -> Optional[str]:
         """
@@ -1768,19 +2091,55 @@ class ProfileManager:
             Instancia del pre-procesador
         """
         # LOGGING DETALLADO PARA DEBUG
-        print(f"[CONFIG][CONFIG][CONFIG] CREANDO PRE-PROCESADOR: {pre_processor_type} [CONFIG][CONFIG][CONFIG]")
-        print(f"[CONFIG][CONFIG][CONFIG] PERFIL RECIBIDO: {profile.get('name') if profile else 'None'} [CONFIG][CONFIG][CONFIG]")
-        
         preprocessor_config = profile.get('pre_processor_config') if profile else None
-        print(f"[CONFIG][CONFIG][CONFIG] CONFIG DEL PRE-PROCESADOR: {preprocessor_config} [CONFIG][CONFIG][CONFIG]")
+        self.logger.debug("[CONFIG] CREANDO PRE-PROCESADOR: %s (perfil: %s, config: %s)",
+                          pre_processor_type, profile.get('name') if profile else None, preprocessor_config)
         
         # Obtener configuración del pre-procesador desde el perfil
         if pre_processor_type == 'common_block':
-            return CommonBlockPreprocessor(config=preprocessor_config)
+            return self.get_common_preprocessor(preprocessor_config)
         # Agregar otros tipos según sea necesario
         else:
             raise ValueError(f"Tipo de pre-procesador no soportado: {pre_processor_type}")
 
+
+class _FallbackSegmentWriter:
+    """
+    Escritor NDJSON incremental usado cuando el sistema de modos de salida no está disponible.
+    
+    Igual que SegmentStreamWriter, escribe en ``<salida>.partial`` y solo lo publica al
+    cerrar sin error ni ``discard()``.
+    """
+    
+    def __init__(self, manager: 'ProfileManager', output_file: str):
+        self.manager = manager
+        self.output_path = Path(output_file)
+        self.partial_path = self.output_path.with_name(self.output_path.name + '.partial')
+        self.segments_written = 0
+        self._file = None
+        self._discarded = False
+    
+    def __enter__(self) -> '_FallbackSegmentWriter':
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.partial_path, 'w', encoding='utf-8')
+        return self
+    
+    def write(self, segment: Any) -> None:
+        segment.text = self.manager._clean_control_characters(segment.text)
+        segment_dict = self.manager._clean_for_json_serialization(segment.__dict__)
+        self._file.write(json.dumps(segment_dict, ensure_ascii=False) + '\n')
+        self.segments_written += 1
+    
+    def discard(self) -> None:
+        self._discarded = True
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._file.close()
+        if exc_type is not None or self._discarded:
+            self.partial_path.unlink(missing_ok=True)
+        else:
+            os.replace(self.partial_path, self.output_path)
+
 if __name__ == "__main__":
     # Configuración básica de logging
     logging.basicConfig(level=logging.INFO)
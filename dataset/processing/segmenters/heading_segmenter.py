@@ -6,6 +6,7 @@ from collections import defaultdict, Counter
 from datetime import datetime
 
 from .base import BaseSegmenter
+from ..pipeline_logging import should_log_block
 
 # Importar el detector de autores
 try:
@@ -213,6 +214,8 @@ class HeadingSegmenter(BaseSegmenter):
     para la detección de encabezados y estructura jerárquica en documentos.
     """
     
+    _version_banner_logged = False
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Inicializa el segmentador con configuración específica.
@@ -361,20 +364,20 @@ class HeadingSegmenter(BaseSegmenter):
         # Señal estructural: longitud máxima
         if len(text) > self.max_heading_length:
             if self.debug_mode:
-                self.logger.debug(f"Rechazado por longitud: {text[:50]}...")
+                self.logger.debug("Rechazado por longitud: %s...", text[:50])
             return False
         
         # Señal estructural: formato visual
         if block.get('is_bold', False) or block.get('is_centered', False):
             self.stats["headings_by_format"] += 1
-            self.logger.debug(f"Encabezado detectado por formato visual: {text[:80]}...")
+            self.logger.debug("Encabezado detectado por formato visual: %s...", text[:80])
             return True
         
         # Señal estructural: todo en mayúsculas y corto
         if text.isupper() and len(text) < 100:
             self.stats["headings_detected"] += 1
             self.stats["headings_by_heuristic"] += 1
-            self.logger.debug(f"Encabezado detectado por mayúsculas: {text}")
+            self.logger.debug("Encabezado detectado por mayúsculas: %s", text)
             return True
         
         # Señal estructural: líneas cortas sin punto final
@@ -386,19 +389,19 @@ class HeadingSegmenter(BaseSegmenter):
                 if all_capitalized:
                     self.stats["headings_detected"] += 1
                     self.stats["headings_by_heuristic"] += 1
-                    self.logger.debug(f"Encabezado detectado por capitalización: {text}")
+                    self.logger.debug("Encabezado detectado por capitalización: %s", text)
                     return True
                 # Formato "Tema - Explicación"
                 if " - " in text and text.index(" - ") < 40:
                     self.stats["headings_detected"] += 1
                     self.stats["headings_by_heuristic"] += 1
-                    self.logger.debug(f"Encabezado detectado por guion: {text}")
+                    self.logger.debug("Encabezado detectado por guion: %s", text)
                     return True
                 # Termina con dos puntos y es corto
                 if text.endswith(':') and len(text) < 40:
                     self.stats["headings_detected"] += 1
                     self.stats["headings_by_heuristic"] += 1
-                    self.logger.debug(f"Encabezado detectado por dos puntos: {text}")
+                    self.logger.debug("Encabezado detectado por dos puntos: %s", text)
                     return True
         return False
     
@@ -499,13 +502,16 @@ class HeadingSegmenter(BaseSegmenter):
         Returns:
             Lista de unidades semánticas (secciones, subsecciones, párrafos)
         """
-        self.logger.info(f"HeadingSegmenter.segment received {len(blocks)} blocks to process.") # Log added for debugging
+        self.logger.info("HeadingSegmenter.segment received %d blocks to process.", len(blocks))
+        
+        # ===== IDENTIFICADOR ÚNICO DE VERSIÓN (una vez por proceso) =====
+        if not HeadingSegmenter._version_banner_logged:
+            HeadingSegmenter._version_banner_logged = True
+            self.logger.debug("HEADINGSEGMENTER V10.0 - DETECCIÓN INTELIGENTE DE TÍTULOS "
+                              "(31-MAY-2025 03:40 - TITLEDETECTOR INTEGRADO + JERARQUÍA AUTOMÁTICA)")
         
-        # ===== IDENTIFICADOR ÚNICO DE VERSIÓN =====
-        self.logger.warning("🚨🚨🚨 HEADINGSEGMENTER V10.0 - DETECCIÓN INTELIGENTE DE TÍTULOS 🚨🚨🚨")
-        self.logger.warning("🔄 VERSIÓN ACTIVA: 31-MAY-2025 03:40 - TITLEDETECTOR INTEGRADO + JERARQUÍA AUTOMÁTICA")
-        print("🚨🚨🚨 HEADINGSEGMENTER V10.0 - DETECCIÓN INTELIGENTE DE TÍTULOS 🚨🚨🚨")
-        print("🔄 VERSIÓN ACTIVA: 31-MAY-2025 03:40 - TITLEDETECTOR INTEGRADO + JERARQUÍA AUTOMÁTICA")
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        info_enabled = self.logger.isEnabledFor(logging.INFO)
         
         # 🆕 DETECCIÓN INTELIGENTE DE TÍTULOS
         if self.smart_title_detection and blocks:
@@ -513,16 +519,20 @@ class HeadingSegmenter(BaseSegmenter):
             
             # Analizar características visuales globales
             baseline_stats = self.title_detector.analyze_visual_characteristics(blocks)
-            self.logger.info(f"📊 Estadísticas visuales: font_size_avg={baseline_stats['avg_font_size']:.1f}, text_length_avg={baseline_stats['avg_text_length']:.0f}")
+            self.logger.info("📊 Estadísticas visuales: font_size_avg=%.1f, text_length_avg=%.0f",
+                             baseline_stats['avg_font_size'], baseline_stats['avg_text_length'])
             
             # Detectar títulos candidatos
             title_candidates = []
             for i, block in enumerate(blocks):
                 score = self.title_detector.calculate_title_score(block, baseline_stats)
-                self.logger.info(f"🔍 Análisis título bloque {i}: score={score:.1f} - '{block.get('text', '')[:50]}...'")
+                if info_enabled and should_log_block(i):
+                    self.logger.info("🔍 Análisis título bloque %d: score=%.1f - '%s...'",
+                                     i, score, block.get('text', '')[:50])
                 if score >= self.title_score_threshold:  # Umbral configurable para considerar como título
                     title_candidates.append((i, block, score))
-                    self.logger.warning(f"🎯 TÍTULO DETECTADO (score={score:.1f}): {block.get('text', '')[:80]}...")
+                    if info_enabled:
+                        self.logger.info("🎯 TÍTULO DETECTADO (score=%.1f): %s...", score, block.get('text', '')[:80])
             
             # Determinar niveles jerárquicos
             if title_candidates:
@@ -538,17 +548,19 @@ class HeadingSegmenter(BaseSegmenter):
                     blocks[idx]['heading_level'] = level
                     self.stats["smart_titles_detected"] += 1
                     
-                self.logger.info(f"✅ Detección inteligente: {len(title_candidates)} títulos encontrados con niveles {hierarchy_levels}")
+                self.logger.info("✅ Detección inteligente: %d títulos encontrados con niveles %s",
+                                 len(title_candidates), hierarchy_levels)
         
         # NUEVA LÓGICA: Modo de preservación de párrafos individuales
         if self.config.get('disable_grouping', True):
-            self.logger.warning("🚨 MODO PÁRRAFOS INDIVIDUALES ACTIVADO - NO AGRUPANDO EN SECCIONES")
+            self.logger.info("🚨 MODO PÁRRAFOS INDIVIDUALES ACTIVADO - NO AGRUPANDO EN SECCIONES")
             
             # DEBUG: Ver qué bloques estamos procesando
-            self.logger.warning(f"📊 DEBUG HeadingSegmenter - Bloques a procesar: {len(blocks)}")
-            for i, block in enumerate(blocks[:5]):  # Primeros 5 bloques
-                text = block.get('text', '')
-                self.logger.warning(f"   Bloque {i}: {len(text)} chars, inicio: {repr(text[:80])}")
+            if debug_enabled:
+                self.logger.debug("📊 DEBUG HeadingSegmenter - Bloques a procesar: %d", len(blocks))
+                for i, block in enumerate(blocks[:5]):  # Primeros 5 bloques
+                    text = block.get('text', '')
+                    self.logger.debug("   Bloque %d: %d chars, inicio: %r", i, len(text), text[:80])
             
             segments = []
             for i, block in enumerate(blocks):
@@ -559,7 +571,8 @@ class HeadingSegmenter(BaseSegmenter):
                     # 🆕 DETERMINAR TIPO DE SEGMENTO BASÁNDOSE EN DETECCIÓN INTELIGENTE
                     if block.get('is_smart_title', False):
                         segment_type = f"title_level_{block.get('smart_hierarchy_level', 1)}"
-                        self.logger.info(f"📄 Segmento {segment_type}: {text[:50]}...")
+                        if info_enabled and should_log_block(i):
+                            self.logger.info("📄 Segmento %s: %s...", segment_type, text[:50])
                         
                         # Los títulos no se dividen internamente
                         segments.append({
@@ -591,7 +604,9 @@ class HeadingSegmenter(BaseSegmenter):
                                 self.config.get('min_paragraph_length', 50)
                             )
                             
-                            self.logger.warning(f"📝 DIVIDIENDO SEGMENTO LARGO en {len(paragraphs)} párrafos (original: {len(text)} chars)")
+                            if debug_enabled and should_log_block(i):
+                                self.logger.debug("📝 DIVIDIENDO SEGMENTO LARGO en %d párrafos (original: %d chars)",
+                                                  len(paragraphs), len(text))
                             
                             # Crear un segmento por cada párrafo
                             for j, paragraph in enumerate(paragraphs):
@@ -630,9 +645,10 @@ class HeadingSegmenter(BaseSegmenter):
                                 }
                             })
                 else:
-                    self.logger.debug(f"Filtrado bloque vacío en modo párrafos individuales")
+                    if debug_enabled:
+                        self.logger.debug("Filtrado bloque vacío en modo párrafos individuales")
             
-            self.logger.warning(f"✅ PÁRRAFOS INDIVIDUALES CON DIVISIÓN INTERNA: {len(segments)} segmentos creados")
+            self.logger.info("✅ PÁRRAFOS INDIVIDUALES CON DIVISIÓN INTERNA: %d segmentos creados", len(segments))
             return self._post_process_segments(segments)
         
         # Reiniciar estadísticas para este procesamiento
@@ -648,10 +664,10 @@ class HeadingSegmenter(BaseSegmenter):
         
         # Imprimir información de bloques para debug
         if self.debug_mode:
-            self.logger.debug(f"Procesando {len(blocks)} bloques")
-            for i, block in enumerate(blocks[:20]):  # Sólo imprimir los primeros 20 para no saturar
-                text = block.get('text', '').strip()
-                self.logger.debug(f"Bloque {i+1}: {text[:100]}...")
+            self.logger.debug("Procesando %d bloques", len(blocks))
+            if debug_enabled:
+                for i, block in enumerate(blocks[:20]):  # Sólo imprimir los primeros 20 para no saturar
+                    self.logger.debug("Bloque %d: %s...", i + 1, block.get('text', '').strip()[:100])
         
         segments = []
         
@@ -685,20 +701,21 @@ class HeadingSegmenter(BaseSegmenter):
             else:
                 # NUEVA LÓGICA: Log cuando reanudamos después de muchas líneas vacías
                 if consecutive_empty > 5:
-                    self.logger.info(f"📄 Reanudando procesamiento después de {consecutive_empty} líneas vacías")
+                    self.logger.info("📄 Reanudando procesamiento después de %d líneas vacías", consecutive_empty)
                 consecutive_empty = 0  # Resetear contador de líneas vacías
                 
                 # Filtrar bloques demasiado pequeños antes de procesarlos
                 if self._is_too_small_for_segment(text):
                     self.stats["small_blocks_filtered"] += 1
-                    if self.debug_mode:
-                        self.logger.debug(f"Filtrado bloque muy pequeño: '{text}'")
+                    if self.debug_mode and debug_enabled:
+                        self.logger.debug("Filtrado bloque muy pequeño: '%s'", text)
                     continue
                 
                 is_heading = self.is_heading(block)
                 
                 # Depuración
-                self.logger.debug(f"Procesando bloque {i}: {'HEADING' if is_heading else 'CONTENT'} - {text[:80]}")
+                if debug_enabled and should_log_block(i):
+                    self.logger.debug("Procesando bloque %d: %s - %s", i, 'HEADING' if is_heading else 'CONTENT', text[:80])
                 
                 # Transiciones de estado y acciones
                 if state == HeadingState.INITIAL:
@@ -1088,12 +1105,14 @@ class HeadingSegmenter(BaseSegmenter):
         Returns:
             Lista de párrafos
         """
-        self.logger.warning(f"🔍 ANALIZANDO TEXTO PARA DIVISIÓN: {len(text)} chars")
-        self.logger.warning(f"   📝 Inicio del texto: {repr(text[:200])}...")
-        self.logger.warning(f"   📏 Min length requerido: {min_length}")
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            self.logger.debug("🔍 ANALIZANDO TEXTO PARA DIVISIÓN: %d chars", len(text))
+            self.logger.debug("   📝 Inicio del texto: %r...", text[:200])
+            self.logger.debug("   📏 Min length requerido: %d", min_length)
         
         if len(text) <= min_length:
-            self.logger.warning(f"   ❌ Texto muy corto, devolviendo sin dividir")
+            self.logger.debug("   ❌ Texto muy corto, devolviendo sin dividir")
             return [text]
         
         # Limpiar el texto
@@ -1101,7 +1120,7 @@ class HeadingSegmenter(BaseSegmenter):
         
         # Detectar si hay saltos de línea
         has_newlines = '\n' in text
-        self.logger.warning(f"   📊 Tiene saltos de línea: {has_newlines}")
+        self.logger.debug("   📊 Tiene saltos de línea: %s", has_newlines)
         
         # Patrón más flexible para división de párrafos
         patterns_to_try = [
@@ -1116,12 +1135,12 @@ class HeadingSegmenter(BaseSegmenter):
         paragraphs = []
         
         for i, pattern in enumerate(patterns_to_try):
-            self.logger.warning(f"   🔍 Probando patrón {i+1}: {pattern}")
+            self.logger.debug("   🔍 Probando patrón %d: %s", i + 1, pattern)
             
             if i < 2:  # Para los dos primeros patrones más complejos
                 # Dividir por el patrón capturando grupos
                 parts = re.split(pattern, text)
-                self.logger.warning(f"   📊 Patrón dividió en {len(parts)} partes")
+                self.logger.debug("   📊 Patrón dividió en %d partes", len(parts))
                 
                 if len(parts) > 1:  # Si encontró divisiones
                     temp_paragraphs = []
@@ -1155,19 +1174,19 @@ class HeadingSegmenter(BaseSegmenter):
                     
                     if len(temp_paragraphs) > 1:
                         paragraphs = temp_paragraphs
-                        self.logger.warning(f"   ✅ Patrón {i+1} exitoso: {len(paragraphs)} párrafos")
+                        self.logger.debug("   ✅ Patrón %d exitoso: %d párrafos", i + 1, len(paragraphs))
                         break
             else:  # Para el patrón simple de doble salto
                 parts = re.split(pattern, text)
                 temp_paragraphs = [p.strip() for p in parts if len(p.strip()) >= min_length]
                 if len(temp_paragraphs) > 1:
                     paragraphs = temp_paragraphs
-                    self.logger.warning(f"   ✅ Patrón {i+1} exitoso: {len(paragraphs)} párrafos")
+                    self.logger.debug("   ✅ Patrón %d exitoso: %d párrafos", i + 1, len(paragraphs))
                     break
         
         # Si ningún patrón funcionó, usar división más agresiva
         if len(paragraphs) <= 1:
-            self.logger.warning(f"   🔄 Ningún patrón funcionó, probando división agresiva")
+            self.logger.debug("   🔄 Ningún patrón funcionó, probando división agresiva")
             
             # Intentar división por frases largas (punto + espacio + mayúscula)
             sentence_pattern = r'([.!?])\s+([A-Za-zÁÉÍÓÚáéíóúñÑüÜ])'
@@ -1201,15 +1220,16 @@ class HeadingSegmenter(BaseSegmenter):
                 
                 if len(temp_paragraphs) > 1:
                     paragraphs = temp_paragraphs
-                    self.logger.warning(f"   ✅ División agresiva exitosa: {len(paragraphs)} párrafos")
+                    self.logger.debug("   ✅ División agresiva exitosa: %d párrafos", len(paragraphs))
         
         # Si aún no hay división, devolver el texto original
         if not paragraphs:
             paragraphs = [text]
-            self.logger.warning(f"   ❌ No se pudo dividir, devolviendo texto original")
+            self.logger.debug("   ❌ No se pudo dividir, devolviendo texto original")
         
-        self.logger.warning(f"   🎯 RESULTADO FINAL: {len(paragraphs)} párrafos generados")
-        for i, p in enumerate(paragraphs[:3]):  # Mostrar primeros 3
-            self.logger.warning(f"      Párrafo {i+1}: {len(p)} chars - {repr(p[:100])}...")
+        if debug_enabled:
+            self.logger.debug("   🎯 RESULTADO FINAL: %d párrafos generados", len(paragraphs))
+            for i, p in enumerate(paragraphs[:3]):  # Mostrar primeros 3
+                self.logger.debug("      Párrafo %d: %d chars - %r...", i + 1, len(p), p[:100])
         
         return paragraphs
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Saneamiento de texto para el pipeline de procesamiento.
+
+Reúne en un solo módulo la limpieza de caracteres de control, la eliminación de
+escapes Unicode corruptos y las métricas de corrupción que antes repetían
+CommonBlockPreprocessor y ProfileManager con varias pasadas de ``re.sub`` y bucles
+carácter a carácter. Los patrones se compilan una vez y el mapeo de caracteres de
+control se hace con tablas de ``str.translate`` (en C, una sola pasada).
+"""
+
+import re
+from typing import Tuple
+
+# Caracteres inválidos en JSON o invisibles problemáticos → espacio:
+# control ASCII salvo \t \n \r, DEL y control C1 (0x7F-0x9F), BOM, ancho cero y
+# separadores de línea/párrafo Unicode
+_JSON_UNSAFE_CODEPOINTS = (
+    [c for c in range(0x00, 0x20) if c not in (0x09, 0x0A, 0x0D)]
+    + list(range(0x7F, 0xA0))
+    + [0xFEFF, 0x2028, 0x2029]
+    + list(range(0x200B, 0x2010))
+)
+_JSON_UNSAFE_TO_SPACE = {c: ' ' for c in _JSON_UNSAFE_CODEPOINTS}
+
+# Control ASCII salvo \t \n \r, y DEL → eliminados
+_CONTROL_CODEPOINTS = [c for c in range(0x00, 0x20) if c not in (0x09, 0x0A, 0x0D)] + [0x7F]
+_CONTROL_DELETE = dict.fromkeys(_CONTROL_CODEPOINTS)
+_CONTROL_NO_DEL_DELETE = dict.fromkeys(c for c in _CONTROL_CODEPOINTS if c != 0x7F)
+
+_LETTERS = 'a-zA-ZáéíóúüñÁÉÍÓÚÜÑ'
+_LETTERS_DELETE = dict.fromkeys(ord(c) for c in
+                                'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZáéíóúüñÁÉÍÓÚÜÑ')
+
+# Secuencias \uXXXX completas o \u/\U mal formadas (0-3 dígitos hex)
+_UNICODE_ESCAPE_RE = re.compile(r'\\(?:u[0-9a-fA-F]{4}|[uU][0-9a-fA-F]{0,3}(?![0-9a-fA-F]))')
+_VALID_WORD_RE = re.compile(rf'\b[{_LETTERS}]{{3,}}\b')
+_LOOSE_SYMBOLS_RE = re.compile(r'\s[+\-*/&%#$@!]{1,2}\s')
+_LOOSE_LETTER_RE = re.compile(r'\s[a-zA-Z]\s')
+_LOOSE_NUMBER_RE = re.compile(r'\s\d{1,2}\s')
+_WHITESPACE_RE = re.compile(r'\s+')
+_REPEATED_ALPHA_RE = re.compile(r'([^\W\d_])\1+')
+
+CORRUPTED_TEXT_PLACEHOLDER = "texto corrupto en archivo de origen"
+
+
+def to_json_safe(text: str) -> str:
+    """Sustituye por espacios los caracteres que rompen la serialización JSON."""
+    return text.translate(_JSON_UNSAFE_TO_SPACE)
+
+
+def remove_control_characters(text: str, keep_del: bool = False) -> str:
+    """Elimina los caracteres de control ASCII (conserva \\t, \\n y \\r)."""
+    return text.translate(_CONTROL_NO_DEL_DELETE if keep_del else _CONTROL_DELETE)
+
+
+def count_control_characters(text: str) -> int:
+    """Número de caracteres de control ASCII (< 0x20) distintos de \\t, \\n y \\r."""
+    return len(text) - len(text.translate(_CONTROL_NO_DEL_DELETE))
+
+
+def count_letters(text: str) -> int:
+    """Número de letras (latinas y acentuadas del español)."""
+    return len(text) - len(text.translate(_LETTERS_DELETE))
+
+
+def count_valid_words(text: str) -> int:
+    """Número de palabras de 3 o más letras."""
+    return sum(1 for _ in _VALID_WORD_RE.finditer(text))
+
+
+def letter_and_word_counts(text: str) -> Tuple[int, int, int]:
+    """
+    Métricas para la heurística de corrupción.
+
+    Returns:
+        Tuple con (caracteres sin espacios ni saltos de línea, letras, palabras válidas)
+    """
+    total_chars = len(text) - text.count(' ') - text.count('\n')
+    return total_chars, count_letters(text), count_valid_words(text)
+
+
+def is_predominantly_corrupt(text: str) -> bool:
+    """
+    True si menos del 30% de los caracteres son letras válidas, hay menos de 2
+    palabras reconocibles y el texto supera los 50 caracteres.
+    """
+    total_chars = len(text) - text.count(' ') - text.count('\n')
+    if total_chars <= 50:
+        return False
+    if count_letters(text) / total_chars >= 0.3:
+        return False
+    # Las palabras solo se cuentan cuando las letras ya indican corrupción
+    return count_valid_words(text) < 2
+
+
+def sanitize_unicode_corruption(text: str) -> str:
+    """
+    Limpia texto corrupto con escapes Unicode y caracteres de control.
+
+    - Caracteres de control e invisibles problemáticos para JSON → espacio
+    - Secuencias \\uXXXX y escapes \\u / \\U mal formados → espacio
+    - Texto predominantemente corrupto → CORRUPTED_TEXT_PLACEHOLDER
+    - Símbolos, letras y números de 1-2 dígitos sueltos entre espacios → eliminados
+    - Espacios en blanco colapsados a un único espacio
+    """
+    if not text:
+        return text
+
+    text = _UNICODE_ESCAPE_RE.sub(' ', text.translate(_JSON_UNSAFE_TO_SPACE))
+
+    if is_predominantly_corrupt(text):
+        return CORRUPTED_TEXT_PLACEHOLDER
+
+    # Cada limpieza depende de la anterior (comparten los espacios delimitadores)
+    text = _LOOSE_SYMBOLS_RE.sub(' ', text)
+    text = _LOOSE_LETTER_RE.sub(' ', text)
+    text = _LOOSE_NUMBER_RE.sub(' ', text)
+    text = _WHITESPACE_RE.sub(' ', text)
+    return text.strip()
+
+
+def duplicated_char_ratio(text: str) -> float:
+    """
+    Proporción de letras repetidas de forma consecutiva (solo se cuentan las
+    repeticiones extra: "aaa" aporta 2). Indicador de texto con glifos duplicados.
+    """
+    if not text:
+        return 0.0
+    duplicated_chars = sum(match.end() - match.start() - 1
+                           for match in _REPEATED_ALPHA_RE.finditer(text)
+                           if match.group(1).isalpha())
+    return duplicated_chars / len(text)
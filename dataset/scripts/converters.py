@@ -22,12 +22,13 @@ from __future__ import annotations
 import subprocess
 import tempfile
 import logging
-import hashlib
 from pathlib import Path
 from typing import Any, Dict, Tuple
 
 import re
 
+from dataset.processing.hash_cache import cached_sha256
+
 # PDF
 try:
     from pdfminer.high_level import extract_text as pdf_extract_text
@@ -164,13 +165,9 @@ def convert_file_to_markdown(
 # --------------------------------------------------------------------------- #
 
 def _calculate_sha256(file_path: Path) -> str:
-    """Calcula el hash SHA256 de un archivo."""
-    sha256_hash = hashlib.sha256()
+    """Calcula el hash SHA256 de un archivo (reutilizando la caché de hashes)."""
     try:
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+        return cached_sha256(file_path)
     except IOError as e:
         logger.error("No se pudo leer el archivo para hashing %s: %s", file_path, e)
         return ""
@@ -19,11 +19,12 @@ if os.name == "nt":
         sys.stdout = io.TextIOWrapper(msvcrt.get_osfhandle(sys.stdout.fileno()), encoding="utf-8", buffering=1)
         sys.stderr = io.TextIOWrapper(msvcrt.get_osfhandle(sys.stderr.fileno()), encoding="utf-8", buffering=1)
 import argparse
+import json
 import logging
 import signal # Nueva importación
 import time
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
@@ -31,6 +32,11 @@ from pathlib import Path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 from dataset.processing.profile_manager import ProfileManager
+from dataset.processing.loaders.ocr_providers import limit_tesseract_threads
+from dataset.processing.pipeline_logging import configure_quiet_pipeline, flush_pipeline_logs, DEFAULT_DIAGNOSTICS_FILE
+from dataset.processing.pipeline_metrics import FileMetrics, PipelineMetricsReport
+from dataset.processing.loaders.pdf_document_cache import shared_pdf_document, DETECTION_SAMPLE_PAGES
+from dataset.processing.build_cache import get_build_cache, compute_file_sha256, compute_pipeline_fingerprint
 
 # Función utilitaria para manejo seguro de emojis
 def safe_emoji_print(text: str, fallback_text: str = None) -> None:
@@ -111,8 +117,12 @@ def cprint(message: str, level: str = "INFO", bold: bool = False, emoji: str = N
     
     safe_emoji_print(styled_message, fallback_message)
 
-def setup_logging(verbose: bool = False):
-    """Configura el sistema de logging."""
+def setup_logging(verbose: bool = False, quiet_pipeline: bool = False):
+    """Configura el sistema de logging.
+
+    Con ``quiet_pipeline`` los diagnósticos de ``dataset.processing`` se envían a un
+    archivo JSON Lines con buffer en lugar de a la consola (solo los errores se muestran).
+    """
     # Configuración del logger principal (raíz)
     root_logger = logging.getLogger()
     # Eliminar handlers preexistentes para evitar duplicados si esta función se llama varias veces
@@ -153,6 +163,10 @@ def setup_logging(verbose: bool = False):
         logging.getLogger("dataset.processing.segmenters.heading_segmenter").setLevel(logging.DEBUG)
         logging.getLogger("dataset.processing.profile_manager").setLevel(logging.DEBUG)
 
+    if quiet_pipeline:
+        diagnostics_file = configure_quiet_pipeline(Path.cwd() / DEFAULT_DIAGNOSTICS_FILE, level=base_level)
+        cprint(f"Diagnósticos del pipeline en: {diagnostics_file}", level="INFO")
+
 def list_profiles(manager: ProfileManager):
     """Lista todos los perfiles disponibles."""
     profiles = manager.list_profiles()
@@ -186,6 +200,8 @@ class ProcessingStats:
         self.average_time_per_file = 0
         self.fastest_file = None
         self.slowest_file = None
+        # Métricas por etapa de cada archivo (--show-timing, --timing-report, --profile-stages)
+        self.pipeline_metrics = PipelineMetricsReport()
         self._lock = threading.Lock()  # Para thread safety
 
     def add_failure(self, filepath: str, error_type: str, message: str):
@@ -229,6 +245,16 @@ class ProcessingStats:
                 self.file_times[filepath]['end'] = end_time
                 self.file_times[filepath]['duration'] = end_time - self.file_times[filepath]['start']
 
+    def merge_file_times(self, file_times: Dict[str, Dict[str, float]]):
+        """Incorpora tiempos por archivo medidos en otro proceso (modo --executor process)"""
+        with self._lock:
+            self.file_times.update(file_times)
+
+def _stage_metrics_enabled(args) -> bool:
+    """True si alguna opción de la CLI necesita las métricas por etapa."""
+    return bool(getattr(args, 'show_timing', False) or getattr(args, 'timing_report', None)
+                or getattr(args, 'profile_stages', None))
+
 def format_duration(seconds: float) -> str:
     """Formatea una duración en segundos a un formato legible"""
     if seconds < 1:
@@ -245,7 +271,53 @@ def format_duration(seconds: float) -> str:
         secs = seconds % 60
         return f"{hours}h {minutes}m {secs:.1f}s"
 
-def core_process(manager: ProfileManager, input_path: Path, profile_name_override: Optional[str], output_spec: Optional[str], cli_args: argparse.Namespace, output_format: str = "ndjson") -> tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
+def _load_json_filter_config(cli_args: argparse.Namespace) -> Optional[Dict[str, Any]]:
+    """
+    Configuración de filtros JSON del trabajo.
+    
+    La UI la pasa ya como dict; si llega la ruta de un archivo de filtros, se lee su
+    contenido para que tanto el loader como la huella de la caché incremental usen
+    los filtros vigentes y no solo su ubicación.
+    """
+    json_filter_config = getattr(cli_args, 'json_filter_config', None)
+    if isinstance(json_filter_config, (str, os.PathLike)):
+        with open(json_filter_config, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return json_filter_config
+
+def _compute_build_cache_key(manager: ProfileManager, input_path: Path, profile_name_override: Optional[str],
+                             cli_args: argparse.Namespace, output_format: str,
+                             folder_structure_info: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Calcula (hash del archivo, huella de configuración) para la caché de construcción incremental."""
+    try:
+        file_hash = compute_file_sha256(input_path)
+    except OSError as e:
+        cprint(f"No se pudo calcular el hash de {input_path.name} para la caché incremental: {e}", level="WARNING")
+        return None
+    try:
+        json_filter_config = _load_json_filter_config(cli_args)
+    except (OSError, ValueError) as e:
+        cprint(f"No se pudo leer la configuración de filtros JSON para la caché incremental: {e}", level="WARNING")
+        return None
+    # Con detección automática el resultado depende de todos los perfiles cargados
+    profile_config = manager.get_profile(profile_name_override) if profile_name_override else manager.profiles
+    options = {
+        'profile_name': profile_name_override,
+        'encoding': cli_args.encoding,
+        'force_type': cli_args.force_type,
+        'confidence_threshold': cli_args.confidence_threshold,
+        'language_override': getattr(cli_args, 'language_override', None),
+        'author_override': getattr(cli_args, 'author_override', None),
+        # Contenido de los filtros (no su ruta): editar el archivo invalida la caché
+        'json_filter_config': json_filter_config,
+        'output_format': output_format,
+        'folder_structure': folder_structure_info,
+        'streaming': getattr(cli_args, 'streaming', False),
+        'stream_window_pages': getattr(cli_args, 'stream_window_pages', 20) if getattr(cli_args, 'streaming', False) else None,
+    }
+    return file_hash, compute_pipeline_fingerprint(profile_config, options)
+
+def core_process(manager: ProfileManager, input_path: Path, profile_name_override: Optional[str], output_spec: Optional[str], cli_args: argparse.Namespace, output_format: str = "ndjson", metrics: Optional[FileMetrics] = None) -> tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
     """Procesa un único archivo y guarda el resultado.
     
     Args:
@@ -255,10 +327,22 @@ def core_process(manager: ProfileManager, input_path: Path, profile_name_overrid
         output_spec: La ruta de salida especificada por el usuario, que podría ser un archivo o un directorio.
         cli_args: El objeto argparse.Namespace completo que contiene todos los argumentos de la CLI.
         output_format: Formato de salida ("ndjson" o "json")
+        metrics: Instrumentación por etapas del archivo (opcional, ver pipeline_metrics)
 
     Returns:
         Tuple con (result_code: str, message: Optional[str], document_metadata: Optional[Dict], segments: Optional[List], segmenter_stats: Optional[Dict])
     """
+    if metrics is None:
+        metrics = FileMetrics(input_path)
+    if input_path.suffix.lower() == '.pdf':
+        # Mantener abierto un único handle del PDF durante detección, carga y metadatos:
+        # cada página se parsea una sola vez aunque la consulten varias etapas
+        with shared_pdf_document(input_path):
+            return _core_process(manager, input_path, profile_name_override, output_spec, cli_args, output_format, metrics)
+    return _core_process(manager, input_path, profile_name_override, output_spec, cli_args, output_format, metrics)
+
+def _core_process(manager: ProfileManager, input_path: Path, profile_name_override: Optional[str], output_spec: Optional[str], cli_args: argparse.Namespace, output_format: str, metrics: FileMetrics) -> tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
+    """Cuerpo de core_process, con el handle del PDF (si aplica) ya abierto."""
     # DEBUG: Imprimir cli_args.input_path y la evaluación de is_input_dir_mode
     resolved_input_path_for_mode_check = Path(cli_args.input_path).resolve()
     is_input_dir_mode_eval = resolved_input_path_for_mode_check.is_dir()
@@ -274,69 +358,6 @@ def core_process(manager: ProfileManager, input_path: Path, profile_name_overrid
     
     cprint(f"Procesando archivo: {input_path}", level="INFO", emoji=ConsoleStyle.FILE_EMOJI, bold=True)
 
-    profile_name = profile_name_override
-    extracted_content_for_detection = None
-    
-    if not profile_name:
-        # Para detección automática, necesitamos extraer el contenido preservando estructura
-        if input_path.suffix.lower() == '.pdf':
-            cprint(f"Extrayendo contenido de PDF para detección automática...", level="INFO", emoji="🔍")
-            try:
-                # Extraer contenido del PDF preservando estructura línea por línea
-                import fitz  # PyMuPDF
-                
-                doc = fitz.open(str(input_path))
-                text_lines = []
-                
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    # Extraer texto preservando saltos de línea
-                    page_text = page.get_text()
-                    
-                    # Dividir en líneas y preservar estructura
-                    lines = page_text.split('\n')
-                    for line in lines:
-                        line = line.strip()
-                        if line:  # Solo agregar líneas no vacías
-                            text_lines.append(line)
-                
-                doc.close()
-                
-                # Crear texto estructurado preservando saltos de línea individuales
-                extracted_content_for_detection = '\n'.join(text_lines)
-                cprint(f"Contenido extraído: {len(text_lines)} líneas, {len(extracted_content_for_detection)} caracteres", level="DEBUG")
-                
-            except Exception as e:
-                cprint(f"Error extrayendo contenido para detección: {str(e)}", level="WARNING")
-                # Fallback al método anterior
-                try:
-                    from dataset.processing.loaders.pdf_loader import PDFLoader
-                    temp_loader = PDFLoader(str(input_path))
-                    temp_data = temp_loader.load()
-                    
-                    blocks = temp_data.get('blocks', [])
-                    if blocks:
-                        text_parts = []
-                        for block in blocks:
-                            block_text = block.get('text', '').strip()
-                            if block_text:
-                                text_parts.append(block_text)
-                        extracted_content_for_detection = '\n\n'.join(text_parts)
-                        cprint(f"Usando fallback: {len(extracted_content_for_detection)} caracteres", level="DEBUG")
-                except Exception as e2:
-                    cprint(f"Error en fallback: {str(e2)}", level="WARNING")
-        
-        # Detectar perfil con contenido extraído si está disponible
-        profile_name = manager.get_profile_for_file(input_path, extracted_content_for_detection)
-        if profile_name:
-            cprint(f"Perfil detectado automáticamente: {profile_name}", level="INFO", emoji=ConsoleStyle.PROFILE_EMOJI)
-        else:
-            cprint(f"No se pudo detectar un perfil adecuado para {input_path.name}. Especifique uno con --profile o verifique las extensiones.", level="ERROR")
-            # No listamos perfiles aquí para no inundar la consola si son muchos archivos
-            return 'CONFIG_ERROR', f"No se pudo detectar un perfil adecuado para {input_path.name}", None, None, None
-    else:
-        cprint(f"Usando perfil: {profile_name}", level="INFO", emoji=ConsoleStyle.PROFILE_EMOJI)
-
     # Manejo del archivo de salida
     output_file_path: Path
     is_input_dir_mode = Path(cli_args.input_path).resolve().is_dir() # Verifica si la entrada original a process_path era un dir
@@ -407,6 +428,77 @@ def core_process(manager: ProfileManager, input_path: Path, profile_name_overrid
 
     cprint(f"Archivo de salida: {output_file_path}", level="INFO", emoji=ConsoleStyle.SAVE_EMOJI)
     
+    # Construcción incremental: si la entrada y la configuración efectiva no cambiaron
+    # desde la última ejecución, conservar la salida existente (antes de detectar perfil)
+    build_cache_key = None
+    if getattr(cli_args, 'incremental', False):
+        build_cache_key = _compute_build_cache_key(manager, input_path, profile_name_override, cli_args,
+                                                   output_format, folder_structure_info)
+        if build_cache_key and get_build_cache().is_up_to_date(input_path, output_file_path, *build_cache_key):
+            cprint(f"Sin cambios desde la última ejecución; se conserva {output_file_path.name}", level="INFO", emoji=ConsoleStyle.SUCCESS_EMOJI)
+            return 'SUCCESS_WITH_UNITS', None, None, None, {'cached_output': True}
+
+    profile_name = profile_name_override
+    extracted_content_for_detection = None
+    
+    with metrics.stage('profile_detection'):
+        if not profile_name:
+            # Para detección automática, necesitamos extraer el contenido preservando estructura
+            if input_path.suffix.lower() == '.pdf':
+                cprint(f"Extrayendo contenido de PDF para detección automática...", level="INFO", emoji="🔍")
+                try:
+                    # Extraer contenido del PDF preservando estructura línea por línea
+                    text_lines = []
+                
+                    # Muestra de las primeras páginas: quedan en la caché del handle y
+                    # PDFLoader las reutiliza sin volver a extraerlas
+                    with shared_pdf_document(input_path) as pdf_handle:
+                        sample_pages = min(DETECTION_SAMPLE_PAGES, pdf_handle.page_count)
+                        page_texts = [pdf_handle.page_text(page_num) for page_num in range(sample_pages)]
+                
+                    for page_text in page_texts:
+                        # Dividir en líneas y preservar estructura
+                        lines = page_text.split('\n')
+                        for line in lines:
+                            line = line.strip()
+                            if line:  # Solo agregar líneas no vacías
+                                text_lines.append(line)
+                
+                    # Crear texto estructurado preservando saltos de línea individuales
+                    extracted_content_for_detection = '\n'.join(text_lines)
+                    cprint(f"Contenido extraído: {len(text_lines)} líneas, {len(extracted_content_for_detection)} caracteres", level="DEBUG")
+                
+                except Exception as e:
+                    cprint(f"Error extrayendo contenido para detección: {str(e)}", level="WARNING")
+                    # Fallback al método anterior
+                    try:
+                        from dataset.processing.loaders.pdf_loader import PDFLoader
+                        temp_loader = PDFLoader(str(input_path))
+                        temp_data = temp_loader.load()
+                    
+                        blocks = temp_data.get('blocks', [])
+                        if blocks:
+                            text_parts = []
+                            for block in blocks:
+                                block_text = block.get('text', '').strip()
+                                if block_text:
+                                    text_parts.append(block_text)
+                            extracted_content_for_detection = '\n\n'.join(text_parts)
+                            cprint(f"Usando fallback: {len(extracted_content_for_detection)} caracteres", level="DEBUG")
+                    except Exception as e2:
+                        cprint(f"Error en fallback: {str(e2)}", level="WARNING")
+        
+            # Detectar perfil con contenido extraído si está disponible
+            profile_name = manager.get_profile_for_file(input_path, extracted_content_for_detection)
+            if profile_name:
+                cprint(f"Perfil detectado automáticamente: {profile_name}", level="INFO", emoji=ConsoleStyle.PROFILE_EMOJI)
+            else:
+                cprint(f"No se pudo detectar un perfil adecuado para {input_path.name}. Especifique uno con --profile o verifique las extensiones.", level="ERROR")
+                # No listamos perfiles aquí para no inundar la consola si son muchos archivos
+                return 'CONFIG_ERROR', f"No se pudo detectar un perfil adecuado para {input_path.name}", None, None, None
+        else:
+            cprint(f"Usando perfil: {profile_name}", level="INFO", emoji=ConsoleStyle.PROFILE_EMOJI)
+
     try:
         # Obtener parámetros de override si están disponibles
         language_override = getattr(cli_args, 'language_override', None)
@@ -414,8 +506,9 @@ def core_process(manager: ProfileManager, input_path: Path, profile_name_overrid
         
         # 🔧 NUEVO: Obtener configuración JSON si está disponible
         job_config_dict = None
-        if hasattr(cli_args, 'json_filter_config') and cli_args.json_filter_config is not None:
-            job_config_dict = {'json_config': cli_args.json_filter_config}
+        json_filter_config = _load_json_filter_config(cli_args)
+        if json_filter_config is not None:
+            job_config_dict = {'json_config': json_filter_config}
             cprint(f"Aplicando configuración de filtros JSON al procesamiento...", level="INFO", emoji="🔧")
         
         segments, segmenter_stats, document_metadata = manager.process_file(
@@ -429,7 +522,10 @@ def core_process(manager: ProfileManager, input_path: Path, profile_name_overrid
             author_override=author_override,
             output_format=output_format,
             folder_structure_info=folder_structure_info,  # Pasar información de estructura
-            job_config_dict=job_config_dict  # 🔧 NUEVO: Pasar configuración JSON
+            job_config_dict=job_config_dict,  # 🔧 NUEVO: Pasar configuración JSON
+            streaming=getattr(cli_args, 'streaming', False),
+            stream_window_pages=getattr(cli_args, 'stream_window_pages', 20),
+            metrics=metrics
         )
         
         if isinstance(segments, tuple) and len(segments) == 3:
@@ -442,6 +538,14 @@ def core_process(manager: ProfileManager, input_path: Path, profile_name_overrid
             cprint(error_msg, level="ERROR")
             return 'PROCESSING_EXCEPTION', error_msg, None, None, None
 
+        streamed_segments = (segmenter_stats or {}).get('streamed_segments', 0)
+        if streamed_segments and not segments and not (document_metadata or {}).get('error'):
+            # Modo streaming: los segmentos ya se escribieron en disco ventana a ventana
+            cprint(f"Se escribieron {streamed_segments} unidades en streaming para {input_path.name}.", level="SUCCESS", emoji=ConsoleStyle.SUCCESS_EMOJI)
+            if build_cache_key:
+                get_build_cache().record(input_path, output_file_path, *build_cache_key)
+            return 'SUCCESS_WITH_UNITS', None, document_metadata, None, segmenter_stats
+
         if segments:
             cprint(f"Se encontraron {len(segments)} unidades en {input_path.name}.", level="SUCCESS", emoji=ConsoleStyle.SUCCESS_EMOJI)
             if segmenter_stats:
@@ -468,6 +572,8 @@ def core_process(manager: ProfileManager, input_path: Path, profile_name_overrid
                     text_preview = segment.texto_segmento[:30] if hasattr(segment, 'texto_segmento') else str(segment)[:30]
                     segment_type = segment.tipo_segmento if hasattr(segment, 'tipo_segmento') else 'unknown'
                     print(f"{ConsoleStyle.BLUE}[{i+1}]{ConsoleStyle.ENDC} {segment_type}: {text_preview}...")
+            if build_cache_key:
+                get_build_cache().record(input_path, output_file_path, *build_cache_key)
             return 'SUCCESS_WITH_UNITS', None, document_metadata, segments, segmenter_stats
         else:
             # Revisar si el loader reportó un error o advertencia específica
@@ -514,6 +620,8 @@ def _process_single_file(manager: ProfileManager, file_path: Path, args, base_ou
     # Iniciar timing para este archivo
     if stats:
         stats.start_file_timing(str(file_path))
+    metrics = FileMetrics(file_path, getattr(args, 'profile_stages', None)) if _stage_metrics_enabled(args) else None
+    result_code = 'PROCESSING_EXCEPTION'
     
     try:
         result_code, message, document_metadata, segments, segmenter_stats = core_process(
@@ -522,7 +630,8 @@ def _process_single_file(manager: ProfileManager, file_path: Path, args, base_ou
             profile_name_override=args.profile,
             output_spec=args.output,
             cli_args=args,
-            output_format=output_format
+            output_format=output_format,
+            metrics=metrics
         )
         
         return result_code, message
@@ -530,11 +639,15 @@ def _process_single_file(manager: ProfileManager, file_path: Path, args, base_ou
         # Terminar timing para este archivo
         if stats:
             stats.end_file_timing(str(file_path))
+            if metrics is not None:
+                stats.pipeline_metrics.add(metrics.finish(result_code))
             # Mostrar tiempo del archivo si es verbose o si es un solo archivo
             if args.verbose or stats.total_files_attempted == 1:
                 duration = stats.file_times[str(file_path)]['duration']
                 cprint(f"Tiempo de procesamiento: {format_duration(duration)}", 
                       level="INFO", emoji=ConsoleStyle.TIMER_EMOJI)
+            if metrics is not None and getattr(args, 'show_timing', False):
+                _print_file_stage_timing(metrics)
 
 def process_path(manager: ProfileManager, args: argparse.Namespace, stats: ProcessingStats) -> None:
     """Procesa un archivo o todos los archivos de un directorio."""
@@ -576,9 +689,13 @@ def process_path(manager: ProfileManager, args: argparse.Namespace, stats: Proce
     if use_parallel:
         if max_workers is None:
             max_workers = min(len(files_to_process), os.cpu_count())
-        cprint(f"Procesamiento paralelo activado con {max_workers} workers", 
+        executor_kind = getattr(args, 'executor', 'thread')
+        cprint(f"Procesamiento paralelo activado con {max_workers} workers ({executor_kind})", 
                level="INFO", emoji=ConsoleStyle.PARALLEL_EMOJI, bold=True)
-        _process_files_parallel(manager, files_to_process, args, base_output_for_relative_path, stats, max_workers)
+        if executor_kind == 'process':
+            _process_files_multiprocess(files_to_process, args, base_output_for_relative_path, stats, max_workers)
+        else:
+            _process_files_parallel(manager, files_to_process, args, base_output_for_relative_path, stats, max_workers)
     else:
         if len(files_to_process) > 1:
             cprint("Procesamiento secuencial (use --parallel para acelerar)", level="INFO")
@@ -624,6 +741,91 @@ def _process_files_parallel(manager: ProfileManager, files_to_process: List[Path
             
             _update_stats_from_result(stats, file_path, result_code, message)
 
+# Estado por proceso worker (modo --executor process). Cada worker construye
+# su propio ProfileManager una sola vez en _init_process_worker.
+_WORKER_MANAGER: Optional[ProfileManager] = None
+
+def _init_process_worker(profiles_dir: Optional[str], verbose: bool, quiet_pipeline: bool = False,
+                         pool_size: int = 1):
+    """Inicializador de cada proceso worker: logging mínimo, límites de OCR y ProfileManager propio."""
+    global _WORKER_MANAGER
+    # Ctrl+C lo gestiona el proceso padre; los workers se cierran con el pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Cada worker puede hacer OCR de un PDF a la vez: repartir las CPUs entre el pool
+    # en lugar de abrir cpu_count hilos de OCR por worker
+    os.environ.setdefault('BIBLIOPERSON_OCR_WORKERS', str(max(1, (os.cpu_count() or 1) // max(1, pool_size))))
+    limit_tesseract_threads()
+    root_logger = logging.getLogger()
+    if not root_logger.handlers:
+        logging.basicConfig(level=logging.DEBUG if verbose else logging.INFO,
+                            format='%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s')
+    if quiet_pipeline:
+        # Un archivo por worker para no intercalar volcados de distintos procesos
+        diagnostics_name = f"{Path(DEFAULT_DIAGNOSTICS_FILE).stem}.{os.getpid()}.jsonl"
+        configure_quiet_pipeline(Path.cwd() / diagnostics_name,
+                                 level=logging.DEBUG if verbose else logging.INFO)
+    _WORKER_MANAGER = ProfileManager(profiles_dir)
+
+def _process_chunk_in_worker(file_paths: List[str], args: argparse.Namespace, base_output_for_relative_path: Optional[Path]) -> Tuple[List[Tuple[str, str, Optional[str]]], Dict[str, Dict[str, float]], List[Dict[str, Any]]]:
+    """Procesa un lote de archivos dentro de un proceso worker.
+
+    Returns:
+        Tuple con (lista de (ruta, código de resultado, mensaje), tiempos por archivo, métricas por etapa)
+    """
+    chunk_stats = ProcessingStats()
+    results = []
+    for file_path_str in file_paths:
+        file_path = Path(file_path_str)
+        try:
+            result_code, message = _process_single_file(_WORKER_MANAGER, file_path, args, base_output_for_relative_path, stats=chunk_stats)
+        except Exception as e:
+            result_code, message = 'PROCESSING_EXCEPTION', str(e)
+        results.append((file_path_str, result_code, message))
+    # El pool termina los workers sin logging.shutdown: volcar los diagnósticos del lote
+    flush_pipeline_logs()
+    return results, chunk_stats.file_times, chunk_stats.pipeline_metrics.files
+
+def _process_files_multiprocess(files_to_process: List[Path], args, base_output_for_relative_path: Path, stats: ProcessingStats, max_workers: int):
+    """Procesa archivos en paralelo usando ProcessPoolExecutor.
+
+    Evita el GIL en las etapas CPU-bound (parseo de PDF, CommonBlockPreprocessor,
+    detección de autor). Los archivos se reparten en lotes para amortizar el coste
+    de IPC; cada worker devuelve resultados y tiempos que se agregan en ``stats``.
+    """
+    chunk_size = getattr(args, 'chunk_size', None)
+    if not chunk_size or chunk_size < 1:
+        # Lotes pequeños para equilibrar la carga, sin saturar de mensajes el pool
+        chunk_size = max(1, min(16, len(files_to_process) // (max_workers * 4)))
+    chunks = [[str(f) for f in files_to_process[i:i + chunk_size]]
+              for i in range(0, len(files_to_process), chunk_size)]
+    cprint(f"Repartiendo {len(files_to_process)} archivos en {len(chunks)} lotes de hasta {chunk_size}", level="INFO")
+
+    completed_count = 0
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_init_process_worker,
+                             initargs=(args.profiles_dir, args.verbose, args.quiet_pipeline, max_workers)) as executor:
+        future_to_chunk = {executor.submit(_process_chunk_in_worker, chunk, args, base_output_for_relative_path): chunk
+                           for chunk in chunks}
+
+        for future in as_completed(future_to_chunk):
+            chunk = future_to_chunk[future]
+            try:
+                results, file_times, file_metrics = future.result()
+            except Exception as e:
+                # El worker murió (p.ej. OOM o segfault en una librería nativa): todo el lote falla
+                cprint(f"Fallo de un proceso worker con {len(chunk)} archivos: {e}", level="ERROR")
+                results = [(file_path_str, 'PROCESSING_EXCEPTION', f"Fallo del proceso worker: {e}") for file_path_str in chunk]
+                file_times = {}
+                file_metrics = []
+
+            stats.merge_file_times(file_times)
+            stats.pipeline_metrics.extend(file_metrics)
+            for file_path_str, result_code, message in results:
+                completed_count += 1
+                cprint(f"Completado {completed_count}/{len(files_to_process)}: {Path(file_path_str).name}",
+                       level="INFO", emoji=ConsoleStyle.SUCCESS_EMOJI)
+                _update_stats_from_result(stats, Path(file_path_str), result_code, message)
+
 def _update_stats_from_result(stats: ProcessingStats, file_path: Path, result_code: str, message: str):
     """Actualiza las estadísticas basándose en el resultado del procesamiento"""
     if result_code == 'SUCCESS_WITH_UNITS':
@@ -642,7 +844,29 @@ def _update_stats_from_result(stats: ProcessingStats, file_path: Path, result_co
         stats.processing_exceptions += 1
         stats.add_failure(str(file_path), "PROCESSING_EXCEPTION", message)
 
-def _print_summary(stats: ProcessingStats):
+def _print_file_stage_timing(metrics: FileMetrics):
+    """Desglose por etapa de un archivo (--show-timing)."""
+    stages = ", ".join(f"{name}={format_duration(seconds)}" for name, seconds in metrics.stages.items())
+    counts = ", ".join(f"{name}={value}" for name, value in metrics.counts.items())
+    cprint(f"Etapas ({Path(metrics.file_path).name}): {stages or 'sin etapas'}"
+           f" | otros={format_duration(metrics.unaccounted_seconds)}", level="INFO", emoji=ConsoleStyle.TIMER_EMOJI)
+    memory = f", pico RSS={metrics.peak_rss_mb:.0f} MB" if metrics.peak_rss_mb is not None else ""
+    cprint(f"  {counts or 'sin contadores'}, bytes leídos={metrics.bytes_read}{memory}", level="INFO")
+
+def _print_stage_summary(report: PipelineMetricsReport):
+    """Tiempo agregado por etapa de todos los archivos (--show-timing)."""
+    cprint("Tiempo por Etapa del Pipeline:", level="HEADER", bold=True, emoji=ConsoleStyle.PERFORMANCE_EMOJI)
+    for name, stage in report.stage_totals().items():
+        cprint(f"  {name:<20} total {format_duration(stage['total']):>10}  ({stage['share']:.0%})"
+               f"  media {format_duration(stage['mean'])}  máx {format_duration(stage['max'])}"
+               f"  en {int(stage['files'])} archivos", level="INFO")
+    counts = report.count_totals()
+    cprint("  " + ", ".join(f"{name}={value}" for name, value in counts.items()), level="INFO")
+    peak = report.peak_rss_mb()
+    if peak is not None:
+        cprint(f"  Pico de memoria (RSS): {peak:.0f} MB", level="INFO")
+
+def _print_summary(stats: ProcessingStats, show_timing: bool = False):
     """Imprime el resumen del procesamiento."""
     cprint("Resumen del Procesamiento:", level="HEADER", bold=True, emoji="📊")
     cprint(f"Total de archivos intentados: {stats.total_files_attempted}", level="INFO")
@@ -675,6 +899,9 @@ def _print_summary(stats: ProcessingStats):
             cprint(f"Archivo más lento: {Path(slowest_path).name} ({format_duration(slowest_time)})", 
                    level="INFO", emoji="🐌")
 
+    if show_timing and len(stats.pipeline_metrics):
+        _print_stage_summary(stats.pipeline_metrics)
+
     total_fallos = stats.loader_errors + stats.config_errors + stats.processing_exceptions
     if total_fallos > 0:
         cprint(f"Detalle de archivos con errores/advertencias ({len(stats.failed_files_details)} entradas):", level="HEADER", bold=True, emoji="📋")
@@ -701,6 +928,7 @@ def signal_handler(sig, frame):
 def main():
     # Registrar el manejador de señal para SIGINT (Ctrl+C)
     signal.signal(signal.SIGINT, signal_handler)
+    limit_tesseract_threads()
 
     parser = argparse.ArgumentParser(description="Procesa archivos usando perfiles de segmentación.")
     parser.add_argument("input_path", nargs='?', help="Ruta al archivo o directorio a procesar.")
@@ -732,14 +960,36 @@ def main():
                       help="Procesar múltiples archivos en paralelo para mejorar el rendimiento.")
     performance_options.add_argument("--max-workers", type=int, 
                       help="Número máximo de workers paralelos (default: número de CPUs disponibles).")
+    performance_options.add_argument("--executor", choices=["thread", "process"], default="thread",
+                      help="Tipo de paralelismo con --parallel: 'thread' (comparte un ProfileManager) o 'process' "
+                           "(un ProfileManager por proceso, escala con los núcleos en cargas CPU-bound) (default: thread).")
+    performance_options.add_argument("--chunk-size", type=int,
+                      help="Archivos por lote enviado a cada proceso worker con --executor process (default: automático).")
+    performance_options.add_argument("--streaming", action="store_true",
+                      help="Procesar por ventanas de páginas y escribir los segmentos en NDJSON a medida que se producen "
+                           "(memoria acotada en documentos grandes; requiere --profile y salida NDJSON). "
+                           "Los JSON se leen con ijson en lotes de objetos.")
+    performance_options.add_argument("--stream-window-pages", type=int, default=20,
+                      help="Páginas por ventana en modo --streaming (default: 20).")
+    performance_options.add_argument("--incremental", action="store_true",
+                      help="Reprocesar solo los archivos cuya entrada o configuración efectiva (perfil, opciones, "
+                           "versión del pipeline) cambió desde la última ejecución; conservar las demás salidas.")
     performance_options.add_argument("--show-timing", action="store_true", 
-                      help="Mostrar tiempos de procesamiento detallados para cada archivo.")
+                      help="Mostrar tiempos de procesamiento detallados para cada archivo (desglose por etapa "
+                           "del pipeline, bloques, segmentos, bytes leídos y pico de memoria) y el agregado final.")
+    performance_options.add_argument("--timing-report", metavar="RUTA",
+                      help="Guardar las métricas por etapa de cada archivo en un informe JSON o CSV (según la extensión).")
+    performance_options.add_argument("--profile-stages", metavar="DIR",
+                      help="Perfilar cada etapa con cProfile y guardar un .prof por archivo y etapa en DIR.")
+    performance_options.add_argument("--quiet-pipeline", action="store_true",
+                      help="Enviar los diagnósticos del pipeline a pipeline_diagnostics.jsonl (JSON Lines, con buffer) "
+                           "en lugar de a la consola; solo los errores se muestran.")
     
     args = parser.parse_args()
     
     # Configurar logging
     # setup_logging se encarga de los mensajes de logging, cprint para mensajes directos del script.
-    setup_logging(args.verbose) 
+    setup_logging(args.verbose, args.quiet_pipeline)
     
     # Inicializar gestor de perfiles
     try:
@@ -765,7 +1015,11 @@ def main():
     process_path(manager, args, processing_stats)
 
     # Imprimir el resumen
-    _print_summary(processing_stats)
+    _print_summary(processing_stats, args.show_timing)
+    if args.timing_report:
+        report_path = processing_stats.pipeline_metrics.write(args.timing_report)
+        cprint(f"Informe de tiempos por etapa guardado en: {report_path}", level="INFO", emoji=ConsoleStyle.SAVE_EMOJI)
+    flush_pipeline_logs()
 
     # Código de salida basado en si hubo errores graves
     if processing_stats.loader_errors > 0 or \
@@ -12,15 +12,17 @@ import sys
 import os
 from pathlib import Path
 import json
+import shutil
+import itertools
 import threading
 import time
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Tuple
 from library_manager import LibraryManager
 import sqlite3
 import logging
 
-from flask import Flask, request, jsonify, send_file, abort
+from flask import Flask, request, jsonify, send_file, abort, Response, stream_with_context
 from flask_cors import CORS
 import argparse
 import subprocess
@@ -35,11 +37,15 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, project_root)
 
 # Importar funcionalidades existentes SIN MODIFICARLAS
-from dataset.processing.profile_manager import ProfileManager
 from dataset.scripts.process_file import core_process, ProcessingStats
 from dataset.processing.dedup_api import register_dedup_api
 from dataset.scripts.unify_ndjson import NDJSONUnifier
 from dataset.processing.deduplication import DeduplicationManager
+from dataset.processing.fulltext import ensure_fts_index, fts_count, fts_search
+from backend.ingestion_runner import IngestionRunner, IngestionCancelled, stage_progress
+from backend.job_scheduler import JobLog, JobScheduler, JobStore, OMITTED_CONFIG_KEY, scheduler_settings
+from backend.input_staging import StagedInput, staging_mode
+from dataset.processing.loaders.ocr_providers import set_ocr_concurrency, limit_tesseract_threads
 
 # Variables globales para el estado del procesamiento
 processing_jobs = {}  # {job_id: {status, progress, stats, thread}}
@@ -72,10 +78,91 @@ if os.name == "nt":
 class ProcessingJobManager:
     """Gestor de trabajos de procesamiento que usa las funciones existentes."""
     
-    def __init__(self):
+    # Trabajos terminados que se cargan de la base de datos al arrancar
+    RECENT_JOBS_ON_START = 200
+    
+    def __init__(self, store: Optional[JobStore] = None):
         self.jobs = {}
-        self.job_counter = 0
         self.lock = threading.Lock()
+        self.settings = scheduler_settings()
+        self.store = store or JobStore()
+        self.job_counter = self.store.last_seq()
+        # ProfileManager, modelo de embeddings y cliente de MeiliSearch compartidos entre trabajos
+        self.runner = IngestionRunner(
+            library_factory=LibraryManager,
+            stage_limits={'processing': self.settings['processing_jobs']}
+        )
+        set_ocr_concurrency(self.settings['ocr_jobs'])
+        limit_tesseract_threads()
+        self.scheduler = JobScheduler(self._execute_job, max_workers=self.settings['max_jobs'])
+        self._started = False
+        # Versión global de los cambios de los trabajos; los flujos de eventos esperan a que avance
+        self._events = threading.Condition()
+        self._event_version = 0
+        for job in self.store.load_recent(self.RECENT_JOBS_ON_START, self.settings['log_lines']):
+            job['logs'].on_append = self._notify
+            self.jobs[job['id']] = job
+    
+    def ensure_started(self):
+        """
+        Arranca los workers y reencola los trabajos interrumpidos por un reinicio.
+        
+        Se llama al atender peticiones y no al importar el módulo: con el recargador
+        de Flask el proceso vigilante también importa este archivo y no debe
+        ejecutar trabajos.
+        """
+        with self.lock:
+            if self._started:
+                return
+            self._started = True
+            self._recover_jobs()
+        self.scheduler.start()
+    
+    def _new_log(self) -> JobLog:
+        return JobLog(self.settings['log_lines'], on_append=self._notify)
+    
+    def _notify(self):
+        """Despierta a los flujos de eventos tras un cambio en algún trabajo."""
+        with self._events:
+            self._event_version += 1
+            self._events.notify_all()
+    
+    def _persist(self, job_id: str):
+        """Guarda el estado del trabajo; un fallo de la base de datos no detiene el trabajo."""
+        self._notify()
+        try:
+            self.store.save(self.jobs[job_id])
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo guardar el trabajo {job_id}: {e}")
+    
+    def _recover_jobs(self):
+        """
+        Reencola los trabajos que quedaron en cola o a medias.
+        
+        Los que usaban API keys no se reencolan: las keys no se guardan en disco y
+        el trabajo se ejecutaría sin ellas.
+        """
+        for job in self.jobs.values():
+            if job['status'] in ('queued', 'running') and job['config'].get(OMITTED_CONFIG_KEY):
+                omitted = ', '.join(job['config'][OMITTED_CONFIG_KEY])
+                job['logs'].append(f"No se reencola tras el reinicio: faltan datos que no se guardan en disco ({omitted})")
+                job['status'] = 'error'
+                job['message'] = 'Interrumpido por un reinicio del servidor; vuelve a enviar el trabajo con sus API keys'
+                job['finished_at'] = datetime.now().isoformat()
+                temp_upload_dir = job['config'].get('temp_upload_dir')
+                if temp_upload_dir and os.path.exists(temp_upload_dir):
+                    shutil.rmtree(temp_upload_dir, ignore_errors=True)
+                self._persist(job['id'])
+                logger.warning(f"⚠️ Trabajo {job['id']} marcado como error tras reinicio: requiere reenvío ({omitted})")
+            elif job['status'] in ('queued', 'running'):
+                job['logs'].append(f"Reencolado tras reinicio del servidor (estado previo: {job['status']})")
+                job['status'] = 'queued'
+                job['progress'] = 0
+                job['stages'] = {}
+                job['message'] = 'En cola'
+                self._persist(job['id'])
+                self.scheduler.submit(job['id'], job['priority'])
+                logger.info(f"🔁 Trabajo {job['id']} reencolado tras reinicio")
     
     def create_job(self, job_config: Dict[str, Any]) -> str:
         """Crea un nuevo trabajo de procesamiento."""
@@ -85,21 +172,25 @@ class ProcessingJobManager:
             
             self.jobs[job_id] = {
                 'id': job_id,
+                'seq': self.job_counter,
                 'status': 'pending',
+                'priority': int(job_config.get('priority', 0) or 0),
                 'progress': 0,
                 'message': 'Trabajo creado',
                 'config': job_config,
                 'stats': {},
+                'stages': {},
+                'logs': self._new_log(),
                 'created_at': datetime.now().isoformat(),
                 'started_at': None,
-                'finished_at': None,
-                'thread': None
+                'finished_at': None
             }
-            
-            return job_id
+        
+        self._persist(job_id)
+        return job_id
     
     def start_job(self, job_id: str):
-        """Inicia un trabajo de procesamiento usando core_process existente."""
+        """Encola un trabajo en el planificador; se ejecuta cuando haya un worker libre."""
         if job_id not in self.jobs:
             raise ValueError(f"Trabajo {job_id} no encontrado")
         
@@ -107,19 +198,26 @@ class ProcessingJobManager:
         if job['status'] != 'pending':
             raise ValueError(f"Trabajo {job_id} ya está en estado {job['status']}")
         
-        # Crear hilo para ejecutar el procesamiento
-        thread = threading.Thread(
-            target=self._run_processing_job,
-            args=(job_id,),
-            daemon=True
-        )
-        
-        job['thread'] = thread
-        job['status'] = 'running'
-        job['started_at'] = datetime.now().isoformat()
-        job['message'] = 'Procesamiento iniciado'
-        
-        thread.start()
+        self.ensure_started()
+        job['status'] = 'queued'
+        job['message'] = 'En cola'
+        self._persist(job_id)
+        self.scheduler.submit(job_id, job['priority'])
+    
+    def _execute_job(self, job_id: str):
+        """Punto de entrada de los workers del planificador."""
+        job = self.jobs.get(job_id)
+        with self.lock:
+            if job is None or job['status'] != 'queued':
+                return
+            job['status'] = 'running'
+            job['started_at'] = datetime.now().isoformat()
+            job['message'] = 'Procesamiento iniciado'
+        self._persist(job_id)
+        try:
+            self._run_processing_job(job_id)
+        finally:
+            self._persist(job_id)
     
     def _check_cancellation(self, job_id: str) -> bool:
         """Verifica si el trabajo ha sido cancelado."""
@@ -129,44 +227,21 @@ class ProcessingJobManager:
         """Ejecuta el trabajo de procesamiento automático completo."""
         job = self.jobs[job_id]
         config = job['config']
-        temp_dir = None
+        staged = None
         
         try:
             start_time = time.time()
             
-            # Paso 1: Crear carpeta temporal
+            # Paso 1: Preparar la entrada (sin copiar el árbol: ver backend/input_staging.py)
             if self._check_cancellation(job_id):
                 return
             
             job['progress'] = 5
-            job['message'] = 'Creando carpeta temporal...'
-            
-            import tempfile
-            import shutil
-            
-            # Crear carpeta temporal específica para este trabajo
-            temp_base = os.path.expanduser('~/AppData/Roaming/Biblioperson/temp')
-            os.makedirs(temp_base, exist_ok=True)
-            temp_dir = os.path.join(temp_base, job_id)
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            # Guardar temp_dir en stats para limpieza posterior
-            if 'stats' not in job:
-                job['stats'] = {}
-            job['stats']['temp_dir'] = temp_dir
-            
-            job['logs'] = [f"Carpeta temporal creada: {temp_dir}"]
+            job['message'] = 'Preparando archivos de entrada...'
             
             # Debug: Verificar configuración recibida
             job['logs'].append(f"Configuración recibida: {config}")
             
-            # Paso 2: Copiar archivos a carpeta temporal
-            if self._check_cancellation(job_id):
-                return
-            
-            job['progress'] = 10
-            job['message'] = 'Copiando archivos...'
-            
             input_path = config.get('input_path')
             if not input_path:
                 raise Exception("No se especificó input_path en la configuración")
@@ -175,187 +250,73 @@ class ProcessingJobManager:
             
             if not os.path.exists(input_path):
                 raise Exception(f"La ruta especificada no existe: {input_path}")
-            
-            if os.path.isfile(input_path):
-                shutil.copy2(input_path, temp_dir)
-                job['logs'].append(f"Archivo copiado: {os.path.basename(input_path)}")
-            elif os.path.isdir(input_path):
-                files_copied = 0
-                for root, dirs, files in os.walk(input_path):
-                    for file in files:
-                        if self._check_cancellation(job_id):
-                            return
-                        src_file = os.path.join(root, file)
-                        rel_path = os.path.relpath(src_file, input_path)
-                        dst_file = os.path.join(temp_dir, rel_path)
-                        os.makedirs(os.path.dirname(dst_file), exist_ok=True)
-                        shutil.copy2(src_file, dst_file)
-                        files_copied += 1
-                job['logs'].append(f"Directorio copiado: {files_copied} archivos")
-                
-                # Verificar que se copiaron archivos
-                temp_files = os.listdir(temp_dir)
-                job['logs'].append(f"Archivos en directorio temporal: {temp_files}")
-            else:
+            if not os.path.isfile(input_path) and not os.path.isdir(input_path):
                 raise Exception(f"La ruta no es ni archivo ni directorio: {input_path}")
             
-            # Paso 3: Procesar archivos a NDJSON
+            mode = staging_mode(config.get('staging'))
+            temp_dir = None
+            if mode != 'in_place':
+                # Carpeta específica para este trabajo; se vacía por si quedó de una ejecución interrumpida
+                temp_base = os.path.expanduser('~/AppData/Roaming/Biblioperson/temp')
+                temp_dir = os.path.join(temp_base, job_id)
+                if os.path.exists(temp_dir):
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                # Guardar temp_dir en stats para limpieza posterior
+                job['stats']['temp_dir'] = temp_dir
+                job['logs'].append(f"Carpeta temporal del trabajo: {temp_dir}")
+            
+            # La enumeración (y el enlazado o copia) sigue en segundo plano mientras se procesa
+            staged = StagedInput(input_path, mode, temp_dir).start()
+            job['logs'].append(f"Entrada preparada en modo '{mode}'")
+            
+            # Pasos 2-5: procesamiento, embeddings, MeiliSearch y biblioteca en proceso
             if self._check_cancellation(job_id):
                 return
             
-            job['progress'] = 20
-            job['message'] = 'Procesando archivos a NDJSON...'
-            
-            # Ejecutar el sistema de procesamiento existente
-            import subprocess
-            import sys
-            
-            process_script = os.path.join(os.path.dirname(__file__), '..', 'dataset', 'scripts', 'process_file.py')
-            
-            # Obtener perfil con validación y corrección
-            profile = config.get('profile', 'prosa')
-            
             # Corregir perfil automático (frontend envía 'auto' o 'automatico', sistema espera 'automático')
+            profile = config.get('profile', 'prosa')
             if profile in ['auto', 'automatico']:
                 profile = 'automático'
                 job['logs'].append(f"Perfil corregido de '{config.get('profile')}' a '{profile}'")
             
             job['logs'].append(f"Perfil configurado: '{profile}'")
             
-            # Decidir si la entrada es directorio o archivo
-            is_dir_mode = os.path.isdir(temp_dir)
-
-            if is_dir_mode:
-                # Cuando procesamos un directorio, pasamos --output como directorio para que process_file genere NDJSONs dentro
-                output_file = None  # Se determinará luego buscándolo en temp_dir
-            else:
-                output_file = os.path.join(temp_dir, 'processed_output.ndjson')
-            
-            cmd = [
-                sys.executable, '-X', 'utf8', process_script,
-                temp_dir,
-                '--profile', profile,
-            ]
-
-            if is_dir_mode:
-                # Salida como directorio
-                cmd.extend(['--output', temp_dir])
-            else:
-                cmd.extend(['--output', output_file])
-            
-            cmd.extend([
-                '--encoding', config.get('encoding', 'utf-8'),
-                '--verbose'  # Siempre usar verbose para debug
-            ])
-            
-            job['logs'].append(f"Comando a ejecutar: {' '.join(cmd)}")
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", errors="replace", cwd=os.path.dirname(process_script), env=dict(os.environ, PYTHONIOENCODING="utf-8"))
-            
-            # Agregar logs de debug para diagnosticar el problema
-            job['logs'].append(f"Return code: {result.returncode}")
-            job['logs'].append(f"STDOUT: {result.stdout}")
-            if result.stderr:
-                job['logs'].append(f"STDERR: {result.stderr}")
-            
-            if result.returncode != 0:
-                raise Exception(f"Error en procesamiento NDJSON: {result.stderr}")
-            
-            # Verificar si el archivo realmente se generó
-            if output_file and os.path.exists(output_file):
-                job['logs'].append(f"Procesamiento NDJSON completado: {output_file}")
-            else:
-                job['logs'].append(f"ADVERTENCIA: El archivo NDJSON no se generó en la ruta esperada: {output_file if output_file else temp_dir}")
-                # Buscar archivos NDJSON en el directorio temporal
-                ndjson_files = [f for f in os.listdir(temp_dir) if f.endswith('.ndjson')]
-                if ndjson_files:
-                    job['logs'].append(f"Archivos NDJSON encontrados en temp_dir: {ndjson_files}")
-                    # Usar el primer archivo encontrado
-                    output_file = os.path.join(temp_dir, ndjson_files[0])
-                    job['logs'].append(f"Usando archivo: {output_file}")
+            def on_progress(stage: str, fraction: float, message: str):
+                if self._check_cancellation(job_id):
+                    return
+                stage_info = job['stages'].setdefault(stage, {'status': 'running', 'progress': 0})
+                stage_info['status'] = 'completed' if fraction >= 1.0 else 'running'
+                stage_info['progress'] = int(fraction * 100)
+                # Mientras se enumera la entrada el total crece: no retroceder
+                job['progress'] = max(job['progress'], stage_progress(stage, fraction))
+                job['message'] = message
+                if fraction >= 1.0:
+                    self._persist(job_id)
                 else:
-                    job['logs'].append("No se encontraron archivos NDJSON en el directorio temporal")
-            
-            # Paso 4: Generar embeddings
-            if self._check_cancellation(job_id):
-                return
-            
-            job['progress'] = 50
-            job['message'] = 'Generando embeddings...'
-            
-            embedding_script = os.path.join(os.path.dirname(__file__), 'backend', 'procesar_semantica.py')
-            
-            cmd_embeddings = [sys.executable, '-X', 'utf8', embedding_script]
-            
-            # Agregar proveedor de embeddings si está especificado
-            embedding_provider = config.get('embedding_provider', 'sentence-transformers')
-            cmd_embeddings.extend(['--provider', embedding_provider])
-            
-            # Agregar configuración de API si es necesaria
-            if embedding_provider in ['novita-ai', 'openai'] and config.get('api_keys'):
-                api_config = {
-                    'novita': config['api_keys'].get('novita'),
-                    'openai': config['api_keys'].get('openai')
-                }
-                cmd_embeddings.extend(['--api-config', json.dumps(api_config)])
-            
-            if config.get('verbose'):
-                cmd_embeddings.append('--verbose')
-            
-            job['logs'].append(f"Generando embeddings con proveedor: {embedding_provider}")
-            
-            result = subprocess.run(cmd_embeddings, capture_output=True, text=True, encoding="utf-8", errors="replace", env=dict(os.environ, PYTHONIOENCODING="utf-8"))
-            
-            if result.returncode != 0:
-                job['logs'].append(f"Advertencia en embeddings: {result.stderr}")
-            else:
-                job['logs'].append("Embeddings generados exitosamente")
-            
-            # Paso 5: Indexar en MeiliSearch
-            if self._check_cancellation(job_id):
-                return
-            
-            job['progress'] = 75
-            job['message'] = 'Indexando en MeiliSearch...'
-            
-            meilisearch_script = os.path.join(os.path.dirname(__file__), 'backend', 'indexar_meilisearch.py')
+                    self._notify()
             
-            cmd_meilisearch = [sys.executable, '-X', 'utf8', meilisearch_script, '--indexar-nuevos']
-            if config.get('verbose'):
-                cmd_meilisearch.append('--verbose')
-            
-            result = subprocess.run(cmd_meilisearch, capture_output=True, text=True, encoding="utf-8", errors="replace", env=dict(os.environ, PYTHONIOENCODING="utf-8"))
-            
-            if result.returncode != 0:
-                job['logs'].append(f"Advertencia en MeiliSearch: {result.stderr}")
-            else:
-                job['logs'].append("Indexación en MeiliSearch completada")
-            
-            # Paso 6: Guardar en biblioteca
-            if self._check_cancellation(job_id):
+            try:
+                stage_stats = self.runner.run(
+                    job_id, staged, dict(config, profile=profile),
+                    progress=on_progress,
+                    log=job['logs'].append,
+                    is_cancelled=lambda: self._check_cancellation(job_id)
+                )
+            except IngestionCancelled:
                 return
             
-            job['progress'] = 85
-            job['message'] = 'Guardando en biblioteca...'
-            
-            try:
-                library_manager = LibraryManager()
-                documents_saved = library_manager.save_documents_from_ndjson(output_file, job_id)
-                job['logs'].append(f"Documentos guardados en biblioteca: {documents_saved}")
-                job['stats']['documents_saved'] = documents_saved
-            except Exception as e:
-                job['logs'].append(f"Advertencia al guardar en biblioteca: {str(e)}")
-                job['stats']['documents_saved'] = 0
+            job['stats']['stages'] = stage_stats
+            job['stats']['documents_saved'] = stage_stats.get('library', {}).get('documents_saved', 0)
             
-            # Paso 7: Limpiar archivos temporales
+            # Paso 6: Limpiar archivos temporales
             if self._check_cancellation(job_id):
                 return
             
             job['progress'] = 95
             job['message'] = 'Limpiando archivos temporales...'
             
-            if temp_dir and os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
+            staged.close()
+            if temp_dir:
                 job['logs'].append("Archivos temporales eliminados")
             
             # Limpiar directorio temporal de archivos subidos si existe
@@ -374,18 +335,11 @@ class ProcessingJobManager:
             job['finished_at'] = datetime.now().isoformat()
             job['stats'].update({
                 'total_time': f"{total_time:.2f}s",
-                'steps_completed': 7,
+                'steps_completed': 6,
                 'processing_successful': True
             })
             
         except Exception as e:
-            # Limpiar en caso de error
-            if temp_dir and os.path.exists(temp_dir):
-                try:
-                    shutil.rmtree(temp_dir)
-                except:
-                    pass
-            
             # Limpiar directorio temporal de archivos subidos si existe
             temp_upload_dir = config.get('temp_upload_dir')
             if temp_upload_dir and os.path.exists(temp_upload_dir):
@@ -397,41 +351,108 @@ class ProcessingJobManager:
             job['status'] = 'error'
             job['message'] = f'Error en procesamiento automático: {str(e)}'
             job['finished_at'] = datetime.now().isoformat()
-            
-            if 'logs' not in job:
-                job['logs'] = []
             job['logs'].append(f"Error: {str(e)}")
+        
+        finally:
+            # Detiene la enumeración y borra la carpeta del trabajo (si la hubo) en cualquier salida
+            if staged is not None:
+                staged.close()
     
     def get_job_status(self, job_id: str) -> Dict[str, Any]:
         """Obtiene el estado de un trabajo."""
         if job_id not in self.jobs:
             raise ValueError(f"Trabajo {job_id} no encontrado")
         
-        job = self.jobs[job_id].copy()
-        # Remover el thread del resultado (no es serializable)
-        job.pop('thread', None)
-        return job
+        return self._public_job(self.jobs[job_id])
+    
+    def _public_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Copia serializable del trabajo, con su posición si sigue en cola."""
+        job_copy = job.copy()
+        job_copy['logs'] = job['logs'].to_list()
+        if job['status'] == 'queued':
+            job_copy['queue_position'] = self.scheduler.queue_position(job['id'])
+        return job_copy
+    
+    def _progress_state(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        state = {
+            'status': job['status'],
+            'progress': job['progress'],
+            'message': job['message'],
+            'stages': {name: dict(info) for name, info in job.get('stages', {}).items()},
+        }
+        if job['status'] == 'queued':
+            state['queue_position'] = self.scheduler.queue_position(job['id'])
+        return state
+    
+    def stream_events(self, job_id: str, log_cursor: int = 0,
+                      keepalive: float = 15.0) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Eventos incrementales de un trabajo hasta que termina.
+        
+        Emite ``progress`` cuando cambian estado, progreso, mensaje o etapas; ``log``
+        con las líneas posteriores a ``log_cursor``; y ``done`` con el trabajo final
+        (sin logs) al terminar. Si no hay cambios en ``keepalive`` segundos emite
+        ``('keepalive', None)`` para mantener viva la conexión.
+        
+        Raises:
+            ValueError: Si el trabajo no existe
+        """
+        if job_id not in self.jobs:
+            raise ValueError(f"Trabajo {job_id} no encontrado")
+        job = self.jobs[job_id]
+        
+        last_state = None
+        last_sent = time.monotonic()
+        while True:
+            with self._events:
+                seen_version = self._event_version
+            
+            state = self._progress_state(job)
+            if state != last_state:
+                last_state = state
+                last_sent = time.monotonic()
+                yield 'progress', state
+            
+            lines, log_cursor, skipped = job['logs'].since(log_cursor)
+            if lines or skipped:
+                last_sent = time.monotonic()
+                yield 'log', {'lines': lines, 'cursor': log_cursor, 'skipped': skipped}
+            
+            if job['status'] in ('completed', 'error', 'cancelled'):
+                final = self._public_job(job)
+                final.pop('logs', None)
+                yield 'done', final
+                return
+            
+            # Los cambios de otros trabajos también despiertan la espera
+            with self._events:
+                if self._event_version == seen_version:
+                    self._events.wait(timeout=keepalive)
+            if time.monotonic() - last_sent >= keepalive:
+                last_sent = time.monotonic()
+                yield 'keepalive', None
     
     def cancel_job(self, job_id: str) -> bool:
-        """Cancela un trabajo en ejecución."""
+        """Cancela un trabajo en cola o en ejecución."""
         if job_id not in self.jobs:
             return False
         
         job = self.jobs[job_id]
         
-        # Solo se pueden cancelar trabajos en progreso
-        if job['status'] != 'running':
-            return False
-        
         try:
-            # Marcar el trabajo como cancelado
-            job['status'] = 'cancelled'
-            job['message'] = 'Trabajo cancelado por el usuario'
-            job['finished_at'] = datetime.now().isoformat()
+            with self.lock:
+                # Solo se pueden cancelar trabajos en cola o en progreso
+                if job['status'] not in ('queued', 'running'):
+                    return False
+                if job['status'] == 'queued':
+                    self.scheduler.remove(job_id)
+                
+                # Marcar el trabajo como cancelado
+                job['status'] = 'cancelled'
+                job['message'] = 'Trabajo cancelado por el usuario'
+                job['finished_at'] = datetime.now().isoformat()
             
             # Agregar log de cancelación
-            if 'logs' not in job:
-                job['logs'] = []
             job['logs'].append(f"Trabajo cancelado manualmente a las {datetime.now().strftime('%H:%M:%S')}")
             
             # Intentar limpiar archivos temporales si existen
@@ -445,6 +466,7 @@ class ProcessingJobManager:
                     except Exception as e:
                         job['logs'].append(f"Error limpiando archivos temporales: {str(e)}")
             
+            self._persist(job_id)
             return True
             
         except Exception as e:
@@ -453,16 +475,15 @@ class ProcessingJobManager:
     
     def list_jobs(self) -> List[Dict[str, Any]]:
         """Lista todos los trabajos."""
-        jobs = []
-        for job in self.jobs.values():
-            job_copy = job.copy()
-            job_copy.pop('thread', None)
-            jobs.append(job_copy)
-        return jobs
+        return [self._public_job(job) for job in list(self.jobs.values())]
 
 # Instancia global del gestor de trabajos
 job_manager = ProcessingJobManager()
 
+@app.before_request
+def _start_job_workers():
+    job_manager.ensure_started()
+
 # === NUEVOS ENDPOINTS DEDUPLICACIÓN ===
 
 dedup_manager = DeduplicationManager()
@@ -499,7 +520,7 @@ def health_check():
 def get_profiles():
     """Obtiene la lista de perfiles disponibles usando ProfileManager existente."""
     try:
-        manager = ProfileManager()
+        manager = job_manager.runner.get_profile_manager()
         profiles = manager.list_profiles()
         return jsonify({
             'success': True,
@@ -515,7 +536,7 @@ def get_profiles():
 def get_profile(profile_name):
     """Obtiene detalles de un perfil específico."""
     try:
-        manager = ProfileManager()
+        manager = job_manager.runner.get_profile_manager()
         profile = manager.get_profile(profile_name)
         if profile:
             return jsonify({
@@ -648,6 +669,46 @@ def get_processing_status(job_id):
             'error': str(e)
         }), 500
 
+@app.route('/api/processing/events/<job_id>', methods=['GET'])
+def stream_processing_events(job_id):
+    """
+    Flujo Server-Sent Events con el avance de un trabajo.
+    
+    Eventos: ``progress`` (estado, progreso, mensaje y etapas cuando cambian),
+    ``log`` (líneas nuevas; su ``id`` es el cursor de log) y ``done`` (trabajo final).
+    Al reconectar, EventSource envía Last-Event-ID y solo se reciben las líneas
+    que faltaban; ``?since=<cursor>`` hace lo mismo de forma explícita.
+    """
+    try:
+        log_cursor = int(request.headers.get('Last-Event-ID') or request.args.get('since') or 0)
+    except ValueError:
+        log_cursor = 0
+    
+    try:
+        events = job_manager.stream_events(job_id, log_cursor)
+        # Validar el trabajo antes de abrir el flujo
+        first_event = next(events)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    
+    def generate():
+        for event, data in itertools.chain([first_event], events):
+            if event == 'keepalive':
+                yield ": keepalive\n\n"
+                continue
+            message = f"event: {event}\n"
+            if event == 'log':
+                message += f"id: {data['cursor']}\n"
+            yield message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
 def cancel_job(job_id):
     """Cancela un trabajo en ejecución."""
@@ -963,6 +1024,69 @@ def get_document_segments(doc_id):
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/search/fulltext', methods=['GET'])
+def fulltext_search():
+    """
+    Búsqueda de texto completo (SQLite FTS5, ranking BM25) sin Meilisearch.
+    
+    Parámetros: ``q`` (texto), ``scope`` ('all', 'documents' o 'segments'),
+    ``limit`` (máx. 100) y ``offset``. Cada resultado incluye ``score`` (mayor =
+    más relevante) y ``snippet``: HTML escapado con los términos entre <mark>...</mark>.
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        scope = request.args.get('scope', 'all')
+        limit = min(int(request.args.get('limit', 20)), 100)
+        offset = int(request.args.get('offset', 0))
+        
+        if not query:
+            return jsonify({'success': False, 'error': 'q es requerido'}), 400
+        if scope not in ('all', 'documents', 'segments'):
+            return jsonify({'success': False, 'error': f'scope no válido: {scope}'}), 400
+        
+        response = {'success': True, 'query': query}
+        
+        if scope in ('all', 'documents'):
+            response['documents'] = LibraryManager().search_documents(query, limit=limit, offset=offset)
+        
+        if scope in ('all', 'segments'):
+            segments = {'results': [], 'total': 0}
+            segments_db_path = os.path.join(project_root, 'data.ms', 'documents.db')
+            if os.path.exists(segments_db_path):
+                with sqlite3.connect(segments_db_path) as conn:
+                    # Las bases creadas antes del índice se indexan la primera vez
+                    if ensure_fts_index(conn, 'segments', ['text']):
+                        results = fts_search(
+                            conn, 'segments', query,
+                            select_columns=['id', 'document_id', 'segment_order', 'segment_type', 'original_page'],
+                            snippet_column=0, limit=limit, offset=offset
+                        )
+                        document_ids = sorted({r['document_id'] for r in results})
+                        documents = {}
+                        if document_ids:
+                            placeholders = ','.join('?' * len(document_ids))
+                            cursor = conn.execute(
+                                f"SELECT id, title, author FROM documents WHERE id IN ({placeholders})",
+                                document_ids
+                            )
+                            documents = {row[0]: row for row in cursor.fetchall()}
+                        for result in results:
+                            document = documents.get(result['document_id'])
+                            result['document_title'] = document[1] if document else 'Unknown'
+                            result['document_author'] = document[2] if document else 'Unknown'
+                        segments = {'results': results, 'total': fts_count(conn, 'segments', query)}
+            response['segments'] = segments
+        
+        return jsonify(response)
+        
+    except Exception as e:
+        logger.error(f"Error en búsqueda de texto completo: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/search/semantic', methods=['POST'])
 def semantic_search():
     """Búsqueda semántica usando embeddings."""
@@ -987,15 +1111,14 @@ def semantic_search():
                 return jsonify({'error': 'No embeddings database found'}), 404
         
         try:
-            # Importar dependencias necesarias
-            import numpy as np
-            
             # Importar el generador de embeddings
             sys.path.append(os.path.join(project_root, 'scripts'))
-            from backend.generate_embeddings import EmbeddingGenerator
+            from backend.model_registry import get_embedding_generator
+            from backend.embedding_index import get_embedding_index
             
-            # Crear generador para la consulta usando el mismo modelo que los embeddings almacenados
-            generator = EmbeddingGenerator(
+            # Generador compartido del proceso, con el mismo modelo que los embeddings almacenados
+            # (se carga en la primera consulta y se reutiliza en las siguientes)
+            generator = get_embedding_generator(
                 provider="sentence-transformers",
                 model_name="all-mpnet-base-v2"  # Modelo ultra potente de 768 dimensiones
             )
@@ -1010,39 +1133,49 @@ def semantic_search():
                 # Verificar qué estructura de BD tenemos
                 cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
                 tables = [row[0] for row in cursor.fetchall()]
+                has_segments = 'segments' in tables
                 
-                if 'segments' in tables:
+                # Top-k sobre la matriz de embeddings en memoria (se carga una vez y se
+                # refresca de forma incremental con los embeddings nuevos)
+                if has_segments:
                     # BD con estructura de segments (data.ms/documents.db)
-                    cursor = conn.execute("""
-                        SELECT e.segment_id, e.embedding, s.text, s.document_id, s.original_page,
-                               d.title as document_title, d.author as document_author
-                        FROM embeddings e
-                        JOIN segments s ON e.segment_id = s.id
-                        JOIN documents d ON s.document_id = d.id
-                        WHERE e.model LIKE 'sentence-transformers:all-mpnet-base-v2%'
-                    """)
+                    index = get_embedding_index(embeddings_db_path, 'sentence-transformers:all-mpnet-base-v2', match_prefix=True)
                 else:
                     # BD de AppData (library.db) - estructura simplificada
-                    cursor = conn.execute("""
-                        SELECT e.document_id, e.embedding, e.text, 
-                               d.title as document_title, d.author as document_author
-                        FROM embeddings e
-                        JOIN documents d ON e.document_id = d.id
-                        WHERE e.model = 'sentence-transformers:all-mpnet-base-v2'
-                    """)
+                    index = get_embedding_index(embeddings_db_path, 'sentence-transformers:all-mpnet-base-v2')
+                index.refresh()
+                hits = index.search(query_embedding, limit)
+                
+                rows_by_rowid = {}
+                if hits:
+                    placeholders = ','.join('?' * len(hits))
+                    if has_segments:
+                        cursor = conn.execute(f"""
+                            SELECT e.rowid AS embedding_rowid, e.segment_id, s.text, s.document_id, s.original_page,
+                                   d.title as document_title, d.author as document_author
+                            FROM embeddings e
+                            JOIN segments s ON e.segment_id = s.id
+                            JOIN documents d ON s.document_id = d.id
+                            WHERE e.rowid IN ({placeholders})
+                        """, [rowid for rowid, _ in hits])
+                    else:
+                        cursor = conn.execute(f"""
+                            SELECT e.rowid AS embedding_rowid, e.document_id, e.text, 
+                                   d.title as document_title, d.author as document_author
+                            FROM embeddings e
+                            JOIN documents d ON e.document_id = d.id
+                            WHERE e.rowid IN ({placeholders})
+                        """, [rowid for rowid, _ in hits])
+                    rows_by_rowid = {row['embedding_rowid']: row for row in cursor.fetchall()}
                 
                 results = []
-                for row in cursor.fetchall():
-                    # Convertir embedding de bytes a numpy array
-                    stored_embedding = np.frombuffer(row['embedding'], dtype=np.float32)
-                    
-                    # Calcular similitud coseno
-                    similarity = np.dot(query_embedding, stored_embedding) / (
-                        np.linalg.norm(query_embedding) * np.linalg.norm(stored_embedding)
-                    )
+                for rowid, similarity in hits:
+                    row = rows_by_rowid.get(rowid)
+                    if row is None:
+                        continue
                     
                     # Adaptar estructura según el tipo de BD
-                    if 'segments' in tables:
+                    if has_segments:
                         # Estructura completa con segments
                         results.append({
                             'segment_id': row['segment_id'],
@@ -1051,7 +1184,7 @@ def semantic_search():
                             'document_title': row['document_title'],
                             'document_author': row['document_author'],
                             'original_page': row['original_page'],
-                            'similarity': float(similarity)
+                            'similarity': similarity
                         })
                     else:
                         # Estructura de AppData (library.db)
@@ -1062,12 +1195,12 @@ def semantic_search():
                             'document_title': row['document_title'],
                             'document_author': row['document_author'],
                             'original_page': None,  # No hay páginas originales en AppData
-                            'similarity': float(similarity)
+                            'similarity': similarity
                         })
                 
-                # Ordenar por similitud y tomar los mejores resultados
-                results.sort(key=lambda x: x['similarity'], reverse=True)
-                results = results[:limit]
+                if len(results) < len(hits):
+                    # Embeddings borrados desde la última carga: se excluyen del índice en memoria
+                    index.discard(rowid for rowid, _ in hits if rowid not in rows_by_rowid)
                 
                 return jsonify({
                     'query': query,
@@ -1238,12 +1371,14 @@ if __name__ == '__main__':
     print("  GET  /api/profiles/<name> - Detalles de perfil")
     print("  POST /api/processing/start - Iniciar procesamiento")
     print("  GET  /api/processing/status/<job_id> - Estado de trabajo")
+    print("  GET  /api/processing/events/<job_id> - Avance de trabajo (SSE)")
     print("  GET  /api/processing/jobs - Lista de trabajos")
     print("  POST /api/jobs/<job_id>/cancel - Cancelar trabajo")
     print("  GET  /api/files/browse - Explorar archivos")
     print("  GET  /api/library/documents - Obtener documentos de biblioteca")
     print("  GET  /api/library/documents/<id> - Obtener documento específico")
     print("  GET  /api/library/stats - Estadísticas de biblioteca")
+    print("  GET  /api/search/fulltext?q=<texto> - Búsqueda de texto completo (FTS5)")
     print("  DELETE /api/library/documents/<id> - Eliminar documento")
     print("  [Deduplicación] /dedup/* - Endpoints de deduplicación existentes")
     print("")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Formato binario compacto para almacenar embeddings en SQLite.
+
+Cada vector se guarda como BLOB: una cabecera de 12 bytes seguida de los valores
+en float32 o float16 (little-endian). Un vector de 768 dimensiones ocupa ~3 KB en
+float32 (~1.5 KB en float16) frente a ~15 KB como texto JSON.
+
+Cabecera (struct '<4sBBHI'):
+    magic   b'BPEV'
+    version 1
+    dtype   1 = float32, 2 = float16
+    (reservado, 2 bytes)
+    dim     número de dimensiones
+
+decode_embedding() también acepta los formatos anteriores: texto JSON y BLOBs
+float32 crudos sin cabecera (tabla ``embeddings``).
+"""
+
+import json
+import struct
+from typing import Any, Optional, Sequence, Union
+
+import numpy as np
+
+MAGIC = b'BPEV'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHI')
+
+_DTYPE_CODES = {'float32': 1, 'float16': 2}
+_CODE_DTYPES = {1: np.dtype('<f4'), 2: np.dtype('<f2')}
+
+
+def encode_embedding(vector: Union[Sequence[float], np.ndarray], dtype: str = 'float32') -> bytes:
+    """
+    Serializa un vector al formato binario con cabecera.
+
+    Args:
+        vector: Embedding (lista de floats o array de numpy)
+        dtype: 'float32' o 'float16'
+    """
+    if dtype not in _DTYPE_CODES:
+        raise ValueError(f"dtype no soportado: {dtype} (usar 'float32' o 'float16')")
+    code = _DTYPE_CODES[dtype]
+    array = np.asarray(vector, dtype=_CODE_DTYPES[code]).ravel()
+    return HEADER.pack(MAGIC, VERSION, code, 0, array.shape[0]) + array.tobytes()
+
+
+def is_binary_embedding(value: Any) -> bool:
+    """True si el valor ya está en el formato binario con cabecera."""
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:4]) == MAGIC
+
+
+def decode_embedding(value: Any) -> Optional[np.ndarray]:
+    """
+    Decodifica un embedding almacenado.
+
+    Los BLOBs se leen con np.frombuffer sin copiar: el array devuelto es de solo
+    lectura y, en float16, conserva ese dtype (usar .astype(np.float32) si hace falta).
+
+    Returns:
+        Array de numpy, o None si el valor está vacío
+    """
+    if value is None or (isinstance(value, (str, bytes)) and not value):
+        return None
+    if isinstance(value, str):
+        # Formato anterior: lista JSON
+        return np.asarray(json.loads(value), dtype=np.float32)
+    if is_binary_embedding(value):
+        _, version, code, _, dim = HEADER.unpack_from(value)
+        if version != VERSION or code not in _CODE_DTYPES:
+            raise ValueError(f"Embedding binario con versión/dtype desconocidos: v{version}, dtype={code}")
+        return np.frombuffer(value, dtype=_CODE_DTYPES[code], count=dim, offset=HEADER.size)
+    # BLOB float32 crudo sin cabecera
+    return np.frombuffer(value, dtype=np.float32)
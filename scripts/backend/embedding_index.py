@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Índice vectorial en memoria para la búsqueda semántica de Biblioperson.
+
+Carga una sola vez todos los embeddings de un modelo en una matriz float32
+contigua y pre-normalizada (persistida en disco y abierta con memory-map), junto
+a un array con el rowid de cada fila de la tabla ``embeddings``. Una consulta
+top-k es un único producto matriz-vector más ``argpartition``; los embeddings
+nuevos se incorporan de forma incremental leyendo solo las filas con rowid mayor
+al último indexado.
+
+Los vectores nuevos quedan en una cola en memoria y se fusionan con la matriz
+del disco por lotes (``TAIL_MERGE_ROWS``). Cada fusión escribe un archivo nuevo
+y cambia a él: el archivo abierto con memory-map nunca se sobrescribe (en Windows
+no se puede).
+"""
+
+import os
+import re
+import json
+import hashlib
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .embedding_codec import decode_embedding
+
+logger = logging.getLogger(__name__)
+
+# Vectores en la cola en memoria a partir de los cuales se fusionan con la matriz del disco
+TAIL_MERGE_ROWS = 4096
+
+
+class EmbeddingIndex:
+    """Matriz de embeddings normalizados de un modelo, con refresco incremental."""
+
+    def __init__(self, db_path: str, model: str, match_prefix: bool = False,
+                 cache_dir: Optional[str] = None):
+        """
+        Args:
+            db_path: Ruta a la base de datos SQLite con la tabla ``embeddings``
+            model: Valor de la columna ``model`` a indexar
+            match_prefix: Si es True se indexan los modelos que empiezan por ``model``
+                          (p.ej. 'sentence-transformers:all-mpnet-base-v2%')
+            cache_dir: Directorio donde persistir la matriz (por defecto junto a la BD)
+        """
+        self.db_path = db_path
+        self.model = model
+        self.match_prefix = match_prefix
+        self.cache_dir = Path(cache_dir) if cache_dir else Path(db_path).parent / 'embedding_index'
+
+        self.matrix: Optional[np.ndarray] = None  # (n, dim) float32, filas con norma 1
+        self.rowids: Optional[np.ndarray] = None  # (n,) int64, rowid en la tabla embeddings
+        self.max_rowid = 0
+        # Vectores añadidos desde la última fusión (solo en memoria)
+        self._tail_matrix: Optional[np.ndarray] = None
+        self._tail_rowids = np.empty(0, dtype=np.int64)
+        # Rowids que ya no existen en la BD; se excluyen de las consultas y de la próxima fusión
+        self._excluded: set = set()
+        self._excluded_mask: Optional[np.ndarray] = None
+        self._generation = 0
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------ #
+    # Persistencia
+    # ------------------------------------------------------------------ #
+
+    @property
+    def _cache_stem(self) -> Path:
+        safe_model = "".join(c if c.isalnum() or c in '-_.' else '_' for c in self.model)
+        return self.cache_dir / safe_model
+
+    def _matrix_path(self, generation: int) -> Path:
+        return Path(f"{self._cache_stem}.{generation}.matrix.npy")
+
+    def _rowids_path(self, generation: int) -> Path:
+        return Path(f"{self._cache_stem}.{generation}.rowids.npy")
+
+    def _model_clause(self) -> Tuple[str, str]:
+        if self.match_prefix:
+            return "model LIKE ?", f"{self.model}%"
+        return "model = ?", self.model
+
+    def _anchor(self, rowid: int) -> Optional[str]:
+        """
+        Huella del embedding con ``rowid`` en la BD actual.
+
+        Identifica la BD a la que corresponde el índice persistido: si se recrea,
+        los rowids vuelven a empezar en 1 y la fila ancla ya no coincide.
+        """
+        if not rowid:
+            return None
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT embedding FROM embeddings WHERE rowid = ?", (rowid,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        blob = row[0] if isinstance(row[0], bytes) else str(row[0]).encode('utf-8')
+        return hashlib.sha1(blob).hexdigest()
+
+    def _load_from_disk(self) -> bool:
+        """Abre la matriz persistida con memory-map si corresponde a esta BD."""
+        meta_path = self._cache_stem.with_suffix('.json')
+        if not meta_path.exists():
+            return False
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('db_path') != os.path.abspath(self.db_path):
+                return False
+            max_rowid = int(meta.get('max_rowid', 0))
+            if meta.get('anchor') is None or meta['anchor'] != self._anchor(max_rowid):
+                logger.info(f"El índice persistido no corresponde a la BD actual; se reconstruirá ({self.model})")
+                return False
+            generation = int(meta['generation'])
+            self.matrix = np.load(self._matrix_path(generation), mmap_mode='r')
+            self.rowids = np.load(self._rowids_path(generation))
+            self.max_rowid = max_rowid
+            self._generation = generation
+            self._reset_tail()
+            logger.info(f"Índice de embeddings cargado desde disco: {len(self.rowids)} vectores ({self.model})")
+            return True
+        except Exception as e:
+            logger.warning(f"No se pudo cargar el índice persistido ({e}); se reconstruirá")
+            self.matrix = None
+            self.rowids = None
+            self.max_rowid = 0
+            return False
+
+    def _save_to_disk(self, matrix: np.ndarray, rowids: np.ndarray) -> None:
+        """
+        Persiste ``matrix``/``rowids`` como una generación nueva y pasa a usarla.
+
+        Se escribe en archivos nuevos y después se reemplaza el JSON de metadatos:
+        la matriz anterior puede seguir abierta con memory-map.
+        """
+        generation = self._generation + 1
+        matrix_path, rowids_path = self._matrix_path(generation), self._rowids_path(generation)
+        meta_path = self._cache_stem.with_suffix('.json')
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(matrix_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+            with open(rowids_path, 'wb') as f:
+                np.save(f, rowids)
+            tmp_meta = meta_path.with_suffix('.json.tmp')
+            with open(tmp_meta, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'db_path': os.path.abspath(self.db_path),
+                    'model': self.model,
+                    'generation': generation,
+                    'count': int(len(rowids)),
+                    'dimensions': int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+                    'max_rowid': int(self.max_rowid),
+                    'anchor': self._anchor(self.max_rowid)
+                }, f)
+            os.replace(tmp_meta, meta_path)
+        except Exception as e:
+            logger.warning(f"No se pudo persistir el índice de embeddings: {e}")
+            self.matrix, self.rowids = matrix, rowids
+            return
+
+        # Reabrir en modo memory-map para no duplicar la matriz en memoria
+        self.matrix = np.load(matrix_path, mmap_mode='r')
+        self.rowids = rowids
+        self._generation = generation
+        self._remove_stale_generations()
+
+    def _remove_stale_generations(self) -> None:
+        """Borra las generaciones anteriores (en Windows puede fallar si siguen mapeadas)."""
+        stale = re.compile(re.escape(self._cache_stem.name) + r'(\.\d+)?\.(matrix|rowids)\.npy$')
+        current = {self._matrix_path(self._generation).name, self._rowids_path(self._generation).name}
+        for path in self.cache_dir.glob(f"{self._cache_stem.name}.*.npy"):
+            if path.name in current or not stale.match(path.name):
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------ #
+    # Construcción y refresco
+    # ------------------------------------------------------------------ #
+
+    def _fetch_rows(self, after_rowid: int,
+                    dimensions: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Lee de SQLite los embeddings con rowid mayor a ``after_rowid``.
+
+        Con ``match_prefix`` pueden coincidir modelos de dimensiones distintas: solo se
+        conservan los vectores de ``dimensions`` (por defecto, la dimensión más
+        frecuente entre las filas leídas) y el resto se descarta antes de apilarlos.
+
+        Returns:
+            (rowids, vectores normalizados, último rowid leído, incluidas las descartadas)
+        """
+        clause, param = self._model_clause()
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                f"SELECT rowid, embedding FROM embeddings WHERE {clause} AND rowid > ? ORDER BY rowid",
+                (param, after_rowid)
+            ).fetchall()
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32), after_rowid
+        last_rowid = int(rows[-1][0])
+
+        # decode_embedding lee cada BLOB con np.frombuffer (sin copia); la única copia
+        # es el volcado a la matriz contigua
+        decoded = [(rowid, vector) for rowid, vector in ((r[0], decode_embedding(r[1])) for r in rows)
+                   if vector is not None]
+        if dimensions is None and decoded:
+            dimensions = Counter(vector.shape[0] for _, vector in decoded).most_common(1)[0][0]
+        kept = [(rowid, vector) for rowid, vector in decoded if vector.shape[0] == dimensions]
+        if len(kept) < len(rows):
+            logger.warning(f"Índice de embeddings ({self.model}): {len(rows) - len(kept)} filas ignoradas "
+                           f"por dimensión distinta de {dimensions} o contenido ilegible")
+        if not kept:
+            return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32), last_rowid
+
+        rowids = np.fromiter((rowid for rowid, _ in kept), dtype=np.int64, count=len(kept))
+        vectors = np.stack([vector for _, vector in kept]).astype(np.float32, copy=False)
+        return rowids, _normalize_rows(vectors), last_rowid
+
+    def _reset_tail(self) -> None:
+        self._tail_matrix = None
+        self._tail_rowids = np.empty(0, dtype=np.int64)
+        self._excluded = set()
+        self._excluded_mask = None
+
+    def build(self) -> None:
+        """Reconstruye el índice completo desde la base de datos."""
+        with self._lock:
+            rowids, vectors, last_rowid = self._fetch_rows(0)
+            self._reset_tail()
+            self.max_rowid = last_rowid
+            logger.info(f"Índice de embeddings construido: {len(rowids)} vectores ({self.model})")
+            if len(rowids):
+                self._save_to_disk(vectors, rowids)
+            else:
+                self.matrix, self.rowids = vectors, rowids
+
+    def refresh(self) -> int:
+        """
+        Incorpora los embeddings añadidos desde la última carga.
+
+        Los vectores nuevos se acumulan en memoria; la matriz del disco solo se
+        reescribe al superar ``TAIL_MERGE_ROWS``.
+
+        Returns:
+            Número de vectores nuevos indexados
+        """
+        with self._lock:
+            if self.rowids is None and not self._load_from_disk():
+                self.build()
+                return len(self.rowids)
+
+            if len(self.rowids):
+                dimensions = self.matrix.shape[1]
+            elif self._tail_matrix is not None:
+                dimensions = self._tail_matrix.shape[1]
+            else:
+                dimensions = None
+            rowids, vectors, last_rowid = self._fetch_rows(self.max_rowid, dimensions)
+            self.max_rowid = last_rowid
+            if not len(rowids):
+                return 0
+
+            if self._tail_matrix is None:
+                self._tail_matrix = vectors
+            else:
+                self._tail_matrix = np.concatenate([self._tail_matrix, vectors])
+            self._tail_rowids = np.concatenate([self._tail_rowids, rowids])
+            self._excluded_mask = None
+            logger.info(f"Índice de embeddings actualizado: +{len(rowids)} vectores")
+            if len(self._tail_rowids) >= TAIL_MERGE_ROWS or not len(self.rowids):
+                self.merge()
+            return len(rowids)
+
+    def merge(self) -> None:
+        """Fusiona la cola en memoria con la matriz del disco, sin los rowids excluidos."""
+        with self._lock:
+            if self.rowids is None:
+                return
+            if self._tail_matrix is None and not self._excluded:
+                return
+            matrix, rowids = self._combined()
+            if self._excluded:
+                keep = ~np.isin(rowids, np.fromiter(self._excluded, dtype=np.int64))
+                matrix, rowids = matrix[keep], rowids[keep]
+            self._reset_tail()
+            self._save_to_disk(np.asarray(matrix), rowids)
+            logger.info(f"Índice de embeddings fusionado en disco: {len(rowids)} vectores ({self.model})")
+
+    def discard(self, rowids: Iterable[int]) -> None:
+        """
+        Excluye de las consultas rowids cuyo embedding ya no existe en la BD.
+
+        Solo cambia el índice en memoria; las filas se eliminan del disco en la
+        próxima fusión.
+        """
+        with self._lock:
+            new = {int(rowid) for rowid in rowids} - self._excluded
+            if not new:
+                return
+            self._excluded |= new
+            self._excluded_mask = None
+            logger.info(f"Índice de embeddings: {len(new)} entradas obsoletas excluidas ({self.model})")
+
+    def _combined(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Matriz y rowids del disco seguidos de la cola en memoria."""
+        if self._tail_matrix is None:
+            return self.matrix, self.rowids
+        if not len(self.rowids):
+            return self._tail_matrix, self._tail_rowids
+        return np.concatenate([self.matrix, self._tail_matrix]), np.concatenate([self.rowids, self._tail_rowids])
+
+    def invalidate(self) -> None:
+        """Fuerza la reconstrucción completa en el próximo refresh (p.ej. tras recrear la BD)."""
+        with self._lock:
+            self.matrix = None
+            self.rowids = None
+            self.max_rowid = 0
+            self._reset_tail()
+            meta_path = self._cache_stem.with_suffix('.json')
+            if meta_path.exists():
+                meta_path.unlink()
+
+    # ------------------------------------------------------------------ #
+    # Consulta
+    # ------------------------------------------------------------------ #
+
+    def search(self, query_embedding: np.ndarray, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Devuelve los k embeddings más similares (coseno) a la consulta.
+
+        Returns:
+            Lista de (rowid en la tabla embeddings, similitud) ordenada de mayor a menor
+        """
+        with self._lock:
+            if self.rowids is None:
+                self.refresh()
+            matrix, rowids = self.matrix, self.rowids
+            tail_matrix, tail_rowids = self._tail_matrix, self._tail_rowids
+            excluded = self._excluded_positions()
+
+        count = (len(rowids) if rowids is not None else 0) + len(tail_rowids)
+        if not count or k <= 0:
+            return []
+
+        dimensions = matrix.shape[1] if len(rowids) else tail_matrix.shape[1]
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        if query.shape[0] != dimensions:
+            raise ValueError(f"Dimensión de la consulta ({query.shape[0]}) distinta a la del índice ({dimensions})")
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+
+        scores = matrix @ query if len(rowids) else np.empty(0, dtype=np.float32)
+        if tail_matrix is not None:
+            scores = np.concatenate([scores, tail_matrix @ query])
+            rowids = np.concatenate([rowids, tail_rowids]) if len(rowids) else tail_rowids
+        if excluded is not None:
+            scores[excluded] = -np.inf
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(rowids[i]), float(scores[i])) for i in top if scores[i] != -np.inf]
+
+    def _excluded_positions(self) -> Optional[np.ndarray]:
+        """Máscara booleana (disco + cola) de las posiciones excluidas; se cachea hasta el próximo cambio."""
+        if not self._excluded:
+            return None
+        if self._excluded_mask is None:
+            rowids = np.concatenate([self.rowids, self._tail_rowids])
+            self._excluded_mask = np.isin(rowids, np.fromiter(self._excluded, dtype=np.int64))
+        return self._excluded_mask
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Normaliza cada fila a norma 1 (las filas nulas se dejan a cero)."""
+    vectors = np.array(vectors, dtype=np.float32, copy=True)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors /= norms
+    return vectors
+
+
+_indexes: Dict[Tuple[str, str, bool], EmbeddingIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_embedding_index(db_path: str, model: str, match_prefix: bool = False) -> EmbeddingIndex:
+    """Devuelve el índice compartido (uno por BD y modelo) para este proceso."""
+    key = (os.path.abspath(db_path), model, match_prefix)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = EmbeddingIndex(db_path, model, match_prefix=match_prefix)
+            _indexes[key] = index
+        return index
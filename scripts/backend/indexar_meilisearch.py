@@ -30,11 +30,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+try:
+    from .embedding_codec import decode_embedding
+except ImportError:
+    from embedding_codec import decode_embedding
+
+# Sin sys.exit al importar: el runner de ingesta del API usa este módulo en proceso
 try:
     import meilisearch
 except ImportError:
-    logger.error("meilisearch no está instalado. Instálalo con: pip install meilisearch")
-    sys.exit(1)
+    meilisearch = None
+
+MEILISEARCH_MISSING = "meilisearch no está instalado. Instálalo con: pip install meilisearch"
 
 class MeiliSearchIndexer:
     """Indexador de MeiliSearch para contenido de Biblioperson."""
@@ -69,6 +76,8 @@ class MeiliSearchIndexer:
     
     def connect_meilisearch(self):
         """Conecta a MeiliSearch."""
+        if meilisearch is None:
+            raise ImportError(MEILISEARCH_MISSING)
         try:
             self.client = meilisearch.Client(self.meilisearch_url, self.api_key)
             # Verificar conexión
@@ -190,7 +199,9 @@ class MeiliSearchIndexer:
             content_list = []
             for row in results:
                 try:
-                    embedding = json.loads(row[10]) if row[10] else None
+                    # BLOB binario (np.frombuffer sin copia) o JSON de bases sin migrar
+                    vector = decode_embedding(row[10])
+                    embedding = vector.astype(float).tolist() if vector is not None else None
                     jerarquia = json.loads(row[9]) if row[9] else {}
                     
                     content_item = {
@@ -294,8 +305,13 @@ class MeiliSearchIndexer:
         except Exception as e:
             logger.warning(f"Error al marcar como indexado: {e}")
     
-    def process_all(self, only_new: bool = False, recreate_index: bool = False):
-        """Procesa todo el contenido para indexación."""
+    def process_all(self, only_new: bool = False, recreate_index: bool = False) -> int:
+        """
+        Procesa todo el contenido para indexación.
+        
+        Returns:
+            Número de elementos enviados al índice
+        """
         logger.info("Iniciando indexación en MeiliSearch")
         
         # Configurar índice
@@ -307,12 +323,13 @@ class MeiliSearchIndexer:
         
         if not content_list:
             logger.info("No hay contenido para indexar")
-            return
+            return 0
         
         # Indexar contenido
         self.index_content(content_list)
         
         logger.info("Indexación completada")
+        return len(content_list)
 
 def main():
     parser = argparse.ArgumentParser(description="Indexar contenido en MeiliSearch")
@@ -334,6 +351,10 @@ def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
+    if meilisearch is None:
+        logger.error(MEILISEARCH_MISSING)
+        sys.exit(1)
+    
     try:
         indexer = MeiliSearchIndexer(meilisearch_url=args.url, api_key=args.api_key)
         indexer.process_all(only_new=args.indexar_nuevos, recreate_index=args.recrear_indice)
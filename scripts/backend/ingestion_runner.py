@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Runner de ingesta en proceso para los trabajos del API.
+
+Antes cada trabajo lanzaba process_file.py, procesar_semantica.py e
+indexar_meilisearch.py como subprocesos: cada etapa pagaba el arranque del
+intérprete, volvía a importar PyMuPDF/pandas/torch, recargaba el modelo de
+embeddings y su stdout completo acababa en los logs del trabajo. IngestionRunner
+ejecuta las mismas etapas dentro del servidor reutilizando entre trabajos un
+ProfileManager, el procesador de embeddings (con el modelo en el registro de
+modelos) y el cliente de MeiliSearch ya inicializados. Los segmentos pasan de la
+etapa de procesamiento a la biblioteca a través de un NDJSON temporal
+(SegmentSpool), de modo que un directorio grande no queda entero en memoria, y el
+avance de cada etapa se informa al trabajo mediante un callback.
+"""
+
+import json
+import logging
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    from .input_staging import StagedInput
+except ImportError:
+    from input_staging import StagedInput
+
+logger = logging.getLogger(__name__)
+
+# Etapas del pipeline y el tramo de progreso global (0-100) que ocupa cada una
+STAGES: Tuple[Tuple[str, int, int], ...] = (
+    ('processing', 20, 50),
+    ('embeddings', 50, 75),
+    ('meilisearch', 75, 85),
+    ('library', 85, 95),
+)
+STAGE_RANGES = {name: (start, end) for name, start, end in STAGES}
+
+ProgressCallback = Callable[[str, float, str], None]
+
+
+class IngestionCancelled(Exception):
+    """El trabajo se canceló entre dos pasos del pipeline."""
+
+
+class SegmentSpool:
+    """Segmentos serializados de cada documento, en un NDJSON temporal en disco."""
+
+    def __init__(self):
+        # TemporaryFile se borra al cerrarse (también en Windows)
+        self._file = tempfile.TemporaryFile('w+b', prefix='biblioperson_segments_', suffix='.ndjson')
+        self._offsets: List[int] = []
+
+    def add(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Añade los segmentos de un documento. Devuelve cuántos se escribieron."""
+        self._file.seek(0, 2)
+        offset = self._file.tell()
+        count = 0
+        try:
+            for record in records:
+                self._file.write(json.dumps(record, ensure_ascii=False, default=str).encode('utf-8') + b'\n')
+                count += 1
+        except BaseException:
+            # Sin segmentos a medias: se atribuirían al documento anterior
+            self._file.seek(offset)
+            self._file.truncate()
+            raise
+        if count:
+            self._offsets.append(offset)
+        return count
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def documents(self) -> Iterator[Iterator[Dict[str, Any]]]:
+        """Los segmentos de cada documento, leídos del disco a medida que se consumen."""
+        self._file.flush()
+        ends = self._offsets[1:] + [None]
+        for start, end in zip(self._offsets, ends):
+            yield self._read(start, end)
+
+    def _read(self, start: int, end: Optional[int]) -> Iterator[Dict[str, Any]]:
+        self._file.seek(start)
+        while end is None or self._file.tell() < end:
+            line = self._file.readline()
+            if not line:
+                return
+            yield json.loads(line)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class IngestionRunner:
+    """Pipeline de ingesta (procesamiento → embeddings → MeiliSearch → biblioteca) en proceso."""
+
+    def __init__(self, library_factory: Callable[[], Any], profiles_dir: Optional[str] = None,
+                 meilisearch_url: str = "http://localhost:7700", meilisearch_api_key: Optional[str] = None,
+                 stage_limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            library_factory: Crea el gestor de biblioteca (LibraryManager)
+            profiles_dir: Directorio de perfiles para el ProfileManager (None = por defecto)
+            meilisearch_url: URL del servidor MeiliSearch
+            meilisearch_api_key: API key de MeiliSearch
+            stage_limits: Trabajos que pueden estar a la vez en cada etapa
+                          (p. ej. ``{'processing': 2}``); las etapas ausentes no se limitan
+        """
+        self.library_factory = library_factory
+        self.profiles_dir = profiles_dir
+        self.meilisearch_url = meilisearch_url
+        self.meilisearch_api_key = meilisearch_api_key
+        self._profile_manager = None
+        self._embedding_processors: Dict[str, Any] = {}
+        self._indexer = None
+        self._init_lock = threading.Lock()
+        # Embeddings e indexación recorren toda la base de contenido: dos trabajos a la
+        # vez procesarían las mismas filas
+        self._index_lock = threading.Lock()
+        self._stage_slots = {stage: threading.BoundedSemaphore(limit)
+                             for stage, limit in (stage_limits or {}).items() if limit}
+
+    # ------------------------------------------------------------------ #
+    # Componentes calientes
+    # ------------------------------------------------------------------ #
+
+    def get_profile_manager(self):
+        with self._init_lock:
+            if self._profile_manager is None:
+                from dataset.processing.profile_manager import ProfileManager
+                started = time.monotonic()
+                self._profile_manager = ProfileManager(self.profiles_dir)
+                logger.info(f"ProfileManager del runner inicializado en {time.monotonic() - started:.1f}s")
+            return self._profile_manager
+
+    def _get_embedding_processor(self, provider: str):
+        with self._init_lock:
+            processor = self._embedding_processors.get(provider)
+            if processor is None:
+                try:
+                    from .procesar_semantica import EmbeddingProcessor
+                except ImportError:
+                    from procesar_semantica import EmbeddingProcessor
+                processor = self._embedding_processors[provider] = EmbeddingProcessor(provider=provider)
+            return processor
+
+    def _get_indexer(self):
+        with self._init_lock:
+            if self._indexer is None:
+                try:
+                    from .indexar_meilisearch import MeiliSearchIndexer
+                except ImportError:
+                    from indexar_meilisearch import MeiliSearchIndexer
+                indexer = MeiliSearchIndexer(meilisearch_url=self.meilisearch_url, api_key=self.meilisearch_api_key)
+                indexer.connect_meilisearch()
+                self._indexer = indexer
+            return self._indexer
+
+    # ------------------------------------------------------------------ #
+    # Pipeline
+    # ------------------------------------------------------------------ #
+
+    def run(self, job_id: str, input_path: Union[str, StagedInput], config: Dict[str, Any],
+            progress: ProgressCallback, log: Callable[[str], None],
+            is_cancelled: Callable[[], bool]) -> Dict[str, Any]:
+        """
+        Ejecuta el pipeline completo sobre un archivo o directorio.
+
+        Args:
+            job_id: Trabajo al que se asocian los documentos de la biblioteca
+            input_path: Archivo o directorio a procesar, o una entrada ya preparada
+                        (los archivos se procesan a medida que se enumeran)
+            config: Configuración del trabajo (profile, encoding, embedding_provider, api_keys)
+            progress: ``progress(etapa, fracción 0-1, mensaje)``
+            log: Añade una línea a los logs del trabajo
+            is_cancelled: Devuelve True si el trabajo se canceló
+
+        Returns:
+            Estadísticas por etapa
+
+        Raises:
+            IngestionCancelled: Si el trabajo se canceló durante la ejecución
+            Exception: Si la etapa de procesamiento falla para todos los archivos
+        """
+        stats: Dict[str, Any] = {}
+
+        documents = SegmentSpool()
+        try:
+            self._run_processing(input_path, config, progress, log, is_cancelled, stats, documents)
+            self._check(is_cancelled)
+            self._run_embeddings(config, progress, log, stats)
+            self._check(is_cancelled)
+            self._run_meilisearch(progress, log, stats)
+            self._check(is_cancelled)
+            self._run_library(job_id, documents, progress, log, stats)
+        finally:
+            documents.close()
+        return stats
+
+    @contextmanager
+    def _stage_slot(self, stage: str) -> Iterator[None]:
+        slots = self._stage_slots.get(stage)
+        if slots is None:
+            yield
+            return
+        with slots:
+            yield
+
+    @staticmethod
+    def _check(is_cancelled: Callable[[], bool]) -> None:
+        if is_cancelled():
+            raise IngestionCancelled()
+
+    def _run_processing(self, input_path: Union[str, StagedInput], config: Dict[str, Any],
+                        progress: ProgressCallback, log: Callable[[str], None],
+                        is_cancelled: Callable[[], bool], stats: Dict[str, Any],
+                        documents: SegmentSpool) -> None:
+        """Procesa cada archivo con el ProfileManager compartido y vuelca sus segmentos en ``documents``."""
+        from dataset.processing.output_modes import create_serializer
+
+        started = time.monotonic()
+        manager = self.get_profile_manager()
+        serializer = create_serializer('biblioperson')
+        profile = config.get('profile', 'prosa')
+        encoding = config.get('encoding', 'utf-8')
+
+        staged = input_path if isinstance(input_path, StagedInput) else StagedInput(input_path)
+        base_path = staged.base_path
+        log(f"Procesando con perfil '{profile}' (entrada: {staged.mode})")
+
+        files = 0
+        failures = 0
+        total_segments = 0
+        first_result = None
+        for index, file_path in enumerate(staged):
+            self._check(is_cancelled)
+            files += 1
+            # Mientras se enumera, el total aún no se conoce
+            total = f"{staged.discovered}" if staged.complete else f"{staged.discovered}+"
+            progress('processing', index / max(1, staged.discovered + (0 if staged.complete else 1)),
+                     f"Procesando {file_path.name} ({index + 1}/{total})...")
+            try:
+                # El hueco se reserva por archivo: un directorio grande no bloquea a los demás trabajos
+                with self._stage_slot('processing'):
+                    segments, _, document_metadata = manager.process_file(
+                        file_path=str(file_path),
+                        profile_name=profile,
+                        encoding=encoding,
+                        folder_structure_info=self._folder_structure(base_path, file_path)
+                    )
+            except Exception as e:
+                failures += 1
+                log(f"Error procesando {file_path.name}: {e}")
+                continue
+
+            if document_metadata and document_metadata.get('error'):
+                failures += 1
+                log(f"Error procesando {file_path.name}: {document_metadata['error']}")
+                continue
+            if not segments:
+                log(f"{file_path.name}: sin segmentos")
+                continue
+
+            written = documents.add(serializer.serialize_segment(segment, document_metadata, i)
+                                    for i, segment in enumerate(segments))
+            total_segments += written
+            if first_result is None:
+                first_result = time.monotonic() - started
+            log(f"{file_path.name}: {written} segmentos")
+
+        progress('processing', 1.0, f"Procesados {files} archivos")
+        if staged.skipped:
+            log(f"{staged.skipped} archivos o directorios omitidos al preparar la entrada (ver log del servidor)")
+        stats['processing'] = {
+            'files': files,
+            'documents': len(documents),
+            'segments': total_segments,
+            'failures': failures,
+            'staging': staged.mode,
+            'staging_methods': {k: v for k, v in staged.methods.items() if v},
+            'staging_skipped': staged.skipped,
+            'first_result_seconds': round(first_result, 2) if first_result is not None else None,
+            'seconds': round(time.monotonic() - started, 2),
+        }
+        if files and failures == files:
+            raise Exception(f"Error en procesamiento: fallaron los {failures} archivos")
+
+    @staticmethod
+    def _folder_structure(base_path: Path, file_path: Path) -> Dict[str, Any]:
+        if not base_path.is_dir():
+            return {}
+        relative_path = file_path.relative_to(base_path)
+        return {
+            "source_base_directory": str(base_path.resolve()),
+            "relative_path": str(relative_path),
+            "parent_folders": list(relative_path.parent.parts) if relative_path.parent != Path('.') else [],
+            "folder_depth": len(relative_path.parent.parts),
+            "is_in_subdirectory": relative_path.parent != Path('.'),
+            "immediate_parent_folder": relative_path.parent.name if relative_path.parent != Path('.') else None
+        }
+
+    def _run_embeddings(self, config: Dict[str, Any], progress: ProgressCallback,
+                        log: Callable[[str], None], stats: Dict[str, Any]) -> None:
+        started = time.monotonic()
+        provider = config.get('embedding_provider', 'sentence-transformers')
+        api_config = None
+        if provider in ['novita-ai', 'openai'] and config.get('api_keys'):
+            api_config = {
+                'novita': config['api_keys'].get('novita'),
+                'openai': config['api_keys'].get('openai')
+            }
+        progress('embeddings', 0.0, 'Generando embeddings...')
+        log(f"Generando embeddings con proveedor: {provider}")
+        try:
+            with self._stage_slot('embeddings'), self._index_lock:
+                processed = self._get_embedding_processor(provider).process_all(api_config)
+            log(f"Embeddings generados exitosamente ({processed} elementos)")
+            stats['embeddings'] = {'processed': processed, 'seconds': round(time.monotonic() - started, 2)}
+        except Exception as e:
+            # Como antes: un fallo en embeddings no invalida el trabajo
+            log(f"Advertencia en embeddings: {e}")
+            stats['embeddings'] = {'error': str(e), 'seconds': round(time.monotonic() - started, 2)}
+        progress('embeddings', 1.0, 'Embeddings completados')
+
+    def _run_meilisearch(self, progress: ProgressCallback, log: Callable[[str], None],
+                         stats: Dict[str, Any]) -> None:
+        started = time.monotonic()
+        progress('meilisearch', 0.0, 'Indexando en MeiliSearch...')
+        try:
+            with self._stage_slot('meilisearch'), self._index_lock:
+                indexed = self._get_indexer().process_all(only_new=True)
+            log(f"Indexación en MeiliSearch completada ({indexed} elementos)")
+            stats['meilisearch'] = {'indexed': indexed, 'seconds': round(time.monotonic() - started, 2)}
+        except Exception as e:
+            log(f"Advertencia en MeiliSearch: {e}")
+            stats['meilisearch'] = {'error': str(e), 'seconds': round(time.monotonic() - started, 2)}
+            # Reintentar la conexión en el próximo trabajo
+            with self._init_lock:
+                self._indexer = None
+        progress('meilisearch', 1.0, 'Indexación completada')
+
+    def _run_library(self, job_id: str, documents: SegmentSpool, progress: ProgressCallback,
+                     log: Callable[[str], None], stats: Dict[str, Any]) -> None:
+        started = time.monotonic()
+        progress('library', 0.0, 'Guardando en biblioteca...')
+        documents_saved = 0
+        try:
+            library_manager = self.library_factory()
+            for index, records in enumerate(documents.documents()):
+                documents_saved += library_manager.save_document_from_records(records, job_id)
+                progress('library', (index + 1) / len(documents), f"Guardados {documents_saved} documentos")
+            log(f"Documentos guardados en biblioteca: {documents_saved}")
+        except Exception as e:
+            log(f"Advertencia al guardar en biblioteca: {e}")
+        stats['library'] = {'documents_saved': documents_saved, 'seconds': round(time.monotonic() - started, 2)}
+
+
+def stage_progress(stage: str, fraction: float) -> int:
+    """Progreso global (0-100) del trabajo para una fracción de la etapa ``stage``."""
+    start, end = STAGE_RANGES[stage]
+    return int(start + (end - start) * min(max(fraction, 0.0), 1.0))
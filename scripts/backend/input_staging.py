@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Preparación de la entrada de los trabajos de ingesta.
+
+Los trabajos copiaban todo el árbol de entrada a una carpeta temporal antes de
+procesar el primer archivo: con una biblioteca de decenas de GB eso duplicaba la
+E/S de disco y retrasaba varios minutos el primer resultado. StagedInput recorre
+la entrada en un hilo propio y entrega cada archivo en cuanto está listo, de modo
+que el procesamiento empieza mientras la enumeración continúa.
+
+Modos (``staging`` en la configuración del trabajo o BIBLIOPERSON_JOB_STAGING):
+    in_place  Procesar los archivos donde están (por defecto). El pipeline solo los lee.
+    link      Aislar la entrada en una carpeta del trabajo con enlaces duros; si el
+              sistema de archivos no los admite, reflink (clonado copy-on-write) y,
+              como último recurso, copia.
+    copy      Copiar cada archivo a la carpeta del trabajo (comportamiento anterior).
+"""
+
+import logging
+import os
+import queue
+import shutil
+import threading
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+STAGING_MODES = ('in_place', 'link', 'copy')
+DEFAULT_STAGING_MODE = 'in_place'
+
+# ioctl FICLONE de Linux (btrfs, XFS): clona el archivo sin duplicar sus datos
+_FICLONE = 0x40049409
+
+_END = object()
+
+
+def staging_mode(requested: Optional[str] = None) -> str:
+    """Modo solicitado por el trabajo, o el del entorno, o el por defecto."""
+    mode = (requested or os.environ.get('BIBLIOPERSON_JOB_STAGING') or DEFAULT_STAGING_MODE).lower()
+    if mode not in STAGING_MODES:
+        raise ValueError(f"Modo de preparación no válido: {mode} (válidos: {', '.join(STAGING_MODES)})")
+    return mode
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, 'rb') as source, open(dst, 'wb') as target:
+            fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def link_or_copy(src: Path, dst: Path) -> str:
+    """
+    Coloca ``src`` en ``dst`` con el método más barato disponible.
+
+    Returns:
+        'link', 'reflink' o 'copy'
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    # Un destino previo puede ser un enlace duro al original: escribir sobre él lo truncaría
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return 'link'
+    except OSError:
+        pass
+    if _reflink(src, dst):
+        return 'reflink'
+    shutil.copy2(src, dst)
+    return 'copy'
+
+
+class StagedInput:
+    """Archivos de entrada de un trabajo, disponibles a medida que se enumeran."""
+
+    def __init__(self, input_path: str, mode: str = DEFAULT_STAGING_MODE, staging_dir: Optional[str] = None):
+        """
+        Args:
+            input_path: Archivo o directorio de entrada
+            mode: 'in_place', 'link' o 'copy'
+            staging_dir: Carpeta del trabajo (obligatoria salvo en modo in_place)
+
+        Raises:
+            FileNotFoundError: Si ``input_path`` no existe
+            ValueError: Si el modo no es válido o falta ``staging_dir``
+        """
+        self.source_path = Path(input_path)
+        if not self.source_path.exists():
+            raise FileNotFoundError(f"La ruta especificada no existe: {input_path}")
+        if mode not in STAGING_MODES:
+            raise ValueError(f"Modo de preparación no válido: {mode}")
+        if mode != 'in_place' and not staging_dir:
+            raise ValueError(f"El modo '{mode}' necesita una carpeta de trabajo")
+
+        self.mode = mode
+        self.staging_dir = Path(staging_dir) if mode != 'in_place' else None
+        # Raíz que ve el pipeline: la entrada original o su réplica en la carpeta del trabajo
+        if self.staging_dir is None:
+            self.base_path = self.source_path
+        elif self.source_path.is_file():
+            self.base_path = self.staging_dir / self.source_path.name
+        else:
+            self.base_path = self.staging_dir
+
+        self.discovered = 0
+        # Directorios ilegibles y archivos que no se pudieron preparar (se omiten)
+        self.skipped = 0
+        self.complete = False
+        self.methods = {'link': 0, 'reflink': 0, 'copy': 0}
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def start(self) -> 'StagedInput':
+        if self._thread is None:
+            if self.staging_dir is not None:
+                self.staging_dir.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._produce, name='input-staging', daemon=True)
+            self._thread.start()
+        return self
+
+    def __iter__(self) -> Iterator[Path]:
+        """
+        Archivos listos para procesar, en orden de recorrido.
+
+        Los directorios que no se pueden leer y los archivos que no se pueden
+        preparar se registran en el log, se cuentan en ``skipped`` y se omiten.
+
+        Raises:
+            Exception: Si la enumeración falla por un error inesperado
+        """
+        self.start()
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item
+
+    def close(self) -> None:
+        """Detiene la enumeración y elimina la carpeta del trabajo si se creó."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.staging_dir is not None and self.staging_dir.exists():
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def _walk(self) -> Iterator[Path]:
+        if self.source_path.is_file():
+            yield self.source_path
+            return
+        pending = [self.source_path]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError as e:
+                # Como os.walk: un directorio ilegible no detiene el recorrido
+                self.skipped += 1
+                logger.warning(f"⚠️ Directorio omitido, no se puede leer {directory}: {e}")
+                continue
+            subdirectories = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(Path(entry.path))
+                    elif entry.is_file():
+                        yield Path(entry.path)
+                except OSError as e:
+                    self.skipped += 1
+                    logger.warning(f"⚠️ Entrada omitida {entry.path}: {e}")
+            # Orden alfabético también entre subdirectorios (pila LIFO)
+            pending.extend(reversed(subdirectories))
+
+    def _produce(self) -> None:
+        try:
+            for source in self._walk():
+                if self._stop.is_set():
+                    break
+                try:
+                    staged = self._stage(source)
+                except OSError as e:
+                    self.skipped += 1
+                    logger.warning(f"⚠️ Archivo omitido, no se pudo preparar {source}: {e}")
+                    continue
+                self.discovered += 1
+                self._queue.put(staged)
+        except BaseException as e:
+            self._error = e
+            logger.error(f"❌ Error preparando la entrada {self.source_path}: {e}")
+        finally:
+            self.complete = True
+            self._queue.put(_END)
+
+    def _stage(self, source: Path) -> Path:
+        if self.staging_dir is None:
+            return source
+        if self.source_path.is_file():
+            target = self.base_path
+        else:
+            target = self.staging_dir / source.relative_to(self.source_path)
+        if self.mode == 'copy':
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.unlink(missing_ok=True)
+            shutil.copy2(source, target)
+            method = 'copy'
+        else:
+            method = link_or_copy(source, target)
+        self.methods[method] += 1
+        return target
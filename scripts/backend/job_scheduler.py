@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Planificación y persistencia de los trabajos de ingesta del servidor API.
+
+Cada petición de procesamiento lanzaba su propio hilo y los trabajos vivían solo
+en memoria: diez subidas simultáneas eran diez pipelines compitiendo por CPU y
+memoria, y un reinicio del servidor perdía todos los trabajos. Este módulo aporta:
+
+- JobScheduler: pool acotado de workers con cola por prioridad (FIFO dentro de
+  la misma prioridad).
+- JobStore: los trabajos en SQLite, para listarlos y reencolar tras un reinicio
+  los que estaban pendientes o en curso.
+- JobLog: logs del trabajo en un buffer circular de tamaño fijo.
+
+Configuración por variables de entorno (ver ``scheduler_settings``):
+    BIBLIOPERSON_MAX_JOBS        Trabajos en ejecución a la vez (default: 2)
+    BIBLIOPERSON_PROCESSING_JOBS Archivos en procesamiento a la vez entre todos
+                                 los trabajos (default: igual que MAX_JOBS)
+    BIBLIOPERSON_OCR_JOBS        Documentos en OCR a la vez (default: 1)
+    BIBLIOPERSON_JOB_LOG_LINES   Líneas de log retenidas por trabajo (default: 500)
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_JOBS = 2
+DEFAULT_OCR_JOBS = 1
+DEFAULT_LOG_LINES = 500
+
+# Claves de la configuración que no se guardan en disco. Las que tenía el trabajo se
+# anotan en OMITTED_CONFIG_KEY: un trabajo recuperado tras un reinicio ya no las tiene
+_UNPERSISTED_CONFIG_KEYS = ('api_keys',)
+OMITTED_CONFIG_KEY = 'omitted_config_keys'
+
+
+def scheduler_settings() -> Dict[str, int]:
+    """Límites de concurrencia del servidor leídos del entorno."""
+    max_jobs = max(1, int(os.environ.get('BIBLIOPERSON_MAX_JOBS', DEFAULT_MAX_JOBS)))
+    return {
+        'max_jobs': max_jobs,
+        'processing_jobs': max(1, int(os.environ.get('BIBLIOPERSON_PROCESSING_JOBS', max_jobs))),
+        'ocr_jobs': max(1, int(os.environ.get('BIBLIOPERSON_OCR_JOBS', DEFAULT_OCR_JOBS))),
+        'log_lines': max(1, int(os.environ.get('BIBLIOPERSON_JOB_LOG_LINES', DEFAULT_LOG_LINES))),
+    }
+
+
+class JobLog:
+    """
+    Buffer circular de líneas de log; cuenta las descartadas.
+
+    Cada línea tiene un cursor creciente (``total`` tras añadirla), de modo que un
+    cliente puede pedir solo las líneas nuevas con ``since``. Los workers añaden
+    líneas mientras los flujos de eventos leen: ambos pasan por el mismo lock.
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_LOG_LINES, lines: Iterable[str] = (), dropped: int = 0,
+                 on_append: Optional[Callable[[], None]] = None):
+        self._lines = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        self.dropped = dropped
+        self.on_append = None
+        for line in lines:
+            self.append(line)
+        self.on_append = on_append
+
+    @property
+    def total(self) -> int:
+        """Líneas añadidas desde la creación del trabajo, incluidas las descartadas."""
+        with self._lock:
+            return self.dropped + len(self._lines)
+
+    def append(self, line: str) -> None:
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self.dropped += 1
+            self._lines.append(line)
+        if self.on_append is not None:
+            self.on_append()
+
+    def since(self, cursor: int) -> Tuple[List[str], int, int]:
+        """
+        Líneas añadidas después de ``cursor``.
+
+        Returns:
+            (líneas, nuevo cursor, líneas perdidas por haber salido ya del buffer)
+        """
+        with self._lock:
+            lines = list(self._lines)
+            first = self.dropped
+        skipped = max(0, first - cursor)
+        return lines[max(0, cursor - first):], first + len(lines), skipped
+
+    def snapshot(self) -> Tuple[List[str], int]:
+        """(líneas retenidas, líneas descartadas), leídos a la vez."""
+        with self._lock:
+            return list(self._lines), self.dropped
+
+    def to_list(self) -> List[str]:
+        lines, dropped = self.snapshot()
+        if dropped:
+            lines.insert(0, f"... {dropped} líneas anteriores descartadas")
+        return lines
+
+    def __iter__(self):
+        return iter(self.snapshot()[0])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._lines)
+
+
+class JobStore:
+    """Persistencia de los trabajos en SQLite."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: Ruta a la base de datos SQLite. Si no se especifica, usa
+                     jobs.db junto a la base de datos de la biblioteca.
+        """
+        if db_path is None:
+            data_dir = os.path.expanduser('~/AppData/Roaming/Biblioperson')
+            os.makedirs(data_dir, exist_ok=True)
+            db_path = os.path.join(data_dir, 'jobs.db')
+
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    seq INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    progress INTEGER NOT NULL DEFAULT 0,
+                    message TEXT,
+                    config TEXT,
+                    stats TEXT,
+                    stages TEXT,
+                    logs TEXT,
+                    logs_dropped INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)')
+
+    def save(self, job: Dict[str, Any]) -> None:
+        """Inserta o actualiza el trabajo."""
+        config = {k: v for k, v in job['config'].items() if k not in _UNPERSISTED_CONFIG_KEYS}
+        omitted = [k for k in _UNPERSISTED_CONFIG_KEYS if job['config'].get(k)]
+        if omitted:
+            config[OMITTED_CONFIG_KEY] = omitted
+        logs, dropped = job['logs'].snapshot()
+        row = (
+            job['id'], job['seq'], job['status'], job.get('priority', 0), job.get('progress', 0),
+            job.get('message'), json.dumps(config, ensure_ascii=False, default=str),
+            json.dumps(job.get('stats', {}), ensure_ascii=False, default=str),
+            json.dumps(job.get('stages', {}), ensure_ascii=False, default=str),
+            json.dumps(logs, ensure_ascii=False), dropped,
+            job.get('created_at'), job.get('started_at'), job.get('finished_at')
+        )
+        with self._lock, self._connect() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO jobs
+                    (id, seq, status, priority, progress, message, config, stats, stages,
+                     logs, logs_dropped, created_at, started_at, finished_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', row)
+
+    def load_recent(self, limit: int, max_log_lines: int = DEFAULT_LOG_LINES) -> List[Dict[str, Any]]:
+        """Los ``limit`` trabajos más recientes, además de todos los que quedaron sin terminar."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute('''
+                SELECT * FROM jobs
+                WHERE status IN ('pending', 'queued', 'running')
+                   OR seq IN (SELECT seq FROM jobs ORDER BY seq DESC LIMIT ?)
+                ORDER BY seq
+            ''', (limit,)).fetchall()
+
+        jobs = []
+        for row in rows:
+            jobs.append({
+                'id': row['id'],
+                'seq': row['seq'],
+                'status': row['status'],
+                'priority': row['priority'],
+                'progress': row['progress'],
+                'message': row['message'],
+                'config': json.loads(row['config'] or '{}'),
+                'stats': json.loads(row['stats'] or '{}'),
+                'stages': json.loads(row['stages'] or '{}'),
+                'logs': JobLog(max_log_lines, json.loads(row['logs'] or '[]'), row['logs_dropped']),
+                'created_at': row['created_at'],
+                'started_at': row['started_at'],
+                'finished_at': row['finished_at'],
+            })
+        return jobs
+
+    def last_seq(self) -> int:
+        with self._lock, self._connect() as conn:
+            row = conn.execute('SELECT MAX(seq) FROM jobs').fetchone()
+        return row[0] or 0
+
+
+class JobScheduler:
+    """Pool acotado de workers que ejecuta trabajos por orden de prioridad."""
+
+    def __init__(self, execute: Callable[[str], None], max_workers: int = DEFAULT_MAX_JOBS):
+        """
+        Args:
+            execute: Ejecuta un trabajo por su id (se llama desde un worker)
+            max_workers: Trabajos en ejecución a la vez
+        """
+        self.execute = execute
+        self.max_workers = max(1, max_workers)
+        self._heap: List[tuple] = []
+        self._queued: Dict[str, tuple] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._stopping = False
+
+    def start(self) -> None:
+        with self._cond:
+            if self._workers:
+                return
+            for i in range(self.max_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f'job-worker-{i + 1}', daemon=True)
+                self._workers.append(worker)
+                worker.start()
+
+    def submit(self, job_id: str, priority: int = 0) -> None:
+        """Encola el trabajo; mayor ``priority`` se ejecuta antes."""
+        entry = (-priority, next(self._seq), job_id)
+        with self._cond:
+            self._queued[job_id] = entry
+            heapq.heappush(self._heap, entry)
+            self._cond.notify()
+
+    def remove(self, job_id: str) -> bool:
+        """Saca un trabajo de la cola si aún no ha empezado."""
+        with self._cond:
+            # La entrada del heap se descarta al salir (borrado perezoso)
+            return self._queued.pop(job_id, None) is not None
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """Posición (1 = siguiente) del trabajo en la cola, o None si no está encolado."""
+        with self._cond:
+            entry = self._queued.get(job_id)
+            if entry is None:
+                return None
+            return 1 + sum(1 for other in self._queued.values() if other < entry)
+
+    def queued_count(self) -> int:
+        with self._cond:
+            return len(self._queued)
+
+    def shutdown(self) -> None:
+        """Detiene los workers cuando terminen el trabajo en curso."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    def _next_job(self) -> Optional[str]:
+        with self._cond:
+            while True:
+                if self._stopping:
+                    return None
+                while self._heap:
+                    entry = heapq.heappop(self._heap)
+                    job_id = entry[2]
+                    if self._queued.get(job_id) == entry:
+                        del self._queued[job_id]
+                        return job_id
+                self._cond.wait()
+
+    def _worker_loop(self) -> None:
+        while True:
+            job_id = self._next_job()
+            if job_id is None:
+                return
+            try:
+                self.execute(job_id)
+            except Exception as e:
+                logger.error(f"❌ Error no controlado en el trabajo {job_id}: {e}", exc_info=True)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Migra los embeddings guardados como texto JSON al formato binario compacto.
+
+Este script:
+1. Localiza la tabla de contenido (nombre con 'contenido') de la base de datos SQLite
+2. Lee en lotes las filas cuyo embedding_vectorial sigue siendo texto JSON
+3. Reescribe cada vector como BLOB binario float32/float16 (ver embedding_codec.py)
+4. Opcionalmente compacta la base de datos con VACUUM
+
+Uso:
+    python migrar_embeddings.py --db-path biblioperson.db
+    python migrar_embeddings.py --db-path biblioperson.db --dtype float16 --vacuum
+    python migrar_embeddings.py --db-path biblioperson.db --dry-run
+"""
+
+import sys
+import sqlite3
+import argparse
+import logging
+from typing import Optional
+
+try:
+    from .embedding_codec import encode_embedding, decode_embedding
+except ImportError:
+    from embedding_codec import encode_embedding, decode_embedding
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def find_content_table(conn: sqlite3.Connection) -> Optional[str]:
+    """Devuelve la primera tabla de contenido, igual que procesar_semantica.py."""
+    row = conn.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name LIKE '%contenido%'
+    """).fetchone()
+    return row[0] if row else None
+
+
+def migrate(db_path: str, dtype: str = "float32", batch_size: int = 1000,
+            dry_run: bool = False, vacuum: bool = False) -> int:
+    """
+    Convierte a binario todos los embeddings JSON de la tabla de contenido.
+
+    Returns:
+        Número de filas migradas (o que se migrarían con dry_run)
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        content_table = find_content_table(conn)
+        if not content_table:
+            logger.error("No se encontraron tablas de contenido en la base de datos")
+            return 0
+        logger.info(f"Usando tabla de contenido: {content_table}")
+
+        pending = conn.execute(f"""
+            SELECT COUNT(*) FROM {content_table}
+            WHERE typeof(embedding_vectorial) = 'text' AND embedding_vectorial != ''
+        """).fetchone()[0]
+        logger.info(f"Embeddings en formato JSON: {pending}")
+        if dry_run or not pending:
+            return pending
+
+        migrated = 0
+        bytes_before = 0
+        bytes_after = 0
+        last_id = None
+        while True:
+            # Paginación por id: las filas ya migradas dejan de ser 'text' y no reaparecen
+            rows = conn.execute(f"""
+                SELECT id, embedding_vectorial FROM {content_table}
+                WHERE typeof(embedding_vectorial) = 'text' AND embedding_vectorial != ''
+                  AND (? IS NULL OR id > ?)
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, last_id, batch_size)).fetchall()
+            if not rows:
+                break
+
+            updates = []
+            for content_id, embedding_json in rows:
+                try:
+                    blob = encode_embedding(decode_embedding(embedding_json), dtype)
+                except ValueError as e:
+                    logger.warning(f"Embedding inválido en fila {content_id}, se deja sin migrar: {e}")
+                    continue
+                bytes_before += len(embedding_json.encode('utf-8'))
+                bytes_after += len(blob)
+                updates.append((blob, content_id))
+
+            conn.executemany(f"UPDATE {content_table} SET embedding_vectorial = ? WHERE id = ?", updates)
+            conn.commit()
+            migrated += len(updates)
+            last_id = rows[-1][0]
+            logger.info(f"Migrados {migrated}/{pending} embeddings")
+
+        if bytes_before:
+            logger.info(f"Tamaño de los vectores: {bytes_before / 1024 / 1024:.1f} MB -> "
+                        f"{bytes_after / 1024 / 1024:.1f} MB ({bytes_after / bytes_before:.0%})")
+
+        if vacuum:
+            logger.info("Compactando base de datos (VACUUM)...")
+            conn.execute("VACUUM")
+        return migrated
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrar embeddings JSON al formato binario compacto")
+    parser.add_argument("--db-path", required=True,
+                       help="Ruta a la base de datos SQLite")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"],
+                       help="Precisión del formato binario (default: float32)")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                       help="Filas por transacción (default: 1000)")
+    parser.add_argument("--dry-run", action="store_true",
+                       help="Solo contar los embeddings pendientes de migrar")
+    parser.add_argument("--vacuum", action="store_true",
+                       help="Ejecutar VACUUM al terminar para recuperar espacio en disco")
+
+    args = parser.parse_args()
+
+    try:
+        migrate(args.db_path, dtype=args.dtype, batch_size=args.batch_size,
+                dry_run=args.dry_run, vacuum=args.vacuum)
+    except Exception as e:
+        logger.error(f"Error en la migración: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
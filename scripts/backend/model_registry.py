@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Registro de modelos compartido por todo el proceso.
+
+Los generadores de embeddings cargan un SentenceTransformer y hacen un encode de
+calentamiento al construirse; crear uno por petición HTTP o por archivo importado
+pone ese coste en cada consulta. ModelRegistry carga cada modelo de forma perezosa
+la primera vez que se pide, lo comparte entre hilos y libera los menos usados
+cuando se supera el máximo configurado.
+
+Configuración por variables de entorno:
+    BIBLIOPERSON_MAX_MODELS     Modelos residentes como máximo (default: 2)
+    BIBLIOPERSON_MODEL_IDLE_TTL Segundos sin uso tras los que se libera un modelo
+                                (default: 0 = sin expiración)
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Caché LRU thread-safe de modelos cargados de forma perezosa."""
+
+    def __init__(self, max_models: int = 2, idle_ttl: float = 0):
+        """
+        Args:
+            max_models: Número máximo de modelos residentes (0 = sin límite)
+            idle_ttl: Segundos sin uso tras los que se libera un modelo (0 = nunca)
+        """
+        self.max_models = max_models
+        self.idle_ttl = idle_ttl
+        self._models: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._last_used: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        # Un lock por clave: dos hilos que piden el mismo modelo esperan a una sola carga
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Devuelve el modelo registrado bajo ``key``, cargándolo con ``loader()`` si hace falta.
+        """
+        with self._lock:
+            self._evict_idle()
+            if key in self._models:
+                self._models.move_to_end(key)
+                self._last_used[key] = time.monotonic()
+                return self._models[key]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self._last_used[key] = time.monotonic()
+                    return self._models[key]
+
+            started = time.monotonic()
+            model = loader()
+            logger.info(f"Modelo registrado: {key} (cargado en {time.monotonic() - started:.1f}s)")
+
+            with self._lock:
+                self._models[key] = model
+                self._last_used[key] = time.monotonic()
+                self._evict_overflow()
+            return model
+
+    def evict(self, key: Hashable) -> bool:
+        """Libera un modelo concreto. Devuelve True si estaba cargado."""
+        with self._lock:
+            return self._drop(key)
+
+    def clear(self) -> None:
+        """Libera todos los modelos."""
+        with self._lock:
+            for key in list(self._models):
+                self._drop(key)
+
+    def loaded_models(self) -> List[Hashable]:
+        """Claves de los modelos residentes, del menos al más recientemente usado."""
+        with self._lock:
+            return list(self._models)
+
+    def _drop(self, key: Hashable) -> bool:
+        if key not in self._models:
+            return False
+        del self._models[key]
+        self._last_used.pop(key, None)
+        logger.info(f"Modelo liberado del registro: {key}")
+        return True
+
+    def _evict_overflow(self) -> None:
+        while self.max_models and len(self._models) > self.max_models:
+            self._drop(next(iter(self._models)))
+
+    def _evict_idle(self) -> None:
+        if not self.idle_ttl:
+            return
+        now = time.monotonic()
+        for key in [k for k, used in self._last_used.items() if now - used > self.idle_ttl]:
+            self._drop(key)
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Registro único del proceso, configurado desde el entorno en el primer uso."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(
+                max_models=int(os.environ.get('BIBLIOPERSON_MAX_MODELS', '2')),
+                idle_ttl=float(os.environ.get('BIBLIOPERSON_MODEL_IDLE_TTL', '0'))
+            )
+        return _registry
+
+
+def get_embedding_generator(provider: str = "sentence-transformers",
+                            model_name: str = "all-mpnet-base-v2"):
+    """
+    Devuelve un EmbeddingGenerator compartido para ``model_name``.
+
+    El modelo se carga (y se calienta) una sola vez por proceso; las siguientes
+    peticiones y archivos reutilizan la misma instancia.
+    """
+    from .generate_embeddings import EmbeddingGenerator
+
+    return get_model_registry().get(
+        ('EmbeddingGenerator', provider, model_name),
+        lambda: EmbeddingGenerator(provider=provider, model_name=model_name)
+    )
@@ -31,19 +31,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+try:
+    from .embedding_codec import encode_embedding
+    from .model_registry import get_model_registry
+except ImportError:
+    from embedding_codec import encode_embedding
+    from model_registry import get_model_registry
+
+# Sin sys.exit al importar: el runner de ingesta del API usa este módulo en proceso
 try:
     from sentence_transformers import SentenceTransformer
 except ImportError:
-    logger.error("sentence-transformers no está instalado. Instálalo con: pip install sentence-transformers")
-    sys.exit(1)
+    SentenceTransformer = None
+
+SENTENCE_TRANSFORMERS_MISSING = "sentence-transformers no está instalado. Instálalo con: pip install sentence-transformers"
+
+
+def _load_sentence_transformer(model_name: str):
+    """SentenceTransformer compartido por el proceso a través del registro de modelos."""
+    if SentenceTransformer is None:
+        raise ImportError(SENTENCE_TRANSFORMERS_MISSING)
+    return get_model_registry().get(('SentenceTransformer', model_name), lambda: SentenceTransformer(model_name))
 
 class EmbeddingProcessor:
     """Procesador de embeddings para contenido de Biblioperson."""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", batch_size: int = 32, provider: str = "sentence-transformers"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", batch_size: int = 32, provider: str = "sentence-transformers",
+                 storage_dtype: str = "float32"):
         self.model_name = model_name
         self.batch_size = batch_size
         self.provider = provider
+        self.storage_dtype = storage_dtype  # Precisión de los BLOBs guardados (ver embedding_codec)
         self.model = None
         self.db_path = self._find_database_path()
         
@@ -77,7 +95,7 @@ class EmbeddingProcessor:
             if self.provider == "sentence-transformers":
                 # Usar el modelo más avanzado para Sentence Transformers
                 advanced_model = "all-mpnet-base-v2"  # Modelo más potente
-                self.model = SentenceTransformer(advanced_model)
+                self.model = _load_sentence_transformer(advanced_model)
                 logger.info(f"Modelo Sentence Transformers cargado: {advanced_model}")
             elif self.provider == "novita-ai":
                 # Para Novita AI, no cargamos modelo local
@@ -93,7 +111,7 @@ class EmbeddingProcessor:
                 logger.info("Configurado para usar MeiliSearch + HuggingFace")
             else:
                 # Fallback a Sentence Transformers
-                self.model = SentenceTransformer(self.model_name)
+                self.model = _load_sentence_transformer(self.model_name)
                 logger.info(f"Proveedor desconocido, usando Sentence Transformers: {self.model_name}")
         except Exception as e:
             logger.error(f"Error al cargar el modelo: {e}")
@@ -264,16 +282,17 @@ class EmbeddingProcessor:
             content_table = tables[0][0]
             
             # Actualizar embeddings
-            for content_id, text, embedding in content_data:
-                embedding_json = json.dumps(embedding)
-                
-                update_query = f"""
-                    UPDATE {content_table} 
-                    SET embedding_vectorial = ? 
-                    WHERE id = ?
-                """
-                
-                cursor.execute(update_query, (embedding_json, content_id))
+            update_query = f"""
+                UPDATE {content_table} 
+                SET embedding_vectorial = ? 
+                WHERE id = ?
+            """
+            
+            # BLOB binario con cabecera (float32/float16) en lugar de texto JSON
+            cursor.executemany(update_query, [
+                (encode_embedding(embedding, self.storage_dtype), content_id)
+                for content_id, text, embedding in content_data
+            ])
             
             conn.commit()
             conn.close()
@@ -284,8 +303,13 @@ class EmbeddingProcessor:
             logger.error(f"Error al actualizar embeddings: {e}")
             raise
     
-    def process_all(self, api_config: dict = None):
-        """Procesa todo el contenido sin embeddings."""
+    def process_all(self, api_config: dict = None) -> int:
+        """
+        Procesa todo el contenido sin embeddings.
+        
+        Returns:
+            Número de elementos procesados
+        """
         logger.info(f"Iniciando procesamiento de embeddings con proveedor: {self.provider}")
         
         # Obtener contenido sin embeddings
@@ -293,7 +317,7 @@ class EmbeddingProcessor:
         
         if not content_without_embeddings:
             logger.info("No hay contenido para procesar")
-            return
+            return 0
         
         # Procesar en lotes
         total_processed = 0
@@ -318,6 +342,7 @@ class EmbeddingProcessor:
             logger.info(f"Procesados {total_processed}/{len(content_without_embeddings)} elementos")
         
         logger.info("Procesamiento de embeddings completado")
+        return total_processed
 
 def main():
     parser = argparse.ArgumentParser(description="Generar embeddings para contenido de Biblioperson")
@@ -330,6 +355,8 @@ def main():
                        help="Proveedor de embeddings (default: sentence-transformers)")
     parser.add_argument("--api-config", type=str,
                        help="Configuración de API en formato JSON")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"],
+                       help="Precisión con la que se guardan los embeddings (default: float32)")
     parser.add_argument("--verbose", "-v", action="store_true",
                        help="Activar logging detallado")
     
@@ -338,6 +365,10 @@ def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
+    if SentenceTransformer is None and args.provider == "sentence-transformers":
+        logger.error(SENTENCE_TRANSFORMERS_MISSING)
+        sys.exit(1)
+    
     # Parsear configuración de API si se proporciona
     api_config = None
     if args.api_config:
@@ -351,7 +382,8 @@ def main():
         processor = EmbeddingProcessor(
             model_name=args.model, 
             batch_size=args.batch_size,
-            provider=args.provider
+            provider=args.provider,
+            storage_dtype=args.dtype
         )
         processor.process_all(api_config)
     except Exception as e:
@@ -9,9 +9,19 @@ para que puedan ser mostrados en la biblioteca del frontend.
 import sqlite3
 import json
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dataset.processing.fulltext import ensure_fts_index, fts_count, fts_search, build_match_query
+
+# Columnas del índice de texto completo y su peso BM25 (el título pesa más que el cuerpo)
+FTS_COLUMNS = ['title', 'author', 'content_preview', 'full_content']
+FTS_WEIGHTS = [10.0, 5.0, 2.0, 1.0]
 
 class LibraryManager:
     """Gestor de la base de datos de biblioteca."""
@@ -63,6 +73,8 @@ class LibraryManager:
             conn.execute('''
                 CREATE INDEX IF NOT EXISTS idx_documents_processed_date ON documents(processed_date)
             ''')
+            
+            self.fts_enabled = ensure_fts_index(conn, 'documents', FTS_COLUMNS, content_rowid='id')
     
     def save_documents_from_ndjson(self, ndjson_file: str, job_id: str) -> int:
         """Guarda documentos desde un archivo NDJSON en la biblioteca.
@@ -77,6 +89,33 @@ class LibraryManager:
         if not os.path.exists(ndjson_file):
             raise FileNotFoundError(f"Archivo NDJSON no encontrado: {ndjson_file}")
         
+        return self.save_document_from_records(self._read_ndjson_records(ndjson_file), job_id)
+    
+    def _read_ndjson_records(self, ndjson_file: str) -> Iterator[Dict[str, Any]]:
+        with open(ndjson_file, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"Error al parsear línea {line_num} del NDJSON: {e}")
+                    continue
+    
+    def save_document_from_records(self, records: Iterable[Dict[str, Any]], job_id: str) -> int:
+        """Guarda en la biblioteca un documento a partir de sus segmentos serializados.
+        
+        Es el mismo formato que cada línea del NDJSON de salida, así que el runner de
+        ingesta del API puede pasar los segmentos en memoria sin escribir el archivo.
+        
+        Args:
+            records: Segmentos serializados del documento, en orden
+            job_id: ID del trabajo de procesamiento
+            
+        Returns:
+            Número de documentos guardados (0 o 1)
+        """
         documents_saved = 0
         processed_date = datetime.now().isoformat()
         
@@ -85,38 +124,28 @@ class LibraryManager:
         document_metadata = None
         
         with sqlite3.connect(self.db_path) as conn:
-            with open(ndjson_file, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
+            for record_num, doc in enumerate(records, 1):
+                try:
+                    # Si es el primer segmento, capturamos los metadatos del documento
+                    if document_metadata is None:
+                        document_metadata = {
+                            'title': (doc.get('title') or doc.get('document_title') or doc.get('content_title')
+                                     or f'Documento sin título'),
+                            'author': (doc.get('author') or doc.get('document_author') or doc.get('content_author')
+                                      or 'Desconocido'),
+                            'source_file': doc.get('source_file_path') or doc.get('source_file') or '',
+                            'language': doc.get('document_language') or doc.get('language') or 'unknown',
+                            'original_metadata': doc
+                        }
                     
-                    try:
-                        doc = json.loads(line)
-                        
-                        # Si es la primera línea, capturamos los metadatos del documento
-                        if document_metadata is None:
-                            document_metadata = {
-                                'title': (doc.get('title') or doc.get('document_title') or doc.get('content_title')
-                                         or f'Documento sin título'),
-                                'author': (doc.get('author') or doc.get('document_author') or doc.get('content_author')
-                                          or 'Desconocido'),
-                                'source_file': doc.get('source_file_path') or doc.get('source_file') or '',
-                                'language': doc.get('document_language') or doc.get('language') or 'unknown',
-                                'original_metadata': doc
-                            }
-                        
-                        # Acumular el texto de cada segmento
-                        segment_text = doc.get('text') or doc.get('content') or ''
-                        if segment_text:
-                            full_text_parts.append(segment_text)
-                        
-                    except json.JSONDecodeError as e:
-                        print(f"Error al parsear línea {line_num} del NDJSON: {e}")
-                        continue
-                    except Exception as e:
-                        print(f"Error procesando línea {line_num}: {e}")
-                        continue
+                    # Acumular el texto de cada segmento
+                    segment_text = doc.get('text') or doc.get('content') or ''
+                    if segment_text:
+                        full_text_parts.append(segment_text)
+                    
+                except Exception as e:
+                    print(f"Error procesando segmento {record_num}: {e}")
+                    continue
             
             # Al final, guardar el documento completo con todo el texto acumulado
             if document_metadata and full_text_parts:
@@ -198,12 +227,22 @@ class LibraryManager:
             '''
             params = []
             
-            if search:
-                query += ''' WHERE (title LIKE ? OR author LIKE ? OR content_preview LIKE ?)'''
-                search_term = f'%{search}%'
-                params.extend([search_term, search_term, search_term])
-            
-            query += ''' ORDER BY created_at DESC LIMIT ? OFFSET ?'''
+            if search and self.fts_enabled and build_match_query(search):
+                # Coincidencias del índice de texto completo, por relevancia
+                query += ''' JOIN (
+                    SELECT rowid, bm25(documents_fts, ?, ?, ?, ?) AS rank
+                    FROM documents_fts WHERE documents_fts MATCH ?
+                ) fts ON fts.rowid = documents.id'''
+                params.extend(FTS_WEIGHTS)
+                params.append(build_match_query(search))
+                query += ''' ORDER BY fts.rank LIMIT ? OFFSET ?'''
+            else:
+                if search:
+                    query += ''' WHERE (title LIKE ? OR author LIKE ? OR content_preview LIKE ?)'''
+                    search_term = f'%{search}%'
+                    params.extend([search_term, search_term, search_term])
+                
+                query += ''' ORDER BY created_at DESC LIMIT ? OFFSET ?'''
             params.extend([limit, offset])
             
             cursor = conn.execute(query, params)
@@ -227,6 +266,39 @@ class LibraryManager:
             
             return documents
     
+    def search_documents(self, query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Busca documentos por texto completo con ranking BM25.
+        
+        Args:
+            query: Texto libre; ignora mayúsculas y tildes, y el último término admite prefijo
+            limit: Número máximo de resultados
+            offset: Número de resultados a omitir (para paginación)
+            
+        Returns:
+            Diccionario con ``results`` (documento, ``score`` y ``snippet`` del
+            contenido con los términos entre <mark>) y ``total``
+        """
+        if not self.fts_enabled:
+            documents = self.get_documents(limit=limit, offset=offset, search=query)
+            search_term = f'%{query}%'
+            with sqlite3.connect(self.db_path) as conn:
+                total = conn.execute('''
+                    SELECT COUNT(*) FROM documents
+                    WHERE (title LIKE ? OR author LIKE ? OR content_preview LIKE ?)
+                ''', (search_term, search_term, search_term)).fetchone()[0]
+            return {'results': documents, 'total': total}
+        
+        with sqlite3.connect(self.db_path) as conn:
+            results = fts_search(
+                conn, 'documents', query,
+                select_columns=['id', 'title', 'author', 'source_file', 'file_type',
+                                'processed_date', 'word_count', 'language'],
+                snippet_column=FTS_COLUMNS.index('full_content'),
+                weights=FTS_WEIGHTS, content_rowid='id',
+                limit=limit, offset=offset
+            )
+            return {'results': results, 'total': fts_count(conn, 'documents', query)}
+    
     def get_document_by_id(self, doc_id: int) -> Optional[Dict[str, Any]]:
         """Obtiene un documento específico por su ID.
         
@@ -44,6 +44,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 # Importar módulos del dataset
 from dataset.processing.profile_manager import ProfileManager
 from dataset.scripts.process_file import core_process
+from dataset.processing.fulltext import ensure_fts_index
 
 # Configurar logging
 logging.basicConfig(
@@ -122,6 +123,10 @@ class BibliopersonImporter:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_segment_order ON segments(segment_order)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_segment_type ON segments(segment_type)")
         
+        # Índices de texto completo (FTS5) para buscar sin Meilisearch
+        ensure_fts_index(conn, 'documents', ['title', 'author'])
+        ensure_fts_index(conn, 'segments', ['text'])
+        
         # Tabla de embeddings (opcional)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS embeddings (
@@ -358,10 +363,10 @@ class BibliopersonImporter:
         """Genera embeddings para los segmentos."""
         try:
             # Importar el generador de embeddings
-            from backend.generate_embeddings import EmbeddingGenerator
+            from backend.model_registry import get_embedding_generator
             
-            # Configurar el generador (usar sentence-transformers por defecto)
-            generator = EmbeddingGenerator(
+            # Generador compartido entre archivos (usar sentence-transformers por defecto)
+            generator = get_embedding_generator(
                 provider="sentence-transformers",
                 model_name="hiiamsid/sentence_similarity_spanish_es"
             )